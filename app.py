@@ -1,11 +1,13 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 import random
 import time
-import requests
+
+from src.services.rest_client import get_rest_client
+from src.services.firestore_codec import decode_value, encode_document
+from src.services.write_queue import PermanentWriteError, WriteBehindQueue, pending_payload
+from src.utils.streaming import encode_chunks, spool_chunks
 
 # Configuração da página
 st.set_page_config(
@@ -281,7 +283,7 @@ def firebase_signup(email, password, display_name=""):
         if display_name:
             payload["displayName"] = display_name
             
-        response = requests.post(FIREBASE_SIGNUP_URL, json=payload, timeout=10)
+        response = get_rest_client().post(FIREBASE_SIGNUP_URL, json=payload, timeout=10, endpoint="auth.signup")
         
         if response.status_code == 200:
             return True, response.json(), "Usuário cadastrado com sucesso!"
@@ -310,7 +312,7 @@ def firebase_signin(email, password):
             "returnSecureToken": True
         }
         
-        response = requests.post(FIREBASE_SIGNIN_URL, json=payload, timeout=10)
+        response = get_rest_client().post(FIREBASE_SIGNIN_URL, json=payload, timeout=10, endpoint="auth.signin")
         
         if response.status_code == 200:
             return True, response.json(), "Login realizado com sucesso!"
@@ -332,8 +334,42 @@ def firebase_signin(email, password):
     except Exception as e:
         return False, None, f"Erro de conexão: {str(e)}"
 
+def _patch_document(client, key, payload):
+    """Envia documento enfileirado; o PATCH substitui o documento inteiro, então reenvios são idempotentes"""
+    
+    doc_url = f"{FIRESTORE_BASE_URL}/{key}?key={FIREBASE_API_KEY}"
+    response = client.patch(
+        doc_url, json=payload, headers={"Content-Type": "application/json"},
+        timeout=30, endpoint="firestore.save_assessment"
+    )
+    
+    if response.status_code in [200, 201]:
+        return
+    # Permissão, API key ou formato: repetir não resolve
+    if response.status_code in [400, 401, 403]:
+        raise PermanentWriteError(f"HTTP {response.status_code}: {response.text[:500]}")
+    raise RuntimeError(f"HTTP {response.status_code}")
+
+
+@st.cache_resource
+def get_write_queue():
+    """Fila durável de gravações no Firestore, compartilhada pelo processo
+
+    Usa um journal próprio (REST_WRITE_QUEUE_PATH): o de `database.get_write_queue`
+    (WRITE_QUEUE_PATH) tem outro formato de payload e outro sender.
+    """
+    client = get_rest_client()
+    queue = WriteBehindQueue(
+        st.secrets.get("REST_WRITE_QUEUE_PATH", ".neuromap/rest_write_queue.db"),
+        lambda key, payload: _patch_document(client, key, payload)
+    )
+    # Pendências de execuções anteriores são enviadas sem esperar um novo enqueue
+    queue.resume()
+    return queue
+
+
 def save_assessment_to_firestore(user_id, results):
-    """Salva avaliação no Firestore usando REST API com debug detalhado"""
+    """Registra a avaliação na fila de gravação; o envio ao Firestore ocorre em segundo plano"""
     
     if not FIREBASE_PROJECT_ID or not user_id:
         st.error("❌ Dados incompletos para salvar no Firestore")
@@ -342,81 +378,22 @@ def save_assessment_to_firestore(user_id, results):
         return False
     
     try:
-        # URL REST do Firestore
-        doc_url = f"https://firestore.googleapis.com/v1/projects/{FIREBASE_PROJECT_ID}/databases/(default)/documents/users/{user_id}?key={FIREBASE_API_KEY}"
-        
-        st.info(f"🔗 **URL:** {doc_url}")
-        
-        # Dados no formato Firestore
-        firestore_data = {
-            "fields": {
-                "results": {
-                    "mapValue": {
-                        "fields": {
-                            "disc": {
-                                "mapValue": {
-                                    "fields": {
-                                        "D": {"doubleValue": float(results["disc"]["D"])},
-                                        "I": {"doubleValue": float(results["disc"]["I"])},
-                                        "S": {"doubleValue": float(results["disc"]["S"])},
-                                        "C": {"doubleValue": float(results["disc"]["C"])}
-                                    }
-                                }
-                            },
-                            "mbti_type": {"stringValue": str(results["mbti_type"])},
-                            "reliability": {"integerValue": str(int(results["reliability"]))},
-                            "completion_time": {"integerValue": str(int(results["completion_time"]))},
-                            "total_questions": {"integerValue": str(int(results["total_questions"]))},
-                            "response_consistency": {"doubleValue": float(results["response_consistency"])},
-                            "response_variance": {"doubleValue": float(results["response_variance"])},
-                            "answered_questions": {"integerValue": str(int(results["answered_questions"]))}
-                        }
-                    }
-                },
-                "timestamp": {"timestampValue": datetime.now().isoformat() + "Z"},
-                "user_email": {"stringValue": str(st.session_state.user_email)},
-                "user_id": {"stringValue": str(user_id)},
-                "version": {"stringValue": "8.0"}
-            }
-        }
-        
-        # Headers
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        st.info("📤 **Enviando dados para Firestore...**")
-        
-        # Requisição PATCH para criar/atualizar documento
-        response = requests.patch(doc_url, json=firestore_data, headers=headers, timeout=30)
-        
-        st.info(f"📡 **Status HTTP:** {response.status_code}")
-        
-        if response.status_code in [200, 201]:
-            st.success("✅ **SUCESSO!** Dados salvos no Firestore!")
-            return True
-        else:
-            st.error(f"❌ **Erro Firestore:** {response.status_code}")
-            st.error(f"**Response:** {response.text}")
-            
-            # Tenta diagnóstico do erro
-            if response.status_code == 403:
-                st.error("🚫 **Erro de Permissão:** Verifique as regras do Firestore")
-            elif response.status_code == 400:
-                st.error("📝 **Erro de Formato:** Dados mal formatados")
-            elif response.status_code == 401:
-                st.error("🔑 **Erro de Auth:** API Key inválida")
-            
-            return False
+        # Dados no formato Firestore (resultado completo, tipado pelo codec)
+        firestore_data = encode_document({
+            "results": results,
+            "answers": st.session_state.get("assessment_answers") or {},
+            "timestamp": datetime.now(timezone.utc),
+            "user_email": str(st.session_state.user_email),
+            "user_id": str(user_id),
+            "version": "8.0"
+        })
+        
+        # A chave é o caminho do documento: uma gravação mais nova substitui a pendente
+        get_write_queue().enqueue(f"users/{user_id}", firestore_data, owner=str(user_id))
+        return True
         
-    except requests.exceptions.Timeout:
-        st.error("⏰ **Timeout:** Firestore demorou para responder")
-        return False
-    except requests.exceptions.ConnectionError:
-        st.error("🌐 **Erro de Conexão:** Verifique sua internet")
-        return False
     except Exception as e:
-        st.error(f"❌ **Erro geral:** {str(e)}")
+        st.error(f"❌ **Erro ao registrar avaliação:** {str(e)}")
         return False
 
 
@@ -427,38 +404,33 @@ def load_assessment_from_firestore(user_id):
         return None
     
     try:
-        doc_url = f"https://firestore.googleapis.com/v1/projects/{FIREBASE_PROJECT_ID}/databases/(default)/documents/users/{user_id}?key={FIREBASE_API_KEY}"
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        response = requests.get(doc_url, headers=headers, timeout=10)
+        # Gravação ainda na fila é mais recente que o documento no Firestore
+        # (só as que serão tentadas: as rejeitadas não representam o documento)
+        pending = pending_payload(get_write_queue(), f"users/{user_id}", owner=str(user_id))
+        if pending is not None:
+            response, data = None, pending
+        else:
+            doc_url = f"https://firestore.googleapis.com/v1/projects/{FIREBASE_PROJECT_ID}/databases/(default)/documents/users/{user_id}?key={FIREBASE_API_KEY}"
+            
+            headers = {
+                "Content-Type": "application/json"
+            }
+            
+            response = get_rest_client().get(doc_url, headers=headers, timeout=10, endpoint="firestore.load_assessment")
+            data = response.json() if response.status_code == 200 else None
         
-        if response.status_code == 200:
-            data = response.json()
+        if data is not None:
             
             if "fields" in data and "results" in data["fields"]:
                 # Converte formato Firestore de volta para Python
-                firestore_results = data["fields"]["results"]["mapValue"]["fields"]
+                results = decode_value(data["fields"]["results"])
                 
-                results = {
-                    "disc": {
-                        "D": float(firestore_results["disc"]["mapValue"]["fields"]["D"]["doubleValue"]),
-                        "I": float(firestore_results["disc"]["mapValue"]["fields"]["I"]["doubleValue"]),
-                        "S": float(firestore_results["disc"]["mapValue"]["fields"]["S"]["doubleValue"]),
-                        "C": float(firestore_results["disc"]["mapValue"]["fields"]["C"]["doubleValue"])
-                    },
-                    "mbti_type": firestore_results["mbti_type"]["stringValue"],
-                    "reliability": int(firestore_results["reliability"]["integerValue"]),
-                    "completion_time": int(firestore_results["completion_time"]["integerValue"]),
-                    "total_questions": int(firestore_results["total_questions"]["integerValue"]),
-                    "response_consistency": float(firestore_results["response_consistency"]["doubleValue"]),
-                    "response_variance": float(firestore_results["response_variance"]["doubleValue"]),
-                    "answered_questions": int(firestore_results["answered_questions"]["integerValue"])
-                }
+                # Respostas são salvas no mesmo documento (mapas do Firestore têm chaves string)
+                if "answers" in data["fields"]:
+                    answers = decode_value(data["fields"]["answers"])
+                    st.session_state.assessment_answers = {int(q_id): answer for q_id, answer in answers.items()}
                 
-                st.success("✅ Dados carregados do Firestore!")
+                st.success("✅ Dados carregados!" if pending is not None else "✅ Dados carregados do Firestore!")
                 return results
             else:
                 return None
@@ -488,21 +460,20 @@ def test_firestore_connection():
         # Testa criação de documento de teste
         test_url = f"https://firestore.googleapis.com/v1/projects/{FIREBASE_PROJECT_ID}/databases/(default)/documents/test_connection/test_doc?key={FIREBASE_API_KEY}"
         
-        test_data = {
-            "fields": {
-                "test": {"stringValue": "connection_test"},
-                "timestamp": {"timestampValue": datetime.now().isoformat() + "Z"},
-                "status": {"stringValue": "testing"},
-                "user_id": {"stringValue": st.session_state.user_id if st.session_state.user_id else "anonymous"}
-            }
-        }
+        test_data = encode_document({
+            "test": "connection_test",
+            "timestamp": datetime.now(timezone.utc),
+            "status": "testing",
+            "user_id": st.session_state.user_id if st.session_state.user_id else "anonymous"
+        })
         
         headers = {
             "Content-Type": "application/json"
         }
         
         # Teste de escrita
-        response = requests.patch(test_url, json=test_data, headers=headers, timeout=15)
+        client = get_rest_client()
+        response = client.patch(test_url, json=test_data, headers=headers, timeout=15, endpoint="firestore.connection_test")
         
         if response.status_code not in [200, 201]:
             st.error(f"❌ Falha na escrita: {response.status_code}")
@@ -511,7 +482,7 @@ def test_firestore_connection():
         st.success("✅ Firestore funcionando!")
         
         # Limpa teste
-        requests.delete(test_url, headers=headers, timeout=10)
+        client.delete(test_url, headers=headers, timeout=10, endpoint="firestore.connection_test")
         
         return True
         
@@ -537,6 +508,7 @@ def generate_random_questions(num_questions=48):
 
 def calculate_results():
     """Calcula resultados da avaliação com algoritmo corrigido"""
+    import numpy as np  # Importado só ao calcular resultados (cold start mais rápido)
     
     answers = st.session_state.assessment_answers
     questions = st.session_state.selected_questions
@@ -827,11 +799,23 @@ def render_dashboard():
     
     with col3:
         if st.session_state.results and st.button("💾 Salvar Agora", key="save_now", use_container_width=True):
-            save_assessment_to_firestore(st.session_state.user_id, st.session_state.results)
+            if save_assessment_to_firestore(st.session_state.user_id, st.session_state.results):
+                st.success("✅ Avaliação registrada; o envio ao Firestore ocorre em segundo plano")
     
     # Informações
     st.info(f"📋 **Firestore:** Project = `{FIREBASE_PROJECT_ID}` | User = `{st.session_state.user_id[:8] if st.session_state.user_id else 'N/A'}...`")
     
+    write_queue = get_write_queue()
+    pending_writes = write_queue.pending(owner=st.session_state.user_id)
+    if pending_writes:
+        st.caption(f"⏳ {len(pending_writes)} gravação(ões) aguardando envio ao Firestore")
+        if pending_writes[0].last_error:
+            st.caption(f"Último erro: {pending_writes[0].last_error}")
+    failed_writes = write_queue.failed(owner=st.session_state.user_id)
+    if failed_writes:
+        st.caption(f"❌ {len(failed_writes)} gravação(ões) não enviada(s) ao Firestore")
+        st.caption(f"Erro: {failed_writes[-1].last_error}")
+    
     st.markdown("---")
     
     # Métricas principais
@@ -1030,15 +1014,11 @@ def render_assessment():
                     if st.session_state.user_id and st.session_state.results:
                         save_success = save_assessment_to_firestore(st.session_state.user_id, st.session_state.results)
                         
-                        if save_success:
-                            st.balloons()
-                            st.success("🎉 **SUCESSO!** Resultados salvos!")
-                        else:
+                        if not save_success:
                             st.warning("⚠️ Resultados calculados, mas problema no salvamento")
                     
                     st.session_state.assessment_completed = True
                     st.session_state.current_page = 'results'
-                    time.sleep(2)
                     st.rerun()
         
         elif page_progress >= 0.5:  # Pelo menos 50% da página respondida
@@ -1403,14 +1383,15 @@ def render_results():
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     filename = f"NeuroMap_Relatorio_{timestamp}.html"
                     
-                    st.download_button(
-                        label="⬇️ Baixar HTML",
-                        data=html_content,
-                        file_name=filename,
-                        mime="text/html",
-                        key="download_html",
-                        use_container_width=True
-                    )
+                    with html_content:
+                        st.download_button(
+                            label="⬇️ Baixar HTML",
+                            data=html_content,
+                            file_name=filename,
+                            mime="text/html",
+                            key="download_html",
+                            use_container_width=True
+                        )
                     
                     st.success("🎉 Relatório HTML gerado!")
                 else:
@@ -1589,17 +1570,16 @@ def generate_insights(dominant_disc, mbti_type, results):
                 ]
             }
 
-def generate_html_report(results):
-    """Gera relatório em HTML com gráficos visuais"""
+def iter_html_report(results):
+    """Partes do relatório em HTML com gráficos visuais, produzidas sob demanda"""
     
-    try:
-        user_email = st.session_state.user_email
-        user_name = st.session_state.user_name
-        mbti_descriptions = get_mbti_description(results['mbti_type'])
-        dominant_disc = max(results['disc'], key=results['disc'].get)
-        insights = generate_insights(dominant_disc, results['mbti_type'], results)
-        
-        html_content = f"""
+    user_email = st.session_state.user_email
+    user_name = st.session_state.user_name
+    mbti_descriptions = get_mbti_description(results['mbti_type'])
+    dominant_disc = max(results['disc'], key=results['disc'].get)
+    insights = generate_insights(dominant_disc, results['mbti_type'], results)
+    
+    yield f"""
 <!DOCTYPE html>
 <html lang="pt-BR">
 <head>
@@ -1916,25 +1896,25 @@ def generate_html_report(results):
                 <div class="disc-chart">
 """
 
-        # Adiciona gráfico DISC com barras
-        disc_descriptions = {
-            "D": ("Dominância", "Orientação para resultados, liderança direta, tomada de decisão rápida"),
-            "I": ("Influência", "Comunicação persuasiva, networking, motivação de equipes"),
-            "S": ("Estabilidade", "Cooperação, paciência, trabalho em equipe consistente"),
-            "C": ("Conformidade", "Foco em qualidade, precisão, análise sistemática")
-        }
+    # Adiciona gráfico DISC com barras
+    disc_descriptions = {
+        "D": ("Dominância", "Orientação para resultados, liderança direta, tomada de decisão rápida"),
+        "I": ("Influência", "Comunicação persuasiva, networking, motivação de equipes"),
+        "S": ("Estabilidade", "Cooperação, paciência, trabalho em equipe consistente"),
+        "C": ("Conformidade", "Foco em qualidade, precisão, análise sistemática")
+    }
+    
+    for key, score in results['disc'].items():
+        name, description = disc_descriptions[key]
         
-        for key, score in results['disc'].items():
-            name, description = disc_descriptions[key]
-            
-            if score >= 35:
-                level_text = "Alto"
-            elif score >= 20:
-                level_text = "Moderado"
-            else:
-                level_text = "Baixo"
-            
-            html_content += f"""
+        if score >= 35:
+            level_text = "Alto"
+        elif score >= 20:
+            level_text = "Moderado"
+        else:
+            level_text = "Baixo"
+        
+        yield f"""
                     <div class="disc-item disc-{key.lower()}">
                         <div class="disc-header">
                             <span>{name} ({key})</span>
@@ -1949,7 +1929,7 @@ def generate_html_report(results):
                     </div>
 """
 
-        html_content += f"""
+    yield f"""
                 </div>
             </div>
             
@@ -1969,10 +1949,10 @@ def generate_html_report(results):
                         <ul>
 """
 
-        for strength in insights['strengths']:
-            html_content += f"                            <li>{strength}</li>\n"
+    for strength in insights['strengths']:
+        yield f"                            <li>{strength}</li>\n"
 
-        html_content += """
+    yield """
                         </ul>
                     </div>
                     
@@ -1981,10 +1961,10 @@ def generate_html_report(results):
                         <ul>
 """
 
-        for area in insights['development']:
-            html_content += f"                            <li>{area}</li>\n"
+    for area in insights['development']:
+        yield f"                            <li>{area}</li>\n"
 
-        html_content += """
+    yield """
                         </ul>
                     </div>
                     
@@ -1993,10 +1973,10 @@ def generate_html_report(results):
                         <ul>
 """
 
-        for career in insights['careers']:
-            html_content += f"                            <li>{career}</li>\n"
+    for career in insights['careers']:
+        yield f"                            <li>{career}</li>\n"
 
-        html_content += f"""
+    yield f"""
                         </ul>
                     </div>
                 </div>
@@ -2011,9 +1991,12 @@ def generate_html_report(results):
 </body>
 </html>
 """
-        
-        return html_content.encode('utf-8')
-        
+
+def generate_html_report(results):
+    """Gera relatório em HTML, gravado em blocos num arquivo temporário aberto para leitura"""
+    
+    try:
+        return spool_chunks(encode_chunks(iter_html_report(results)))
     except Exception as e:
         st.error(f"❌ Erro ao gerar relatório HTML: {str(e)}")
         return None
@@ -0,0 +1,342 @@
+import numpy as np
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+from .compatibility import CompatibilityEngine, scores_to_vector
+from .item_bank import DIMENSIONS, DIMENSION_CODES, DIMENSION_INDEX, SCALE_CODES, SCALE_SLICES
+from .models import UserAssessment
+from .percentiles import PercentileIndex
+from ..utils.timestamps import epoch_seconds
+
+# Os 16 tipos MBTI em ordem canônica; tipos são guardados como códigos int8 (-1 = ausente)
+MBTI_TYPES = tuple(
+    e + s + t + j for e in "EI" for s in "SN" for t in "TF" for j in "JP"
+)
+MBTI_TYPE_INDEX = {mbti_type: i for i, mbti_type in enumerate(MBTI_TYPES)}
+_MBTI_LETTERS = np.array([list(mbti_type) for mbti_type in MBTI_TYPES])
+
+# Acima disso a matriz n×n completa é grande demais para materializar (10k² floats = 400MB);
+# grupos maiores usam `similarity_engine` (blocos) ou `similar_members` (top-k)
+MAX_SIMILARITY_MEMBERS = 2000
+
+IndexLike = Union[Sequence[int], np.ndarray]
+
+
+class CohortFrame:
+    """Avaliações de um grupo em formato colunar
+
+    Uma linha por membro (a avaliação mais recente de cada usuário) e uma
+    coluna por dimensão, na ordem de `DIMENSIONS`; scores ausentes são NaN.
+    Todas as análises de `CohortAnalytics` operam sobre estes arrays.
+    """
+
+    def __init__(
+        self,
+        user_ids: Sequence[str],
+        scores: np.ndarray,
+        mbti_codes: np.ndarray,
+        timestamps: np.ndarray,
+        reliability: np.ndarray
+    ):
+        self.user_ids = np.asarray(user_ids, dtype=object)
+        self.scores = np.asarray(scores, dtype=np.float32)
+        self.mbti_codes = np.asarray(mbti_codes, dtype=np.int8)
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.reliability = np.asarray(reliability, dtype=np.float32)
+
+        if self.scores.shape != (len(self.user_ids), len(DIMENSIONS)):
+            raise ValueError(f"scores deve ter formato ({len(self.user_ids)}, {len(DIMENSIONS)})")
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    @classmethod
+    def from_assessments(cls, assessments: Iterable[UserAssessment], latest_only: bool = True) -> "CohortFrame":
+        """Monta o frame; com `latest_only` mantém só a avaliação mais recente de cada usuário"""
+
+        if latest_only:
+            latest: Dict[str, UserAssessment] = {}
+            for assessment in assessments:
+                current = latest.get(assessment.user_id)
+                if current is None or epoch_seconds(assessment.timestamp) > epoch_seconds(current.timestamp):
+                    latest[assessment.user_id] = assessment
+            rows = list(latest.values())
+        else:
+            rows = list(assessments)
+
+        n = len(rows)
+        scores = np.full((n, len(DIMENSIONS)), np.nan, dtype=np.float32)
+        mbti_codes = np.full(n, -1, dtype=np.int8)
+        timestamps = np.empty(n, dtype=np.float64)
+        reliability = np.full(n, np.nan, dtype=np.float32)
+
+        for i, assessment in enumerate(rows):
+            scores_to_vector(assessment.scores, out=scores[i])
+            mbti_codes[i] = MBTI_TYPE_INDEX.get(assessment.scores.mbti_type, -1)
+            timestamps[i] = epoch_seconds(assessment.timestamp)
+            if assessment.reliability_score is not None:
+                reliability[i] = assessment.reliability_score
+
+        return cls([assessment.user_id for assessment in rows], scores, mbti_codes, timestamps, reliability)
+
+    def scale(self, scale: str) -> np.ndarray:
+        """Colunas de uma escala (`disc`, `b5`, `mbti`)"""
+        return self.scores[:, SCALE_SLICES[scale]]
+
+    def subset(self, rows: IndexLike) -> "CohortFrame":
+        rows = np.asarray(rows)
+        return CohortFrame(
+            self.user_ids[rows], self.scores[rows], self.mbti_codes[rows],
+            self.timestamps[rows], self.reliability[rows]
+        )
+
+    def row_of(self, user_id: str) -> int:
+        matches = np.flatnonzero(self.user_ids == user_id)
+        if not len(matches):
+            raise KeyError(user_id)
+        return int(matches[0])
+
+
+class CohortAnalytics:
+    """Análises vetorizadas de um grupo (distribuições, similaridade e lacunas vs população)"""
+
+    def __init__(self, frame: CohortFrame):
+        self.frame = frame
+        self._profiles: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def dimension_stats(self) -> Dict[str, Dict[str, float]]:
+        """Média, desvio e quartis de cada dimensão (ignorando scores ausentes)"""
+        scores = self.frame.scores.astype(np.float64)
+        counts = np.sum(~np.isnan(scores), axis=0)
+        present = counts > 0
+        if not present.any():
+            return {}
+
+        columns = scores[:, present]
+        means = np.nanmean(columns, axis=0)
+        stds = np.nanstd(columns, axis=0)
+        quartiles = np.nanpercentile(columns, [25, 50, 75], axis=0)
+
+        stats = {}
+        for j, column in enumerate(np.flatnonzero(present)):
+            stats[DIMENSIONS[column]] = {
+                'mean': float(means[j]),
+                'std': float(stds[j]),
+                'p25': float(quartiles[0, j]),
+                'p50': float(quartiles[1, j]),
+                'p75': float(quartiles[2, j]),
+                'count': int(counts[column])
+            }
+        return stats
+
+    def disc_distribution(self) -> Dict:
+        """Estilo DISC dominante de cada membro e médias do grupo"""
+        disc = self.frame.scale("disc")
+        valid = ~np.all(np.isnan(disc), axis=1)
+        codes = SCALE_CODES["disc"]
+
+        dominant = np.argmax(np.nan_to_num(disc[valid], nan=-np.inf), axis=1)
+        counts = np.bincount(dominant, minlength=len(codes))
+        total = int(valid.sum())
+
+        return {
+            'dominant_counts': {code: int(count) for code, count in zip(codes, counts)},
+            'dominant_share': {
+                code: float(count / total * 100) if total else 0.0 for code, count in zip(codes, counts)
+            },
+            'mean_scores': {
+                code: float(value) for code, value in zip(codes, np.nanmean(disc[valid], axis=0))
+            } if total else {},
+            'members': total
+        }
+
+    def mbti_distribution(self) -> Dict:
+        """Contagem de tipos MBTI e proporção de cada preferência (E/I, S/N, T/F, J/P)"""
+        codes = self.frame.mbti_codes
+        valid = codes[codes >= 0]
+        counts = np.bincount(valid, minlength=len(MBTI_TYPES))
+        total = len(valid)
+
+        letters = _MBTI_LETTERS[valid] if total else np.empty((0, 4), dtype=_MBTI_LETTERS.dtype)
+        preference_share = {}
+        for position, pair in enumerate(("EI", "SN", "TF", "JP")):
+            for letter in pair:
+                share = float(np.mean(letters[:, position] == letter) * 100) if total else 0.0
+                preference_share[letter] = share
+
+        return {
+            'type_counts': {MBTI_TYPES[i]: int(count) for i, count in enumerate(counts) if count},
+            'type_share': {
+                MBTI_TYPES[i]: float(count / total * 100) for i, count in enumerate(counts) if count
+            },
+            'preference_share': preference_share,
+            'members': total
+        }
+
+    def _standardized_profiles(self) -> np.ndarray:
+        """Perfis padronizados por dimensão (z-score do grupo) e normalizados por linha
+
+        Padronizar dá peso igual a DISC (ipsativo), Big Five e MBTI; o produto
+        interno entre linhas é então a similaridade de cosseno centrada.
+        """
+        if self._profiles is None:
+            scores = self.frame.scores
+            means = np.nanmean(scores, axis=0) if len(scores) else np.zeros(scores.shape[1], dtype=np.float32)
+            stds = np.nanstd(scores, axis=0) if len(scores) else np.ones(scores.shape[1], dtype=np.float32)
+            means = np.nan_to_num(means)
+            stds = np.where(np.nan_to_num(stds) > 1e-6, stds, 1.0)
+
+            profiles = np.nan_to_num((scores - means) / stds).astype(np.float32)
+            norms = np.linalg.norm(profiles, axis=1, keepdims=True)
+            self._profiles = np.divide(profiles, norms, out=np.zeros_like(profiles), where=norms > 0)
+        return self._profiles
+
+    def similarity_engine(self, rows: Optional[IndexLike] = None) -> CompatibilityEngine:
+        """Similaridade entre membros calculada em blocos, sem materializar a matriz n×n
+
+        `iter_blocks` percorre a matriz em faixas e `top_k` seleciona os pares
+        mais próximos; `rows` restringe o motor a um subconjunto de membros.
+        """
+        profiles = self._standardized_profiles()
+        ids = self.frame.user_ids
+        if rows is not None:
+            rows = np.asarray(rows)
+            profiles, ids = profiles[rows], ids[rows]
+        return CompatibilityEngine(profiles, ids=ids, prepared=True)
+
+    def similar_members(self, k: int = 5, rows: Optional[IndexLike] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Os k membros mais parecidos com cada membro de `rows` (ou de todos)
+
+        Retorna (índices no frame, similaridades), ambos len(rows) × k e
+        ordenados da maior para a menor; memória O(bloco × n) mesmo em 10k.
+        """
+        return self.similarity_engine().top_k(k, rows=rows)
+
+    def similarity_matrix(self, rows: Optional[IndexLike] = None) -> np.ndarray:
+        """Matriz de similaridade (-1 a 1) entre membros; `rows` restringe a um subconjunto"""
+        engine = self.similarity_engine(rows)
+        if len(engine) > MAX_SIMILARITY_MEMBERS:
+            raise ValueError(
+                f"Matriz completa limitada a {MAX_SIMILARITY_MEMBERS} membros; "
+                "use `rows`, `similar_members` ou `similarity_engine().iter_blocks()`"
+            )
+        similarity = engine.matrix()
+        return np.clip(similarity, -1.0, 1.0, out=similarity)
+
+    def cohesion(self) -> float:
+        """Similaridade média entre todos os pares, em O(n·d) sem materializar a matriz
+
+        Σ_{i≠j} uᵢ·uⱼ = ‖Σ uᵢ‖² − Σ ‖uᵢ‖².
+        """
+        profiles = self._standardized_profiles().astype(np.float64)
+        n = len(profiles)
+        if n < 2:
+            return 0.0
+        total = profiles.sum(axis=0)
+        pair_sum = float(total @ total - np.einsum("ij,ij->", profiles, profiles))
+        return pair_sum / (n * (n - 1))
+
+    def member_fit(self) -> np.ndarray:
+        """Similaridade de cada membro com o perfil médio dos demais (baixa = perfil atípico)"""
+        profiles = self._standardized_profiles().astype(np.float64)
+        n = len(profiles)
+        if n < 2:
+            return np.zeros(n, dtype=np.float32)
+        others = profiles.sum(axis=0) - profiles
+        norms = np.linalg.norm(others, axis=1)
+        dots = np.einsum("ij,ij->i", profiles, others)
+        return np.divide(dots, norms, out=np.zeros(n), where=norms > 0).astype(np.float32)
+
+    def iter_members(self) -> Iterator[Dict]:
+        """Resumo de cada membro, produzido sob demanda (seções do relatório de equipe)"""
+        disc = self.frame.scale("disc")
+        codes = SCALE_CODES["disc"]
+        has_disc = ~np.all(np.isnan(disc), axis=1)
+        dominant = np.argmax(np.nan_to_num(disc, nan=-np.inf), axis=1)
+        fit = self.member_fit()
+
+        for i, user_id in enumerate(self.frame.user_ids):
+            mbti_code = self.frame.mbti_codes[i]
+            yield {
+                'user_id': str(user_id),
+                'mbti_type': MBTI_TYPES[mbti_code] if mbti_code >= 0 else None,
+                'dominant_disc': codes[dominant[i]] if has_disc[i] else None,
+                'disc': {code: float(value) for code, value in zip(codes, disc[i]) if not np.isnan(value)},
+                'fit': float(fit[i])
+            }
+
+    def population_gaps(
+        self,
+        benchmarks: Optional[Dict] = None,
+        percentile_index: Optional[PercentileIndex] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """Diferença entre o grupo e a população por dimensão DISC/Big Five
+
+        `benchmarks` segue o formato de `get_population_benchmarks`; com
+        `percentile_index`, inclui também o percentil populacional mediano dos membros.
+        """
+        benchmarks = benchmarks or {}
+        stats = self.dimension_stats()
+        gaps: Dict[str, Dict[str, float]] = {}
+
+        for scale, key in (("disc", "disc_percentiles"), ("b5", "b5_percentiles")):
+            population = benchmarks.get(key, {})
+            for column in range(SCALE_SLICES[scale].start, SCALE_SLICES[scale].stop):
+                name = DIMENSIONS[column]
+                if name not in stats:
+                    continue
+                gap = {'team_mean': stats[name]['mean']}
+                reference = population.get(DIMENSION_CODES[name])
+                if reference:
+                    gap['population_mean'] = float(reference.get('mean', 0.0))
+                    gap['gap'] = gap['team_mean'] - gap['population_mean']
+                    if reference.get('std'):
+                        gap['effect_size'] = gap['gap'] / float(reference['std'])
+                gaps[name] = gap
+
+        if percentile_index is not None:
+            self._add_median_percentiles(gaps, percentile_index)
+        return gaps
+
+    def _add_median_percentiles(self, gaps: Dict[str, Dict[str, float]], percentile_index: PercentileIndex) -> None:
+        """Percentil populacional mediano por dimensão, com uma busca para todos os membros"""
+        names = [name for name in gaps if name in percentile_index]
+        if not names or not len(self.frame):
+            return
+
+        columns = np.array([DIMENSION_INDEX[name] for name in names])
+        values = self.frame.scores[:, columns].astype(np.float64)
+        index_rows = np.array([percentile_index.row_of[name] for name in names])
+
+        valid = ~np.isnan(values)
+        flat_rows = np.broadcast_to(index_rows, values.shape)[valid]
+        percentiles = np.full(values.shape, np.nan)
+        percentiles[valid] = percentile_index.lookup_rows(flat_rows, values[valid])
+
+        medians = np.nanmedian(percentiles, axis=0)
+        for name, median in zip(names, medians):
+            if not np.isnan(median):
+                gaps[name]['median_percentile'] = float(median)
+
+    def summary(
+        self,
+        benchmarks: Optional[Dict] = None,
+        percentile_index: Optional[PercentileIndex] = None
+    ) -> Dict:
+        """Resumo completo do grupo para dashboard e relatórios"""
+        fit = self.member_fit()
+        outliers = np.argsort(fit)[:min(5, len(fit))] if len(fit) > 2 else np.array([], dtype=np.int64)
+
+        return {
+            'size': len(self.frame),
+            'disc': self.disc_distribution(),
+            'mbti': self.mbti_distribution(),
+            'dimension_stats': self.dimension_stats(),
+            'cohesion': self.cohesion(),
+            'atypical_members': [
+                {'user_id': str(self.frame.user_ids[i]), 'fit': float(fit[i])} for i in outliers
+            ],
+            'population_gaps': self.population_gaps(benchmarks, percentile_index)
+        }
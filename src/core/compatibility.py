@@ -0,0 +1,200 @@
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .item_bank import DIMENSIONS, DIMENSION_INDEX, SCALE_CODES, SCALE_PREFIXES
+from .models import PersonalityScores
+
+# Ponto neutro das escalas 0-100: scores ausentes equivalem a "sem preferência"
+NEUTRAL_SCORE = 50.0
+
+# Linhas de consulta por bloco: bloco × N floats em memória (1024 × 100k ≈ 400MB em float32)
+DEFAULT_BLOCK_SIZE = 1024
+
+# Peso de cada dimensão na complementaridade: negativo = diferença soma (papéis
+# DISC, modo de percepção S/N e de decisão T/F), positivo = semelhança soma
+# (disciplina, cooperação e organização J/P), zero = neutro para a parceria
+COMPLEMENTARITY_WEIGHTS: Dict[str, float] = {
+    'DISC_D': -1.0, 'DISC_I': -1.0, 'DISC_S': -1.0, 'DISC_C': -1.0,
+    'B5_O': 0.0, 'B5_C': 1.0, 'B5_E': 0.0, 'B5_A': 1.0, 'B5_N': 0.0,
+    'MBTI_E': 0.0, 'MBTI_I': 0.0,
+    'MBTI_S': -0.5, 'MBTI_N': -0.5, 'MBTI_T': -0.5, 'MBTI_F': -0.5,
+    'MBTI_J': 0.5, 'MBTI_P': 0.5
+}
+
+METRICS = ("similarity", "complementarity")
+
+ProfilesLike = Union[np.ndarray, Sequence[PersonalityScores]]
+
+
+def scores_to_vector(scores: PersonalityScores, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Vetor de 17 posições na ordem de `DIMENSIONS`; dimensões ausentes ficam NaN"""
+    vector = np.full(len(DIMENSIONS), np.nan) if out is None else out
+    for values in (scores.disc, scores.big_five, scores.mbti_preferences):
+        for name, value in (values or {}).items():
+            column = DIMENSION_INDEX.get(name)
+            if column is not None and value is not None:
+                vector[column] = value
+    return vector
+
+
+def scores_to_matrix(scores: Sequence[PersonalityScores], dtype=np.float32) -> np.ndarray:
+    """Matriz n × 17 de perfis (uma linha por `PersonalityScores`)"""
+    matrix = np.full((len(scores), len(DIMENSIONS)), np.nan, dtype=dtype)
+    for row, item in enumerate(scores):
+        scores_to_vector(item, out=matrix[row])
+    return matrix
+
+
+def _weights(metric: str) -> np.ndarray:
+    if metric == "similarity":
+        return np.ones(len(DIMENSIONS), dtype=np.float32)
+    if metric == "complementarity":
+        return np.array([COMPLEMENTARITY_WEIGHTS[name] for name in DIMENSIONS], dtype=np.float32)
+    raise ValueError(f"Métrica não suportada: {metric} (use {', '.join(METRICS)})")
+
+
+class CompatibilityEngine:
+    """Similaridade/complementaridade entre perfis como produto interno ponderado
+
+    Cada perfil é centrado no ponto neutro (50) e escalado para [-1, 1]; a
+    pontuação entre i e j é Σ w·xᵢ·xⱼ normalizada por ‖xᵢ‖_|w|·‖xⱼ‖_|w|, ficando
+    em [-1, 1]. Com w = 1 é o cosseno (similaridade); com `COMPLEMENTARITY_WEIGHTS`
+    diferenças nas dimensões de papel contam a favor. O cálculo é sempre
+    `L[bloco] @ R.T`, então a matriz N × N só existe se pedida explicitamente.
+    Com `prepared`, os perfis (e as consultas externas) já vêm normalizados
+    por linha, como os z-scores de `CohortAnalytics`, e são usados como estão.
+    """
+
+    def __init__(
+        self,
+        profiles: ProfilesLike,
+        ids: Optional[Sequence[str]] = None,
+        metric: str = "similarity",
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        prepared: bool = False
+    ):
+        matrix = profiles if isinstance(profiles, np.ndarray) else scores_to_matrix(profiles)
+        if matrix.ndim != 2 or matrix.shape[1] != len(DIMENSIONS):
+            raise ValueError(f"Perfis devem ter formato (n, {len(DIMENSIONS)})")
+
+        self.metric = metric
+        self.prepared = prepared
+        self.block_size = block_size
+        self.ids = list(ids) if ids is not None else list(range(len(matrix)))
+        if len(self.ids) != len(matrix):
+            raise ValueError("ids e perfis devem ter o mesmo tamanho")
+
+        self._weights = _weights(metric)
+        self._left, self._right = self._prepare(matrix)
+
+    def __len__(self) -> int:
+        return len(self._right)
+
+    def _prepare(self, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Lados esquerdo (com pesos) e direito do produto, já normalizados por linha"""
+        if self.prepared:
+            unit = np.asarray(matrix, dtype=np.float32)
+            return unit * self._weights, unit
+        centered = (np.nan_to_num(np.asarray(matrix, dtype=np.float32), nan=NEUTRAL_SCORE) - NEUTRAL_SCORE) / NEUTRAL_SCORE
+        norms = np.sqrt((centered * centered) @ np.abs(self._weights))[:, None]
+        unit = np.divide(centered, norms, out=np.zeros_like(centered), where=norms > 0)
+        return unit * self._weights, unit
+
+    def _query_side(self, profiles: ProfilesLike) -> np.ndarray:
+        if isinstance(profiles, PersonalityScores):
+            profiles = [profiles]
+        matrix = profiles if isinstance(profiles, np.ndarray) else scores_to_matrix(profiles)
+        return self._prepare(np.atleast_2d(matrix))[0]
+
+    def score(self, i: int, j: int) -> float:
+        return float(self._left[i] @ self._right[j])
+
+    def scores_against(self, profile: ProfilesLike) -> np.ndarray:
+        """Pontuação de um perfil externo contra todos os perfis indexados (vetor de N)"""
+        return (self._query_side(profile) @ self._right.T)[0]
+
+    def iter_blocks(self, rows: Optional[Sequence[int]] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Percorre a matriz em faixas (índices das linhas, bloco × N) com memória limitada"""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        for start in range(0, len(rows), self.block_size):
+            block_rows = rows[start:start + self.block_size]
+            yield block_rows, self._left[block_rows] @ self._right.T
+
+    def matrix(self, rows: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Matriz completa (ou das linhas pedidas) montada bloco a bloco"""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        result = np.empty((len(rows), len(self)), dtype=np.float32)
+        offset = 0
+        for block_rows, block in self.iter_blocks(rows):
+            result[offset:offset + len(block_rows)] = block
+            offset += len(block_rows)
+        return result
+
+    def top_k(
+        self,
+        k: int = 5,
+        rows: Optional[Sequence[int]] = None,
+        exclude_self: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Os k parceiros de maior pontuação para cada linha consultada
+
+        Retorna (índices, pontuações), ambos len(rows) × k e ordenados da maior
+        para a menor; a seleção usa `argpartition` por bloco, em O(bloco × N).
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        k = min(k, len(self) - (1 if exclude_self else 0))
+        indices = np.empty((len(rows), max(k, 0)), dtype=np.int64)
+        scores = np.empty((len(rows), max(k, 0)), dtype=np.float32)
+        if k <= 0:
+            return indices, scores
+
+        offset = 0
+        for block_rows, block in self.iter_blocks(rows):
+            if exclude_self:
+                block[np.arange(len(block_rows)), block_rows] = -np.inf
+            candidates = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            candidate_scores = np.take_along_axis(block, candidates, axis=1)
+            order = np.argsort(-candidate_scores, axis=1, kind="stable")
+
+            stop = offset + len(block_rows)
+            indices[offset:stop] = np.take_along_axis(candidates, order, axis=1)
+            scores[offset:stop] = np.take_along_axis(candidate_scores, order, axis=1)
+            offset = stop
+        return indices, scores
+
+    def top_k_for(self, profile: ProfilesLike, k: int = 5, exclude: Sequence[str] = ()) -> List[Tuple[str, float]]:
+        """Os k perfis indexados de maior pontuação com um perfil externo"""
+        scores = self.scores_against(profile)
+        excluded = set(exclude)
+        if excluded:
+            scores[[i for i, item_id in enumerate(self.ids) if item_id in excluded]] = -np.inf
+
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.ids[i], float(scores[i])) for i in candidates]
+
+
+def style_archetypes() -> Dict[str, np.ndarray]:
+    """Perfil típico de cada estilo DISC (demais dimensões neutras)"""
+    archetypes = {}
+    for code in SCALE_CODES["disc"]:
+        vector = np.full(len(DIMENSIONS), NEUTRAL_SCORE)
+        for other in SCALE_CODES["disc"]:
+            vector[DIMENSION_INDEX[f"{SCALE_PREFIXES['disc']}{other}"]] = 80.0 if other == code else 35.0
+        archetypes[code] = vector
+    return archetypes
+
+
+def style_compatibility(scores: PersonalityScores) -> Dict[str, Dict[str, float]]:
+    """Similaridade e complementaridade do perfil com cada estilo DISC típico"""
+    archetypes = style_archetypes()
+    matrix = np.array(list(archetypes.values()))
+    result = {code: {} for code in archetypes}
+    for metric in METRICS:
+        values = CompatibilityEngine(matrix, list(archetypes), metric=metric).scores_against(scores)
+        for code, value in zip(archetypes, values):
+            result[code][metric] = float(value)
+    return result
@@ -0,0 +1,139 @@
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from .models import AssessmentItem
+
+# Ordem fixa das dimensões: 4 DISC + 5 Big Five + 8 preferências MBTI
+SCALE_PREFIXES = {"disc": "DISC_", "b5": "B5_", "mbti": "MBTI_"}
+SCALE_CODES = {
+    "disc": ("D", "I", "S", "C"),
+    "b5": ("O", "C", "E", "A", "N"),
+    "mbti": ("E", "I", "S", "N", "T", "F", "J", "P")
+}
+
+DIMENSIONS: Tuple[str, ...] = tuple(
+    f"{SCALE_PREFIXES[scale]}{code}" for scale, codes in SCALE_CODES.items() for code in codes
+)
+DIMENSION_INDEX: Dict[str, int] = {name: i for i, name in enumerate(DIMENSIONS)}
+DIMENSION_CODES: Dict[str, str] = {name: name.split("_", 1)[1] for name in DIMENSIONS}
+
+SCALE_SLICES: Dict[str, slice] = {}
+_offset = 0
+for _scale, _codes in SCALE_CODES.items():
+    SCALE_SLICES[_scale] = slice(_offset, _offset + len(_codes))
+    _offset += len(_codes)
+
+
+class CompiledItemBank:
+    """Banco de itens pré-compilado em arrays contíguos para pontuação vetorizada
+
+    Construído uma única vez a partir de `List[AssessmentItem]`: os prefixos
+    DISC_/B5_/MBTI_ são resolvidos para índices inteiros de dimensão e a
+    confiabilidade de cada item é avaliada uma só vez.
+    """
+
+    def __init__(
+        self,
+        items: List[AssessmentItem],
+        reliability: Optional[Callable[[int], float]] = None
+    ):
+        self.items = tuple(items)
+        self.fingerprint = self.fingerprint_of(items)
+
+        n_items = len(self.items)
+        self.item_ids = np.array([item.id for item in self.items], dtype=np.int64)
+        self.row_of: Dict[int, int] = {item.id: row for row, item in enumerate(self.items)}
+        self.reverse_mask = np.array([item.reverse_scored for item in self.items], dtype=bool)
+        self.reliability = np.array(
+            [reliability(item.id) if reliability else 1.0 for item in self.items],
+            dtype=float
+        )
+
+        # Dimensões de confiança seguem as chaves de peso na ordem de aparição
+        self.confidence_dimensions: List[str] = list(dict.fromkeys(
+            dimension for item in self.items for dimension in item.weights.keys()
+        ))
+        confidence_column = {dimension: i for i, dimension in enumerate(self.confidence_dimensions)}
+
+        entry_rows, entry_dimensions, entry_weights = [], [], []
+        self.incidence_matrix = np.zeros((n_items, len(self.confidence_dimensions)))
+
+        for row, item in enumerate(self.items):
+            for dimension, weight in item.weights.items():
+                self.incidence_matrix[row, confidence_column[dimension]] = 1.0
+
+                if dimension in DIMENSION_INDEX:
+                    entry_rows.append(row)
+                    entry_dimensions.append(DIMENSION_INDEX[dimension])
+                    entry_weights.append(weight)
+                elif dimension.startswith(tuple(SCALE_PREFIXES.values())):
+                    raise ValueError(f"Dimensão desconhecida: {dimension}")
+
+        # Pesos em formato esparso (COO) com índices inteiros de dimensão
+        self.entry_rows = np.array(entry_rows, dtype=np.int32)
+        self.entry_dimensions = np.array(entry_dimensions, dtype=np.int32)
+        self.entry_weights = np.array(entry_weights, dtype=float)
+
+        self.weights = np.zeros((n_items, len(DIMENSIONS)))
+        np.add.at(self.weights, (self.entry_rows, self.entry_dimensions), self.entry_weights)
+
+        # Matriz densa item × dimensão com confiabilidade já aplicada
+        self.weight_matrix = np.ascontiguousarray(self.weights * self.reliability[:, None])
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @staticmethod
+    def fingerprint_of(items: List[AssessmentItem]) -> Tuple:
+        """Identifica o conteúdo do banco de itens (ids, reverse scoring e pesos)"""
+        return tuple(
+            (item.id, item.reverse_scored, tuple(item.weights.items())) for item in items
+        )
+
+    def answers_to_vector(self, answers: Dict[int, int]) -> np.ndarray:
+        """Converte respostas {item_id: resposta} em vetor alinhado às linhas do banco"""
+
+        vector = np.zeros(len(self.items), dtype=float)
+        for item_id, response in answers.items():
+            row = self.row_of.get(item_id)
+            if row is not None:
+                vector[row] = response
+        return vector
+
+    def answers_to_matrix(self, answers_list: List[Dict[int, int]]) -> np.ndarray:
+        """Converte respostas de vários respondentes em matriz (respondentes × itens)"""
+
+        matrix = np.zeros((len(answers_list), len(self.items)), dtype=float)
+        for row, answers in enumerate(answers_list):
+            matrix[row] = self.answers_to_vector(answers)
+        return matrix
+
+    def effective_responses(self, answers_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna (respostas com reverse scoring aplicado, máscara de itens respondidos)"""
+
+        answers = np.nan_to_num(np.atleast_2d(np.asarray(answers_matrix, dtype=float)))
+        if answers.shape[1] != len(self.items):
+            raise ValueError(
+                f"Matriz de respostas com {answers.shape[1]} colunas para {len(self.items)} itens"
+            )
+
+        answered = answers > 0
+        effective = np.where(self.reverse_mask, 6 - answers, answers) * answered
+        return effective, answered
+
+    def raw_scores(self, answers_matrix: np.ndarray) -> np.ndarray:
+        """Scores brutos (respondentes × dimensões) com uma única multiplicação matricial"""
+
+        effective, _ = self.effective_responses(answers_matrix)
+        return effective @ self.weight_matrix
+
+    def confidence_moments(self, answers_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Contagem, soma e soma dos quadrados das respostas por dimensão de confiança"""
+
+        answers = np.nan_to_num(np.atleast_2d(np.asarray(answers_matrix, dtype=float)))
+        answered = answers > 0
+        answers = answers * answered
+
+        counts = answered.astype(float) @ self.incidence_matrix
+        sums = answers @ self.incidence_matrix
+        sums_sq = (answers ** 2) @ self.incidence_matrix
+        return counts, sums, sums_sq
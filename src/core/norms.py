@@ -0,0 +1,172 @@
+import json
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Union
+from .item_bank import SCALE_CODES, SCALE_SLICES
+
+DEFAULT_SEGMENT = "global"
+
+
+def normal_cdf(z: np.ndarray) -> np.ndarray:
+    """CDF da normal padrão vetorizada, sem depender do scipy
+
+    Usa a aproximação de Chebyshev para erfc (Numerical Recipes, erro
+    relativo < 1.2e-7), suficiente para percentis arredondados em 0.1.
+    """
+
+    # Φ(z) = erfc(-z / √2) / 2
+    x = -np.asarray(z, dtype=float) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * np.abs(x))
+    poly = -x * x - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 +
+           t * (-0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 +
+           t * (-0.82215223 + t * 0.17087277))))))))
+    erfc = t * np.exp(poly)
+    erfc = np.where(x >= 0, erfc, 2.0 - erfc)
+    return 0.5 * erfc
+
+
+@dataclass
+class NormTable:
+    """Média e desvio padrão por traço Big Five para um segmento populacional"""
+    segment: str
+    means: Dict[str, float]
+    stds: Dict[str, float]
+    sample_size: Optional[int] = None
+    metadata: Dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        missing = [code for code in SCALE_CODES["b5"] if code not in self.means or code not in self.stds]
+        if missing:
+            raise ValueError(f"Tabela normativa '{self.segment}' sem traços: {', '.join(missing)}")
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'NormTable':
+        """Cria tabela a partir de dicionário (ex: JSON versionado ou documento Firestore)"""
+        return cls(
+            segment=data.get("segment", DEFAULT_SEGMENT),
+            means={k: float(v) for k, v in data["means"].items()},
+            stds={k: float(v) for k, v in data["stds"].items()},
+            sample_size=data.get("sample_size"),
+            metadata=data.get("metadata", {})
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "segment": self.segment,
+            "means": dict(self.means),
+            "stds": dict(self.stds),
+            "sample_size": self.sample_size,
+            "metadata": dict(self.metadata)
+        }
+
+
+class NormativeNormalizer:
+    """Converte scores brutos em percentis populacionais para coortes inteiras
+
+    As tabelas normativas são plugáveis por segmento populacional; a conversão
+    de uma matriz (respondentes × traços) é feita numa única passada vetorizada.
+    """
+
+    def __init__(self, tables: Sequence[NormTable] = (), default_segment: str = DEFAULT_SEGMENT):
+        self.default_segment = default_segment
+        self._segments: Dict[str, int] = {}
+        self._means = np.zeros((0, len(SCALE_CODES["b5"])))
+        self._stds = np.zeros((0, len(SCALE_CODES["b5"])))
+        self.tables: Dict[str, NormTable] = {}
+
+        for table in tables:
+            self.register(table)
+
+    @classmethod
+    def default(cls) -> 'NormativeNormalizer':
+        """Normas padrão (média 50, desvio 15) usadas enquanto não há dados populacionais"""
+        codes = SCALE_CODES["b5"]
+        return cls([NormTable(
+            segment=DEFAULT_SEGMENT,
+            means={code: 50.0 for code in codes},
+            stds={code: 15.0 for code in codes}
+        )])
+
+    @classmethod
+    def from_json(cls, path: str) -> 'NormativeNormalizer':
+        """Carrega tabelas de um arquivo JSON ({"default_segment": ..., "tables": [...]})"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            [NormTable.from_dict(table) for table in data["tables"]],
+            default_segment=data.get("default_segment", DEFAULT_SEGMENT)
+        )
+
+    def register(self, table: NormTable) -> None:
+        """Adiciona ou substitui a tabela normativa de um segmento"""
+
+        codes = SCALE_CODES["b5"]
+        means = np.array([table.means[code] for code in codes], dtype=float)
+        stds = np.array([table.stds[code] for code in codes], dtype=float)
+
+        if table.segment in self._segments:
+            index = self._segments[table.segment]
+            self._means[index] = means
+            self._stds[index] = stds
+        else:
+            self._segments[table.segment] = len(self._segments)
+            self._means = np.vstack([self._means, means])
+            self._stds = np.vstack([self._stds, stds])
+
+        self.tables[table.segment] = table
+
+    def _segment_indices(self, segments: Union[None, str, Sequence[str]], n_rows: int) -> np.ndarray:
+        """Resolve segmento(s) para índices de linha das tabelas"""
+
+        if segments is None or isinstance(segments, str):
+            segment = segments or self.default_segment
+            if segment not in self._segments:
+                raise KeyError(f"Segmento normativo não registrado: {segment}")
+            return np.full(n_rows, self._segments[segment], dtype=np.intp)
+
+        if len(segments) != n_rows:
+            raise ValueError(f"{len(segments)} segmentos para {n_rows} respondentes")
+
+        unknown = set(segments) - set(self._segments)
+        if unknown:
+            raise KeyError(f"Segmentos normativos não registrados: {', '.join(sorted(unknown))}")
+        return np.array([self._segments[s] for s in segments], dtype=np.intp)
+
+    def percentiles(
+        self,
+        raw_b5: np.ndarray,
+        segments: Union[None, str, Sequence[str]] = None
+    ) -> np.ndarray:
+        """Converte scores brutos Big Five (respondentes × 5) em percentis 0-100"""
+
+        raw_b5 = np.atleast_2d(np.asarray(raw_b5, dtype=float))
+        index = self._segment_indices(segments, raw_b5.shape[0])
+        means = self._means[index]
+        stds = self._stds[index]
+
+        safe_stds = np.where(stds > 0, stds, 1.0)
+        z_scores = np.where(stds > 0, (raw_b5 - means) / safe_stds, 0.0)
+        return np.clip(normal_cdf(z_scores) * 100, 0, 100)
+
+    def normalize(
+        self,
+        raw: np.ndarray,
+        segments: Union[None, str, Sequence[str]] = None
+    ) -> np.ndarray:
+        """Normaliza a matriz completa de dimensões (respondentes × 17)
+
+        DISC recebe normalização ipsativa (soma = 100; linhas sem pontuação ficam
+        NaN), Big Five vira percentil populacional e MBTI mantém os scores brutos.
+        """
+
+        raw = np.atleast_2d(np.asarray(raw, dtype=float))
+        normalized = raw.copy()
+
+        disc = np.abs(raw[:, SCALE_SLICES["disc"]])
+        totals = disc.sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            normalized[:, SCALE_SLICES["disc"]] = np.where(totals > 0, disc / totals * 100, np.nan)
+
+        normalized[:, SCALE_SLICES["b5"]] = self.percentiles(raw[:, SCALE_SLICES["b5"]], segments)
+
+        return normalized
@@ -0,0 +1,168 @@
+import numpy as np
+from typing import Dict, Iterable, Mapping, Optional, Sequence
+
+from .item_bank import DIMENSIONS, SCALE_PREFIXES
+from .models import PersonalityScores
+from .sketches import QuantileSketch
+
+# Níveis percentuais (0-100) em que cada dimensão guarda o valor correspondente
+DEFAULT_LEVELS = np.linspace(0.0, 100.0, 1001)
+
+# Deslocamento entre linhas na busca vetorizada: maior que qualquer score (0-100)
+_ROW_OFFSET = 1e6
+
+
+class PercentileIndex:
+    """Tabela de CDF pré-computada por dimensão para posicionar um usuário na população
+
+    Cada dimensão guarda os valores populacionais em níveis percentuais fixos
+    (`levels`), ordenados. `percentile_of` faz uma busca binária (O(log n));
+    `percentiles_of` responde todas as dimensões com um único `searchsorted`
+    sobre as linhas concatenadas com deslocamento.
+    """
+
+    def __init__(
+        self,
+        tables: Mapping[str, np.ndarray],
+        levels: np.ndarray = DEFAULT_LEVELS,
+        sample_size: int = 0
+    ):
+        self.levels = np.asarray(levels, dtype=np.float64)
+        self.dimensions = tuple(name for name in DIMENSIONS if name in tables) + \
+            tuple(name for name in tables if name not in DIMENSIONS)
+        self.row_of = {name: i for i, name in enumerate(self.dimensions)}
+        self.sample_size = sample_size
+
+        width = len(self.levels)
+        self.values = np.empty((len(self.dimensions), width), dtype=np.float64)
+        for name, row in self.row_of.items():
+            values = np.asarray(tables[name], dtype=np.float64)
+            if values.shape != (width,):
+                raise ValueError(f"Tabela de {name} deve ter {width} valores")
+            # Garante monotonicidade (aproximações podem oscilar em regiões planas)
+            self.values[row] = np.maximum.accumulate(values)
+
+        offsets = np.arange(len(self.dimensions), dtype=np.float64)[:, None] * _ROW_OFFSET
+        self._flat = (self.values + offsets).ravel()
+
+    def __contains__(self, dimension: str) -> bool:
+        return dimension in self.row_of
+
+    @classmethod
+    def from_samples(cls, samples: Mapping[str, Sequence[float]], levels: np.ndarray = DEFAULT_LEVELS) -> "PercentileIndex":
+        """Constrói a partir de amostras brutas por dimensão"""
+        tables = {}
+        sample_size = 0
+        for name, values in samples.items():
+            values = np.asarray(values, dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if values.size:
+                tables[name] = np.percentile(values, levels)
+                sample_size = max(sample_size, int(values.size))
+        return cls(tables, levels, sample_size)
+
+    @classmethod
+    def from_sketches(cls, sketches: Mapping[str, QuantileSketch], levels: np.ndarray = DEFAULT_LEVELS) -> "PercentileIndex":
+        """Constrói a partir de sketches de quantis (ex: mesclados por período/segmento)"""
+        tables = {
+            name: np.array([sketch.quantile(level / 100) for level in levels])
+            for name, sketch in sketches.items() if sketch.count
+        }
+        sample_size = max((sketch.count for sketch in sketches.values()), default=0)
+        return cls(tables, levels, sample_size)
+
+    @classmethod
+    def from_scores(cls, scores: Iterable[PersonalityScores], levels: np.ndarray = DEFAULT_LEVELS) -> "PercentileIndex":
+        """Constrói a partir de avaliações armazenadas, em uma passada"""
+        sketches: Dict[str, QuantileSketch] = {}
+        for item in scores:
+            for values in (item.disc, item.big_five, item.mbti_preferences):
+                for name, value in (values or {}).items():
+                    sketches.setdefault(name, QuantileSketch()).update(value)
+        return cls.from_sketches(sketches, levels)
+
+    @classmethod
+    def from_population(cls, population, levels: np.ndarray = DEFAULT_LEVELS) -> "PercentileIndex":
+        """Constrói a partir do agregado materializado (`PopulationBenchmarks`)"""
+        tables = {}
+        for scale, prefix_key in (("disc", "disc"), ("big_five", "b5")):
+            for code, histogram in getattr(population, scale).items():
+                if histogram.count:
+                    tables[f"{SCALE_PREFIXES[prefix_key]}{code}"] = np.array(
+                        [histogram.quantile(level / 100) for level in levels]
+                    )
+        return cls(tables, levels, population.sample_size)
+
+    def percentile_of(self, dimension: str, score: float) -> float:
+        """Percentil (0-100) de `score` na dimensão; empates recebem o nível médio"""
+        row = self.values[self.row_of[dimension]]
+        return float(self._lookup(row, np.asarray([score], dtype=np.float64))[0])
+
+    def percentiles_of(self, scores: Mapping[str, float]) -> Dict[str, float]:
+        """Percentis de várias dimensões de uma vez (dimensões fora do índice são ignoradas)"""
+        names = [name for name, value in scores.items() if name in self.row_of and value is not None]
+        if not names:
+            return {}
+
+        rows = np.fromiter((self.row_of[name] for name in names), dtype=np.int64, count=len(names))
+        values = np.fromiter((scores[name] for name in names), dtype=np.float64, count=len(names))
+        result = self.lookup_rows(rows, values)
+        return {name: float(value) for name, value in zip(names, result)}
+
+    def scores_percentiles(self, scores: PersonalityScores) -> Dict[str, float]:
+        """Percentis de todas as dimensões de um `PersonalityScores`"""
+        return self.percentiles_of({**scores.disc, **scores.big_five, **scores.mbti_preferences})
+
+    def lookup_rows(self, rows: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Percentis para pares (linha, valor) com um único `searchsorted` vetorizado"""
+        width = len(self.levels)
+        clipped = np.clip(values, -_ROW_OFFSET / 4, _ROW_OFFSET / 4)
+        shifted = clipped + rows * _ROW_OFFSET
+
+        left = np.searchsorted(self._flat, shifted, side="left") - rows * width
+        right = np.searchsorted(self._flat, shifted, side="right") - rows * width
+        return self._interpolate(self.values[rows], clipped, left, right)
+
+    def _lookup(self, row: np.ndarray, values: np.ndarray) -> np.ndarray:
+        left = np.searchsorted(row, values, side="left")
+        right = np.searchsorted(row, values, side="right")
+        return self._interpolate(np.broadcast_to(row, (len(values), len(row))), values, left, right)
+
+    def _interpolate(self, rows: np.ndarray, values: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Interpola entre os níveis vizinhos; valores exatos usam o meio da faixa empatada"""
+        levels = self.levels
+        last = len(levels) - 1
+        index = np.arange(len(values))
+
+        below = np.clip(left - 1, 0, last)
+        above = np.clip(left, 0, last)
+        low_values = rows[index, below]
+        high_values = rows[index, above]
+        span = high_values - low_values
+        fraction = np.divide(values - low_values, span, out=np.zeros_like(values), where=span > 0)
+        interpolated = levels[below] + fraction * (levels[above] - levels[below])
+
+        tied = right > left
+        tie_level = (levels[np.clip(left, 0, last)] + levels[np.clip(right - 1, 0, last)]) / 2
+
+        result = np.where(tied, tie_level, interpolated)
+        result = np.where(left == 0, np.where(tied, tie_level, levels[0]), result)
+        result = np.where(left > last, levels[-1], result)
+        return result
+
+    def to_dict(self, precision: Optional[int] = 3) -> Dict:
+        """Forma serializável (para cache em disco ou documento)"""
+        values = np.round(self.values, precision) if precision is not None else self.values
+        return {
+            'levels': self.levels.tolist(),
+            'tables': {name: values[row].tolist() for name, row in self.row_of.items()},
+            'sample_size': self.sample_size
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PercentileIndex":
+        return cls(
+            {name: np.asarray(values) for name, values in data['tables'].items()},
+            np.asarray(data['levels']),
+            int(data.get('sample_size', 0))
+        )
@@ -1,157 +1,230 @@
+import threading
+from collections import OrderedDict
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from .models import AssessmentItem, PersonalityScores, ProfileInsights
-from scipy import stats
+from .compatibility import style_compatibility
+from .item_bank import (
+    CompiledItemBank, DIMENSIONS, DIMENSION_INDEX, DIMENSION_CODES, SCALE_PREFIXES, SCALE_SLICES
+)
+from .norms import NormativeNormalizer
 import logging
 
 logger = logging.getLogger(__name__)
 
+ItemsLike = Union[List[AssessmentItem], CompiledItemBank]
+
+# Casas decimais das preferências MBTI brutas
+MBTI_DECIMALS = 9
+
+# Bancos compilados compartilhados entre instâncias (uma por rerun do Streamlit),
+# do mais antigo ao mais recente uso
+ITEM_BANK_CACHE_SIZE = 8
+_item_bank_cache: "OrderedDict[Tuple, CompiledItemBank]" = OrderedDict()
+_item_bank_lock = threading.Lock()
+
 class AdvancedScoringEngine:
     """Engine de pontuação com algoritmos estatísticos avançados"""
     
-    def __init__(self):
+    def __init__(self, normalizer: Optional[NormativeNormalizer] = None):
         self.item_reliability_cache = {}
-        self.norm_data = self._load_normative_data()
+        self.normalizer = normalizer or NormativeNormalizer.default()
     
-    def _load_normative_data(self) -> Dict:
-        """Carrega dados normativos para comparação (mock)"""
-        return {
-            "disc_means": {"D": 50, "I": 50, "S": 50, "C": 50},
-            "disc_stds": {"D": 15, "I": 15, "S": 15, "C": 15},
-            "b5_means": {"O": 50, "C": 50, "E": 50, "A": 50, "N": 50},
-            "b5_stds": {"O": 15, "C": 15, "E": 15, "A": 15, "N": 15}
-        }
+    def compile_item_bank(self, items: ItemsLike) -> CompiledItemBank:
+        """Retorna o banco de itens compilado, reutilizando compilações anteriores"""
+        
+        if isinstance(items, CompiledItemBank):
+            return items
+        
+        # A confiabilidade entra na chave: engines com outra configuração não compartilham bancos
+        key = (
+            CompiledItemBank.fingerprint_of(items),
+            tuple(self._get_item_reliability(item.id) for item in items)
+        )
+        with _item_bank_lock:
+            bank = _item_bank_cache.get(key)
+            if bank is not None:
+                _item_bank_cache.move_to_end(key)
+                return bank
+        
+        bank = CompiledItemBank(items, reliability=self._get_item_reliability)
+        with _item_bank_lock:
+            _item_bank_cache[key] = bank
+            while len(_item_bank_cache) > ITEM_BANK_CACHE_SIZE:
+                _item_bank_cache.popitem(last=False)
+        return bank
     
     def calculate_scores_with_confidence(
         self, 
         answers: Dict[int, int], 
-        items: List[AssessmentItem]
+        items: ItemsLike,
+        segment: Optional[str] = None
     ) -> PersonalityScores:
         """Calcula scores com intervalos de confiança"""
         
-        raw_scores = self._calculate_raw_scores(answers, items)
-        normalized_scores = self._normalize_scores(raw_scores)
-        confidence_scores = self._calculate_confidence_intervals(answers, items)
-        mbti_type = self._determine_mbti_type(normalized_scores.get("mbti", {}))
-        
-        return PersonalityScores(
-            disc=normalized_scores.get("disc", {}),
-            big_five=normalized_scores.get("b5", {}),
-            mbti_preferences=normalized_scores.get("mbti", {}),
-            mbti_type=mbti_type,
-            confidence_scores=confidence_scores
-        )
+        bank = self.compile_item_bank(items)
+        return self.score_batch(bank.answers_to_matrix([answers]), bank, segment)[0]
+    
+    def score_batch(
+        self,
+        answers_matrix: np.ndarray,
+        items: ItemsLike,
+        segments: Union[None, str, Sequence[str]] = None
+    ) -> List[PersonalityScores]:
+        """Calcula scores de vários respondentes com uma única multiplicação matricial
+        
+        `answers_matrix` tem formato (respondentes × itens), com colunas na mesma
+        ordem de `items`; valores 0 ou NaN indicam item não respondido. Cada linha
+        produz o mesmo resultado de `calculate_scores_with_confidence`.
+        `segments` escolhe a tabela normativa (um segmento para todos ou um por linha).
+        """
+        
+        bank = self.compile_item_bank(items)
+        raw = bank.raw_scores(answers_matrix)
+        normalized = self._normalize_matrix(raw, segments)
+        counts, sums, sums_sq = bank.confidence_moments(answers_matrix)
+        
+        results = []
+        for row, normalized_row in enumerate(normalized.tolist()):
+            normalized_scores = self._normalized_row_to_dict(normalized_row)
+            confidence_scores = self._confidence_from_moments(
+                bank.confidence_dimensions, counts[row], sums[row], sums_sq[row]
+            )
+            
+            results.append(PersonalityScores(
+                disc=normalized_scores.get("disc", {}),
+                big_five=normalized_scores.get("b5", {}),
+                mbti_preferences=normalized_scores.get("mbti", {}),
+                mbti_type=self._determine_mbti_type(normalized_scores.get("mbti", {})),
+                confidence_scores=confidence_scores
+            ))
+        
+        return results
+    
+    def answers_to_matrix(
+        self,
+        answers_list: List[Dict[int, int]],
+        items: ItemsLike
+    ) -> np.ndarray:
+        """Converte respostas por respondente em matriz (respondentes × itens) para `score_batch`"""
+        
+        return self.compile_item_bank(items).answers_to_matrix(answers_list)
     
     def _calculate_raw_scores(
         self, 
         answers: Dict[int, int], 
-        items: List[AssessmentItem]
+        items: ItemsLike
     ) -> Dict[str, Dict[str, float]]:
         """Calcula scores brutos com pesos adaptativos"""
         
-        scores = {
-            "disc": {"D": 0, "I": 0, "S": 0, "C": 0},
-            "b5": {"O": 0, "C": 0, "E": 0, "A": 0, "N": 0},
-            "mbti": {"E": 0, "I": 0, "S": 0, "N": 0, "T": 0, "F": 0, "J": 0, "P": 0}
-        }
+        bank = self.compile_item_bank(items)
+        raw = bank.raw_scores(bank.answers_to_vector(answers))
+        return self._raw_scores_to_dict(raw[0])
+    
+    def _raw_scores_to_dict(self, raw_row: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """Agrupa uma linha de scores brutos por escala ({"disc": {"D": ...}, ...})"""
         
-        for item in items:
-            if item.id not in answers:
-                continue
-                
-            response = answers[item.id]
-            
-            # Aplica reverse scoring se necessário
-            if item.reverse_scored:
-                response = 6 - response
-            
-            # Aplica pesos com adaptação baseada na confiabilidade do item
-            reliability_factor = self._get_item_reliability(item.id)
-            
-            for dimension, weight in item.weights.items():
-                adjusted_weight = weight * reliability_factor
-                
-                if dimension.startswith("DISC_"):
-                    key = dimension.replace("DISC_", "")
-                    scores["disc"][key] += response * adjusted_weight
-                elif dimension.startswith("B5_"):
-                    key = dimension.replace("B5_", "")
-                    scores["b5"][key] += response * adjusted_weight
-                elif dimension.startswith("MBTI_"):
-                    key = dimension.replace("MBTI_", "")
-                    scores["mbti"][key] += response * adjusted_weight
-        
-        return scores
+        return {
+            scale: {
+                DIMENSION_CODES[dimension]: float(value)
+                for dimension, value in zip(DIMENSIONS[columns], raw_row[columns])
+            }
+            for scale, columns in SCALE_SLICES.items()
+        }
     
-    def _normalize_scores(self, raw_scores: Dict) -> Dict[str, Dict[str, float]]:
+    def _normalize_scores(
+        self,
+        raw_scores: Dict,
+        segment: Optional[str] = None
+    ) -> Dict[str, Dict[str, float]]:
         """Normaliza scores usando dados normativos"""
-        normalized = {}
         
+        raw_row = np.zeros(len(DIMENSIONS))
         for scale, dimensions in raw_scores.items():
-            normalized[scale] = {}
-            
-            if scale == "disc":
-                # Normalização ipsativa (soma = 100)
-                total = sum(abs(score) for score in dimensions.values())
-                if total > 0:
-                    for dim, score in dimensions.items():
-                        normalized[scale][f"DISC_{dim}"] = round((abs(score) / total) * 100, 1)
-                
-            elif scale == "b5":
-                # Normalização baseada em normas populacionais
-                for dim, score in dimensions.items():
-                    mean = self.norm_data["b5_means"][dim]
-                    std = self.norm_data["b5_stds"][dim]
-                    z_score = (score - mean) / std if std > 0 else 0
-                    percentile = stats.norm.cdf(z_score) * 100
-                    normalized[scale][f"B5_{dim}"] = round(max(0, min(100, percentile)), 1)
-            
-            elif scale == "mbti":
-                # Mantém scores brutos para MBTI (serão usados para determinar preferências)
-                normalized[scale] = {f"MBTI_{k}": v for k, v in dimensions.items()}
+            for dim, score in dimensions.items():
+                raw_row[DIMENSION_INDEX[f"{SCALE_PREFIXES[scale]}{dim}"]] = score
+        
+        return self._normalized_row_to_dict(self._normalize_matrix(raw_row, segment)[0].tolist())
+    
+    def _normalize_matrix(
+        self,
+        raw: np.ndarray,
+        segments: Union[None, str, Sequence[str]] = None
+    ) -> np.ndarray:
+        """Normaliza a matriz de scores brutos numa única passada vetorizada"""
+        
+        normalized = self.normalizer.normalize(raw, segments)
+        
+        # DISC ipsativo (soma = 100) e percentis Big Five com uma casa decimal;
+        # MBTI mantém scores brutos (usados para determinar preferências)
+        for scale in ("disc", "b5"):
+            normalized[:, SCALE_SLICES[scale]] = np.round(normalized[:, SCALE_SLICES[scale]], 1)
+        # Erro de arredondamento da soma (~1e-15, varia com a ordem e o tamanho
+        # do lote) não pode decidir empates entre preferências opostas
+        normalized[:, SCALE_SLICES["mbti"]] = np.round(normalized[:, SCALE_SLICES["mbti"]], MBTI_DECIMALS)
+        return normalized
+    
+    def _normalized_row_to_dict(self, normalized_row: List[float]) -> Dict[str, Dict[str, float]]:
+        """Converte uma linha normalizada no formato {"disc": {"DISC_D": ...}, ...}"""
         
+        normalized = {}
+        for scale, columns in SCALE_SLICES.items():
+            values = normalized_row[columns]
+            # Linha DISC sem pontuação (NaN) resulta em dicionário vazio
+            if scale == "disc" and values and values[0] != values[0]:
+                normalized[scale] = {}
+                continue
+            normalized[scale] = dict(zip(DIMENSIONS[columns], values))
         return normalized
     
     def _calculate_confidence_intervals(
         self, 
         answers: Dict[int, int], 
-        items: List[AssessmentItem]
+        items: ItemsLike
     ) -> Dict[str, float]:
         """Calcula intervalos de confiança para cada dimensão"""
         
-        # Análise da consistência das respostas por dimensão
-        dimension_responses = {}
+        # Análise da consistência das respostas por dimensão, via matriz de incidência
+        bank = self.compile_item_bank(items)
+        counts, sums, sums_sq = bank.confidence_moments(bank.answers_to_vector(answers))
         
-        for item in items:
-            if item.id not in answers:
-                continue
-                
-            response = answers[item.id]
-            
-            for dimension in item.weights.keys():
-                if dimension not in dimension_responses:
-                    dimension_responses[dimension] = []
-                dimension_responses[dimension].append(response)
+        return self._confidence_from_moments(
+            bank.confidence_dimensions, counts[0], sums[0], sums_sq[0]
+        )
+    
+    def _confidence_from_moments(
+        self,
+        dimensions: List[str],
+        counts: np.ndarray,
+        sums: np.ndarray,
+        sums_sq: np.ndarray
+    ) -> Dict[str, float]:
+        """Calcula confiança por dimensão a partir de contagem, soma e soma dos quadrados"""
         
         confidence_scores = {}
-        for dimension, responses in dimension_responses.items():
-            if len(responses) < 2:
+        for dimension, n, total, total_sq in zip(dimensions, counts, sums, sums_sq):
+            if n == 0:
+                continue
+            if n < 2:
                 confidence_scores[dimension] = 0.5
             else:
-                # Calcula consistência interna (Alpha de Cronbach simplificado)
-                variance = np.var(responses)
-                mean_response = np.mean(responses)
-                
-                # Score de confiança baseado na variabilidade esperada
-                if variance == 0:
-                    confidence_scores[dimension] = 0.3  # Muito consistente = suspeito
-                else:
-                    expected_var = 1.0  # Variância esperada para respostas autênticas
-                    confidence = min(1.0, expected_var / (variance + 0.1))
-                    confidence_scores[dimension] = round(confidence, 2)
+                # Numerador inteiro exato para respostas Likert: variância zero é detectada sem erro
+                variance = (n * total_sq - total * total) / (n * n)
+                confidence_scores[dimension] = self._confidence_from_variance(variance)
         
         return confidence_scores
     
+    def _confidence_from_variance(self, variance: float) -> float:
+        """Converte variância das respostas em score de confiança"""
+        
+        # Score de confiança baseado na variabilidade esperada
+        if variance == 0:
+            return 0.3  # Muito consistente = suspeito
+        
+        expected_var = 1.0  # Variância esperada para respostas autênticas
+        confidence = min(1.0, expected_var / (variance + 0.1))
+        return round(confidence, 2)
+    
     def _determine_mbti_type(self, mbti_scores: Dict[str, float]) -> str:
         """Determina tipo MBTI com base nos scores"""
         
@@ -219,7 +292,8 @@ class InsightGenerator:
             communication_style=self._determine_communication_style(scores),
             leadership_style=self._determine_leadership_style(scores),
             stress_indicators=self._identify_stress_indicators(scores),
-            growth_recommendations=self._generate_growth_recommendations(scores)
+            growth_recommendations=self._generate_growth_recommendations(scores),
+            compatibility_notes=self._generate_compatibility_notes(scores)
         )
     
     def _generate_summary(self, scores: PersonalityScores, blend: List[str]) -> str:
@@ -445,6 +519,31 @@ class InsightGenerator:
         
         return recommendations[:5]
     
+    def _generate_compatibility_notes(self, scores: PersonalityScores) -> Dict[str, str]:
+        """Gera notas de parceria com cada estilo DISC (similaridade x complementaridade)"""
+        
+        style_names = {"D": "Dominância", "I": "Influência", "S": "Estabilidade", "C": "Conformidade"}
+        notes = {}
+        
+        for code, values in style_compatibility(scores).items():
+            similarity = values["similarity"]
+            complementarity = values["complementarity"]
+            
+            if complementarity > 0.25:
+                note = "Parceria complementar: vocês cobrem os pontos cegos um do outro"
+            elif similarity > 0.2:
+                note = "Afinidade natural: comunicação fluida, mas atenção a pontos cegos em comum"
+            elif similarity < -0.2:
+                note = "Estilos contrastantes: alinhe expectativas e ritmo de trabalho desde o início"
+            else:
+                note = "Relação equilibrada: combine papéis e responsabilidades de forma explícita"
+            
+            notes[f"{style_names[code]} ({code})"] = (
+                f"{note} (afinidade {similarity:+.2f}, complementaridade {complementarity:+.2f})"
+            )
+        
+        return notes
+    
     def _load_insight_templates(self) -> Dict:
         """Carrega templates para geração de insights (mock)"""
         return {
@@ -0,0 +1,315 @@
+import math
+import struct
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Cabeçalho binário: versão, compressão, contagem, min, max, média, m2, número de centróides
+_HEADER = struct.Struct("<BddddddI")
+_SKETCH_VERSION = 1
+
+
+@dataclass
+class MomentSketch:
+    """Contagem, média e variância em uma passada (Welford), combináveis (Chan et al.)"""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "MomentSketch") -> None:
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """Variância populacional (como np.var)"""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MomentSketch":
+        return cls(
+            count=int(data.get('count', 0)),
+            mean=float(data.get('mean', 0.0)),
+            m2=float(data.get('m2', 0.0)),
+            min=float(data.get('min', math.inf)),
+            max=float(data.get('max', -math.inf))
+        )
+
+
+class TDigest:
+    """t-digest com fusão em buffer (Dunning), para quantis aproximados em streaming
+
+    Mantém O(compression) centróides; a precisão é maior nas caudas. Dois
+    digests são combinados reinserindo os centróides de um no outro, o que
+    permite agregar shards e períodos armazenados separadamente.
+    """
+
+    def __init__(self, compression: float = 100.0):
+        if compression < 10:
+            raise ValueError("compression deve ser ao menos 10")
+        self.compression = float(compression)
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[Tuple[float, float]] = []
+        self._buffer_limit = int(5 * compression)
+
+    def __len__(self) -> int:
+        self._compress()
+        return len(self.means)
+
+    def update(self, value: float, weight: float = 1.0) -> None:
+        if math.isnan(value):
+            return
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= self._buffer_limit:
+            self._compress()
+
+    def update_many(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.update(float(value))
+
+    def merge(self, other: "TDigest") -> None:
+        other._compress()
+        if not other.count:
+            return
+        self._buffer.extend(zip(other.means, other.weights))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k: float) -> float:
+        return (math.sin(min(math.pi / 2, k * 2 * math.pi / self.compression)) + 1) / 2
+
+    def _compress(self) -> None:
+        """Funde buffer e centróides respeitando o limite de tamanho da função de escala k1"""
+        if not self._buffer:
+            return
+
+        items = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+        total = self.count
+
+        means, weights = [], []
+        current_mean, current_weight = items[0]
+        weight_so_far = 0.0
+        q_limit = self._k_inverse(self._k(0.0) + 1)
+
+        for mean, weight in items[1:]:
+            proposed = current_weight + weight
+            if (weight_so_far + proposed) / total <= q_limit:
+                current_mean += (mean - current_mean) * weight / proposed
+                current_weight = proposed
+            else:
+                means.append(current_mean)
+                weights.append(current_weight)
+                weight_so_far += current_weight
+                q_limit = self._k_inverse(self._k(weight_so_far / total) + 1)
+                current_mean, current_weight = mean, weight
+
+        means.append(current_mean)
+        weights.append(current_weight)
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: float) -> float:
+        """Valor aproximado no quantil q ∈ [0, 1]"""
+        self._compress()
+        if not self.count:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        means, weights = self.means, self.weights
+        if len(means) == 1:
+            return means[0]
+
+        index = q * self.count
+        if index < weights[0] / 2:
+            return self.min + (means[0] - self.min) * index / (weights[0] / 2)
+
+        cumulative = weights[0] / 2
+        for i in range(len(means) - 1):
+            step = (weights[i] + weights[i + 1]) / 2
+            if cumulative + step > index:
+                t = (index - cumulative) / step
+                return means[i] + t * (means[i + 1] - means[i])
+            cumulative += step
+
+        remaining = (index - cumulative) / (weights[-1] / 2)
+        return means[-1] + (self.max - means[-1]) * min(1.0, remaining)
+
+    def cdf(self, value: float) -> float:
+        """Fração aproximada da população com valor ≤ `value`"""
+        self._compress()
+        if not self.count:
+            return math.nan
+        if value < self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+
+        means, weights = self.means, self.weights
+        if len(means) == 1:
+            return 0.5
+
+        if value < means[0]:
+            span = means[0] - self.min
+            return (weights[0] / 2) * ((value - self.min) / span if span else 1.0) / self.count
+
+        cumulative = weights[0] / 2
+        for i in range(len(means) - 1):
+            if value < means[i + 1]:
+                span = means[i + 1] - means[i]
+                t = (value - means[i]) / span if span else 0.0
+                return (cumulative + t * (weights[i] + weights[i + 1]) / 2) / self.count
+            cumulative += (weights[i] + weights[i + 1]) / 2
+
+        span = self.max - means[-1]
+        t = (value - means[-1]) / span if span else 1.0
+        return (cumulative + t * weights[-1] / 2) / self.count
+
+    def centroids(self) -> List[Tuple[float, float]]:
+        self._compress()
+        return list(zip(self.means, self.weights))
+
+
+class QuantileSketch:
+    """Sketch de distribuição de uma dimensão: t-digest para quantis + momentos exatos
+
+    Atualizável uma avaliação por vez, serializável (dict para Firestore ou
+    bytes compactos) e combinável entre shards, segmentos e períodos.
+    """
+
+    def __init__(self, compression: float = 100.0):
+        self.digest = TDigest(compression)
+        self.moments = MomentSketch()
+
+    @property
+    def count(self) -> int:
+        return self.moments.count
+
+    def update(self, value: float) -> None:
+        if value is None or math.isnan(value):
+            return
+        self.digest.update(value)
+        self.moments.update(value)
+
+    def update_many(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.update(float(value))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        self.digest.merge(other.digest)
+        self.moments.merge(other.moments)
+        return self
+
+    @classmethod
+    def merged(cls, sketches: Iterable["QuantileSketch"], compression: float = 100.0) -> "QuantileSketch":
+        result = cls(compression)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    def quantile(self, q: float) -> float:
+        return self.digest.quantile(q)
+
+    def percentile_rank(self, value: float) -> float:
+        """Percentil (0-100) de `value` na distribuição"""
+        return self.digest.cdf(value) * 100
+
+    def summary(self) -> Dict[str, float]:
+        """Resumo no formato dos benchmarks (p25/p50/p75/mean/std)"""
+        return {
+            'p25': self.quantile(0.25),
+            'p50': self.quantile(0.50),
+            'p75': self.quantile(0.75),
+            'mean': self.moments.mean,
+            'std': self.moments.std
+        }
+
+    def to_dict(self, precision: Optional[int] = 4) -> Dict:
+        """Forma serializável em documentos (listas paralelas de médias e pesos)"""
+        centroids = self.digest.centroids()
+        return {
+            'compression': self.digest.compression,
+            'moments': self.moments.to_dict(),
+            'means': [round(mean, precision) if precision is not None else mean for mean, _ in centroids],
+            'weights': [int(weight) if float(weight).is_integer() else weight for _, weight in centroids]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "QuantileSketch":
+        sketch = cls(float(data.get('compression', 100.0)))
+        sketch.moments = MomentSketch.from_dict(data.get('moments', {}))
+        digest = sketch.digest
+        digest.means = [float(mean) for mean in data.get('means', [])]
+        digest.weights = [float(weight) for weight in data.get('weights', [])]
+        digest.count = float(sum(digest.weights))
+        digest.min, digest.max = sketch.moments.min, sketch.moments.max
+        return sketch
+
+    def to_bytes(self) -> bytes:
+        """Serialização binária compacta (centróides em float32)"""
+        centroids = self.digest.centroids()
+        moments = self.moments
+        header = _HEADER.pack(
+            _SKETCH_VERSION, self.digest.compression, float(moments.count),
+            moments.min, moments.max, moments.mean, moments.m2, len(centroids)
+        )
+        body = struct.pack(f"<{2 * len(centroids)}f", *(value for centroid in centroids for value in centroid))
+        return header + body
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "QuantileSketch":
+        version, compression, count, minimum, maximum, mean, m2, size = _HEADER.unpack_from(payload)
+        if version != _SKETCH_VERSION:
+            raise ValueError(f"Versão de sketch não suportada: {version}")
+
+        values = struct.unpack_from(f"<{2 * size}f", payload, _HEADER.size)
+        sketch = cls(compression)
+        sketch.moments = MomentSketch(count=int(count), mean=mean, m2=m2, min=minimum, max=maximum)
+        digest = sketch.digest
+        digest.means = list(values[0::2])
+        digest.weights = list(values[1::2])
+        digest.count = float(sum(digest.weights))
+        digest.min, digest.max = minimum, maximum
+        return sketch
@@ -0,0 +1,344 @@
+"""Exportação em massa de avaliações para Parquet/Arrow particionado
+
+Uso (linha de comando):
+
+    python -m src.services.assessment_export --output exports/avaliacoes
+    python -m src.services.assessment_export --source jsonl --input dump.jsonl --format arrow
+
+Cada linha é uma avaliação: metadados, 17 colunas de score float32 (ordem de
+`DIMENSIONS`) e as respostas num bloco de largura fixa `answers`
+(fixed_size_list<int8>, 0 = sem resposta). Os arquivos são particionados por
+mês (`period=YYYY-MM/part-00000.parquet`) e escritos em lotes de tamanho fixo,
+então a memória não depende do tamanho do histórico exportado.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import logging
+
+import numpy as np
+
+from ..core.compatibility import scores_to_vector
+from ..core.item_bank import DIMENSIONS
+from ..core.models import UserAssessment
+from ..utils.lazy_imports import lazy_module
+from ..utils.timestamps import epoch_microseconds
+from .firestore_codec import schema_for
+
+pa = lazy_module("pyarrow")
+pq = lazy_module("pyarrow.parquet")
+
+logger = logging.getLogger(__name__)
+
+# Questionário padrão do app (48 itens); respostas com id fora de 1..largura são descartadas
+DEFAULT_ANSWER_WIDTH = 48
+DEFAULT_BATCH_ROWS = 10_000
+# Partições com lote/escritor abertos ao mesmo tempo; a menos recente é gravada e
+# fechada, e um novo part é criado se ela reaparecer
+MAX_OPEN_WRITERS = 16
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def export_schema(answer_width: int = DEFAULT_ANSWER_WIDTH):
+    """Schema Arrow das linhas exportadas"""
+    return pa.schema(
+        [
+            pa.field("user_id", pa.string()),
+            pa.field("assessment_id", pa.string()),
+            pa.field("timestamp", pa.timestamp("us", tz="UTC")),
+            pa.field("mbti_type", pa.string()),
+            pa.field("completion_time_minutes", pa.int16()),
+            pa.field("reliability_score", pa.float32()),
+        ]
+        + [pa.field(name, pa.float32()) for name in DIMENSIONS]
+        + [pa.field("answers", pa.list_(pa.int8(), answer_width))]
+    )
+
+
+@dataclass
+class ExportResult:
+    """Resumo da exportação"""
+    rows_written: int = 0
+    files: List[str] = field(default_factory=list)
+    partitions: int = 0
+    dropped_answers: int = 0
+    elapsed_seconds: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'rows_written': self.rows_written,
+            'files': len(self.files),
+            'partitions': self.partitions,
+            'dropped_answers': self.dropped_answers,
+            'elapsed_seconds': round(self.elapsed_seconds, 3)
+        }
+
+
+class _PartitionBuffer:
+    """Lote pré-alocado de uma partição (arrays colunares reaproveitados entre flushes)"""
+
+    def __init__(self, capacity: int, answer_width: int):
+        self.capacity = capacity
+        self.size = 0
+        self.user_ids: List[str] = []
+        self.assessment_ids: List[str] = []
+        self.mbti_types: List[str] = []
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.completion = np.zeros(capacity, dtype=np.int16)
+        self.completion_valid = np.zeros(capacity, dtype=bool)
+        self.reliability = np.zeros(capacity, dtype=np.float32)
+        self.reliability_valid = np.zeros(capacity, dtype=bool)
+        self.scores = np.full((capacity, len(DIMENSIONS)), np.nan, dtype=np.float32)
+        self.answers = np.zeros((capacity, answer_width), dtype=np.int8)
+
+    @property
+    def full(self) -> bool:
+        return self.size == self.capacity
+
+    def append(self, assessment: UserAssessment) -> int:
+        """Adiciona a avaliação; retorna quantas respostas ficaram fora do bloco"""
+        row = self.size
+        self.user_ids.append(assessment.user_id)
+        self.assessment_ids.append(assessment.assessment_id)
+        self.mbti_types.append(assessment.scores.mbti_type)
+
+        self.timestamps[row] = epoch_microseconds(assessment.timestamp)
+
+        self.completion_valid[row] = assessment.completion_time_minutes is not None
+        self.completion[row] = assessment.completion_time_minutes or 0
+        self.reliability_valid[row] = assessment.reliability_score is not None
+        self.reliability[row] = assessment.reliability_score or 0.0
+
+        self.scores[row] = np.nan
+        scores_to_vector(assessment.scores, out=self.scores[row])
+
+        answers = self.answers[row]
+        answers[:] = 0
+        responses = assessment.answers or {}
+        item_ids = np.fromiter(responses.keys(), dtype=np.int64, count=len(responses))
+        values = np.fromiter(responses.values(), dtype=np.int8, count=len(responses))
+        inside = (item_ids >= 1) & (item_ids <= len(answers))
+        answers[item_ids[inside] - 1] = values[inside]
+
+        self.size += 1
+        return int(len(item_ids) - inside.sum())
+
+    def to_record_batch(self, schema):
+        size = self.size
+        answer_width = self.answers.shape[1]
+        columns = [
+            pa.array(self.user_ids, type=pa.string()),
+            pa.array(self.assessment_ids, type=pa.string()),
+            pa.array(self.timestamps[:size], type=pa.timestamp("us", tz="UTC")),
+            pa.array(self.mbti_types, type=pa.string()),
+            pa.array(self.completion[:size], mask=~self.completion_valid[:size], type=pa.int16()),
+            pa.array(self.reliability[:size], mask=~self.reliability_valid[:size], type=pa.float32()),
+        ]
+        for column in range(len(DIMENSIONS)):
+            values = self.scores[:size, column]
+            columns.append(pa.array(values, mask=np.isnan(values), type=pa.float32()))
+        columns.append(pa.FixedSizeListArray.from_arrays(
+            pa.array(self.answers[:size].ravel(), type=pa.int8()), answer_width
+        ))
+        return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+    def clear(self) -> None:
+        self.size = 0
+        self.user_ids, self.assessment_ids, self.mbti_types = [], [], []
+
+
+class _PartWriter:
+    """Um arquivo de saída (Parquet ou Arrow IPC) recebendo lotes"""
+
+    def __init__(self, path: str, schema, file_format: str):
+        self.path = path
+        self._sink = None
+        if file_format == "parquet":
+            self._writer = pq.ParquetWriter(path, schema, compression="zstd")
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, schema)
+
+    def write(self, batch) -> None:
+        self._writer.write_batch(batch)
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+class AssessmentExporter:
+    """Grava um stream de avaliações em arquivos colunares particionados por mês"""
+
+    def __init__(
+        self,
+        output_dir: str,
+        file_format: str = "parquet",
+        answer_width: int = DEFAULT_ANSWER_WIDTH,
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        max_open_writers: int = MAX_OPEN_WRITERS,
+        partition_by: Optional[Callable[[UserAssessment], str]] = None
+    ):
+        if file_format not in FORMATS:
+            raise ValueError(f"Formato não suportado: {file_format} (use {', '.join(FORMATS)})")
+
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.answer_width = answer_width
+        self.batch_rows = batch_rows
+        self.max_open_writers = max_open_writers
+        self.partition_by = partition_by or (lambda assessment: assessment.timestamp.strftime("%Y-%m"))
+
+    def export(
+        self,
+        assessments: Iterable[UserAssessment],
+        progress: Optional[Callable[[int], None]] = None
+    ) -> ExportResult:
+        """Consome o iterável uma única vez, sem materializá-lo"""
+        start = time.perf_counter()
+        schema = export_schema(self.answer_width)
+        result = ExportResult()
+
+        buffers: "OrderedDict[str, _PartitionBuffer]" = OrderedDict()
+        writers: "OrderedDict[str, _PartWriter]" = OrderedDict()
+        parts: Dict[str, int] = {}
+
+        def flush(partition: str) -> None:
+            buffer = buffers[partition]
+            if not buffer.size:
+                return
+            writer = writers.get(partition)
+            if writer is None:
+                writer = self._open_writer(partition, parts, schema)
+                writers[partition] = writer
+                result.files.append(writer.path)
+                if len(writers) > self.max_open_writers:
+                    _, oldest = writers.popitem(last=False)
+                    oldest.close()
+            writers.move_to_end(partition)
+            writer.write(buffer.to_record_batch(schema))
+            result.rows_written += buffer.size
+            buffer.clear()
+            if progress:
+                progress(result.rows_written)
+
+        try:
+            for assessment in assessments:
+                partition = self.partition_by(assessment)
+                buffer = buffers.get(partition)
+                if buffer is None:
+                    buffer = buffers[partition] = _PartitionBuffer(self.batch_rows, self.answer_width)
+                    # Limita os lotes em memória: a partição menos recente é gravada e liberada
+                    if len(buffers) > self.max_open_writers:
+                        oldest = next(iter(buffers))
+                        flush(oldest)
+                        del buffers[oldest]
+                buffers.move_to_end(partition)
+                result.dropped_answers += buffer.append(assessment)
+                if buffer.full:
+                    flush(partition)
+
+            for partition in list(buffers):
+                flush(partition)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        result.partitions = len(parts)
+        result.elapsed_seconds = time.perf_counter() - start
+        if result.dropped_answers:
+            logger.warning(f"{result.dropped_answers} respostas fora dos {self.answer_width} itens exportados")
+        return result
+
+    def _open_writer(self, partition: str, parts: Dict[str, int], schema) -> _PartWriter:
+        directory = os.path.join(self.output_dir, f"period={partition}")
+        os.makedirs(directory, exist_ok=True)
+        part = parts.get(partition, 0)
+        parts[partition] = part + 1
+        path = os.path.join(directory, f"part-{part:05d}{FORMATS[self.file_format]}")
+        return _PartWriter(path, schema, self.file_format)
+
+
+# Fontes
+
+_ASSESSMENT_SCHEMA = schema_for(UserAssessment)
+
+
+def _decode(data: Dict) -> UserAssessment:
+    data = dict(data)
+    data['profile_insights'] = None
+    return _ASSESSMENT_SCHEMA.from_plain(data)
+
+
+def firestore_source(db, page_size: int = 1000) -> Iterator[UserAssessment]:
+    """Todas as avaliações do collection group, em páginas (sem carregar tudo em memória)"""
+    query = db.collection_group('assessments').order_by('__name__').limit(page_size)
+    last = None
+    while True:
+        page = query.start_after(last) if last is not None else query
+        count = 0
+        for doc in page.stream():
+            count += 1
+            last = doc
+            yield _decode(doc.to_dict())
+        if count < page_size:
+            return
+
+
+def jsonl_source(path: str) -> Iterator[UserAssessment]:
+    """Avaliações de um arquivo JSON Lines (um documento por linha, datas em ISO 8601)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                if isinstance(data.get('timestamp'), str):
+                    data['timestamp'] = datetime.fromisoformat(data['timestamp'].replace('Z', '+00:00'))
+                yield _decode(data)
+
+
+def _firestore_client(credentials_path: Optional[str]):
+    from google.cloud import firestore
+    if credentials_path:
+        return firestore.Client.from_service_account_json(credentials_path)
+    return firestore.Client()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Exporta avaliações NeuroMap para Parquet/Arrow particionado")
+    parser.add_argument("--output", required=True, help="Diretório de saída")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--source", choices=["firestore", "jsonl"], default="firestore")
+    parser.add_argument("--input", help="Arquivo JSON Lines (com --source jsonl)")
+    parser.add_argument("--credentials", help="JSON da service account (padrão: credenciais do ambiente)")
+    parser.add_argument("--answer-width", type=int, default=DEFAULT_ANSWER_WIDTH)
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS)
+    args = parser.parse_args(argv)
+
+    if args.source == "jsonl":
+        if not args.input:
+            parser.error("--input é obrigatório com --source jsonl")
+        source = jsonl_source(args.input)
+    else:
+        source = firestore_source(_firestore_client(args.credentials))
+
+    exporter = AssessmentExporter(
+        args.output, file_format=args.format, answer_width=args.answer_width, batch_rows=args.batch_rows
+    )
+    result = exporter.export(
+        source, progress=lambda rows: print(f"{rows} avaliações exportadas", file=sys.stderr)
+    )
+    print(json.dumps(result.to_dict()))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Coroutine, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRunner:
+    """Event loop dedicado em thread de fundo para executar corrotinas a partir de código síncrono
+
+    O script do Streamlit roda sem event loop; em vez de criar um loop novo a
+    cada chamada (asyncio.run), todas as sessões submetem corrotinas a este
+    loop persistente e aguardam o resultado.
+    """
+
+    def __init__(self, name: str = "neuromap-async"):
+        self._name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._run_loop, args=(loop,), name=self._name, daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Executa a corrotina no loop de fundo e bloqueia até o resultado"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def gather(self, *coros: Awaitable, timeout: Optional[float] = None, return_exceptions: bool = False) -> List[Any]:
+        """Executa várias corrotinas concorrentemente e retorna os resultados na ordem"""
+
+        async def _gather():
+            return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+
+        return self.run(_gather(), timeout=timeout)
+
+    def shutdown(self) -> None:
+        """Encerra o loop de fundo"""
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+                self._loop = None
+                self._thread = None
+
+
+# Runner compartilhado pelo processo
+async_runner = AsyncRunner()
@@ -0,0 +1,213 @@
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from ..core.item_bank import SCALE_CODES, SCALE_PREFIXES
+from ..core.models import PersonalityScores
+
+# Scores DISC (ipsativos) e Big Five (percentis) vivem em 0-100
+SCORE_RANGE = (0.0, 100.0)
+HISTOGRAM_BINS = 100
+# Documentos por período; cada save incrementa um shard aleatório para evitar contenção
+BENCHMARK_SHARDS = 10
+GLOBAL_PERIOD = "global"
+
+BENCHMARK_SCALES = {"disc": "disc", "big_five": "b5"}
+
+
+def period_of(timestamp: datetime) -> str:
+    """Período mensal (YYYY-MM) em que a avaliação é agregada"""
+    return timestamp.strftime("%Y-%m")
+
+
+def periods_between(start: datetime, end: datetime) -> List[str]:
+    """Meses que cobrem o intervalo [start, end]"""
+    periods = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        periods.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return periods
+
+
+def shard_id(period: str, shard: int) -> str:
+    return f"{period}_{shard}"
+
+
+def random_shard() -> int:
+    return random.randrange(BENCHMARK_SHARDS)
+
+
+@dataclass
+class DimensionHistogram:
+    """Histograma de largura fixa com momentos; soma de histogramas é exata (mergeable)"""
+    bins: Dict[int, int] = field(default_factory=dict)
+    count: int = 0
+    total: float = 0.0
+    total_sq: float = 0.0
+
+    @staticmethod
+    def bin_of(value: float) -> int:
+        low, high = SCORE_RANGE
+        position = (min(max(value, low), high) - low) / (high - low) * HISTOGRAM_BINS
+        return min(int(position), HISTOGRAM_BINS - 1)
+
+    def add(self, value: float) -> None:
+        index = self.bin_of(value)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+
+    def merge(self, other: "DimensionHistogram") -> None:
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        """Desvio padrão populacional (como np.std)"""
+        if not self.count:
+            return 0.0
+        return math.sqrt(max(0.0, self.total_sq / self.count - self.mean ** 2))
+
+    def quantile(self, q: float) -> float:
+        """Quantil interpolado linearmente dentro do bin (erro máximo de meio bin)"""
+        if not self.count:
+            return 0.0
+
+        low, high = SCORE_RANGE
+        width = (high - low) / HISTOGRAM_BINS
+        target = q * self.count
+        cumulative = 0
+        for index in sorted(self.bins):
+            count = self.bins[index]
+            if cumulative + count >= target:
+                fraction = (target - cumulative) / count if count else 0.0
+                return low + (index + fraction) * width
+            cumulative += count
+        return high
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'p25': self.quantile(0.25),
+            'p50': self.quantile(0.50),
+            'p75': self.quantile(0.75),
+            'mean': self.mean,
+            'std': self.std
+        }
+
+    def to_document(self) -> Dict:
+        return {
+            'n': self.count,
+            'sum': self.total,
+            'sum_sq': self.total_sq,
+            'bins': {str(index): count for index, count in self.bins.items()}
+        }
+
+    @classmethod
+    def from_document(cls, data: Dict) -> "DimensionHistogram":
+        return cls(
+            bins={int(index): int(count) for index, count in data.get('bins', {}).items()},
+            count=int(data.get('n', 0)),
+            total=float(data.get('sum', 0.0)),
+            total_sq=float(data.get('sum_sq', 0.0))
+        )
+
+
+@dataclass
+class PopulationBenchmarks:
+    """Agregado populacional materializado: histogramas por dimensão e contagem MBTI"""
+    disc: Dict[str, DimensionHistogram] = field(default_factory=dict)
+    big_five: Dict[str, DimensionHistogram] = field(default_factory=dict)
+    mbti_counts: Dict[str, int] = field(default_factory=dict)
+    sample_size: int = 0
+
+    @staticmethod
+    def dimension_values(scores: PersonalityScores) -> Iterable[Tuple[str, str, float]]:
+        """(escala, código, valor) das dimensões agregadas, ignorando scores ausentes/NaN"""
+        for scale, prefix_key in BENCHMARK_SCALES.items():
+            prefix = SCALE_PREFIXES[prefix_key]
+            values = getattr(scores, scale) or {}
+            for code in SCALE_CODES[prefix_key]:
+                value = values.get(f"{prefix}{code}")
+                if value is not None and not math.isnan(value):
+                    yield scale, code, float(value)
+
+    def add(self, scores: PersonalityScores) -> None:
+        self.sample_size += 1
+        for scale, code, value in self.dimension_values(scores):
+            getattr(self, scale).setdefault(code, DimensionHistogram()).add(value)
+        if scores.mbti_type:
+            self.mbti_counts[scores.mbti_type] = self.mbti_counts.get(scores.mbti_type, 0) + 1
+
+    def merge(self, other: "PopulationBenchmarks") -> None:
+        for scale in BENCHMARK_SCALES:
+            histograms = getattr(self, scale)
+            for code, histogram in getattr(other, scale).items():
+                histograms.setdefault(code, DimensionHistogram()).merge(histogram)
+        for mbti_type, count in other.mbti_counts.items():
+            self.mbti_counts[mbti_type] = self.mbti_counts.get(mbti_type, 0) + count
+        self.sample_size += other.sample_size
+
+    @classmethod
+    def merged(cls, documents: Iterable[Dict]) -> "PopulationBenchmarks":
+        """Combina documentos (shards e/ou períodos) num único agregado"""
+        result = cls()
+        for data in documents:
+            result.merge(cls.from_document(data))
+        return result
+
+    def to_document(self) -> Dict:
+        return {
+            'sample_size': self.sample_size,
+            'disc': {code: histogram.to_document() for code, histogram in self.disc.items()},
+            'big_five': {code: histogram.to_document() for code, histogram in self.big_five.items()},
+            'mbti': dict(self.mbti_counts)
+        }
+
+    @classmethod
+    def from_document(cls, data: Dict) -> "PopulationBenchmarks":
+        return cls(
+            disc={code: DimensionHistogram.from_document(value) for code, value in data.get('disc', {}).items()},
+            big_five={code: DimensionHistogram.from_document(value) for code, value in data.get('big_five', {}).items()},
+            mbti_counts={mbti_type: int(count) for mbti_type, count in data.get('mbti', {}).items()},
+            sample_size=int(data.get('sample_size', 0))
+        )
+
+    def to_benchmarks(self) -> Dict:
+        """Formato consumido pelo dashboard (`disc_percentiles`, `b5_percentiles`, ...)"""
+        total_mbti = sum(self.mbti_counts.values())
+        return {
+            'disc_percentiles': {code: histogram.summary() for code, histogram in self.disc.items() if histogram.count},
+            'b5_percentiles': {code: histogram.summary() for code, histogram in self.big_five.items() if histogram.count},
+            'mbti_distribution': {
+                mbti_type: count / total_mbti * 100 for mbti_type, count in self.mbti_counts.items()
+            } if total_mbti else {},
+            'sample_size': self.sample_size
+        }
+
+
+def increment_fields(scores: PersonalityScores) -> Dict[str, float]:
+    """Deltas (caminho de campo → incremento) de uma avaliação sobre o documento agregado
+
+    Aplicados com incrementos atômicos do Firestore, sem leitura prévia do documento.
+    """
+    deltas: Dict[str, float] = {'sample_size': 1}
+    for scale, code, value in PopulationBenchmarks.dimension_values(scores):
+        base = f"{scale}.{code}"
+        deltas[f"{base}.n"] = 1
+        deltas[f"{base}.sum"] = value
+        deltas[f"{base}.sum_sq"] = value * value
+        deltas[f"{base}.bins.{DimensionHistogram.bin_of(value)}"] = 1
+    if scores.mbti_type:
+        deltas[f"mbti.{scores.mbti_type}"] = 1
+    return deltas
@@ -0,0 +1,217 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from .firestore_codec import encode_document
+from .rest_client import FirebaseRestClient, get_rest_client
+
+logger = logging.getLogger(__name__)
+
+# Limite de escritas por commit/batch do Firestore
+MAX_BATCH_WRITES = 500
+
+# (caminho do documento relativo a `documents/`, dados)
+BulkWrite = Tuple[str, Dict]
+
+
+class BulkCommitError(Exception):
+    """Falha ao confirmar um lote; `retryable=False` interrompe as tentativas"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retryable: bool = True):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+@dataclass
+class BulkWriteProgress:
+    """Andamento do envio, reportado ao final de cada lote"""
+    chunks_committed: int = 0
+    chunks_failed: int = 0
+    documents_written: int = 0
+    documents_failed: int = 0
+    retries: int = 0
+    elapsed_seconds: float = 0.0
+
+
+@dataclass
+class BulkWriteResult(BulkWriteProgress):
+    """Resultado final, com os documentos que não puderam ser gravados"""
+    failed_paths: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.documents_failed == 0
+
+
+class FirestoreBatchCommitter:
+    """Confirma lotes com `WriteBatch` do SDK (uma chamada de rede por lote)"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __call__(self, writes: List[BulkWrite]) -> None:
+        batch = self.db.batch()
+        for path, data in writes:
+            batch.set(self.db.document(path), data)
+        batch.commit()
+
+
+class RestBatchCommitter:
+    """Confirma lotes pelo endpoint REST `documents:commit`"""
+
+    def __init__(
+        self,
+        project_id: str,
+        id_token: Optional[str] = None,
+        api_key: Optional[str] = None,
+        client: Optional[FirebaseRestClient] = None,
+        timeout: float = 60
+    ):
+        self.database = f"projects/{project_id}/databases/(default)"
+        self.url = f"https://firestore.googleapis.com/v1/{self.database}/documents:commit"
+        self.id_token = id_token
+        self.api_key = api_key
+        self.client = client
+        self.timeout = timeout
+
+    def _body(self, writes: List[BulkWrite]) -> Dict:
+        return {"writes": [
+            {"update": {"name": f"{self.database}/documents/{path}", **encode_document(data)}}
+            for path, data in writes
+        ]}
+
+    def __call__(self, writes: List[BulkWrite]) -> None:
+        headers = {"Authorization": f"Bearer {self.id_token}"} if self.id_token else {}
+        params = {"key": self.api_key} if self.api_key else None
+        client = self.client or get_rest_client()
+
+        # Escritas `update` são substituições completas: repetir o commit é seguro
+        response = client.post(
+            self.url, json=self._body(writes), headers=headers, params=params,
+            timeout=self.timeout, endpoint="firestore.commit", idempotent=True
+        )
+        if response.status_code != 200:
+            raise BulkCommitError(
+                f"Commit falhou ({response.status_code}): {response.text[:200]}",
+                status=response.status_code,
+                retryable=response.status_code in (408, 409, 429) or response.status_code >= 500
+            )
+
+
+class BulkWriter:
+    """Envia grandes volumes de documentos em lotes com concorrência limitada
+
+    O iterável de escritas é consumido sob demanda: no máximo
+    `max_concurrency` lotes ficam em memória/voo ao mesmo tempo. Cada lote é
+    repetido com backoff exponencial até `max_retries` vezes; lotes que
+    esgotam as tentativas são registrados no resultado sem abortar os demais.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[List[BulkWrite]], None],
+        batch_size: int = MAX_BATCH_WRITES,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        if not 1 <= batch_size <= MAX_BATCH_WRITES:
+            raise ValueError(f"batch_size deve estar entre 1 e {MAX_BATCH_WRITES}")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency deve ser positivo")
+
+        self.commit = commit
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="bulk-writer")
+
+    def _chunks(self, writes: Iterable[BulkWrite]) -> Iterator[List[BulkWrite]]:
+        iterator = iter(writes)
+        while True:
+            chunk = list(islice(iterator, self.batch_size))
+            if not chunk:
+                return
+            yield chunk
+
+    async def write(
+        self,
+        writes: Iterable[BulkWrite],
+        progress: Optional[Callable[[BulkWriteProgress], None]] = None
+    ) -> BulkWriteResult:
+        """Grava todas as escritas e retorna o resumo do envio"""
+
+        result = BulkWriteResult()
+        start = time.perf_counter()
+        pending = set()
+
+        def collect(done) -> None:
+            for task in done:
+                chunk, error, attempts = task.result()
+                result.retries += attempts - 1
+                if error is None:
+                    result.chunks_committed += 1
+                    result.documents_written += len(chunk)
+                else:
+                    result.chunks_failed += 1
+                    result.documents_failed += len(chunk)
+                    result.failed_paths.extend(path for path, _ in chunk)
+                    result.errors.append(str(error))
+
+                result.elapsed_seconds = time.perf_counter() - start
+                if progress:
+                    progress(BulkWriteProgress(
+                        chunks_committed=result.chunks_committed,
+                        chunks_failed=result.chunks_failed,
+                        documents_written=result.documents_written,
+                        documents_failed=result.documents_failed,
+                        retries=result.retries,
+                        elapsed_seconds=result.elapsed_seconds
+                    ))
+
+        for chunk in self._chunks(writes):
+            if len(pending) >= self.max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                collect(done)
+            pending.add(asyncio.ensure_future(self._commit_with_retry(chunk)))
+
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            collect(done)
+
+        result.elapsed_seconds = time.perf_counter() - start
+        logger.info(
+            f"Envio em lote: {result.documents_written} documentos gravados, "
+            f"{result.documents_failed} com falha em {result.elapsed_seconds:.1f}s"
+        )
+        return result
+
+    async def _commit_with_retry(self, chunk: List[BulkWrite]) -> Tuple[List[BulkWrite], Optional[Exception], int]:
+        """Confirma um lote; retorna (lote, erro final ou None, tentativas)"""
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            try:
+                await loop.run_in_executor(self._executor, self.commit, chunk)
+                return chunk, None, attempt + 1
+            except Exception as e:
+                if not getattr(e, "retryable", True) or attempt == self.max_retries:
+                    logger.error(f"Lote de {len(chunk)} documentos falhou após {attempt + 1} tentativas: {e}")
+                    return chunk, e, attempt + 1
+                logger.warning(f"Falha no lote (tentativa {attempt + 1}): {e}")
+                await self._sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt))))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
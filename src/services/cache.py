@@ -0,0 +1,228 @@
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, Hashable]
+
+
+def estimate_size(value: Any) -> int:
+    """Estima o tamanho em bytes de um valor cacheado (serialização pickle)"""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+@dataclass
+class CacheStats:
+    """Contadores de uso do cache"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['hit_rate'] = round(self.hit_rate, 4)
+        return data
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    size: int
+    created_at: float
+    expires_at: float
+    owner: Optional[str]
+
+
+class LRUTTLCache:
+    """Cache LRU com TTL por namespace, limitado por número de entradas e bytes
+
+    Pensado para ser compartilhado por todas as sessões do processo: operações
+    são protegidas por lock, expiração usa relógio monotônico e a invalidação
+    por usuário é O(entradas do usuário) via índice secundário.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: float = 300,
+        namespace_ttls: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sizeof: Callable[[Any], int] = estimate_size
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.namespace_ttls = dict(namespace_ttls or {})
+        self._clock = clock
+        self._sizeof = sizeof
+
+        self._entries: 'OrderedDict[CacheKey, _CacheEntry]' = OrderedDict()
+        self._owner_index: Dict[str, Set[CacheKey]] = {}
+        self._bytes = 0
+        self._stats = CacheStats()
+        self._lock = threading.RLock()
+
+    def ttl_for(self, namespace: str) -> float:
+        """TTL configurado para o namespace"""
+        return self.namespace_ttls.get(namespace, self.default_ttl)
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        """Retorna o valor se presente e não expirado, marcando-o como recém-usado"""
+
+        cache_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+
+            if entry.expires_at <= self._clock():
+                self._remove(cache_key)
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+
+            self._entries.move_to_end(cache_key)
+            self._stats.hits += 1
+            return entry.value
+
+    def set(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: Any,
+        owner: Optional[str] = None,
+        ttl: Optional[float] = None
+    ) -> None:
+        """Armazena valor; `owner` (ex: user_id) permite invalidação agrupada"""
+
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            logger.debug(f"Valor de {size} bytes excede o limite do cache ({namespace})")
+            self.invalidate(namespace, key)
+            return
+
+        now = self._clock()
+        entry = _CacheEntry(
+            value=value,
+            size=size,
+            created_at=now,
+            expires_at=now + (ttl if ttl is not None else self.ttl_for(namespace)),
+            owner=owner
+        )
+        cache_key = (namespace, key)
+
+        with self._lock:
+            if cache_key in self._entries:
+                self._remove(cache_key)
+
+            self._entries[cache_key] = entry
+            self._bytes += size
+            if owner is not None:
+                self._owner_index.setdefault(owner, set()).add(cache_key)
+
+            self._evict_if_needed()
+
+    def invalidate(self, namespace: str, key: Hashable) -> bool:
+        """Remove uma entrada específica"""
+        with self._lock:
+            if (namespace, key) not in self._entries:
+                return False
+            self._remove((namespace, key))
+            self._stats.invalidations += 1
+            return True
+
+    def invalidate_owner(self, owner: str) -> int:
+        """Remove todas as entradas de um dono (usuário) via índice secundário"""
+        with self._lock:
+            keys = self._owner_index.pop(owner, set())
+            for cache_key in keys:
+                self._remove(cache_key, unindex=False)
+            self._stats.invalidations += len(keys)
+            return len(keys)
+
+    def invalidate_namespace(self, namespace: str) -> int:
+        """Remove todas as entradas de um namespace"""
+        with self._lock:
+            keys = [cache_key for cache_key in self._entries if cache_key[0] == namespace]
+            for cache_key in keys:
+                self._remove(cache_key)
+            self._stats.invalidations += len(keys)
+            return len(keys)
+
+    def purge_expired(self, max_age: Optional[float] = None) -> int:
+        """Remove entradas expiradas (ou mais antigas que `max_age` segundos)"""
+        now = self._clock()
+        with self._lock:
+            keys = [
+                cache_key for cache_key, entry in self._entries.items()
+                if entry.expires_at <= now or (max_age is not None and now - entry.created_at >= max_age)
+            ]
+            for cache_key in keys:
+                self._remove(cache_key)
+            self._stats.expirations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._owner_index.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        """Retorna cópia dos contadores atuais"""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                invalidations=self._stats.invalidations,
+                entries=len(self._entries),
+                bytes=self._bytes
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, cache_key: CacheKey) -> bool:
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            return entry is not None and entry.expires_at > self._clock()
+
+    def _remove(self, cache_key: CacheKey, unindex: bool = True) -> None:
+        entry = self._entries.pop(cache_key)
+        self._bytes -= entry.size
+
+        if unindex and entry.owner is not None:
+            owner_keys = self._owner_index.get(entry.owner)
+            if owner_keys is not None:
+                owner_keys.discard(cache_key)
+                if not owner_keys:
+                    del self._owner_index[entry.owner]
+
+    def _evict_if_needed(self) -> None:
+        """Remove as entradas menos recentemente usadas até respeitar os limites"""
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            cache_key = next(iter(self._entries))
+            self._remove(cache_key)
+            self._stats.evictions += 1
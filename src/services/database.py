@@ -1,23 +1,74 @@
-import asyncio
+import hashlib
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 import logging
-from dataclasses import asdict
 import streamlit as st
 from google.cloud import firestore
 from google.oauth2 import service_account
+from ..core.cohort import CohortAnalytics
 from ..core.models import UserAssessment, PersonalityScores, ProfileInsights
+from ..core.percentiles import PercentileIndex
+from .cache import LRUTTLCache
+from .async_runner import AsyncRunner, async_runner
+from .storage import StorageBackend, USER_ASSESSMENT_SCHEMA, USER_STATS_SCHEMA
+from .user_stats import UserStatsSummary
+from .profile_index import ProfileIndex, ProfileMatch
+from ..utils.config import get_setting
+from .write_queue import WriteBehindQueue, backend_sender
+from .assessment_export import firestore_source
+from .benchmark_store import (
+    BENCHMARK_SHARDS, GLOBAL_PERIOD, PopulationBenchmarks, increment_fields,
+    period_of, periods_between, random_shard, shard_id
+)
+from .bulk_writer import (
+    BulkWriteProgress, BulkWriteResult, BulkWriter, FirestoreBatchCommitter, MAX_BATCH_WRITES
+)
 
 logger = logging.getLogger(__name__)
 
-class FirestoreManager:
+# TTL por namespace: analytics e benchmarks populacionais mudam mais devagar
+CACHE_NAMESPACE_TTLS = {
+    'user_assessments': 300,        # 5 minutos
+    'user_analytics': 900,          # 15 minutos
+    'population_benchmarks': 3600,  # 1 hora
+    'percentile_index': 3600        # 1 hora
+}
+
+# Cache compartilhado por todas as sessões do processo
+shared_cache = LRUTTLCache(
+    max_entries=2048,
+    max_bytes=64 * 1024 * 1024,
+    default_ttl=300,
+    namespace_ttls=CACHE_NAMESPACE_TTLS
+)
+
+# Índice de vizinhos do perfil mais recente de cada usuário (persistido localmente)
+shared_profile_index = ProfileIndex(directory=get_setting("PROFILE_INDEX_DIR", ".neuromap/profile_index"))
+
+
+def assessment_revision(assessment: UserAssessment) -> str:
+    """Hash do conteúdo da avaliação, gravado no documento para identificar reenvios"""
+    plain = USER_ASSESSMENT_SCHEMA.to_plain(assessment)
+    return hashlib.sha256(json.dumps(plain, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+class FirestoreManager(StorageBackend):
     """Gerenciador otimizado para operações Firestore"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[LRUTTLCache] = None,
+        max_workers: int = 8,
+        profile_index: Optional[ProfileIndex] = None
+    ):
+        super().__init__(
+            cache if cache is not None else shared_cache, max_workers, profile_index, thread_name_prefix="firestore"
+        )
         self.db = self._initialize_firestore()
-        self._cache = {}
-        self._cache_ttl = 300  # 5 minutos
+    
+    @property
+    def available(self) -> bool:
+        return self.db is not None
     
     def _initialize_firestore(self) -> firestore.Client:
         """Inicializa cliente Firestore com service account"""
@@ -34,26 +85,9 @@ class FirestoreManager:
             logger.error(f"Erro ao inicializar Firestore: {e}")
             return None
     
-    def _get_cache_key(self, collection: str, doc_id: str, query_params: str = "") -> str:
-        """Gera chave para cache"""
-        return f"{collection}:{doc_id}:{query_params}"
-    
-    def _is_cache_valid(self, cache_entry: Dict) -> bool:
-        """Verifica se entrada do cache ainda é válida"""
-        return (datetime.now() - cache_entry['timestamp']).seconds < self._cache_ttl
-    
-    def _set_cache(self, key: str, data: any) -> None:
-        """Define entrada no cache"""
-        self._cache[key] = {
-            'data': data,
-            'timestamp': datetime.now()
-        }
-    
-    def _get_cache(self, key: str) -> Optional[any]:
-        """Recupera entrada do cache se válida"""
-        if key in self._cache and self._is_cache_valid(self._cache[key]):
-            return self._cache[key]['data']
-        return None
+    def _stream_query(self, query) -> List:
+        """Materializa o stream da query (a rede é percorrida durante a iteração)"""
+        return list(query.stream())
     
     async def save_assessment(
         self, 
@@ -61,62 +95,36 @@ class FirestoreManager:
         assessment: UserAssessment,
         batch_size: int = 500
     ) -> str:
-        """Salva avaliação com operações em lote otimizadas"""
+        """Salva avaliação com operações em lote otimizadas
+        
+        O documento é sempre regravado. A revisão (hash do conteúdo) gravada
+        nele identifica reenvios da fila write-behind: com a mesma revisão, o
+        resumo e os benchmarks não são incrementados de novo; com conteúdo
+        alterado (ex.: re-pontuação), os benchmarks recebem a diferença e o
+        resumo do usuário é reconstruído.
+        """
         
         if not self.db:
             raise Exception("Firestore não inicializado")
         
         try:
             # Prepara dados para salvamento
-            assessment_data = {
-                'user_id': user_id,
-                'assessment_id': assessment.assessment_id,
-                'answers': assessment.answers,
-                'scores': {
-                    'disc': assessment.scores.disc,
-                    'big_five': assessment.scores.big_five,
-                    'mbti_preferences': assessment.scores.mbti_preferences,
-                    'mbti_type': assessment.scores.mbti_type,
-                    'confidence_scores': assessment.scores.confidence_scores
-                },
-                'profile_insights': asdict(assessment.profile_insights) if assessment.profile_insights else {},
-                'timestamp': assessment.timestamp,
-                'completion_time_minutes': assessment.completion_time_minutes,
-                'reliability_score': assessment.reliability_score,
-                'created_at': firestore.SERVER_TIMESTAMP,
-                'updated_at': firestore.SERVER_TIMESTAMP
-            }
+            assessment_data = self._assessment_document(user_id, assessment)
             
             # Usa transação para garantir consistência
             transaction = self.db.transaction()
             
             @firestore.transactional
             def update_in_transaction(transaction):
-                # Referência do documento
-                doc_ref = self.db.collection('users').document(user_id)\
-                                 .collection('assessments').document(assessment.assessment_id)
-                
-                # Salva avaliação principal
-                transaction.set(doc_ref, assessment_data)
-                
-                # Atualiza estatísticas do usuário
-                user_stats_ref = self.db.collection('users').document(user_id)\
-                                       .collection('stats').document('summary')
-                
-                transaction.set(user_stats_ref, {
-                    'last_assessment': assessment.timestamp,
-                    'total_assessments': firestore.Increment(1),
-                    'last_mbti_type': assessment.scores.mbti_type,
-                    'assessment_streak': self._calculate_streak(user_id),
-                    'updated_at': firestore.SERVER_TIMESTAMP
-                }, merge=True)
-                
-                return doc_ref.id
+                return self._save_in_transaction(transaction, user_id, assessment, assessment_data)
             
-            doc_id = update_in_transaction(transaction)
+            doc_id, outcome = await self._run_blocking(update_in_transaction, transaction)
+            if outcome == 'changed':
+                await self.rebuild_user_stats(user_id)
             
             # Limpa cache relacionado
             self._invalidate_user_cache(user_id)
+            self._index_profile(user_id, assessment)
             
             logger.info(f"Avaliação {assessment.assessment_id} salva para usuário {user_id}")
             return doc_id
@@ -125,6 +133,108 @@ class FirestoreManager:
             logger.error(f"Erro ao salvar avaliação: {e}")
             raise
     
+    def _save_in_transaction(
+        self,
+        transaction,
+        user_id: str,
+        assessment: UserAssessment,
+        assessment_data: Dict
+    ) -> Tuple[str, str]:
+        """Grava a avaliação e seus agregados; retorna o id e 'new', 'replay' ou 'changed'"""
+        
+        doc_ref = self.db.collection('users').document(user_id)\
+                         .collection('assessments').document(assessment.assessment_id)
+        user_stats_ref = self._stats_ref(user_id)
+        
+        # Leituras antes das escritas, exigido pela transação
+        snapshot = doc_ref.get(transaction=transaction)
+        previous = snapshot.to_dict() if snapshot.exists else None
+        summary = self._read_stats(user_stats_ref.get(transaction=transaction)) if previous is None else None
+        
+        if previous is not None:
+            assessment_data = dict(assessment_data, created_at=previous.get('created_at', firestore.SERVER_TIMESTAMP))
+        transaction.set(doc_ref, assessment_data)
+        
+        if previous is not None and previous.get('revision') == assessment_data['revision']:
+            return doc_ref.id, 'replay'
+        
+        previous_assessment = None
+        if previous is not None:
+            previous_assessment = USER_ASSESSMENT_SCHEMA.from_plain(dict(previous, profile_insights=None))
+        else:
+            # Atualiza resumo incremental do usuário
+            summary = (summary or UserStatsSummary()).apply(assessment)
+            transaction.set(user_stats_ref, self._stats_document(summary))
+        
+        # Benchmarks populacionais: incrementos atômicos num shard aleatório (global e mensal)
+        shard = random_shard()
+        for period, deltas in self._benchmark_deltas(assessment, previous_assessment).items():
+            if deltas:
+                transaction.set(self._benchmark_ref(shard_id(period, shard)), self._benchmark_increments(deltas), merge=True)
+        
+        return doc_ref.id, 'new' if previous is None else 'changed'
+    
+    def _assessment_document(self, user_id: str, assessment: UserAssessment) -> Dict:
+        """Documento da avaliação no formato aceito pelo SDK"""
+        assessment_data = USER_ASSESSMENT_SCHEMA.to_plain(assessment)
+        assessment_data.update({
+            'user_id': user_id,
+            'profile_insights': assessment_data['profile_insights'] or {},
+            'revision': assessment_revision(assessment),
+            'created_at': firestore.SERVER_TIMESTAMP,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        })
+        return assessment_data
+    
+    async def bulk_save_assessments(
+        self,
+        assessments: Iterable[UserAssessment],
+        batch_size: int = MAX_BATCH_WRITES,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        progress: Optional[Callable[[BulkWriteProgress], None]] = None
+    ) -> BulkWriteResult:
+        """Grava muitas avaliações em lotes (importações e migrações de re-pontuação)
+        
+        Apenas os documentos de avaliação são escritos: substituições completas
+        podem ser repetidas com segurança, ao contrário dos incrementos do
+        resumo de estatísticas; após a importação use `rebuild_user_stats`.
+        """
+        
+        if not self.db:
+            raise Exception("Firestore não inicializado")
+        
+        # Avaliação mais recente por usuário, indexada se o documento foi gravado
+        latest: Dict[str, Tuple[str, UserAssessment]] = {}
+        
+        def writes():
+            for assessment in assessments:
+                path = f"users/{assessment.user_id}/assessments/{assessment.assessment_id}"
+                current = latest.get(assessment.user_id)
+                if current is None or assessment.timestamp >= current[1].timestamp:
+                    latest[assessment.user_id] = (path, assessment)
+                yield path, self._assessment_document(assessment.user_id, assessment)
+        
+        writer = BulkWriter(
+            FirestoreBatchCommitter(self.db),
+            batch_size=batch_size,
+            max_concurrency=max_concurrency,
+            max_retries=max_retries
+        )
+        try:
+            result = await writer.write(writes(), progress=progress)
+        finally:
+            writer.close()
+            for user_id in latest:
+                self._invalidate_user_cache(user_id)
+        
+        failed = set(result.failed_paths)
+        for user_id, (path, assessment) in latest.items():
+            if path not in failed:
+                self._index_profile(user_id, assessment)
+        
+        return result
+    
     async def get_user_assessments(
         self, 
         user_id: str, 
@@ -136,7 +246,7 @@ class FirestoreManager:
         cache_key = self._get_cache_key('user_assessments', user_id, f"limit:{limit}:details:{include_details}")
         cached_result = self._get_cache(cache_key)
         
-        if cached_result:
+        if cached_result is not None:
             return cached_result
         
         if not self.db:
@@ -149,42 +259,21 @@ class FirestoreManager:
                           .order_by('timestamp', direction=firestore.Query.DESCENDING)\
                           .limit(limit)
             
-            docs = query.stream()
+            docs = await self._run_blocking(self._stream_query, query)
             assessments = []
             
             for doc in docs:
                 data = doc.to_dict()
                 
-                # Reconstrói objetos
-                scores = PersonalityScores(
-                    disc=data['scores']['disc'],
-                    big_five=data['scores']['big_five'],
-                    mbti_preferences=data['scores']['mbti_preferences'],
-                    mbti_type=data['scores']['mbti_type'],
-                    confidence_scores=data['scores'].get('confidence_scores', {})
-                )
-                
-                insights = None
-                if include_details and 'profile_insights' in data:
-                    insights_data = data['profile_insights']
-                    if insights_data:
-                        insights = ProfileInsights(**insights_data)
-                
-                assessment = UserAssessment(
-                    user_id=data['user_id'],
-                    assessment_id=data['assessment_id'],
-                    answers=data['answers'],
-                    scores=scores,
-                    profile_insights=insights,
-                    timestamp=data['timestamp'],
-                    completion_time_minutes=data.get('completion_time_minutes'),
-                    reliability_score=data.get('reliability_score')
-                )
+                # Reconstrói objetos (schema restaura chaves int das respostas e dataclasses aninhadas)
+                insights_data = data.get('profile_insights') if include_details else None
+                data['profile_insights'] = ProfileInsights(**insights_data) if insights_data else None
+                assessment = USER_ASSESSMENT_SCHEMA.from_plain(data)
                 
                 assessments.append(assessment)
             
             # Cache resultado
-            self._set_cache(cache_key, assessments)
+            self._set_cache(cache_key, assessments, owner=user_id)
             
             return assessments
             
@@ -192,40 +281,31 @@ class FirestoreManager:
             logger.error(f"Erro ao recuperar avaliações do usuário {user_id}: {e}")
             return []
     
-    async def get_latest_assessment(self, user_id: str) -> Optional[UserAssessment]:
-        """Recupera a avaliação mais recente do usuário"""
-        
-        assessments = await self.get_user_assessments(user_id, limit=1, include_details=True)
-        return assessments[0] if assessments else None
-    
     async def get_assessment_analytics(self, user_id: str) -> Dict:
         """Recupera analytics das avaliações do usuário"""
         
         cache_key = self._get_cache_key('user_analytics', user_id)
         cached_result = self._get_cache(cache_key)
         
-        if cached_result:
+        if cached_result is not None:
             return cached_result
         
+        if not self.db:
+            return {}
+        
         try:
-            assessments = await self.get_user_assessments(user_id, limit=50, include_details=False)
+            # Leitura de um único documento, independente do tamanho do histórico
+            snapshot = await self._run_blocking(self._stats_ref(user_id).get)
+            summary = self._read_stats(snapshot)
             
-            if not assessments:
-                return {}
+            if summary is None:
+                # Usuário anterior ao resumo incremental: reconstrói uma vez a partir do histórico
+                summary = await self.rebuild_user_stats(user_id)
             
-            analytics = {
-                'total_assessments': len(assessments),
-                'assessment_frequency': self._calculate_assessment_frequency(assessments),
-                'mbti_type_history': [a.scores.mbti_type for a in assessments],
-                'disc_evolution': self._calculate_disc_evolution(assessments),
-                'reliability_trend': [a.reliability_score for a in assessments if a.reliability_score],
-                'completion_time_avg': self._calculate_avg_completion_time(assessments),
-                'first_assessment': assessments[-1].timestamp if assessments else None,
-                'last_assessment': assessments[0].timestamp if assessments else None
-            }
+            analytics = summary.to_analytics()
             
             # Cache por mais tempo (analytics mudam menos)
-            self._set_cache(cache_key, analytics)
+            self._set_cache(cache_key, analytics, owner=user_id)
             
             return analytics
             
@@ -233,180 +313,264 @@ class FirestoreManager:
             logger.error(f"Erro ao calcular analytics para usuário {user_id}: {e}")
             return {}
     
-    async def get_population_benchmarks(self, filters: Dict = None) -> Dict:
-        """Recupera benchmarks populacionais para comparação"""
+    async def rebuild_user_stats(self, user_id: str) -> UserStatsSummary:
+        """Recalcula o resumo a partir de todas as avaliações (migração e pós-importação em lote)"""
+        
+        if not self.db:
+            raise Exception("Firestore não inicializado")
+        
+        query = self.db.collection('users').document(user_id)\
+                      .collection('assessments')\
+                      .order_by('timestamp', direction=firestore.Query.ASCENDING)
+        docs = await self._run_blocking(self._stream_query, query)
+        
+        summary = UserStatsSummary()
+        for doc in docs:
+            data = doc.to_dict()
+            data['profile_insights'] = None
+            summary = summary.apply(USER_ASSESSMENT_SCHEMA.from_plain(data))
+        
+        if summary.total_assessments:
+            await self._run_blocking(self._stats_ref(user_id).set, self._stats_document(summary))
+        
+        self._invalidate_user_cache(user_id)
+        return summary
+    
+    def _stats_ref(self, user_id: str):
+        return self.db.collection('users').document(user_id)\
+                      .collection('stats').document('summary')
+    
+    def _read_stats(self, snapshot) -> Optional[UserStatsSummary]:
+        """Converte o snapshot do resumo (None se ainda não existe)"""
+        if not snapshot.exists:
+            return None
+        return USER_STATS_SCHEMA.from_plain(snapshot.to_dict())
+    
+    def _stats_document(self, summary: UserStatsSummary) -> Dict:
+        stats_data = USER_STATS_SCHEMA.to_plain(summary)
+        stats_data['updated_at'] = firestore.SERVER_TIMESTAMP
+        return stats_data
+    
+    async def _get_population(self, filters: Dict = None) -> PopulationBenchmarks:
+        """Agregado materializado: lê os shards dos períodos pedidos numa única chamada"""
         
         cache_key = self._get_cache_key('population_benchmarks', 'global', str(filters or {}))
         cached_result = self._get_cache(cache_key)
         
-        if cached_result:
+        if cached_result is not None:
             return cached_result
         
-        try:
-            # Query agregada para estatísticas populacionais
-            # Nota: Em produção, isso seria pre-computado em uma função Cloud
-            
-            query = self.db.collection_group('assessments')
-            
-            # Aplica filtros se fornecidos
-            if filters:
-                if 'date_range' in filters:
-                    start_date, end_date = filters['date_range']
-                    query = query.where('timestamp', '>=', start_date)\
-                               .where('timestamp', '<=', end_date)
-            
-            # Limita para performance (em produção usaria aggregation queries)
-            query = query.limit(1000)
-            
-            docs = query.stream()
-            
-            disc_scores = {'D': [], 'I': [], 'S': [], 'C': []}
-            b5_scores = {'O': [], 'C': [], 'E': [], 'A': [], 'N': []}
-            mbti_types = []
-            
-            for doc in docs:
-                data = doc.to_dict()
-                scores = data.get('scores', {})
-                
-                # Coleta scores DISC
-                disc_data = scores.get('disc', {})
-                for key, value in disc_data.items():
-                    dimension = key.replace('DISC_', '')
-                    if dimension in disc_scores:
-                        disc_scores[dimension].append(value)
-                
-                # Coleta scores Big Five
-                b5_data = scores.get('big_five', {})
-                for key, value in b5_data.items():
-                    dimension = key.replace('B5_', '')
-                    if dimension in b5_scores:
-                        b5_scores[dimension].append(value)
-                
-                # Coleta tipos MBTI
-                mbti_type = scores.get('mbti_type')
-                if mbti_type:
-                    mbti_types.append(mbti_type)
-            
-            # Calcula estatísticas
-            benchmarks = {
-                'disc_percentiles': {},
-                'b5_percentiles': {},
-                'mbti_distribution': {},
-                'sample_size': len(list(docs))
-            }
-            
-            # Percentis DISC
-            for dim, values in disc_scores.items():
-                if values:
-                    benchmarks['disc_percentiles'][dim] = {
-                        'p25': float(np.percentile(values, 25)),
-                        'p50': float(np.percentile(values, 50)),
-                        'p75': float(np.percentile(values, 75)),
-                        'mean': float(np.mean(values)),
-                        'std': float(np.std(values))
-                    }
-            
-            # Percentis Big Five
-            for dim, values in b5_scores.items():
-                if values:
-                    benchmarks['b5_percentiles'][dim] = {
-                        'p25': float(np.percentile(values, 25)),
-                        'p50': float(np.percentile(values, 50)),
-                        'p75': float(np.percentile(values, 75)),
-                        'mean': float(np.mean(values)),
-                        'std': float(np.std(values))
-                    }
-            
-            # Distribuição MBTI
-            if mbti_types:
-                from collections import Counter
-                type_counts = Counter(mbti_types)
-                total = len(mbti_types)
-                benchmarks['mbti_distribution'] = {
-                    type_: (count / total) * 100 
-                    for type_, count in type_counts.items()
-                }
-            
-            # Cache por mais tempo (dados populacionais mudam lentamente)
-            self._cache[cache_key] = {
-                'data': benchmarks,
-                'timestamp': datetime.now()
-            }
-            
-            return benchmarks
-            
-        except Exception as e:
-            logger.error(f"Erro ao recuperar benchmarks populacionais: {e}")
-            return {}
-    
-    def _calculate_streak(self, user_id: str) -> int:
-        """Calcula streak de avaliações do usuário"""
-        # Implementação simplificada - em produção seria mais sofisticada
-        return 1
-    
-    def _calculate_assessment_frequency(self, assessments: List[UserAssessment]) -> str:
-        """Calcula frequência média de avaliações"""
-        if len(assessments) < 2:
-            return "Dados insuficientes"
-        
-        # Calcula intervalos entre avaliações
-        intervals = []
-        for i in range(len(assessments) - 1):
-            delta = assessments[i].timestamp - assessments[i + 1].timestamp
-            intervals.append(delta.days)
-        
-        avg_interval = sum(intervals) / len(intervals)
-        
-        if avg_interval <= 7:
-            return "Semanal"
-        elif avg_interval <= 30:
-            return "Mensal"
-        elif avg_interval <= 90:
-            return "Trimestral"
-        else:
-            return "Esporádica"
-    
-    def _calculate_disc_evolution(self, assessments: List[UserAssessment]) -> Dict:
-        """Calcula evolução dos scores DISC"""
-        if len(assessments) < 2:
-            return {}
+        periods = [GLOBAL_PERIOD]
+        if filters and 'date_range' in filters:
+            start_date, end_date = filters['date_range']
+            periods = periods_between(start_date, end_date)
         
-        evolution = {}
-        latest = assessments[0].scores.disc
-        oldest = assessments[-1].scores.disc
-        
-        for key in latest.keys():
-            if key in oldest:
-                change = latest[key] - oldest[key]
-                evolution[key] = {
-                    'change': round(change, 1),
-                    'direction': 'increase' if change > 0 else 'decrease' if change < 0 else 'stable'
-                }
-        
-        return evolution
-    
-    def _calculate_avg_completion_time(self, assessments: List[UserAssessment]) -> Optional[float]:
-        """Calcula tempo médio de completude"""
-        times = [a.completion_time_minutes for a in assessments if a.completion_time_minutes]
-        return sum(times) / len(times) if times else None
-    
-    def _invalidate_user_cache(self, user_id: str) -> None:
-        """Invalida cache relacionado ao usuário"""
-        keys_to_remove = [key for key in self._cache.keys() if user_id in key]
-        for key in keys_to_remove:
-            del self._cache[key]
-    
-    async def cleanup_old_cache(self, max_age_hours: int = 24) -> None:
-        """Limpa entradas antigas do cache"""
-        cutoff = datetime.now() - timedelta(hours=max_age_hours)
-        keys_to_remove = [
-            key for key, entry in self._cache.items()
-            if entry['timestamp'] < cutoff
+        refs = [
+            self._benchmark_ref(shard_id(period, shard))
+            for period in periods for shard in range(BENCHMARK_SHARDS)
         ]
-        for key in keys_to_remove:
-            del self._cache[key]
+        snapshots = await self._run_blocking(lambda: list(self.db.get_all(refs)))
+        
+        population = PopulationBenchmarks.merged(
+            snapshot.to_dict() for snapshot in snapshots if snapshot.exists
+        )
+        
+        # Cache por mais tempo (dados populacionais mudam lentamente)
+        self._set_cache(cache_key, population)
+        return population
+    
+    async def materialize_population_benchmarks(self) -> PopulationBenchmarks:
+        """Reconstrói os agregados populacionais a partir de todas as avaliações
+        
+        Job de manutenção (backfill ou correção): percorre o collection group
+        inteiro em páginas, agregando sem reter os documentos, e regrava cada
+        período no shard 0, zerando os demais. Saves concorrentes durante o
+        job podem ter seus incrementos sobrescritos.
+        """
+        
+        if not self.db:
+            raise Exception("Firestore não inicializado")
+        
+        populations = await self._run_blocking(self._aggregate_benchmarks)
+        
+        targets = {}
+        for period, population in populations.items():
+            for shard in range(BENCHMARK_SHARDS):
+                targets[shard_id(period, shard)] = population.to_document() if shard == 0 else {}
+        existing = await self._run_blocking(self._stream_query, self.db.collection('benchmarks'))
+        for snapshot in existing:
+            targets.setdefault(snapshot.id, {})
+        
+        writer = BulkWriter(FirestoreBatchCommitter(self.db))
+        try:
+            result = await writer.write((f"benchmarks/{doc_id}", data) for doc_id, data in targets.items())
+        finally:
+            writer.close()
+        if not result.ok:
+            raise Exception(f"Falha ao gravar benchmarks: {result.errors}")
+        
+        self._cache.invalidate_namespace('population_benchmarks')
+        self._cache.invalidate_namespace('percentile_index')
+        logger.info(f"Benchmarks materializados: {populations[GLOBAL_PERIOD].sample_size} avaliações")
+        return populations[GLOBAL_PERIOD]
+    
+    def _aggregate_benchmarks(self) -> Dict[str, PopulationBenchmarks]:
+        """Agregados global e mensais, acumulados página a página do collection group"""
         
-        logger.info(f"Cache limpo: {len(keys_to_remove)} entradas removidas")
+        populations: Dict[str, PopulationBenchmarks] = {GLOBAL_PERIOD: PopulationBenchmarks()}
+        for assessment in firestore_source(self.db):
+            for period in (GLOBAL_PERIOD, period_of(assessment.timestamp)):
+                populations.setdefault(period, PopulationBenchmarks()).add(assessment.scores)
+        return populations
+    
+    def _scan_latest_assessments(self) -> List[UserAssessment]:
+        latest: Dict[str, UserAssessment] = {}
+        for assessment in firestore_source(self.db):
+            current = latest.get(assessment.user_id)
+            if current is None or assessment.timestamp > current.timestamp:
+                latest[assessment.user_id] = assessment
+        return list(latest.values())
+    
+    async def _latest_assessments(self) -> List[UserAssessment]:
+        """Percorre o collection group em páginas mantendo a avaliação mais recente de cada usuário"""
+        return await self._run_blocking(self._scan_latest_assessments)
+    
+    def _benchmark_ref(self, doc_id: str):
+        return self.db.collection('benchmarks').document(doc_id)
+    
+    def _benchmark_deltas(
+        self,
+        assessment: UserAssessment,
+        previous: Optional[UserAssessment] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """Deltas por período; ao regravar, desconta a versão anterior (sample_size fica igual)"""
+        deltas: Dict[str, Dict[str, float]] = {}
+        versions = [(assessment, 1)] + ([(previous, -1)] if previous is not None else [])
+        for version, sign in versions:
+            fields = increment_fields(version.scores)
+            for period in (GLOBAL_PERIOD, period_of(version.timestamp)):
+                target = deltas.setdefault(period, {})
+                for path, delta in fields.items():
+                    target[path] = target.get(path, 0) + sign * delta
+        return {
+            period: {path: delta for path, delta in fields.items() if delta}
+            for period, fields in deltas.items()
+        }
+    
+    def _benchmark_increments(self, deltas: Dict[str, float]) -> Dict:
+        """Deltas do agregado como dict aninhado de `firestore.Increment` (set com merge)"""
+        nested: Dict = {}
+        for path, delta in deltas.items():
+            *parents, leaf = path.split('.')
+            node = nested
+            for key in parents:
+                node = node.setdefault(key, {})
+            node[leaf] = firestore.Increment(delta)
+        return nested
+
+def create_storage_backend(name: Optional[str] = None) -> StorageBackend:
+    """Backend configurado em `STORAGE_BACKEND` (`firestore` ou `sqlite`)"""
+    
+    name = (name or get_setting("STORAGE_BACKEND", "firestore")).lower()
+    if name == "firestore":
+        return FirestoreManager(profile_index=shared_profile_index)
+    if name == "sqlite":
+        from .sqlite_backend import SQLiteStorage
+        return SQLiteStorage(
+            get_setting("SQLITE_PATH", ".neuromap/neuromap.db"),
+            cache=shared_cache,
+            profile_index=shared_profile_index
+        )
+    raise ValueError(f"Backend de armazenamento desconhecido: {name}")
+
+class SyncFirestoreFacade:
+    """Fachada síncrona para as páginas Streamlit
+    
+    Cada método submete a corrotina correspondente do backend a um event loop
+    de fundo compartilhado e aguarda o resultado, permitindo que o script do
+    Streamlit (síncrono) dispare buscas concorrentes.
+    """
+    
+    def __init__(self, manager: StorageBackend, runner: AsyncRunner = async_runner, timeout: float = 30):
+        self.manager = manager
+        self.runner = runner
+        self.timeout = timeout
+    
+    def save_assessment(self, user_id: str, assessment: UserAssessment) -> str:
+        return self.runner.run(self.manager.save_assessment(user_id, assessment), timeout=self.timeout)
+    
+    def bulk_save_assessments(self, assessments: Iterable[UserAssessment], **kwargs) -> BulkWriteResult:
+        """Envio em lote; sem timeout, pois importações podem ser longas"""
+        return self.runner.run(self.manager.bulk_save_assessments(assessments, **kwargs))
+    
+    def get_user_assessments(self, user_id: str, limit: int = 10, include_details: bool = True) -> List[UserAssessment]:
+        return self.runner.run(
+            self.manager.get_user_assessments(user_id, limit, include_details), timeout=self.timeout
+        )
+    
+    def get_latest_assessment(self, user_id: str) -> Optional[UserAssessment]:
+        return self.runner.run(self.manager.get_latest_assessment(user_id), timeout=self.timeout)
+    
+    def get_assessment_analytics(self, user_id: str) -> Dict:
+        return self.runner.run(self.manager.get_assessment_analytics(user_id), timeout=self.timeout)
+    
+    def get_population_benchmarks(self, filters: Dict = None) -> Dict:
+        return self.runner.run(self.manager.get_population_benchmarks(filters), timeout=self.timeout)
+    
+    def get_percentile_index(self, filters: Dict = None) -> Optional[PercentileIndex]:
+        return self.runner.run(self.manager.get_percentile_index(filters), timeout=self.timeout)
+    
+    def materialize_population_benchmarks(self) -> PopulationBenchmarks:
+        """Job de reconstrução; sem timeout, percorre todas as avaliações"""
+        return self.runner.run(self.manager.materialize_population_benchmarks())
+    
+    def find_similar_profiles(
+        self,
+        scores: PersonalityScores,
+        k: int = 20,
+        filters: Dict = None,
+        exclude: Iterable[str] = ()
+    ) -> List[ProfileMatch]:
+        return self.runner.run(
+            self.manager.find_similar_profiles(scores, k, filters, exclude), timeout=self.timeout
+        )
+    
+    def rebuild_profile_index(self) -> int:
+        """Job de reconstrução; sem timeout, percorre todas as avaliações"""
+        return self.runner.run(self.manager.rebuild_profile_index())
+    
+    def load_cohort(self, user_ids: Iterable[str]) -> CohortAnalytics:
+        """Equipes grandes disparam uma consulta por membro; sem timeout"""
+        return self.runner.run(self.manager.load_cohort(user_ids))
+    
+    def load_dashboard_data(self, user_id: str, limit: int = 20) -> Dict:
+        """Avaliações, analytics e benchmarks em paralelo (uma ida à rede em vez de três em série)"""
+        return self.runner.run(self.manager.load_dashboard_data(user_id, limit), timeout=self.timeout)
+
+# Instâncias do processo, criadas no primeiro uso (importar o módulo não
+# abre conexões, arquivos nem threads)
+
+@st.cache_resource
+def get_storage_backend() -> StorageBackend:
+    """Backend configurado, compartilhado entre sessões"""
+    return create_storage_backend()
+
+
+@st.cache_resource
+def get_db_sync() -> SyncFirestoreFacade:
+    """Fachada síncrona sobre o backend compartilhado"""
+    return SyncFirestoreFacade(get_storage_backend())
+
+
+@st.cache_resource
+def get_write_queue() -> WriteBehindQueue:
+    """Gravações de avaliações confirmadas no journal local e enviadas em segundo plano
 
-# Instância global do gerenciador
-db_manager = FirestoreManager()
+    Pendências deixadas por um reinício são retomadas ao criar a fila.
+    """
+    queue = WriteBehindQueue(
+        get_setting("WRITE_QUEUE_PATH", ".neuromap/write_queue.db"),
+        backend_sender(get_storage_backend())
+    )
+    queue.resume()
+    return queue
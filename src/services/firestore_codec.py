@@ -0,0 +1,385 @@
+import base64
+import dataclasses
+import math
+import threading
+import typing
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Valores especiais de double aceitos pela API REST (mapeamento JSON do proto3)
+_SPECIAL_DOUBLES = {"NaN": math.nan, "Infinity": math.inf, "-Infinity": -math.inf}
+
+
+def _encode_double(value: float) -> Dict:
+    value = float(value)
+    if math.isfinite(value):
+        return {"doubleValue": value}
+    # NaN/Infinity não são JSON válido; a API aceita a forma textual
+    return {"doubleValue": "NaN" if math.isnan(value) else ("Infinity" if value > 0 else "-Infinity")}
+
+
+def _decode_double(raw: Any) -> float:
+    if isinstance(raw, str) and raw in _SPECIAL_DOUBLES:
+        return _SPECIAL_DOUBLES[raw]
+    return float(raw)
+
+
+def format_timestamp(value: datetime) -> str:
+    """Formata datetime como RFC 3339 em UTC (datetimes sem fuso são tratados como UTC)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat() + "Z"
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Converte timestamp RFC 3339 (até nanossegundos) em datetime UTC"""
+    text = value[:-1] + "+00:00" if value.endswith("Z") else value
+    if "." in text:
+        # Firestore retorna nanossegundos; datetime suporta só microssegundos
+        head, _, tail = text.partition(".")
+        digits = len(tail) - len(tail.lstrip("0123456789"))
+        text = f"{head}.{tail[:min(digits, 6)]}{tail[digits:]}"
+    return datetime.fromisoformat(text)
+
+
+def _is_pydantic_model(cls: Any) -> bool:
+    """Modelos pydantic v1 (`__fields__`) ou v2 (`model_fields`)"""
+    return isinstance(cls, type) and (hasattr(cls, "model_fields") or hasattr(cls, "__fields__"))
+
+
+# ---------------------------------------------------------------------------
+# Codificação genérica (sem informação de tipo)
+# ---------------------------------------------------------------------------
+
+def encode_value(value: Any) -> Dict:
+    """Converte um valor Python em valor tipado da API REST do Firestore"""
+
+    encoder = _ENCODERS.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+    return _encode_fallback(value)
+
+
+def _encode_map(value: Dict) -> Dict:
+    return {"mapValue": {"fields": {str(key): encode_value(item) for key, item in value.items()}}}
+
+
+def _encode_array(value) -> Dict:
+    return {"arrayValue": {"values": [encode_value(item) for item in value]}}
+
+
+def _encode_fallback(value: Any) -> Dict:
+    """Tipos fora da tabela: subclasses, escalares numpy, dataclasses e modelos pydantic"""
+
+    if isinstance(value, bool):
+        return {"booleanValue": bool(value)}
+    if isinstance(value, int):
+        return {"integerValue": str(int(value))}
+    if isinstance(value, float):
+        return _encode_double(value)
+    if isinstance(value, str):
+        return {"stringValue": str(value)}
+    if isinstance(value, datetime):
+        return {"timestampValue": format_timestamp(value)}
+    if isinstance(value, dict):
+        return _encode_map(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return _encode_array(value)
+    if dataclasses.is_dataclass(value) or _is_pydantic_model(type(value)):
+        return schema_for(type(value)).encode(value)
+    if hasattr(value, "item") and hasattr(value, "dtype"):
+        # Escalares numpy (np.float64, np.int64, np.bool_)
+        return encode_value(value.item())
+    if hasattr(value, "tolist"):
+        return encode_value(value.tolist())
+    raise TypeError(f"Tipo não suportado pelo Firestore: {type(value).__name__}")
+
+
+_ENCODERS: Dict[type, Callable[[Any], Dict]] = {
+    type(None): lambda value: {"nullValue": None},
+    bool: lambda value: {"booleanValue": value},
+    int: lambda value: {"integerValue": str(value)},
+    float: _encode_double,
+    str: lambda value: {"stringValue": value},
+    bytes: lambda value: {"bytesValue": base64.b64encode(value).decode("ascii")},
+    datetime: lambda value: {"timestampValue": format_timestamp(value)},
+    date: lambda value: {"stringValue": value.isoformat()},
+    dict: _encode_map,
+    list: _encode_array,
+    tuple: _encode_array,
+}
+
+
+def decode_value(value: Dict) -> Any:
+    """Converte valor tipado da API REST em valor Python nativo"""
+
+    for kind, raw in value.items():
+        decoder = _DECODERS.get(kind)
+        if decoder is not None:
+            return decoder(raw)
+    raise ValueError(f"Valor Firestore desconhecido: {list(value)}")
+
+
+_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "nullValue": lambda raw: None,
+    "booleanValue": bool,
+    "integerValue": int,
+    "doubleValue": _decode_double,
+    "stringValue": str,
+    "timestampValue": parse_timestamp,
+    "bytesValue": base64.b64decode,
+    "referenceValue": str,
+    "geoPointValue": dict,
+    "arrayValue": lambda raw: [decode_value(item) for item in raw.get("values", [])],
+    "mapValue": lambda raw: {key: decode_value(item) for key, item in raw.get("fields", {}).items()},
+}
+
+
+def encode_document(data: Any) -> Dict:
+    """Monta o corpo de documento REST (`{"fields": ...}`) a partir de dict, dataclass ou modelo"""
+    if isinstance(data, dict):
+        return {"fields": {str(key): encode_value(value) for key, value in data.items()}}
+    return {"fields": schema_for(type(data)).encode(data)["mapValue"]["fields"]}
+
+
+def decode_document(document: Dict, cls: Optional[Type] = None) -> Any:
+    """Converte documento REST em dict (ou em instância de `cls`, usando o schema do tipo)"""
+    fields = document.get("fields", {})
+    if cls is None:
+        return {key: decode_value(value) for key, value in fields.items()}
+    return schema_for(cls).decode({"mapValue": {"fields": fields}})
+
+
+# ---------------------------------------------------------------------------
+# Codecs tipados, derivados uma vez das anotações de cada tipo
+# ---------------------------------------------------------------------------
+
+class _Codec:
+    """Conversão de um tipo anotado entre Python, dict serializável e valor REST"""
+
+    def encode(self, value: Any) -> Dict:
+        return encode_value(value)
+
+    def decode(self, value: Dict) -> Any:
+        return decode_value(value)
+
+    def to_plain(self, value: Any) -> Any:
+        return to_plain(value)
+
+    def from_plain(self, value: Any) -> Any:
+        return value
+
+
+_ANY = _Codec()
+
+
+class _ScalarCodec(_Codec):
+    def __init__(self, kind: str, encode: Callable[[Any], Any], cast: Callable[[Any], Any]):
+        self.kind = kind
+        self._encode = encode
+        self._cast = cast
+
+    def encode(self, value: Any) -> Dict:
+        if value is None:
+            return {"nullValue": None}
+        return {self.kind: self._encode(value)}
+
+    def decode(self, value: Dict) -> Any:
+        raw = value.get(self.kind)
+        if raw is None:
+            # Tipo armazenado diferente do anotado (ex: int salvo onde se espera float)
+            decoded = decode_value(value)
+            return None if decoded is None else self._cast(decoded)
+        return self._cast(raw)
+
+    def to_plain(self, value: Any) -> Any:
+        return None if value is None else self._cast(value)
+
+    def from_plain(self, value: Any) -> Any:
+        return None if value is None else self._cast(value)
+
+
+class _DoubleCodec(_ScalarCodec):
+    def __init__(self):
+        super().__init__("doubleValue", float, _decode_double)
+
+    def encode(self, value: Any) -> Dict:
+        return {"nullValue": None} if value is None else _encode_double(value)
+
+    def to_plain(self, value: Any) -> Any:
+        return None if value is None else float(value)
+
+
+class _OptionalCodec(_Codec):
+    def __init__(self, inner: _Codec):
+        self.inner = inner
+
+    def encode(self, value: Any) -> Dict:
+        return {"nullValue": None} if value is None else self.inner.encode(value)
+
+    def decode(self, value: Dict) -> Any:
+        return None if "nullValue" in value else self.inner.decode(value)
+
+    def to_plain(self, value: Any) -> Any:
+        return None if value is None else self.inner.to_plain(value)
+
+    def from_plain(self, value: Any) -> Any:
+        return None if value is None else self.inner.from_plain(value)
+
+
+class _ListCodec(_Codec):
+    def __init__(self, item: _Codec):
+        self.item = item
+
+    def encode(self, value: Any) -> Dict:
+        return {"arrayValue": {"values": [self.item.encode(item) for item in value]}}
+
+    def decode(self, value: Dict) -> Any:
+        return [self.item.decode(item) for item in value["arrayValue"].get("values", [])]
+
+    def to_plain(self, value: Any) -> Any:
+        return [self.item.to_plain(item) for item in value]
+
+    def from_plain(self, value: Any) -> Any:
+        return [self.item.from_plain(item) for item in value]
+
+
+class _MapCodec(_Codec):
+    """Mapas do Firestore só aceitam chaves string; `key_cast` restaura o tipo original"""
+
+    def __init__(self, key_cast: Callable[[str], Any], item: _Codec):
+        self.key_cast = key_cast
+        self.item = item
+
+    def encode(self, value: Any) -> Dict:
+        item = self.item
+        return {"mapValue": {"fields": {str(key): item.encode(entry) for key, entry in value.items()}}}
+
+    def decode(self, value: Dict) -> Any:
+        key_cast, item = self.key_cast, self.item
+        return {key_cast(key): item.decode(entry) for key, entry in value["mapValue"].get("fields", {}).items()}
+
+    def to_plain(self, value: Any) -> Any:
+        return {str(key): self.item.to_plain(entry) for key, entry in value.items()}
+
+    def from_plain(self, value: Any) -> Any:
+        return {self.key_cast(key): self.item.from_plain(entry) for key, entry in value.items()}
+
+
+class RecordSchema(_Codec):
+    """Schema pré-computado de uma dataclass ou modelo pydantic
+
+    Os codecs de cada campo são resolvidos uma única vez a partir das
+    anotações; codificar/decodificar apenas percorre a lista de campos.
+    """
+
+    def __init__(self, cls: Type):
+        self.cls = cls
+        self.fields: List[Tuple[str, _Codec]] = []
+
+    def _resolve(self) -> None:
+        hints = typing.get_type_hints(self.cls)
+        if dataclasses.is_dataclass(self.cls):
+            names = [item.name for item in dataclasses.fields(self.cls)]
+        else:
+            names = list(getattr(self.cls, "model_fields", None) or self.cls.__fields__)
+        self.fields = [(name, _codec_for(hints.get(name, Any))) for name in names]
+
+    def encode(self, value: Any) -> Dict:
+        return {"mapValue": {"fields": {
+            name: codec.encode(getattr(value, name)) for name, codec in self.fields
+        }}}
+
+    def decode(self, value: Dict) -> Any:
+        stored = value["mapValue"].get("fields", {})
+        return self.cls(**{
+            name: codec.decode(stored[name]) for name, codec in self.fields if name in stored
+        })
+
+    def to_plain(self, value: Any) -> Dict:
+        return {name: codec.to_plain(getattr(value, name)) for name, codec in self.fields}
+
+    def from_plain(self, value: Dict) -> Any:
+        return self.cls(**{
+            name: codec.from_plain(value[name]) for name, codec in self.fields if name in value
+        })
+
+
+_SCALAR_CODECS: Dict[Any, _Codec] = {
+    bool: _ScalarCodec("booleanValue", bool, bool),
+    int: _ScalarCodec("integerValue", lambda value: str(int(value)), int),
+    float: _DoubleCodec(),
+    str: _ScalarCodec("stringValue", str, str),
+    datetime: _ScalarCodec(
+        "timestampValue", format_timestamp,
+        lambda raw: parse_timestamp(raw) if isinstance(raw, str) else raw
+    ),
+}
+
+_schemas: Dict[Type, RecordSchema] = {}
+_pending_schemas: Dict[Type, RecordSchema] = {}
+_schemas_lock = threading.RLock()
+
+
+def _codec_for(hint: Any) -> _Codec:
+    """Resolve o codec de uma anotação de tipo"""
+
+    if hint in _SCALAR_CODECS:
+        return _SCALAR_CODECS[hint]
+
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+
+    if origin is typing.Union:
+        members = [arg for arg in args if arg is not type(None)]
+        if len(members) == 1:
+            return _OptionalCodec(_codec_for(members[0]))
+        return _ANY
+    if origin in (list, tuple, set) and args:
+        return _ListCodec(_codec_for(args[0]))
+    if origin is dict and len(args) == 2:
+        key_cast = args[0] if args[0] in (int, float, str) else str
+        return _MapCodec(key_cast, _codec_for(args[1]))
+    if isinstance(hint, type) and (dataclasses.is_dataclass(hint) or _is_pydantic_model(hint)):
+        return schema_for(hint)
+    return _ANY
+
+
+def schema_for(cls: Type) -> RecordSchema:
+    """Retorna (e memoiza) o schema do tipo"""
+
+    schema = _schemas.get(cls)
+    if schema is None:
+        with _schemas_lock:
+            schema = _schemas.get(cls) or _pending_schemas.get(cls)
+            if schema is None:
+                schema = RecordSchema(cls)
+                # Registra como pendente antes de resolver para suportar tipos recursivos
+                _pending_schemas[cls] = schema
+                try:
+                    schema._resolve()
+                    _schemas[cls] = schema
+                finally:
+                    del _pending_schemas[cls]
+    return schema
+
+
+def to_plain(value: Any) -> Any:
+    """Converte dataclasses/modelos em estruturas nativas aceitas pelo SDK do Firestore"""
+
+    if value is None or isinstance(value, (str, bool, int, float, datetime, bytes)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_plain(item) for item in value]
+    if dataclasses.is_dataclass(value) or _is_pydantic_model(type(value)):
+        return schema_for(type(value)).to_plain(value)
+    if hasattr(value, "item") and hasattr(value, "dtype"):
+        return value.item()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return value
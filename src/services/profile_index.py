@@ -0,0 +1,356 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import logging
+
+from ..core.cohort import MBTI_TYPES, MBTI_TYPE_INDEX
+from ..core.compatibility import NEUTRAL_SCORE, scores_to_vector
+from ..core.item_bank import DIMENSIONS
+from ..core.models import PersonalityScores
+from ..utils.timestamps import epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "snapshot.npz"
+JOURNAL_FILE = "journal.jsonl"
+
+# Entradas do journal antes de consolidar num novo snapshot
+COMPACT_EVERY = 10_000
+# Linhas do índice por bloco de busca: consultas × bloco floats em memória
+SEARCH_BLOCK_ROWS = 262_144
+
+QueryLike = Union[PersonalityScores, np.ndarray]
+
+
+@dataclass
+class ProfileMatch:
+    """Perfil encontrado na busca, com a distância euclidiana em pontos de score"""
+    user_id: str
+    distance: float
+    mbti_type: str
+    timestamp: datetime
+
+
+class ProfileIndex:
+    """Índice de vizinhos mais próximos sobre o perfil mais recente de cada usuário
+
+    Busca exata por força bruta vetorizada: as distâncias vêm de
+    ‖x‖² − 2·x·q + ‖q‖² com as normas pré-computadas, percorrendo o índice em
+    blocos, e a seleção usa `argpartition` (1M perfis × 17 dimensões ≈ 70MB em
+    float32, consultados em milissegundos). Filtros (tipo MBTI, período,
+    exclusões) viram uma máscara vetorizada antes da busca.
+
+    Com `directory`, o índice persiste como snapshot `.npz` mais um journal
+    append-only de atualizações, consolidado a cada `compact_every` entradas.
+    O carregamento do disco acontece no primeiro uso.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        initial_capacity: int = 1024,
+        compact_every: int = COMPACT_EVERY
+    ):
+        self.directory = directory
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._loaded = directory is None
+        self._journal_entries = 0
+        self._allocate(initial_capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self._vectors = np.full((capacity, len(DIMENSIONS)), NEUTRAL_SCORE, dtype=np.float32)
+        self._sq_norms = np.zeros(capacity, dtype=np.float32)
+        self._mbti_codes = np.full(capacity, -1, dtype=np.int8)
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._user_ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return int(self._active[:len(self._user_ids)].sum())
+
+    def __contains__(self, user_id: str) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            row = self._row_of.get(user_id)
+            return row is not None and bool(self._active[row])
+
+    # Atualização
+
+    def upsert(self, user_id: str, scores: PersonalityScores, timestamp: datetime) -> None:
+        """Insere ou substitui o perfil do usuário (avaliações mais antigas são ignoradas)"""
+        vector = np.nan_to_num(scores_to_vector(scores), nan=NEUTRAL_SCORE)
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._apply(user_id, vector, scores.mbti_type, epoch_seconds(timestamp))
+            if entry is not None:
+                self._journal(entry)
+
+    def bulk_load(
+        self,
+        user_ids: Sequence[str],
+        vectors: np.ndarray,
+        mbti_types: Sequence[str],
+        timestamps: Sequence[datetime]
+    ) -> None:
+        """Substitui todo o conteúdo (reconstrução) e grava um snapshot novo"""
+        vectors = np.nan_to_num(np.asarray(vectors, dtype=np.float32), nan=NEUTRAL_SCORE)
+        with self._lock:
+            self._loaded = True
+            self._set_arrays(
+                list(user_ids), vectors,
+                np.array([MBTI_TYPE_INDEX.get(mbti_type, -1) for mbti_type in mbti_types], dtype=np.int8),
+                np.array([epoch_seconds(timestamp) for timestamp in timestamps], dtype=np.float64),
+                np.ones(len(user_ids), dtype=bool)
+            )
+            self.compact()
+
+    def remove(self, user_id: str) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            row = self._row_of.get(user_id)
+            if row is None or not self._active[row]:
+                return False
+            self._active[row] = False
+            self._journal({'op': 'remove', 'user_id': user_id})
+            return True
+
+    def _apply(self, user_id: str, vector: np.ndarray, mbti_type: str, timestamp: float) -> Optional[Dict]:
+        """Aplica um upsert em memória; retorna a entrada de journal (None se ignorado)"""
+        row = self._row_of.get(user_id)
+        if row is not None and self._active[row] and self._timestamps[row] > timestamp:
+            return None
+
+        if row is None:
+            row = len(self._user_ids)
+            if row == len(self._vectors):
+                self._grow(2 * row)
+            self._user_ids.append(user_id)
+            self._row_of[user_id] = row
+
+        self._vectors[row] = vector
+        self._sq_norms[row] = float(vector @ vector)
+        self._mbti_codes[row] = MBTI_TYPE_INDEX.get(mbti_type, -1)
+        self._timestamps[row] = timestamp
+        self._active[row] = True
+        return {
+            'op': 'upsert', 'user_id': user_id, 'vector': [round(float(value), 4) for value in vector],
+            'mbti_type': mbti_type, 'timestamp': timestamp
+        }
+
+    def _grow(self, capacity: int) -> None:
+        size = len(self._user_ids)
+        user_ids, row_of = self._user_ids, self._row_of
+        old = (self._vectors, self._sq_norms, self._mbti_codes, self._timestamps, self._active)
+        self._allocate(max(capacity, 1))
+        for target, source in zip(
+            (self._vectors, self._sq_norms, self._mbti_codes, self._timestamps, self._active), old
+        ):
+            target[:size] = source[:size]
+        self._user_ids, self._row_of = user_ids, row_of
+
+    def _set_arrays(
+        self,
+        user_ids: List[str],
+        vectors: np.ndarray,
+        mbti_codes: np.ndarray,
+        timestamps: np.ndarray,
+        active: np.ndarray
+    ) -> None:
+        self._allocate(max(len(user_ids), 1))
+        size = len(user_ids)
+        self._vectors[:size] = vectors
+        self._sq_norms[:size] = np.einsum("ij,ij->i", vectors, vectors)
+        self._mbti_codes[:size] = mbti_codes
+        self._timestamps[:size] = timestamps
+        self._active[:size] = active
+        self._user_ids = user_ids
+        self._row_of = {user_id: row for row, user_id in enumerate(user_ids)}
+
+    # Busca
+
+    def query(
+        self,
+        profile: QueryLike,
+        k: int = 20,
+        mbti_types: Optional[Iterable[str]] = None,
+        date_range: Optional[Tuple[datetime, datetime]] = None,
+        exclude: Iterable[str] = ()
+    ) -> List[ProfileMatch]:
+        """Os k perfis mais próximos de um perfil, respeitando os filtros"""
+        return self.query_batch([profile], k, mbti_types, date_range, exclude)[0]
+
+    def query_batch(
+        self,
+        profiles: Sequence[QueryLike],
+        k: int = 20,
+        mbti_types: Optional[Iterable[str]] = None,
+        date_range: Optional[Tuple[datetime, datetime]] = None,
+        exclude: Iterable[str] = ()
+    ) -> List[List[ProfileMatch]]:
+        """Várias consultas de uma vez: um produto matricial por bloco do índice"""
+        queries = np.vstack([
+            scores_to_vector(profile) if isinstance(profile, PersonalityScores) else np.asarray(profile, dtype=np.float64)
+            for profile in profiles
+        ])
+        queries = np.nan_to_num(queries, nan=NEUTRAL_SCORE).astype(np.float32)
+
+        with self._lock:
+            self._ensure_loaded()
+            rows = self._candidate_rows(mbti_types, date_range, exclude)
+            indices, distances = self._search(queries, rows, k)
+            return [
+                [self._match(row, distance) for row, distance in zip(query_rows, query_distances)]
+                for query_rows, query_distances in zip(indices, distances)
+            ]
+
+    def _candidate_rows(
+        self,
+        mbti_types: Optional[Iterable[str]],
+        date_range: Optional[Tuple[datetime, datetime]],
+        exclude: Iterable[str]
+    ) -> np.ndarray:
+        size = len(self._user_ids)
+        mask = self._active[:size].copy()
+        if mbti_types is not None:
+            codes = [MBTI_TYPE_INDEX[mbti_type] for mbti_type in mbti_types if mbti_type in MBTI_TYPE_INDEX]
+            mask &= np.isin(self._mbti_codes[:size], codes)
+        if date_range is not None:
+            start, end = date_range
+            timestamps = self._timestamps[:size]
+            mask &= (timestamps >= epoch_seconds(start)) & (timestamps <= epoch_seconds(end))
+        for user_id in exclude:
+            row = self._row_of.get(user_id)
+            if row is not None:
+                mask[row] = False
+        return np.flatnonzero(mask)
+
+    def _search(self, queries: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k por distância, mesclando os melhores candidatos de cada bloco"""
+        k = min(k, len(rows))
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_distances = np.empty((len(queries), 0), dtype=np.float32)
+        if k == 0:
+            return best_rows, best_distances
+
+        query_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+        contiguous = len(rows) == len(self._user_ids)
+
+        for start in range(0, len(rows), SEARCH_BLOCK_ROWS):
+            if contiguous:
+                block = slice(start, min(start + SEARCH_BLOCK_ROWS, len(rows)))
+                block_rows = np.arange(block.start, block.stop)
+            else:
+                block = block_rows = rows[start:start + SEARCH_BLOCK_ROWS]
+
+            distances = self._sq_norms[block] - 2 * (queries @ self._vectors[block].T) + query_norms
+            block_k = min(k, distances.shape[1])
+            candidates = np.argpartition(distances, block_k - 1, axis=1)[:, :block_k]
+
+            best_rows = np.hstack([best_rows, block_rows[candidates]])
+            best_distances = np.hstack([best_distances, np.take_along_axis(distances, candidates, axis=1)])
+            if best_rows.shape[1] > k:
+                keep = np.argpartition(best_distances, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_distances = np.take_along_axis(best_distances, keep, axis=1)
+
+        order = np.argsort(best_distances, axis=1, kind="stable")
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        best_distances = np.sqrt(np.maximum(np.take_along_axis(best_distances, order, axis=1), 0))
+        return best_rows, best_distances
+
+    def _match(self, row: int, distance: float) -> ProfileMatch:
+        code = self._mbti_codes[row]
+        return ProfileMatch(
+            user_id=self._user_ids[row],
+            distance=float(distance),
+            mbti_type=MBTI_TYPES[code] if code >= 0 else "",
+            timestamp=datetime.fromtimestamp(float(self._timestamps[row]), tz=timezone.utc)
+        )
+
+    # Persistência
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        os.makedirs(self.directory, exist_ok=True)
+
+        snapshot = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(snapshot):
+            with np.load(snapshot, allow_pickle=False) as data:
+                self._set_arrays(
+                    data['user_ids'].tolist(), data['vectors'], data['mbti_codes'],
+                    data['timestamps'], data['active']
+                )
+
+        journal = os.path.join(self.directory, JOURNAL_FILE)
+        if os.path.exists(journal):
+            with open(journal, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Última linha truncada por queda do processo
+                        logger.warning("Entrada inválida no journal do índice de perfis ignorada")
+                        continue
+                    self._replay(entry)
+                    self._journal_entries += 1
+
+    def _replay(self, entry: Dict) -> None:
+        if entry['op'] == 'upsert':
+            self._apply(
+                entry['user_id'], np.asarray(entry['vector'], dtype=np.float32),
+                entry['mbti_type'], float(entry['timestamp'])
+            )
+        elif entry['op'] == 'remove':
+            row = self._row_of.get(entry['user_id'])
+            if row is not None:
+                self._active[row] = False
+
+    def _journal(self, entry: Dict) -> None:
+        if self.directory is None:
+            return
+        with open(os.path.join(self.directory, JOURNAL_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_entries += 1
+        if self._journal_entries >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """Grava snapshot com o estado atual e zera o journal (escrita atômica)"""
+        if self.directory is None:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            os.makedirs(self.directory, exist_ok=True)
+            size = len(self._user_ids)
+            snapshot = os.path.join(self.directory, SNAPSHOT_FILE)
+            temporary = snapshot + ".tmp"
+            with open(temporary, 'wb') as f:
+                np.savez(
+                    f,
+                    user_ids=np.array(self._user_ids, dtype=str),
+                    vectors=self._vectors[:size],
+                    mbti_codes=self._mbti_codes[:size],
+                    timestamps=self._timestamps[:size],
+                    active=self._active[:size]
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, snapshot)
+
+            journal = os.path.join(self.directory, JOURNAL_FILE)
+            if os.path.exists(journal):
+                os.remove(journal)
+            self._journal_entries = 0
@@ -0,0 +1,187 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+from urllib.parse import urlsplit
+import logging
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from ..utils.config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Status que indicam falha transitória do servidor/limite de taxa
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Status em que o servidor garantidamente não processou a requisição
+SAFE_RETRY_STATUSES = {429, 503}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"}
+
+
+class EndpointMetrics:
+    """Latência e contadores de um endpoint REST"""
+
+    def __init__(self, window: int = 512):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, elapsed_ms: float, ok: bool) -> None:
+        self.requests += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self._samples.append(elapsed_ms)
+        if not ok:
+            self.errors += 1
+
+    def _percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'avg_ms': round(self.total_ms / self.requests, 1) if self.requests else 0.0,
+            'p50_ms': round(self._percentile(0.50), 1),
+            'p95_ms': round(self._percentile(0.95), 1),
+            'max_ms': round(self.max_ms, 1)
+        }
+
+
+class FirebaseRestClient:
+    """Cliente HTTP compartilhado para as APIs REST do Firebase/Firestore
+
+    Mantém uma única `requests.Session` com pool de conexões keep-alive (evita
+    handshake TCP+TLS a cada clique), repete falhas transitórias (429/5xx) com
+    backoff exponencial com jitter e registra latência por endpoint.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        default_timeout: float = 10,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.default_timeout = default_timeout
+        self._sleep = sleep
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        self._metrics: Dict[str, EndpointMetrics] = {}
+        self._metrics_lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        endpoint: Optional[str] = None,
+        idempotent: Optional[bool] = None,
+        **kwargs
+    ) -> requests.Response:
+        """Executa requisição com retry; `endpoint` nomeia a métrica de latência"""
+
+        method = method.upper()
+        endpoint = endpoint or self._endpoint_name(method, url)
+        idempotent = method in IDEMPOTENT_METHODS if idempotent is None else idempotent
+        retry_statuses = RETRY_STATUSES if idempotent else SAFE_RETRY_STATUSES
+        kwargs.setdefault("timeout", self.default_timeout)
+
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(endpoint, start, ok=False)
+                # Sem resposta não há como saber se um POST foi processado
+                if not idempotent or attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                self._record(endpoint, start, ok=response.status_code < 400)
+                if response.status_code not in retry_statuses or attempt == self.max_retries:
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+
+            self._count_retry(endpoint)
+            self._sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Métricas de latência por endpoint"""
+        with self._metrics_lock:
+            return {name: metrics.to_dict() for name, metrics in self._metrics.items()}
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponencial com "full jitter" para não sincronizar sessões concorrentes"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        try:
+            return min(self.backoff_max, float(value)) if value is not None else None
+        except ValueError:
+            return None
+
+    def _endpoint_name(self, method: str, url: str) -> str:
+        """Nome padrão do endpoint (método + host); caminhos com ids de documento não viram métricas"""
+        return f"{method} {urlsplit(url).netloc}"
+
+    def _metrics_for(self, endpoint: str) -> EndpointMetrics:
+        metrics = self._metrics.get(endpoint)
+        if metrics is None:
+            metrics = self._metrics.setdefault(endpoint, EndpointMetrics())
+        return metrics
+
+    def _record(self, endpoint: str, start: float, ok: bool) -> None:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._metrics_lock:
+            self._metrics_for(endpoint).record(elapsed_ms, ok)
+
+    def _count_retry(self, endpoint: str) -> None:
+        with self._metrics_lock:
+            self._metrics_for(endpoint).retries += 1
+
+
+@st.cache_resource
+def get_rest_client() -> FirebaseRestClient:
+    """Cliente REST único por processo, compartilhado entre sessões"""
+    return FirebaseRestClient(
+        pool_size=int(get_setting("HTTP_POOL_SIZE", 10)),
+        max_retries=int(get_setting("HTTP_MAX_RETRIES", 3))
+    )
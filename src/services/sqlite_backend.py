@@ -0,0 +1,430 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, time as dt_time, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from ..core.item_bank import DIMENSIONS, SCALE_CODES, SCALE_PREFIXES
+from ..core.models import UserAssessment, ProfileInsights
+from .benchmark_store import (
+    BENCHMARK_SCALES, HISTOGRAM_BINS, SCORE_RANGE, DimensionHistogram, PopulationBenchmarks
+)
+from .bulk_writer import BulkWriteProgress, BulkWriteResult, MAX_BATCH_WRITES
+from .cache import LRUTTLCache
+from .profile_index import ProfileIndex
+from .storage import StorageBackend, USER_ASSESSMENT_SCHEMA
+from .user_stats import RECENT_HISTORY, UserStatsSummary
+from ..utils.timestamps import epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+# Uma coluna REAL por dimensão (disc_d, b5_o, mbti_e, ...) para agregar em SQL
+DIMENSION_COLUMNS: Dict[str, str] = {name: name.lower() for name in DIMENSIONS}
+
+SCHEMA_STATEMENTS = (
+    f"""
+    CREATE TABLE IF NOT EXISTS assessments (
+        user_id TEXT NOT NULL,
+        assessment_id TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        mbti_type TEXT NOT NULL DEFAULT '',
+        completion_time_minutes INTEGER,
+        reliability_score REAL,
+        {', '.join(f'{column} REAL' for column in DIMENSION_COLUMNS.values())},
+        document TEXT NOT NULL,
+        PRIMARY KEY (user_id, assessment_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_assessments_user_timestamp ON assessments (user_id, timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_assessments_timestamp ON assessments (timestamp)",
+)
+
+_INSERT_COLUMNS = (
+    ["user_id", "assessment_id", "timestamp", "mbti_type", "completion_time_minutes", "reliability_score"]
+    + list(DIMENSION_COLUMNS.values()) + ["document"]
+)
+INSERT_SQL = (
+    f"INSERT OR REPLACE INTO assessments ({', '.join(_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _INSERT_COLUMNS)})"
+)
+
+_DISC_COLUMNS = [DIMENSION_COLUMNS[f"{SCALE_PREFIXES['disc']}{code}"] for code in SCALE_CODES['disc']]
+
+
+def _end_of_range(value) -> float:
+    """Fim inclusivo: datas sem horário cobrem o dia inteiro"""
+    if not isinstance(value, datetime) and isinstance(value, date):
+        value = datetime.combine(value, dt_time.max)
+    return epoch_seconds(value)
+
+
+def _from_epoch(value: float) -> datetime:
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+def _histogram_sql(where: str) -> str:
+    """Bins, contagem, soma e soma dos quadrados de cada dimensão agregada, numa consulta"""
+    low, high = SCORE_RANGE
+    selects = []
+    for scale, prefix_key in BENCHMARK_SCALES.items():
+        for code in SCALE_CODES[prefix_key]:
+            column = DIMENSION_COLUMNS[f"{SCALE_PREFIXES[prefix_key]}{code}"]
+            clipped = f"MIN(MAX({column}, {low}), {high})"
+            bin_expression = (
+                f"MIN(CAST(({clipped} - {low}) * {HISTOGRAM_BINS} / ({high} - {low}) AS INTEGER), {HISTOGRAM_BINS - 1})"
+            )
+            selects.append(
+                f"SELECT '{scale}' AS scale, '{code}' AS code, {bin_expression} AS bin, "
+                f"COUNT(*), SUM({column}), SUM({column} * {column}) "
+                f"FROM assessments WHERE {column} IS NOT NULL AND {where} GROUP BY bin"
+            )
+    return " UNION ALL ".join(selects)
+
+
+class SQLiteStorage(StorageBackend):
+    """Backend local em SQLite (WAL) com a mesma API do FirestoreManager
+
+    Para CI e instalações sem acesso à rede. Cada avaliação é uma linha com o
+    documento completo em JSON e colunas extraídas (timestamp, tipo MBTI, uma
+    por dimensão), indexada por (user_id, timestamp); analytics e benchmarks
+    são agregações SQL sobre essas colunas. Cada thread do pool usa sua
+    própria conexão.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        cache: Optional[LRUTTLCache] = None,
+        max_workers: int = 4,
+        profile_index: Optional[ProfileIndex] = None
+    ):
+        super().__init__(
+            cache if cache is not None else LRUTTLCache(), max_workers, profile_index, thread_name_prefix="sqlite"
+        )
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            for statement in SCHEMA_STATEMENTS:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Libera o pool e fecha as conexões abertas"""
+        self._executor.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    # Escrita
+
+    def _row(self, user_id: str, assessment: UserAssessment) -> Tuple:
+        document = USER_ASSESSMENT_SCHEMA.to_plain(assessment)
+        document.pop('timestamp', None)
+        document['user_id'] = user_id
+        document['profile_insights'] = document['profile_insights'] or {}
+
+        values = {
+            **assessment.scores.disc, **assessment.scores.big_five, **assessment.scores.mbti_preferences
+        }
+        return (
+            user_id,
+            assessment.assessment_id,
+            epoch_seconds(assessment.timestamp),
+            assessment.scores.mbti_type or '',
+            assessment.completion_time_minutes,
+            assessment.reliability_score,
+            *(values.get(name) for name in DIMENSION_COLUMNS),
+            json.dumps(document, separators=(',', ':'))
+        )
+
+    def _write_rows(self, rows: List[Tuple]) -> None:
+        conn = self._connection()
+        with conn:
+            conn.executemany(INSERT_SQL, rows)
+
+    async def save_assessment(self, user_id: str, assessment: UserAssessment) -> str:
+        """Salva (ou substitui) a avaliação numa transação"""
+
+        try:
+            await self._run_blocking(self._write_rows, [self._row(user_id, assessment)])
+
+            self._invalidate_user_cache(user_id)
+            self._index_profile(user_id, assessment)
+
+            logger.info(f"Avaliação {assessment.assessment_id} salva para usuário {user_id}")
+            return assessment.assessment_id
+
+        except Exception as e:
+            logger.error(f"Erro ao salvar avaliação: {e}")
+            raise
+
+    async def bulk_save_assessments(
+        self,
+        assessments: Iterable[UserAssessment],
+        batch_size: int = MAX_BATCH_WRITES,
+        progress: Optional[Callable[[BulkWriteProgress], None]] = None,
+        **kwargs
+    ) -> BulkWriteResult:
+        """Grava em transações de `batch_size` linhas; lotes com erro são reportados"""
+
+        start = time.perf_counter()
+        result = BulkWriteResult()
+        latest: Dict[str, UserAssessment] = {}
+
+        async def commit(chunk: List[UserAssessment]) -> None:
+            try:
+                await self._run_blocking(
+                    self._write_rows, [self._row(assessment.user_id, assessment) for assessment in chunk]
+                )
+                result.chunks_committed += 1
+                result.documents_written += len(chunk)
+                for assessment in chunk:
+                    current = latest.get(assessment.user_id)
+                    if current is None or assessment.timestamp >= current.timestamp:
+                        latest[assessment.user_id] = assessment
+            except Exception as e:
+                result.chunks_failed += 1
+                result.documents_failed += len(chunk)
+                result.failed_paths.extend(
+                    f"users/{assessment.user_id}/assessments/{assessment.assessment_id}" for assessment in chunk
+                )
+                result.errors.append(str(e))
+
+            result.elapsed_seconds = time.perf_counter() - start
+            if progress:
+                progress(BulkWriteProgress(
+                    result.chunks_committed, result.chunks_failed, result.documents_written,
+                    result.documents_failed, result.retries, result.elapsed_seconds
+                ))
+
+        chunk: List[UserAssessment] = []
+        for assessment in assessments:
+            chunk.append(assessment)
+            if len(chunk) == batch_size:
+                await commit(chunk)
+                chunk = []
+        if chunk:
+            await commit(chunk)
+
+        for user_id, assessment in latest.items():
+            self._invalidate_user_cache(user_id)
+            self._index_profile(user_id, assessment)
+
+        return result
+
+    # Leitura
+
+    def _decode(self, timestamp: float, document: str, include_details: bool = True) -> UserAssessment:
+        data = json.loads(document)
+        data['timestamp'] = _from_epoch(timestamp)
+        insights_data = data.get('profile_insights') if include_details else None
+        data['profile_insights'] = ProfileInsights(**insights_data) if insights_data else None
+        return USER_ASSESSMENT_SCHEMA.from_plain(data)
+
+    def _query_user_assessments(self, user_id: str, limit: int, include_details: bool) -> List[UserAssessment]:
+        rows = self._connection().execute(
+            "SELECT timestamp, document FROM assessments WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?",
+            (user_id, limit)
+        ).fetchall()
+        return [self._decode(timestamp, document, include_details) for timestamp, document in rows]
+
+    async def get_user_assessments(
+        self,
+        user_id: str,
+        limit: int = 10,
+        include_details: bool = True
+    ) -> List[UserAssessment]:
+        """Recupera avaliações do usuário (índice em user_id, timestamp) com cache"""
+
+        cache_key = self._get_cache_key('user_assessments', user_id, f"limit:{limit}:details:{include_details}")
+        cached_result = self._get_cache(cache_key)
+
+        if cached_result is not None:
+            return cached_result
+
+        try:
+            assessments = await self._run_blocking(self._query_user_assessments, user_id, limit, include_details)
+            self._set_cache(cache_key, assessments, owner=user_id)
+            return assessments
+
+        except Exception as e:
+            logger.error(f"Erro ao recuperar avaliações do usuário {user_id}: {e}")
+            return []
+
+    def _query_stats(self, user_id: str) -> UserStatsSummary:
+        """Resumo do usuário calculado por agregações SQL (mesma semântica do resumo incremental)"""
+        conn = self._connection()
+        disc_columns = ', '.join(_DISC_COLUMNS)
+
+        (total, first, last, reliability_sum, reliability_count,
+         completion_sum, completion_count) = conn.execute(
+            """
+            SELECT COUNT(*), MIN(timestamp), MAX(timestamp),
+                   TOTAL(CASE WHEN reliability_score != 0 THEN reliability_score END),
+                   COUNT(CASE WHEN reliability_score != 0 THEN 1 END),
+                   TOTAL(CASE WHEN completion_time_minutes != 0 THEN completion_time_minutes END),
+                   COUNT(CASE WHEN completion_time_minutes != 0 THEN 1 END)
+            FROM assessments WHERE user_id = ?
+            """,
+            (user_id,)
+        ).fetchone()
+
+        if not total:
+            return UserStatsSummary()
+
+        recent = conn.execute(
+            f"SELECT mbti_type, {disc_columns} FROM assessments WHERE user_id = ? "
+            "ORDER BY timestamp DESC LIMIT ?",
+            (user_id, RECENT_HISTORY)
+        ).fetchall()
+        first_disc = conn.execute(
+            f"SELECT {disc_columns} FROM assessments WHERE user_id = ? ORDER BY timestamp ASC LIMIT 1",
+            (user_id,)
+        ).fetchone()
+        recent_reliability = [value for (value,) in conn.execute(
+            "SELECT reliability_score FROM assessments WHERE user_id = ? AND reliability_score != 0 "
+            "ORDER BY timestamp DESC LIMIT ?",
+            (user_id, RECENT_HISTORY)
+        )]
+
+        # Sequências de dias (UTC) consecutivos: cada ilha tem dia - posição constante
+        current_streak, longest_streak, last_day = conn.execute(
+            """
+            WITH days AS (
+                SELECT DISTINCT CAST(timestamp / 86400 AS INTEGER) AS day
+                FROM assessments WHERE user_id = ?
+            ), islands AS (
+                SELECT day, day - ROW_NUMBER() OVER (ORDER BY day) AS island FROM days
+            ), lengths AS (
+                SELECT COUNT(*) AS length, MAX(day) AS last_day FROM islands GROUP BY island
+            )
+            SELECT (SELECT length FROM lengths ORDER BY last_day DESC LIMIT 1),
+                   MAX(length), MAX(last_day)
+            FROM lengths
+            """,
+            (user_id,)
+        ).fetchone()
+
+        def disc_of(values) -> Dict[str, float]:
+            return {
+                f"{SCALE_PREFIXES['disc']}{code}": value
+                for code, value in zip(SCALE_CODES['disc'], values) if value is not None
+            }
+
+        return UserStatsSummary(
+            total_assessments=total,
+            first_assessment=_from_epoch(first),
+            last_assessment=_from_epoch(last),
+            last_mbti_type=recent[0][0],
+            first_disc=disc_of(first_disc),
+            recent_disc=[disc_of(row[1:]) for row in recent],
+            recent_mbti_types=[row[0] for row in recent],
+            recent_reliability=recent_reliability,
+            reliability_sum=reliability_sum,
+            reliability_count=reliability_count,
+            completion_time_sum=completion_sum,
+            completion_time_count=completion_count,
+            assessment_streak=current_streak,
+            longest_streak=longest_streak,
+            streak_last_day=date.fromordinal(date(1970, 1, 1).toordinal() + last_day).isoformat()
+        )
+
+    async def get_assessment_analytics(self, user_id: str) -> Dict:
+        """Analytics do usuário por agregação SQL, no formato do resumo incremental"""
+
+        cache_key = self._get_cache_key('user_analytics', user_id)
+        cached_result = self._get_cache(cache_key)
+
+        if cached_result is not None:
+            return cached_result
+
+        try:
+            summary = await self._run_blocking(self._query_stats, user_id)
+            analytics = summary.to_analytics()
+            self._set_cache(cache_key, analytics, owner=user_id)
+            return analytics
+
+        except Exception as e:
+            logger.error(f"Erro ao calcular analytics para usuário {user_id}: {e}")
+            return {}
+
+    def _query_population(self, filters: Dict = None) -> PopulationBenchmarks:
+        where, params = "1 = 1", []
+        if filters and 'date_range' in filters:
+            start_date, end_date = filters['date_range']
+            where = "timestamp BETWEEN ? AND ?"
+            params = [epoch_seconds(start_date), _end_of_range(end_date)]
+
+        conn = self._connection()
+        population = PopulationBenchmarks()
+        (population.sample_size,) = conn.execute(
+            f"SELECT COUNT(*) FROM assessments WHERE {where}", params
+        ).fetchone()
+
+        histogram_params = params * sum(len(SCALE_CODES[key]) for key in BENCHMARK_SCALES.values())
+        for scale, code, bin_index, count, total, total_sq in conn.execute(_histogram_sql(where), histogram_params):
+            histogram = getattr(population, scale).setdefault(code, DimensionHistogram())
+            histogram.bins[bin_index] = count
+            histogram.count += count
+            histogram.total += total
+            histogram.total_sq += total_sq
+
+        population.mbti_counts = dict(conn.execute(
+            f"SELECT mbti_type, COUNT(*) FROM assessments WHERE mbti_type != '' AND {where} GROUP BY mbti_type",
+            params
+        ).fetchall())
+        return population
+
+    async def _get_population(self, filters: Dict = None) -> PopulationBenchmarks:
+        """Agregado populacional calculado em SQL (histogramas como no Firestore)"""
+
+        cache_key = self._get_cache_key('population_benchmarks', 'global', str(filters or {}))
+        cached_result = self._get_cache(cache_key)
+
+        if cached_result is not None:
+            return cached_result
+
+        population = await self._run_blocking(self._query_population, filters)
+        self._set_cache(cache_key, population)
+        return population
+
+    async def materialize_population_benchmarks(self) -> PopulationBenchmarks:
+        """Agregados são consultas ao vivo: apenas descarta o cache e recalcula"""
+
+        self._cache.invalidate_namespace('population_benchmarks')
+        self._cache.invalidate_namespace('percentile_index')
+        return await self._get_population()
+
+    def _query_latest_assessments(self) -> List[UserAssessment]:
+        rows = self._connection().execute(
+            """
+            SELECT timestamp, document FROM (
+                SELECT timestamp, document,
+                       ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY timestamp DESC) AS position
+                FROM assessments
+            ) WHERE position = 1
+            """
+        ).fetchall()
+        return [self._decode(timestamp, document, include_details=False) for timestamp, document in rows]
+
+    async def _latest_assessments(self) -> List[UserAssessment]:
+        return await self._run_blocking(self._query_latest_assessments)
@@ -0,0 +1,259 @@
+import asyncio
+import functools
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import logging
+
+from ..core.cohort import CohortAnalytics, CohortFrame
+from ..core.compatibility import scores_to_matrix
+from ..core.models import UserAssessment, PersonalityScores
+from ..core.percentiles import PercentileIndex
+from .benchmark_store import PopulationBenchmarks
+from .bulk_writer import BulkWriteProgress, BulkWriteResult
+from .cache import LRUTTLCache
+from .firestore_codec import schema_for
+from .profile_index import ProfileIndex, ProfileMatch
+from .user_stats import UserStatsSummary
+
+logger = logging.getLogger(__name__)
+
+# Schemas pré-computados: convertem avaliações de/para documentos (Firestore, JSON)
+USER_ASSESSMENT_SCHEMA = schema_for(UserAssessment)
+USER_STATS_SCHEMA = schema_for(UserStatsSummary)
+
+
+class StorageBackend(ABC):
+    """Interface comum dos backends de persistência (Firestore, SQLite local)
+
+    Subclasses implementam leitura/escrita de avaliações e o agregado
+    populacional; cache, pool de threads, índice de perfis e as consultas
+    compostas (dashboard, equipe, percentis) são compartilhados aqui.
+    """
+
+    def __init__(
+        self,
+        cache: LRUTTLCache,
+        max_workers: int = 8,
+        profile_index: Optional[ProfileIndex] = None,
+        thread_name_prefix: str = "storage"
+    ):
+        self._cache = cache
+        self.profile_index = profile_index
+        # Clientes de banco são bloqueantes: as chamadas rodam neste pool
+        # limitado para não travar o event loop
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+
+    @property
+    def available(self) -> bool:
+        """Se o backend está pronto para consultas"""
+        return True
+
+    # Operações específicas de cada backend
+
+    @abstractmethod
+    async def save_assessment(self, user_id: str, assessment: UserAssessment) -> str:
+        """Salva a avaliação e atualiza agregados; retorna o id do documento"""
+
+    @abstractmethod
+    async def bulk_save_assessments(
+        self,
+        assessments: Iterable[UserAssessment],
+        progress: Optional[Callable[[BulkWriteProgress], None]] = None,
+        **kwargs
+    ) -> BulkWriteResult:
+        """Grava muitas avaliações em lotes"""
+
+    @abstractmethod
+    async def get_user_assessments(
+        self,
+        user_id: str,
+        limit: int = 10,
+        include_details: bool = True
+    ) -> List[UserAssessment]:
+        """Avaliações do usuário, da mais recente para a mais antiga"""
+
+    @abstractmethod
+    async def get_assessment_analytics(self, user_id: str) -> Dict:
+        """Analytics no formato de `UserStatsSummary.to_analytics`"""
+
+    @abstractmethod
+    async def _get_population(self, filters: Dict = None) -> PopulationBenchmarks:
+        """Agregado populacional (opcionalmente filtrado por `date_range`)"""
+
+    @abstractmethod
+    async def materialize_population_benchmarks(self) -> PopulationBenchmarks:
+        """Reconstrói o agregado populacional a partir de todas as avaliações"""
+
+    @abstractmethod
+    async def _latest_assessments(self) -> List[UserAssessment]:
+        """Avaliação mais recente de cada usuário (reconstrução do índice de perfis)"""
+
+    # Cache e execução
+
+    def _get_cache_key(self, collection: str, doc_id: str, query_params: str = "") -> str:
+        """Gera chave para cache (o prefixo da coleção define o namespace/TTL)"""
+        return f"{collection}:{doc_id}:{query_params}"
+
+    def _set_cache(self, key: str, data: any, owner: Optional[str] = None) -> None:
+        """Define entrada no cache; `owner` associa a entrada a um usuário"""
+        namespace = key.split(':', 1)[0]
+        self._cache.set(namespace, key, data, owner=owner)
+
+    def _get_cache(self, key: str) -> Optional[any]:
+        """Recupera entrada do cache se válida"""
+        namespace = key.split(':', 1)[0]
+        return self._cache.get(namespace, key)
+
+    def cache_stats(self) -> Dict:
+        """Retorna contadores de hit/miss/eviction do cache"""
+        return self._cache.stats().to_dict()
+
+    async def _run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """Executa chamada bloqueante no pool de threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def close(self) -> None:
+        """Libera o pool de threads"""
+        self._executor.shutdown(wait=False)
+
+    def _invalidate_user_cache(self, user_id: str) -> None:
+        """Invalida cache relacionado ao usuário"""
+        self._cache.invalidate_owner(user_id)
+
+    async def cleanup_old_cache(self, max_age_hours: int = 24) -> None:
+        """Limpa entradas expiradas ou antigas do cache"""
+        removed = self._cache.purge_expired(max_age=max_age_hours * 3600)
+
+        logger.info(f"Cache limpo: {removed} entradas removidas")
+
+    # Consultas compostas
+
+    async def get_latest_assessment(self, user_id: str) -> Optional[UserAssessment]:
+        """Recupera a avaliação mais recente do usuário"""
+
+        assessments = await self.get_user_assessments(user_id, limit=1, include_details=True)
+        return assessments[0] if assessments else None
+
+    async def get_population_benchmarks(self, filters: Dict = None) -> Dict:
+        """Recupera benchmarks populacionais para comparação"""
+
+        if not self.available:
+            return {}
+
+        try:
+            population = await self._get_population(filters)
+            return population.to_benchmarks() if population.sample_size else {}
+
+        except Exception as e:
+            logger.error(f"Erro ao recuperar benchmarks populacionais: {e}")
+            return {}
+
+    async def get_percentile_index(self, filters: Dict = None) -> Optional[PercentileIndex]:
+        """Índice de percentis populacionais (CDF por dimensão), renovado com o cache"""
+
+        cache_key = self._get_cache_key('percentile_index', 'global', str(filters or {}))
+        cached_result = self._get_cache(cache_key)
+
+        if cached_result is not None:
+            return cached_result
+
+        if not self.available:
+            return None
+
+        try:
+            population = await self._get_population(filters)
+            if not population.sample_size:
+                return None
+
+            index = PercentileIndex.from_population(population)
+            self._set_cache(cache_key, index)
+            return index
+
+        except Exception as e:
+            logger.error(f"Erro ao construir índice de percentis: {e}")
+            return None
+
+    def _index_profile(self, user_id: str, assessment: UserAssessment) -> None:
+        """Atualiza o índice de perfis; falhas locais não desfazem o que já foi salvo"""
+        if self.profile_index is None:
+            return
+        try:
+            self.profile_index.upsert(user_id, assessment.scores, assessment.timestamp)
+        except Exception as e:
+            logger.error(f"Erro ao indexar perfil do usuário {user_id}: {e}")
+
+    async def find_similar_profiles(
+        self,
+        scores: PersonalityScores,
+        k: int = 20,
+        filters: Dict = None,
+        exclude: Iterable[str] = ()
+    ) -> List[ProfileMatch]:
+        """Usuários de perfil mais próximo (filtros: `mbti_types`, `date_range`)"""
+
+        if self.profile_index is None:
+            return []
+
+        filters = filters or {}
+        return await self._run_blocking(
+            self.profile_index.query, scores, k,
+            mbti_types=filters.get('mbti_types'),
+            date_range=filters.get('date_range'),
+            exclude=exclude
+        )
+
+    async def rebuild_profile_index(self) -> int:
+        """Reconstrói o índice a partir da avaliação mais recente de cada usuário"""
+
+        if not self.available or self.profile_index is None:
+            raise Exception("Backend ou índice de perfis não inicializado")
+
+        assessments = await self._latest_assessments()
+        await self._run_blocking(
+            self.profile_index.bulk_load,
+            [assessment.user_id for assessment in assessments],
+            scores_to_matrix([assessment.scores for assessment in assessments]),
+            [assessment.scores.mbti_type for assessment in assessments],
+            [assessment.timestamp for assessment in assessments]
+        )
+
+        logger.info(f"Índice de perfis reconstruído: {len(assessments)} usuários")
+        return len(assessments)
+
+    async def load_cohort(self, user_ids: Iterable[str]) -> CohortAnalytics:
+        """Análise de equipe a partir da avaliação mais recente de cada membro
+
+        Cada membro é uma consulta `limit=1` (reaproveitando o cache por usuário),
+        disparadas concorrentemente; membros sem avaliação ficam de fora.
+        """
+
+        user_ids = list(dict.fromkeys(user_ids))
+        latest = await asyncio.gather(*(
+            self.get_user_assessments(user_id, limit=1, include_details=False)
+            for user_id in user_ids
+        ))
+
+        return CohortAnalytics(CohortFrame.from_assessments(
+            assessments[0] for assessments in latest if assessments
+        ))
+
+    async def load_dashboard_data(self, user_id: str, limit: int = 20) -> Dict:
+        """Carrega avaliações, analytics e benchmarks do dashboard concorrentemente"""
+
+        assessments, analytics, percentile_index = await asyncio.gather(
+            self.get_user_assessments(user_id, limit=limit),
+            self.get_assessment_analytics(user_id),
+            self.get_percentile_index()
+        )
+        # Agregado populacional já está em cache após o índice
+        benchmarks = await self.get_population_benchmarks()
+
+        return {
+            'assessments': assessments,
+            'analytics': analytics,
+            'benchmarks': benchmarks,
+            'percentile_index': percentile_index,
+            'latest_assessment': assessments[0] if assessments else None
+        }
@@ -0,0 +1,155 @@
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+from ..core.models import UserAssessment
+
+# Quantidade de avaliações recentes mantidas no resumo (vetores DISC, MBTI, confiabilidade)
+RECENT_HISTORY = 20
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Normaliza datetimes (sem fuso são tratados como UTC) para comparação"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+@dataclass
+class UserStatsSummary:
+    """Resumo incremental das avaliações de um usuário (documento `stats/summary`)
+
+    Atualizado a cada avaliação salva, na mesma transação, para que analytics
+    seja a leitura de um único documento em vez de recalcular o histórico.
+    Listas `recent_*` guardam as últimas `RECENT_HISTORY` avaliações, da mais
+    recente para a mais antiga.
+    """
+    total_assessments: int = 0
+    first_assessment: Optional[datetime] = None
+    last_assessment: Optional[datetime] = None
+    last_mbti_type: str = ""
+    first_disc: Dict[str, float] = field(default_factory=dict)
+    recent_disc: List[Dict[str, float]] = field(default_factory=list)
+    recent_mbti_types: List[str] = field(default_factory=list)
+    recent_reliability: List[float] = field(default_factory=list)
+    reliability_sum: float = 0.0
+    reliability_count: int = 0
+    completion_time_sum: float = 0.0
+    completion_time_count: int = 0
+    assessment_streak: int = 0
+    longest_streak: int = 0
+    streak_last_day: Optional[str] = None
+
+    def apply(self, assessment: UserAssessment) -> "UserStatsSummary":
+        """Retorna novo resumo incluindo a avaliação (O(1), independente do histórico)"""
+
+        timestamp = _as_utc(assessment.timestamp)
+        summary = replace(
+            self,
+            total_assessments=self.total_assessments + 1,
+            first_disc=dict(self.first_disc),
+            recent_disc=list(self.recent_disc),
+            recent_mbti_types=list(self.recent_mbti_types),
+            recent_reliability=list(self.recent_reliability)
+        )
+
+        if assessment.reliability_score:
+            summary.reliability_sum += assessment.reliability_score
+            summary.reliability_count += 1
+        if assessment.completion_time_minutes:
+            summary.completion_time_sum += assessment.completion_time_minutes
+            summary.completion_time_count += 1
+
+        if summary.first_assessment is None or timestamp < _as_utc(summary.first_assessment):
+            summary.first_assessment = timestamp
+            summary.first_disc = dict(assessment.scores.disc)
+
+        # Avaliações fora de ordem (importações) só entram nos totais
+        if summary.last_assessment is not None and timestamp < _as_utc(summary.last_assessment):
+            return summary
+
+        summary.last_assessment = timestamp
+        summary.last_mbti_type = assessment.scores.mbti_type
+        summary.recent_disc = ([dict(assessment.scores.disc)] + summary.recent_disc)[:RECENT_HISTORY]
+        summary.recent_mbti_types = ([assessment.scores.mbti_type] + summary.recent_mbti_types)[:RECENT_HISTORY]
+        if assessment.reliability_score:
+            summary.recent_reliability = ([assessment.reliability_score] + summary.recent_reliability)[:RECENT_HISTORY]
+
+        summary._advance_streak(timestamp.date())
+        return summary
+
+    def _advance_streak(self, day: date) -> None:
+        """Sequência de dias consecutivos (UTC) com ao menos uma avaliação"""
+        last_day = date.fromisoformat(self.streak_last_day) if self.streak_last_day else None
+
+        if last_day == day:
+            return
+        if last_day is not None and (day - last_day).days == 1:
+            self.assessment_streak += 1
+        else:
+            self.assessment_streak = 1
+
+        self.streak_last_day = day.isoformat()
+        self.longest_streak = max(self.longest_streak, self.assessment_streak)
+
+    def current_streak(self, today: Optional[date] = None) -> int:
+        """Sequência vigente: zera se o último dia com avaliação foi antes de ontem"""
+        if not self.streak_last_day:
+            return 0
+        today = today or datetime.now(timezone.utc).date()
+        gap = (today - date.fromisoformat(self.streak_last_day)).days
+        return self.assessment_streak if gap <= 1 else 0
+
+    def assessment_frequency(self) -> str:
+        """Frequência média a partir do intervalo entre primeira e última avaliação"""
+        if self.total_assessments < 2 or not self.first_assessment or not self.last_assessment:
+            return "Dados insuficientes"
+
+        span_days = (_as_utc(self.last_assessment) - _as_utc(self.first_assessment)).total_seconds() / 86400
+        avg_interval = span_days / (self.total_assessments - 1)
+
+        if avg_interval <= 7:
+            return "Semanal"
+        elif avg_interval <= 30:
+            return "Mensal"
+        elif avg_interval <= 90:
+            return "Trimestral"
+        else:
+            return "Esporádica"
+
+    def disc_evolution(self) -> Dict:
+        """Variação DISC entre a primeira e a última avaliação"""
+        if self.total_assessments < 2 or not self.recent_disc:
+            return {}
+
+        evolution = {}
+        latest = self.recent_disc[0]
+        for key, value in latest.items():
+            if key in self.first_disc:
+                change = value - self.first_disc[key]
+                evolution[key] = {
+                    'change': round(change, 1),
+                    'direction': 'increase' if change > 0 else 'decrease' if change < 0 else 'stable'
+                }
+        return evolution
+
+    def to_analytics(self, today: Optional[date] = None) -> Dict:
+        """Analytics no formato consumido pelo dashboard"""
+        if self.total_assessments == 0:
+            return {}
+
+        return {
+            'total_assessments': self.total_assessments,
+            'assessment_frequency': self.assessment_frequency(),
+            'mbti_type_history': list(self.recent_mbti_types),
+            'disc_evolution': self.disc_evolution(),
+            'reliability_trend': list(self.recent_reliability),
+            'reliability_avg': (
+                self.reliability_sum / self.reliability_count if self.reliability_count else None
+            ),
+            'completion_time_avg': (
+                self.completion_time_sum / self.completion_time_count if self.completion_time_count else None
+            ),
+            'assessment_streak': self.current_streak(today),
+            'longest_streak': self.longest_streak,
+            'first_assessment': self.first_assessment,
+            'last_assessment': self.last_assessment
+        }
@@ -0,0 +1,336 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+from ..core.models import UserAssessment, ProfileInsights
+from .async_runner import AsyncRunner, async_runner
+from .storage import StorageBackend, USER_ASSESSMENT_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 25
+FLUSH_INTERVAL_SECONDS = 2.0
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 300.0
+# Após esse número de tentativas a escrita fica retida no journal para inspeção
+MAX_ATTEMPTS = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_writes (
+    idempotency_key TEXT PRIMARY KEY,
+    owner TEXT,
+    payload TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+)
+"""
+
+# Mesma chave: substitui o conteúdo (só a versão mais nova é enviada) e zera o backoff
+UPSERT_SQL = """
+INSERT INTO pending_writes (idempotency_key, owner, payload, enqueued_at, next_attempt_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (idempotency_key) DO UPDATE SET
+    owner = excluded.owner,
+    payload = excluded.payload,
+    revision = revision + 1,
+    next_attempt_at = excluded.next_attempt_at,
+    attempts = 0,
+    last_error = NULL
+"""
+
+Sender = Callable[[str, Dict], None]
+
+
+class PermanentWriteError(Exception):
+    """Falha que não se resolve com nova tentativa (permissão, payload inválido)"""
+
+
+@dataclass
+class PendingWrite:
+    """Escrita ainda não confirmada pelo destino"""
+    idempotency_key: str
+    owner: Optional[str]
+    payload: Dict
+    attempts: int = 0
+    last_error: Optional[str] = None
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff exponencial limitado"""
+    return min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+
+
+class WriteBehindQueue:
+    """Fila durável de escritas (write-behind) com journal SQLite local
+
+    `enqueue` grava o payload no journal e retorna imediatamente; uma thread
+    de fundo envia as pendências vencidas em lotes concorrentes via `send`,
+    com backoff exponencial por entrada. Entradas só saem do journal após
+    confirmação, sobrevivendo a reinícios do processo. A chave de
+    idempotência identifica o documento de destino: reenfileirar a mesma
+    chave substitui o payload pendente, e `send` deve gravar de forma que
+    repetir o envio não duplique dados.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        send: Sender,
+        batch_size: int = FLUSH_BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+        max_workers: int = 4
+    ):
+        self.path = path
+        self.send = send
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+
+    # Journal
+
+    def _journal(self) -> sqlite3.Connection:
+        """Conexão com o journal, aberta no primeiro uso (chamar com `_lock` adquirido)"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def enqueue(self, key: str, payload: Dict, owner: Optional[str] = None) -> str:
+        """Registra o payload no journal e agenda o envio; retorna a chave de idempotência"""
+
+        now = time.time()
+        with self._lock:
+            self._journal().execute(UPSERT_SQL, (key, owner, json.dumps(payload, separators=(',', ':')), now, now))
+
+        self.start()
+        self._wakeup.set()
+        return key
+
+    def _due(self, limit: int) -> List[Tuple[str, str, int, int]]:
+        with self._lock:
+            return self._journal().execute(
+                "SELECT idempotency_key, payload, revision, attempts FROM pending_writes "
+                "WHERE next_attempt_at <= ? AND attempts < ? ORDER BY enqueued_at LIMIT ?",
+                (time.time(), self.max_attempts, limit)
+            ).fetchall()
+
+    def _acknowledge(self, key: str, revision: int) -> None:
+        # Se a chave foi reenfileirada durante o envio, a versão nova continua pendente
+        with self._lock:
+            self._journal().execute(
+                "DELETE FROM pending_writes WHERE idempotency_key = ? AND revision = ?", (key, revision)
+            )
+
+    def _reschedule(self, key: str, revision: int, attempts: int, error: str) -> None:
+        with self._lock:
+            self._journal().execute(
+                "UPDATE pending_writes SET attempts = ?, next_attempt_at = ?, last_error = ? "
+                "WHERE idempotency_key = ? AND revision = ?",
+                (attempts, time.time() + retry_delay(attempts), error, key, revision)
+            )
+
+    def pending(self, owner: Optional[str] = None, include_exhausted: bool = False) -> List[PendingWrite]:
+        """Escritas ainda não confirmadas (opcionalmente de um dono), mais antigas primeiro
+
+        Por padrão só as que ainda serão tentadas; as esgotadas (incluindo
+        falhas permanentes) ficam em `failed` e não devem substituir o destino.
+        """
+
+        query = "SELECT idempotency_key, owner, payload, attempts, last_error FROM pending_writes WHERE 1 = 1"
+        params: Tuple = ()
+        if not include_exhausted:
+            query += " AND attempts < ?"
+            params += (self.max_attempts,)
+        if owner is not None:
+            query += " AND owner = ?"
+            params += (owner,)
+        return self._select(query, params)
+
+    def failed(self, owner: Optional[str] = None) -> List[PendingWrite]:
+        """Escritas abandonadas após `max_attempts` ou falha permanente, retidas para inspeção"""
+
+        query = "SELECT idempotency_key, owner, payload, attempts, last_error FROM pending_writes WHERE attempts >= ?"
+        params: Tuple = (self.max_attempts,)
+        if owner is not None:
+            query += " AND owner = ?"
+            params += (owner,)
+        return self._select(query, params)
+
+    def _select(self, query: str, params: Tuple) -> List[PendingWrite]:
+        with self._lock:
+            rows = self._journal().execute(query + " ORDER BY enqueued_at", params).fetchall()
+
+        return [
+            PendingWrite(key, row_owner, json.loads(payload), attempts, last_error)
+            for key, row_owner, payload, attempts, last_error in rows
+        ]
+
+    def stats(self) -> Dict:
+        """Tamanho da fila, entradas esgotadas e idade da pendência mais antiga"""
+
+        with self._lock:
+            pending, exhausted, oldest = self._journal().execute(
+                "SELECT COUNT(*), COUNT(CASE WHEN attempts >= ? THEN 1 END), MIN(enqueued_at) FROM pending_writes",
+                (self.max_attempts,)
+            ).fetchone()
+        return {
+            'pending': pending,
+            'exhausted': exhausted,
+            'oldest_age_seconds': time.time() - oldest if oldest is not None else 0.0
+        }
+
+    # Envio
+
+    def _send_one(self, key: str, payload: str) -> Optional[Exception]:
+        try:
+            self.send(key, json.loads(payload))
+            return None
+        except Exception as e:
+            return e
+
+    def flush_once(self) -> int:
+        """Envia um lote de pendências vencidas; retorna quantas foram confirmadas
+
+        O lote é lido e confirmado de uma vez no journal, mas cada entrada é
+        enviada por `send` individualmente (em paralelo): `save_assessment`
+        grava avaliação, estatísticas do usuário e benchmarks numa transação
+        que descarta reenvios pela revisão, o que o `BulkWriter` (só
+        documentos, sem leituras) não garante. Assim uma falha afeta apenas
+        a própria entrada, que é reagendada sem reenviar as demais.
+        """
+
+        due = self._due(self.batch_size)
+        if not due:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(due))) as executor:
+            errors = list(executor.map(lambda row: self._send_one(row[0], row[1]), due))
+
+        written = 0
+        for (key, _, revision, attempts), error in zip(due, errors):
+            if error is None:
+                self._acknowledge(key, revision)
+                written += 1
+                continue
+
+            attempts = self.max_attempts if isinstance(error, PermanentWriteError) else attempts + 1
+            self._reschedule(key, revision, attempts, str(error))
+            logger.warning(f"Falha ao enviar {key} (tentativa {attempts}): {error}")
+        return written
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Envia pendências vencidas até esvaziar; retorna se nada vencido ficou pendente"""
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self._due(1):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            self.flush_once()
+        return not self._due(1)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                while self.flush_once():
+                    pass
+            except Exception as e:
+                logger.error(f"Erro no envio de escritas pendentes: {e}")
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Inicia a thread de envio (idempotente); pendências de execuções anteriores são retomadas"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stop.clear()
+                self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._worker.start()
+
+    def resume(self) -> int:
+        """Inicia a thread de envio se o journal tiver pendências de execuções anteriores
+
+        Chamado onde a fila é construída: sem isso, pendências deixadas por um
+        reinício só seriam enviadas no próximo `enqueue`. Retorna quantas há.
+        """
+        stats = self.stats()
+        pending = stats['pending'] - stats['exhausted']
+        if pending:
+            self.start()
+        return pending
+
+    def close(self, timeout: float = 5) -> None:
+        """Para a thread de envio; o que não foi confirmado permanece no journal"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def pending_payload(queue: WriteBehindQueue, key: str, owner: Optional[str] = None) -> Optional[Dict]:
+    """Payload mais recente ainda a enviar para `key`, para leitura antes do destino
+
+    Escritas esgotadas não contam: uma gravação rejeitada não pode encobrir
+    o documento que está no destino.
+    """
+    writes = [write for write in queue.pending(owner=owner) if write.idempotency_key == key]
+    return writes[-1].payload if writes else None
+
+
+# Avaliações do modelo de domínio (páginas em src/ui)
+
+def assessment_key(user_id: str, assessment: UserAssessment) -> str:
+    """Chave de idempotência: o caminho do documento da avaliação"""
+    return f"users/{user_id}/assessments/{assessment.assessment_id}"
+
+
+def encode_assessment(assessment: UserAssessment) -> Dict:
+    data = USER_ASSESSMENT_SCHEMA.to_plain(assessment)
+    data['timestamp'] = assessment.timestamp.isoformat()
+    return data
+
+
+def decode_assessment(data: Dict) -> UserAssessment:
+    data = dict(data)
+    data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+    insights = data.get('profile_insights')
+    data['profile_insights'] = ProfileInsights(**insights) if insights else None
+    return USER_ASSESSMENT_SCHEMA.from_plain(data)
+
+
+def enqueue_assessment(queue: WriteBehindQueue, user_id: str, assessment: UserAssessment) -> str:
+    return queue.enqueue(assessment_key(user_id, assessment), encode_assessment(assessment), owner=user_id)
+
+
+def backend_sender(backend: StorageBackend, runner: AsyncRunner = async_runner, timeout: float = 60) -> Sender:
+    """Envia avaliações enfileiradas ao backend (idempotente por `assessment_id`)"""
+
+    def send(key: str, payload: Dict) -> None:
+        assessment = decode_assessment(payload)
+        runner.run(backend.save_assessment(assessment.user_id, assessment), timeout=timeout)
+
+    return send
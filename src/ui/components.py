@@ -1,10 +1,16 @@
+from __future__ import annotations
+
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 from typing import Dict, List, Optional, Callable, Any
 from datetime import datetime, timedelta
-import pandas as pd
 from ..core.models import PersonalityScores, UserAssessment
+from ..utils.lazy_imports import lazy_module
+
+# Dependências de gráficos/tabelas carregadas no primeiro uso
+go = lazy_module("plotly.graph_objects")
+px = lazy_module("plotly.express")
+pd = lazy_module("pandas")
+np = lazy_module("numpy")
 
 class MetricsCards:
     """Componentes de cards de métricas reutilizáveis"""
@@ -71,11 +77,16 @@ class MetricsCards:
         user_value: float,
         benchmark_value: float,
         unit: str = "%",
-        higher_is_better: bool = True
+        higher_is_better: bool = True,
+        percentile: Optional[float] = None
     ) -> None:
-        """Card de comparação com benchmark"""
+        """Card de comparação com benchmark (`percentile`: posição na população, ex: via PercentileIndex)"""
         
         difference = user_value - benchmark_value
+        percentile_html = (
+            f"<div style='color: #94a3b8; font-size: 0.8rem;'>Percentil {percentile:.0f} na população</div>"
+            if percentile is not None else ""
+        )
         percentage_diff = (difference / benchmark_value * 100) if benchmark_value != 0 else 0
         
         # Determina cor baseada na comparação
@@ -105,6 +116,7 @@ class MetricsCards:
                     <div style='color: #94a3b8; font-size: 0.8rem;'>
                         Benchmark: {benchmark_value:.1f}{unit}
                     </div>
+                    {percentile_html}
                 </div>
                 <div style='text-align: right;'>
                     <div style='color: {color}; font-size: 1.2rem;'>
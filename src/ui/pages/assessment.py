@@ -1,10 +1,12 @@
 import streamlit as st
 import time
+import uuid
 from datetime import datetime
 from typing import Dict, List, Optional
 from ...core.models import AssessmentItem, UserAssessment, PersonalityScores
 from ...core.scoring import AdvancedScoringEngine, InsightGenerator
-from ...services.database import db_manager
+from ...services.database import get_write_queue
+from ...services.write_queue import enqueue_assessment
 from ...utils.validators import ResponseValidator
 
 class AssessmentPage:
@@ -15,6 +17,7 @@ class AssessmentPage:
         self.insight_generator = InsightGenerator()
         self.response_validator = ResponseValidator()
         self.items = self._load_assessment_items()
+        self.item_bank = self.scoring_engine.compile_item_bank(self.items)
     
     def render(self) -> None:
         """Renderiza a página de avaliação"""
@@ -362,7 +365,7 @@ class AssessmentPage:
             # Calcula scores
             scores = self.scoring_engine.calculate_scores_with_confidence(
                 st.session_state.assessment_answers, 
-                self.items
+                self.item_bank
             )
             
             # Gera insights
@@ -473,11 +476,11 @@ class AssessmentPage:
         st.rerun()
     
     def _save_assessment_to_db(self, scores: PersonalityScores, insights, reliability_score: float) -> None:
-        """Salva avaliação no banco de dados"""
+        """Registra a avaliação na fila de gravação (envio ao banco em segundo plano)"""
         try:
             assessment = UserAssessment(
                 user_id=st.session_state.user_id,
-                assessment_id=f"assess_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                assessment_id=f"assess_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}",
                 answers=st.session_state.assessment_answers,
                 scores=scores,
                 profile_insights=insights,
@@ -486,8 +489,7 @@ class AssessmentPage:
                 reliability_score=reliability_score
             )
             
-            # Salva de forma assíncrona (em produção)
-            # await db_manager.save_assessment(st.session_state.user_id, assessment)
+            enqueue_assessment(get_write_queue(), st.session_state.user_id, assessment)
             
         except Exception as e:
             st.warning(f"Avaliação processada, mas não foi possível salvar: {e}")
@@ -1,12 +1,16 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
+from ...core.cohort import MBTI_TYPES
+from ...core.compatibility import CompatibilityEngine
 from ...core.models import UserAssessment, PersonalityScores
-from ...services.database import db_manager
+from ...core.scoring import InsightGenerator
+from ...services.database import get_db_sync, get_storage_backend
 from ...ui.visualizations import PersonalityVisualizer, DashboardComponents
 from ...ui.components import MetricsCards, TimelineChart, ComparisonChart
+from ...utils.lazy_imports import lazy_module
+
+pd = lazy_module("pandas")
 
 class DashboardPage:
     """Dashboard principal com analytics e insights"""
@@ -33,11 +37,12 @@ class DashboardPage:
         self._render_dashboard_header(user_data)
         
         # Conteúdo principal em tabs
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
+        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
             "🏠 Visão Geral",
             "📊 Análise Detalhada", 
             "📈 Evolução Temporal",
             "🎯 Benchmarks",
+            "👥 Equipe",
             "🤖 Insights IA"
         ])
         
@@ -54,6 +59,9 @@ class DashboardPage:
             self._render_benchmarks_tab(user_data)
         
         with tab5:
+            self._render_team_tab(user_data)
+        
+        with tab6:
             self._render_ai_insights_tab(user_data)
     
     def _load_user_data(self) -> Dict:
@@ -71,26 +79,18 @@ class DashboardPage:
         
         with st.spinner("📊 Carregando seus dados..."):
             try:
-                # Carrega avaliações
-                assessments = []  # await db_manager.get_user_assessments(user_id, limit=20)
-                
-                # Carrega analytics
-                analytics = {}  # await db_manager.get_assessment_analytics(user_id)
-                
-                # Carrega benchmarks populacionais
-                benchmarks = {}  # await db_manager.get_population_benchmarks()
-                
-                # Mock data para demonstração
-                assessments = self._generate_mock_assessments()
-                analytics = self._generate_mock_analytics()
-                benchmarks = self._generate_mock_benchmarks()
-                
-                user_data = {
-                    'assessments': assessments,
-                    'analytics': analytics,
-                    'benchmarks': benchmarks,
-                    'latest_assessment': assessments[0] if assessments else None
-                }
+                if get_storage_backend().available:
+                    # Avaliações, analytics e benchmarks são buscados concorrentemente
+                    user_data = get_db_sync().load_dashboard_data(user_id, limit=20)
+                else:
+                    # Mock data para demonstração (backend indisponível)
+                    assessments = self._generate_mock_assessments()
+                    user_data = {
+                        'assessments': assessments,
+                        'analytics': self._generate_mock_analytics(),
+                        'benchmarks': self._generate_mock_benchmarks(),
+                        'latest_assessment': assessments[0] if assessments else None
+                    }
                 
                 # Atualiza cache
                 st.session_state[cache_key] = user_data
@@ -448,11 +448,15 @@ class DashboardPage:
         
         percentiles_data = []
         
+        # Posição real na população (uma busca vetorizada para todas as dimensões)
+        percentile_index = user_data.get('percentile_index')
+        population_percentiles = percentile_index.scores_percentiles(latest.scores) if percentile_index else {}
+        
         # DISC percentis
         for key, value in latest.scores.disc.items():
             dimension = key.replace('DISC_', '')
             benchmark = benchmarks.get('disc_percentiles', {}).get(dimension, {})
-            percentile = self._calculate_percentile(value, benchmark)
+            percentile = population_percentiles.get(key, self._calculate_percentile(value, benchmark))
             
             percentiles_data.append({
                 'Categoria': 'DISC',
@@ -467,13 +471,15 @@ class DashboardPage:
             dimension = key.replace('B5_', '')
             trait_names = {'O': 'Abertura', 'C': 'Conscienciosidade', 'E': 'Extroversão', 'A': 'Amabilidade', 'N': 'Neuroticismo'}
             dimension_name = trait_names.get(dimension, dimension)
+            # Sem índice populacional, o score Big Five (percentil normativo) é usado diretamente
+            percentile = population_percentiles.get(key, value)
             
             percentiles_data.append({
                 'Categoria': 'Big Five',
                 'Dimensão': dimension_name,
                 'Seu Score': f"{value:.1f}%",
-                'Percentil': f"{value:.0f}%",  # Big Five já é em percentil
-                'Interpretação': self._interpret_percentile(value)
+                'Percentil': f"{percentile:.0f}%",
+                'Interpretação': self._interpret_percentile(percentile)
             })
         
         df_percentiles = pd.DataFrame(percentiles_data)
@@ -486,6 +492,104 @@ class DashboardPage:
         for insight in positioning_insights:
             st.info(f"**{insight['title']}**: {insight['description']}")
     
+    def _render_team_tab(self, user_data: Dict) -> None:
+        """Renderiza análise de equipe (distribuições, coesão e lacunas vs população)"""
+        
+        st.markdown("### 👥 Análise de Equipe")
+        
+        if user_data['latest_assessment']:
+            self._render_similar_profiles(user_data['latest_assessment'])
+        
+        raw_ids = st.text_area(
+            "IDs dos membros (um por linha ou separados por vírgula):",
+            value=st.session_state.get('team_member_ids', ''),
+            help="Sua avaliação mais recente é incluída automaticamente"
+        )
+        st.session_state.team_member_ids = raw_ids
+        
+        member_ids = [member.strip() for member in raw_ids.replace(',', '\n').splitlines() if member.strip()]
+        if not member_ids:
+            st.info("Informe os membros da equipe para gerar a análise")
+            return
+        
+        cohort = get_db_sync().load_cohort([st.session_state.user_id] + member_ids)
+        if len(cohort) < 2:
+            st.warning("São necessários ao menos dois membros com avaliação concluída")
+            return
+        
+        st.session_state.team_cohort = cohort
+        summary = cohort.summary(user_data['benchmarks'], user_data.get('percentile_index'))
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Membros Avaliados", summary['size'])
+        with col2:
+            st.metric("Coesão de Perfis", f"{summary['cohesion']:+.2f}")
+        with col3:
+            preferences = summary['mbti']['preference_share']
+            st.metric("Extroversão", f"{preferences.get('E', 0):.0f}%")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("#### 📊 Estilos DISC Dominantes")
+            st.bar_chart(pd.Series(summary['disc']['dominant_share'], name="% da equipe"))
+        
+        with col2:
+            st.markdown("#### 🧩 Tipos MBTI")
+            st.bar_chart(pd.Series(summary['mbti']['type_share'], name="% da equipe"))
+        
+        if summary['population_gaps']:
+            st.markdown("#### 📈 Equipe vs População")
+            gaps_data = [
+                {
+                    'Dimensão': dimension,
+                    'Média Equipe': f"{gap['team_mean']:.1f}",
+                    'Média População': f"{gap['population_mean']:.1f}" if 'population_mean' in gap else "-",
+                    'Diferença': f"{gap['gap']:+.1f}" if 'gap' in gap else "-",
+                    'Percentil Mediano': f"{gap['median_percentile']:.0f}%" if 'median_percentile' in gap else "-"
+                }
+                for dimension, gap in summary['population_gaps'].items()
+            ]
+            st.dataframe(pd.DataFrame(gaps_data), use_container_width=True)
+        
+        if len(cohort) <= 50:
+            st.markdown("#### 🔗 Similaridade entre Membros")
+            labels = [str(user_id) for user_id in cohort.frame.user_ids]
+            similarity = pd.DataFrame(cohort.similarity_matrix(), index=labels, columns=labels)
+            st.dataframe(similarity.style.format("{:.2f}"), use_container_width=True)
+        
+        if summary['atypical_members']:
+            st.markdown("#### 🎯 Perfis Mais Distintos do Grupo")
+            for member in summary['atypical_members']:
+                st.write(f"• **{member['user_id']}** — aderência ao perfil médio: {member['fit']:+.2f}")
+    
+    def _render_similar_profiles(self, latest: UserAssessment) -> None:
+        """Renderiza os usuários de perfil mais próximo (mentoria e alocação em papéis)"""
+        
+        st.markdown("#### 🔍 Perfis Semelhantes ao Seu")
+        
+        mbti_filter = st.multiselect("Filtrar por tipo MBTI:", list(MBTI_TYPES))
+        matches = get_db_sync().find_similar_profiles(
+            latest.scores, k=20,
+            filters={'mbti_types': mbti_filter or None},
+            exclude=[st.session_state.user_id]
+        )
+        
+        if not matches:
+            st.info("Nenhum perfil semelhante encontrado")
+            return
+        
+        st.dataframe(pd.DataFrame([
+            {
+                'Usuário': match.user_id,
+                'Tipo MBTI': match.mbti_type,
+                'Distância': f"{match.distance:.1f}",
+                'Avaliado em': match.timestamp.strftime('%d/%m/%Y')
+            }
+            for match in matches
+        ]), use_container_width=True)
+    
     def _render_ai_insights_tab(self, user_data: Dict) -> None:
         """Renderiza insights gerados por IA"""
         
@@ -666,6 +770,28 @@ class DashboardPage:
             }
         }
     
+    def _calculate_percentile(self, value: float, benchmark: Dict) -> float:
+        """Percentil aproximado pela normal (fallback quando não há índice populacional)"""
+        from ...core.norms import normal_cdf
+        
+        std = benchmark.get('std')
+        if not std:
+            return 50.0
+        return float(normal_cdf((value - benchmark.get('mean', 0)) / std)) * 100
+    
+    def _interpret_percentile(self, percentile: float) -> str:
+        """Interpretação textual do percentil"""
+        if percentile >= 80:
+            return "Muito acima da média"
+        elif percentile >= 60:
+            return "Acima da média"
+        elif percentile >= 40:
+            return "Na média"
+        elif percentile >= 20:
+            return "Abaixo da média"
+        else:
+            return "Muito abaixo da média"
+    
     def _get_disc_level(self, score: float) -> str:
         """Retorna nível DISC baseado no score"""
         if score >= 70:
@@ -731,14 +857,29 @@ class DashboardPage:
         ]
     
     def _generate_team_compatibility_insights(self, assessment: UserAssessment) -> List[Dict]:
-        """Gera insights de compatibilidade"""
-        return [
-            {
-                'title': 'Dinâmica em Equipes',
-                'content': 'Você funciona melhor em equipes que...',
-                'actions': ['Busque roles colaborativos', 'Pratique feedback construtivo']
-            }
-        ]
+        """Gera insights de compatibilidade com estilos DISC e com a equipe carregada"""
+        
+        notes = (assessment.profile_insights.compatibility_notes if assessment.profile_insights else None) \
+            or InsightGenerator()._generate_compatibility_notes(assessment.scores)
+        
+        insights = [{
+            'title': 'Dinâmica em Equipes',
+            'content': "\n\n".join(f"**{style}**: {note}" for style, note in notes.items())
+        }]
+        
+        # Colegas mais complementares dentre os membros da equipe analisada
+        cohort = st.session_state.get('team_cohort')
+        if cohort is not None and len(cohort) > 1:
+            user_ids = [str(user_id) for user_id in cohort.frame.user_ids]
+            engine = CompatibilityEngine(cohort.frame.scores, user_ids, metric="complementarity")
+            matches = engine.top_k_for(assessment.scores, k=3, exclude=[assessment.user_id])
+            insights.append({
+                'title': 'Colegas Mais Complementares',
+                'content': 'Membros da equipe cujo perfil melhor complementa o seu.',
+                'actions': [f"{user_id} (complementaridade {score:+.2f})" for user_id, score in matches]
+            })
+        
+        return insights
     
     def _generate_stress_management_insights(self, assessment: UserAssessment) -> List[Dict]:
         """Gera insights de gestão de estresse"""
@@ -1,11 +1,53 @@
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+from __future__ import annotations
+
 import streamlit as st
-import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional
 from ..core.models import PersonalityScores, UserAssessment
+from ..utils.lazy_imports import lazy_module
+
+# Plotly só é importado quando o primeiro gráfico é criado
+go = lazy_module("plotly.graph_objects")
+plotly_subplots = lazy_module("plotly.subplots")
+
+DISC_LABELS = {'DISC_D': 'Dominância', 'DISC_I': 'Influência', 'DISC_S': 'Estabilidade', 'DISC_C': 'Conformidade'}
+B5_LABELS = {
+    'B5_O': 'Abertura', 'B5_C': 'Conscienciosidade', 'B5_E': 'Extroversão',
+    'B5_A': 'Amabilidade', 'B5_N': 'Neuroticismo'
+}
+MBTI_PAIRS = [('E vs I', 'MBTI_E', 'MBTI_I'), ('S vs N', 'MBTI_S', 'MBTI_N'),
+              ('T vs F', 'MBTI_T', 'MBTI_F'), ('J vs P', 'MBTI_J', 'MBTI_P')]
+
+
+def b5_level(value: float) -> str:
+    """Faixa do percentil Big Five"""
+    if value >= 70:
+        return "Alto"
+    elif value >= 30:
+        return "Médio"
+    else:
+        return "Baixo"
+
+
+def mbti_preference_strengths(scores: PersonalityScores) -> Dict[str, float]:
+    """Intensidade de cada par MBTI na escala visual (-100 a 100)"""
+    strengths = {}
+    for name, first, second in MBTI_PAIRS:
+        value = scores.mbti_preferences.get(first, 0) - scores.mbti_preferences.get(second, 0)
+        # Normaliza baseado no range típico dos scores
+        strengths[name] = max(-100, min(100, value * 10))
+    return strengths
+
+
+def mbti_preference_color(value: float) -> str:
+    """Cor da barra conforme a direção e a clareza da preferência"""
+    if value > 20:
+        return '#4ecdc4'  # Turquesa para preferência clara
+    elif value < -20:
+        return '#ff6b6b'  # Vermelho para preferência oposta clara
+    else:
+        return '#ffd93d'  # Amarelo para preferência leve
+
 
 class PersonalityVisualizer:
     """Classe para criar visualizações interativas dos perfis"""
@@ -34,13 +76,8 @@ class PersonalityVisualizer:
     def create_disc_radar_chart(self, scores: PersonalityScores) -> go.Figure:
         """Cria gráfico radar para DISC com comparação normativa"""
         
-        dimensions = ['Dominância', 'Influência', 'Estabilidade', 'Conformidade']
-        user_values = [
-            scores.disc.get('DISC_D', 0),
-            scores.disc.get('DISC_I', 0), 
-            scores.disc.get('DISC_S', 0),
-            scores.disc.get('DISC_C', 0)
-        ]
+        dimensions = list(DISC_LABELS.values())
+        user_values = [scores.disc.get(key, 0) for key in DISC_LABELS]
         
         # Dados normativos (população geral)
         norm_values = [25, 25, 25, 25]  # Distribuição equilibrada
@@ -97,20 +134,13 @@ class PersonalityVisualizer:
     def create_big_five_bars(self, scores: PersonalityScores) -> go.Figure:
         """Cria gráfico de barras para Big Five com percentis"""
         
-        traits = ['Abertura', 'Conscienciosidade', 'Extroversão', 'Amabilidade', 'Neuroticismo']
-        trait_keys = ['B5_O', 'B5_C', 'B5_E', 'B5_A', 'B5_N']
+        traits = list(B5_LABELS.values())
+        trait_keys = list(B5_LABELS)
         values = [scores.big_five.get(key, 0) for key in trait_keys]
         colors = [self.color_scheme['b5_colors'][key.split('_')[1]] for key in trait_keys]
         
         # Interpretação dos percentis
-        interpretations = []
-        for value in values:
-            if value >= 70:
-                interpretations.append("Alto")
-            elif value >= 30:
-                interpretations.append("Médio")
-            else:
-                interpretations.append("Baixo")
+        interpretations = [b5_level(value) for value in values]
         
         fig = go.Figure()
         
@@ -161,20 +191,8 @@ class PersonalityVisualizer:
     def create_mbti_preference_chart(self, scores: PersonalityScores) -> go.Figure:
         """Cria visualização das preferências MBTI"""
         
-        # Calcula intensidade das preferências
-        preferences = {
-            'E vs I': scores.mbti_preferences.get('MBTI_E', 0) - scores.mbti_preferences.get('MBTI_I', 0),
-            'S vs N': scores.mbti_preferences.get('MBTI_S', 0) - scores.mbti_preferences.get('MBTI_N', 0),
-            'T vs F': scores.mbti_preferences.get('MBTI_T', 0) - scores.mbti_preferences.get('MBTI_F', 0),
-            'J vs P': scores.mbti_preferences.get('MBTI_J', 0) - scores.mbti_preferences.get('MBTI_P', 0)
-        }
-        
-        # Converte para escala visual (-100 a 100)
-        normalized_prefs = {}
-        for key, value in preferences.items():
-            # Normaliza baseado no range típico dos scores
-            normalized = max(-100, min(100, value * 10))  # Ajuste do fator conforme necessário
-            normalized_prefs[key] = normalized
+        # Intensidade das preferências na escala visual (-100 a 100)
+        normalized_prefs = mbti_preference_strengths(scores)
         
         fig = go.Figure()
         
@@ -182,14 +200,7 @@ class PersonalityVisualizer:
         values = list(normalized_prefs.values())
         
         # Cores baseadas na direção da preferência
-        colors = []
-        for val in values:
-            if val > 20:
-                colors.append('#4ecdc4')  # Turquesa para preferência clara
-            elif val < -20:
-                colors.append('#ff6b6b')  # Vermelho para preferência oposta clara
-            else:
-                colors.append('#ffd93d')  # Amarelo para preferência leve
+        colors = [mbti_preference_color(val) for val in values]
         
         fig.add_trace(go.Bar(
             y=dimensions,
@@ -364,7 +375,7 @@ class PersonalityVisualizer:
         
         dates = [a.timestamp.strftime('%Y-%m-%d') for a in sorted_assessments]
         
-        fig = make_subplots(
+        fig = plotly_subplots.make_subplots(
             rows=2, cols=2,
             subplot_titles=('DISC Dominância', 'DISC Influência', 'Big Five Abertura', 'Big Five Conscienciosidade'),
             vertical_spacing=0.1
@@ -0,0 +1,362 @@
+"""Geração em lote de relatórios para organizações inteiras
+
+Uso (linha de comando):
+
+    python -m src.utils.bulk_reports --ids ids.txt --output relatorios.zip
+    python -m src.utils.bulk_reports --source jsonl --input dump.jsonl --ids ids.txt --output relatorios.zip
+    python -m src.utils.bulk_reports --ids ids.txt --output relatorios.zip --font-dir /opt/fonts/dejavu
+
+Os relatórios são renderizados num pool de processos em que cada processo
+mantém um único gerador (fonte, templates e desenho de gráficos
+reaproveitados entre relatórios). No máximo `max_in_flight` avaliações estão
+em renderização ao mesmo tempo e cada relatório pronto é gravado em seguida
+no ZIP, então a memória não depende do tamanho do lote. Falhas individuais
+vão para o `manifest.json` do ZIP sem interromper o lote.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from ..core.models import ProfileInsights, UserAssessment
+from ..services.firestore_codec import schema_for
+from .chart_renderer import ChartRasterizer
+from .reports import AdvancedReportGenerator, report_fonts
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+# PDFs já são comprimidos internamente; HTML ganha com deflate
+FORMATS = {"pdf": (".pdf", zipfile.ZIP_STORED), "html": (".html", zipfile.ZIP_DEFLATED)}
+# Consultas `in` do Firestore aceitam até 30 valores
+FIRESTORE_IN_LIMIT = 30
+
+RenderOutcome = Tuple[str, Optional[bytes], Optional[str]]
+
+
+@dataclass
+class BulkReportResult:
+    """Resumo do lote, com vazão em relatórios por segundo"""
+    requested: int = 0
+    succeeded: int = 0
+    failures: Dict[str, str] = field(default_factory=dict)
+    bytes_written: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def failed(self) -> int:
+        return len(self.failures)
+
+    @property
+    def completed(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def reports_per_second(self) -> float:
+        return self.succeeded / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'requested': self.requested,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'bytes_written': self.bytes_written,
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'reports_per_second': round(self.reports_per_second, 2)
+        }
+
+
+# Processos do pool
+
+def default_generator() -> AdvancedReportGenerator:
+    """Gerador de cada processo do pool: sem cache em disco e com rasterização própria"""
+    return AdvancedReportGenerator(rasterizer=ChartRasterizer(max_workers=1))
+
+
+_worker_generator: Optional[AdvancedReportGenerator] = None
+
+
+def _init_worker(factory: Callable[[], AdvancedReportGenerator]) -> None:
+    global _worker_generator
+    _worker_generator = factory()
+    report_fonts()
+
+
+def _render_in_worker(
+    assessment: UserAssessment,
+    report_type: str,
+    format: str,
+    customizations: Dict
+) -> RenderOutcome:
+    """Renderiza um relatório; erros voltam como texto para não depender de exceções serializáveis"""
+    try:
+        data = _worker_generator.generate_comprehensive_report(assessment, report_type, format, customizations)
+        return assessment.assessment_id, bytes(data), None
+    except Exception as e:
+        return assessment.assessment_id, None, f"{type(e).__name__}: {e}"
+
+
+class BulkReportPipeline:
+    """Renderiza relatórios de muitas avaliações num pool de processos e grava um ZIP
+
+    O ZIP é montado em `<output>.partial` e renomeado ao final; cada
+    relatório vira `<assessment_id>.pdf` (ou `.html`). Se um processo do
+    pool morrer, o pool é recriado e as avaliações que estavam nele são
+    tentadas mais uma vez antes de serem registradas como falha.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        report_type: str = "executive",
+        format: str = "pdf",
+        customizations: Optional[Dict] = None,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        generator_factory: Callable[[], AdvancedReportGenerator] = default_generator
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"Formato não suportado em lote: {format}")
+        self.output_path = output_path
+        self.report_type = report_type
+        self.format = format
+        self.customizations = customizations or {}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.max_workers * 2
+        self.generator_factory = generator_factory
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers, initializer=_init_worker, initargs=(self.generator_factory,)
+        )
+
+    def run(
+        self,
+        assessment_ids: Iterable[str],
+        source: Iterable[UserAssessment],
+        progress: Optional[Callable[[BulkReportResult], None]] = None
+    ) -> BulkReportResult:
+        """Gera os relatórios das avaliações pedidas encontradas em `source`
+
+        `source` é consumido uma única vez e pode conter outras avaliações;
+        ids pedidos que não aparecem nele são registrados como não encontrados.
+        """
+
+        requested = list(dict.fromkeys(assessment_ids))
+        wanted = set(requested)
+        result = BulkReportResult(requested=len(requested))
+        extension, compression = FORMATS[self.format]
+        start = time.perf_counter()
+
+        directory = os.path.dirname(os.path.abspath(self.output_path))
+        os.makedirs(directory, exist_ok=True)
+        partial_path = self.output_path + ".partial"
+
+        pool = self._new_pool()
+        # future -> (avaliação, tentativa, pool em que foi submetida)
+        inflight: Dict[Future, Tuple[UserAssessment, int, ProcessPoolExecutor]] = {}
+
+        def submit(assessment: UserAssessment, attempt: int) -> None:
+            future = pool.submit(
+                _render_in_worker, assessment, self.report_type, self.format, self.customizations
+            )
+            inflight[future] = (assessment, attempt, pool)
+
+        def record(archive: zipfile.ZipFile, outcome: RenderOutcome) -> None:
+            assessment_id, data, error = outcome
+            if error is None:
+                archive.writestr(f"{assessment_id}{extension}", data, compress_type=compression)
+                result.succeeded += 1
+                result.bytes_written += len(data)
+            else:
+                logger.warning(f"Relatório de {assessment_id} falhou: {error}")
+                result.failures[assessment_id] = error
+            result.elapsed_seconds = time.perf_counter() - start
+            if progress:
+                progress(result)
+
+        def drain(archive: zipfile.ZipFile, limit: int) -> None:
+            """Grava relatórios concluídos até restarem no máximo `limit` em andamento"""
+            nonlocal pool
+            while len(inflight) > limit:
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    assessment, attempt, owner = inflight.pop(future)
+                    try:
+                        record(archive, future.result())
+                    except BrokenProcessPool as e:
+                        if owner is pool:
+                            logger.error(f"Processo de renderização encerrado, recriando o pool: {e}")
+                            pool.shutdown(wait=False, cancel_futures=True)
+                            pool = self._new_pool()
+                        if attempt == 0:
+                            submit(assessment, attempt + 1)
+                        else:
+                            record(archive, (assessment.assessment_id, None, f"Processo encerrado: {e}"))
+
+        try:
+            with zipfile.ZipFile(partial_path, 'w') as archive:
+                for assessment in source:
+                    if assessment.assessment_id not in wanted:
+                        continue
+                    wanted.discard(assessment.assessment_id)
+                    drain(archive, self.max_in_flight - 1)
+                    submit(assessment, 0)
+                drain(archive, 0)
+
+                for assessment_id in requested:
+                    if assessment_id in wanted:
+                        record(archive, (assessment_id, None, "Avaliação não encontrada"))
+
+                result.elapsed_seconds = time.perf_counter() - start
+                manifest = {
+                    **result.to_dict(),
+                    'report_type': self.report_type,
+                    'format': self.format,
+                    'generated_at': datetime.now().isoformat(),
+                    'failures': result.failures
+                }
+                archive.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+            os.replace(partial_path, self.output_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        logger.info(
+            f"{result.succeeded}/{result.requested} relatórios em {result.elapsed_seconds:.1f}s "
+            f"({result.reports_per_second:.1f}/s)"
+        )
+        return result
+
+
+def generate_bulk_reports(
+    assessment_ids: Iterable[str],
+    source: Iterable[UserAssessment],
+    output_path: str,
+    report_type: str = "executive",
+    format: str = "pdf",
+    customizations: Optional[Dict] = None,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[BulkReportResult], None]] = None
+) -> BulkReportResult:
+    """Atalho para `BulkReportPipeline(...).run(...)`"""
+    pipeline = BulkReportPipeline(
+        output_path, report_type=report_type, format=format,
+        customizations=customizations, max_workers=max_workers
+    )
+    return pipeline.run(assessment_ids, source, progress)
+
+
+# Fontes
+
+_ASSESSMENT_SCHEMA = schema_for(UserAssessment)
+
+
+def _decode(data: Dict) -> UserAssessment:
+    data = dict(data)
+    if isinstance(data.get('timestamp'), str):
+        data['timestamp'] = datetime.fromisoformat(data['timestamp'].replace('Z', '+00:00'))
+    insights = data.get('profile_insights')
+    data['profile_insights'] = ProfileInsights(**insights) if insights else None
+    return _ASSESSMENT_SCHEMA.from_plain(data)
+
+
+def firestore_assessments(db, assessment_ids: List[str]) -> Iterator[UserAssessment]:
+    """Avaliações pelo id, em consultas `in` de até 30 ids no collection group"""
+    for start in range(0, len(assessment_ids), FIRESTORE_IN_LIMIT):
+        chunk = assessment_ids[start:start + FIRESTORE_IN_LIMIT]
+        query = db.collection_group('assessments').where('assessment_id', 'in', chunk)
+        for doc in query.stream():
+            yield _decode(doc.to_dict())
+
+
+def jsonl_assessments(path: str) -> Iterator[UserAssessment]:
+    """Avaliações de um arquivo JSON Lines (um documento por linha, datas em ISO 8601)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield _decode(json.loads(line))
+
+
+def read_ids(path: str) -> List[str]:
+    """Ids de avaliação, um por linha (`-` lê da entrada padrão)"""
+    stream = sys.stdin if path == "-" else open(path, encoding='utf-8')
+    try:
+        return [line.strip() for line in stream if line.strip()]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _firestore_client(credentials_path: Optional[str]):
+    from google.cloud import firestore
+    if credentials_path:
+        return firestore.Client.from_service_account_json(credentials_path)
+    return firestore.Client()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Gera relatórios NeuroMap em lote num arquivo ZIP")
+    parser.add_argument("--ids", required=True, help="Arquivo com ids de avaliação, um por linha (- para stdin)")
+    parser.add_argument("--output", required=True, help="Arquivo ZIP de saída")
+    parser.add_argument("--report-type", choices=["executive", "complete", "coaching"], default="executive")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="pdf")
+    parser.add_argument("--no-charts", action="store_true", help="Omite os gráficos dos relatórios")
+    parser.add_argument("--source", choices=["firestore", "jsonl"], default="firestore")
+    parser.add_argument("--input", help="Arquivo JSON Lines (com --source jsonl)")
+    parser.add_argument("--credentials", help="JSON da service account (padrão: credenciais do ambiente)")
+    parser.add_argument("--workers", type=int, help="Processos de renderização (padrão: CPUs)")
+    parser.add_argument("--max-in-flight", type=int, help="Relatórios em renderização ao mesmo tempo")
+    parser.add_argument(
+        "--font-dir", default=os.environ.get("REPORT_FONT_DIR"),
+        help="Pasta com as fontes DejaVu dos PDFs (padrão: $REPORT_FONT_DIR)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.font_dir:
+        # Herdado pelos processos do pool
+        os.environ["REPORT_FONT_DIR"] = args.font_dir
+        report_fonts.cache_clear()
+
+    assessment_ids = read_ids(args.ids)
+    if args.source == "jsonl":
+        if not args.input:
+            parser.error("--input é obrigatório com --source jsonl")
+        source = jsonl_assessments(args.input)
+    else:
+        source = firestore_assessments(_firestore_client(args.credentials), assessment_ids)
+
+    def report_progress(result: BulkReportResult) -> None:
+        if result.completed % 50 == 0 or result.completed == result.requested:
+            print(
+                f"{result.completed}/{result.requested} relatórios ({result.reports_per_second:.1f}/s)",
+                file=sys.stderr
+            )
+
+    pipeline = BulkReportPipeline(
+        args.output,
+        report_type=args.report_type,
+        format=args.format,
+        customizations={"include_charts": not args.no_charts},
+        max_workers=args.workers,
+        max_in_flight=args.max_in_flight
+    )
+    result = pipeline.run(assessment_ids, source, progress=report_progress)
+    print(json.dumps(result.to_dict()))
+    return 0 if result.succeeded or not result.requested else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
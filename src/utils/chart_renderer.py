@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+import logging
+
+from ..services.cache import LRUTTLCache
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTH = 800
+DEFAULT_HEIGHT = 600
+CHART_CACHE_BYTES = 64 * 1024 * 1024
+# PNGs são determinísticos para a mesma especificação: o TTL só limita a memória ociosa
+CHART_CACHE_TTL = 24 * 3600
+
+
+def render_png(spec: str, width: int, height: int) -> bytes:
+    """Rasteriza uma figura serializada (JSON do Plotly); executa nos processos do pool
+
+    O Kaleido é iniciado uma vez por processo e reaproveitado entre chamadas.
+    """
+    import plotly.io as plotly_io
+    return plotly_io.to_image(plotly_io.from_json(spec), format='png', width=width, height=height)
+
+
+def spec_hash(spec: str, width: int, height: int) -> str:
+    return hashlib.sha256(f"{width}x{height}:{spec}".encode('utf-8')).hexdigest()
+
+
+class ChartRasterizer:
+    """Converte figuras Plotly em PNG num pool persistente de processos
+
+    Cada figura é serializada para JSON (a especificação), e o PNG é
+    cacheado pelo hash dessa especificação e do tamanho. `render_many`
+    submete todas as figuras ausentes do cache de uma vez, de modo que os
+    gráficos de um relatório são rasterizados em paralelo; especificações
+    idênticas são renderizadas uma única vez. O pool é criado no primeiro
+    uso e recriado se um processo morrer.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cache: Optional[LRUTTLCache] = None,
+        render: Callable[[str, int, int], bytes] = render_png
+    ):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._cache = cache if cache is not None else LRUTTLCache(
+            max_entries=512, max_bytes=CHART_CACHE_BYTES, default_ttl=CHART_CACHE_TTL, sizeof=len
+        )
+        self._render = render
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def _reset_pool(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def render(
+        self,
+        fig: Optional[go.Figure],
+        width: int = DEFAULT_WIDTH,
+        height: int = DEFAULT_HEIGHT
+    ) -> Optional[bytes]:
+        """PNG de uma figura (None se a rasterização falhar)"""
+        return self.render_many({'chart': fig}, width, height)['chart']
+
+    def render_many(
+        self,
+        figures: Dict[str, Optional[go.Figure]],
+        width: int = DEFAULT_WIDTH,
+        height: int = DEFAULT_HEIGHT
+    ) -> Dict[str, Optional[bytes]]:
+        """PNGs das figuras, por nome; as ausentes do cache são renderizadas concorrentemente
+
+        Figuras None (gráfico sem dados) resultam em None.
+        """
+
+        specs = {name: fig.to_json() for name, fig in figures.items() if fig is not None}
+        keys = {name: spec_hash(spec, width, height) for name, spec in specs.items()}
+
+        results: Dict[str, Optional[bytes]] = {}
+        pending: Dict[str, str] = {}
+        for name, key in keys.items():
+            cached = self._cache.get('charts', key)
+            if cached is not None:
+                results[name] = cached
+            else:
+                pending.setdefault(key, specs[name])
+
+        rendered = self._render_pending(pending, width, height)
+        for name in figures:
+            if name not in results:
+                results[name] = rendered.get(keys[name]) if name in keys else None
+        return results
+
+    def _render_pending(self, pending: Dict[str, str], width: int, height: int) -> Dict[str, Optional[bytes]]:
+        if not pending:
+            return {}
+
+        try:
+            executor = self._executor()
+            futures: Dict[str, Future] = {
+                key: executor.submit(self._render, spec, width, height) for key, spec in pending.items()
+            }
+        except (BrokenProcessPool, RuntimeError, OSError) as e:
+            # Sem pool disponível (ambiente restrito): rasteriza no processo atual
+            logger.warning(f"Pool de rasterização indisponível, renderizando em série: {e}")
+            self._reset_pool()
+            return {key: self._render_inline(spec, width, height) for key, spec in pending.items()}
+
+        rendered: Dict[str, Optional[bytes]] = {}
+        for key, future in futures.items():
+            try:
+                png = future.result()
+                self._cache.set('charts', key, png)
+                rendered[key] = png
+            except BrokenProcessPool as e:
+                logger.error(f"Processo de rasterização encerrado: {e}")
+                self._reset_pool()
+                rendered[key] = None
+            except Exception as e:
+                logger.warning(f"Erro ao converter gráfico: {e}")
+                rendered[key] = None
+        return rendered
+
+    def _render_inline(self, spec: str, width: int, height: int) -> Optional[bytes]:
+        try:
+            png = self._render(spec, width, height)
+            self._cache.set('charts', spec_hash(spec, width, height), png)
+            return png
+        except Exception as e:
+            logger.warning(f"Erro ao converter gráfico: {e}")
+            return None
+
+    def cache_stats(self) -> Dict:
+        return self._cache.stats().to_dict()
+
+    def close(self) -> None:
+        """Encerra os processos do pool"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+# Pool compartilhado pelo processo (criado no primeiro relatório com gráficos)
+shared_rasterizer = ChartRasterizer()
@@ -0,0 +1,12 @@
+"""Configuração opcional da aplicação (secrets.toml do Streamlit)"""
+from typing import Any
+
+import streamlit as st
+
+
+def get_setting(key: str, default: Any = None) -> Any:
+    """Valor de `key` no secrets.toml, ou `default` se ausente ou sem secrets (testes, CLI)"""
+    try:
+        return st.secrets.get(key, default)
+    except Exception:
+        return default
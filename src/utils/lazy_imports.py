@@ -0,0 +1,43 @@
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """Proxy de módulo que só executa o import no primeiro acesso a atributo
+
+    Usado para dependências pesadas (plotly, pandas, fpdf, jinja2) que não
+    devem entrar no cold start do Streamlit quando a funcionalidade não é usada.
+    Módulos que declaram anotações com o proxy precisam de
+    `from __future__ import annotations` para não disparar o import na definição.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "carregado" if self.__dict__["_lazy_module"] is not None else "não carregado"
+        return f"<LazyModule '{self.__name__}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Retorna proxy para o módulo `name`, importado apenas quando usado"""
+    return LazyModule(name)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from ..core.models import PersonalityScores
+from ..ui.visualizations import (
+    B5_LABELS, DISC_LABELS, b5_level, mbti_preference_color, mbti_preference_strengths
+)
+
+if TYPE_CHECKING:
+    from fpdf import FPDF
+
+RGB = Tuple[int, int, int]
+
+GRID_COLOR: RGB = (210, 214, 222)
+AXIS_COLOR: RGB = (120, 126, 138)
+TEXT_COLOR: RGB = (40, 44, 52)
+REFERENCE_COLOR: RGB = (150, 150, 150)
+
+
+def hex_to_rgb(value: str) -> RGB:
+    value = value.lstrip('#')
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+class PDFChartDrawer:
+    """Gráficos vetoriais desenhados com primitivas do FPDF (sem Plotly/Kaleido)
+
+    Reproduz o radar DISC, as barras Big Five e as preferências MBTI do
+    `PersonalityVisualizer` usando as mesmas cores de série, sobre fundo
+    branco para impressão. Cada método desenha dentro da caixa informada,
+    preserva fonte/cores/traço do documento e retorna a altura ocupada.
+    """
+
+    def __init__(self, color_scheme: Dict):
+        self.primary = hex_to_rgb(color_scheme['primary'])
+        self.disc_colors = {key: hex_to_rgb(color) for key, color in color_scheme['disc_colors'].items()}
+        self.b5_colors = {key: hex_to_rgb(color) for key, color in color_scheme['b5_colors'].items()}
+
+    def _label(self, pdf: FPDF, x: float, y: float, w: float, text: str, align: str = 'C') -> None:
+        """Texto de uma linha centrado verticalmente em `y`"""
+        height = pdf.font_size
+        pdf.set_xy(x, y - height / 2)
+        pdf.cell(w, height, text, align=align)
+
+    def disc_radar(self, pdf: FPDF, scores: PersonalityScores, x: float, y: float, size: float) -> float:
+        """Radar DISC (eixos no sentido horário a partir do topo) com a média populacional"""
+
+        keys = list(DISC_LABELS)
+        label_margin = 16
+        cx, cy = x + size / 2, y + size / 2
+        radius = size / 2 - label_margin
+        angles = [-math.pi / 2 + i * 2 * math.pi / len(keys) for i in range(len(keys))]
+
+        def polygon(values: List[float]) -> List[Tuple[float, float]]:
+            return [
+                (cx + radius * r * math.cos(a), cy + radius * r * math.sin(a))
+                for r, a in ((min(max(v, 0), 100) / 100, a) for v, a in zip(values, angles))
+            ]
+
+        with pdf.local_context(line_width=0.2, draw_color=GRID_COLOR, text_color=TEXT_COLOR, font_size=8):
+            for level in (25, 50, 75, 100):
+                pdf.polygon(polygon([level] * len(keys)))
+            for angle in angles:
+                pdf.line(cx, cy, cx + radius * math.cos(angle), cy + radius * math.sin(angle))
+
+            # Média populacional (distribuição equilibrada)
+            with pdf.local_context(draw_color=REFERENCE_COLOR, line_width=0.4):
+                pdf.set_dash_pattern(dash=1.5, gap=1)
+                pdf.polygon(polygon([25] * len(keys)))
+                pdf.set_dash_pattern()
+
+            values = [scores.disc.get(key, 0) for key in keys]
+            points = polygon(values)
+            with pdf.local_context(fill_color=self.primary, fill_opacity=0.3):
+                pdf.polygon(points, style='F')
+            with pdf.local_context(draw_color=self.primary, line_width=0.6):
+                pdf.polygon(points)
+
+            for key, value, angle, (px, py) in zip(keys, values, angles, points):
+                with pdf.local_context(fill_color=self.disc_colors[key[-1]]):
+                    pdf.rect(px - 1.2, py - 1.2, 2.4, 2.4, style='F')
+
+                lx = cx + (radius + label_margin / 2) * math.cos(angle)
+                ly = cy + (radius + label_margin / 2) * math.sin(angle)
+                self._label(pdf, lx - 15, ly - 2, 30, DISC_LABELS[key])
+                self._label(pdf, lx - 15, ly + 2, 30, f"{value:.0f}%")
+
+            # Legenda
+            legend_y = y + size + 3
+            with pdf.local_context(draw_color=self.primary, line_width=0.6):
+                pdf.line(x + 4, legend_y, x + 10, legend_y)
+            self._label(pdf, x + 12, legend_y, 30, 'Seu Perfil', align='L')
+            with pdf.local_context(draw_color=REFERENCE_COLOR, line_width=0.4):
+                pdf.set_dash_pattern(dash=1.5, gap=1)
+                pdf.line(x + 42, legend_y, x + 48, legend_y)
+                pdf.set_dash_pattern()
+            self._label(pdf, x + 50, legend_y, 40, 'Média Populacional', align='L')
+
+        return size + 6
+
+    def big_five_bars(
+        self, pdf: FPDF, scores: PersonalityScores, x: float, y: float, w: float, h: float
+    ) -> float:
+        """Barras de percentil Big Five com a referência de 50%"""
+
+        axis_width, label_height = 10, 8
+        plot_x, plot_w = x + axis_width, w - axis_width
+        plot_y, plot_h = y + 6, h - 6 - label_height
+        base_y = plot_y + plot_h
+
+        def y_of(value: float) -> float:
+            return base_y - plot_h * min(max(value, 0), 100) / 100
+
+        with pdf.local_context(line_width=0.2, draw_color=GRID_COLOR, text_color=TEXT_COLOR, font_size=7):
+            for tick in (0, 25, 50, 75, 100):
+                pdf.line(plot_x, y_of(tick), plot_x + plot_w, y_of(tick))
+                self._label(pdf, x, y_of(tick), axis_width - 1, f"{tick}", align='R')
+
+            slot = plot_w / len(B5_LABELS)
+            for i, (key, label) in enumerate(B5_LABELS.items()):
+                value = scores.big_five.get(key, 0)
+                bar_x = plot_x + i * slot + slot * 0.2
+                with pdf.local_context(fill_color=self.b5_colors[key.split('_')[1]]):
+                    pdf.rect(bar_x, y_of(value), slot * 0.6, base_y - y_of(value), style='F')
+
+                self._label(pdf, plot_x + i * slot, y_of(value) - 3, slot, f"{value:.0f}% · {b5_level(value)}")
+                with pdf.local_context(font_size=6):
+                    self._label(pdf, plot_x + i * slot, base_y + label_height / 2, slot, label)
+
+            with pdf.local_context(draw_color=REFERENCE_COLOR, line_width=0.4):
+                pdf.set_dash_pattern(dash=1.5, gap=1)
+                pdf.line(plot_x, y_of(50), plot_x + plot_w, y_of(50))
+                pdf.set_dash_pattern()
+
+            with pdf.local_context(draw_color=AXIS_COLOR, line_width=0.3):
+                pdf.line(plot_x, base_y, plot_x + plot_w, base_y)
+
+        return h
+
+    def mbti_preferences(
+        self, pdf: FPDF, scores: PersonalityScores, x: float, y: float, w: float, h: float
+    ) -> float:
+        """Barras divergentes de intensidade por par MBTI (-100 a 100)"""
+
+        strengths = mbti_preference_strengths(scores)
+        label_width, axis_height = 16, 8
+        plot_x, plot_w = x + label_width, w - label_width
+        center_x = plot_x + plot_w / 2
+        row_h = (h - axis_height) / len(strengths)
+
+        def x_of(value: float) -> float:
+            return center_x + plot_w / 2 * value / 100
+
+        with pdf.local_context(line_width=0.2, draw_color=GRID_COLOR, text_color=TEXT_COLOR, font_size=8):
+            ticks = [(-75, 'Forte'), (-50, 'Moderada'), (-25, 'Leve'), (0, 'Neutro'),
+                     (25, 'Leve'), (50, 'Moderada'), (75, 'Forte')]
+            base_y = y + row_h * len(strengths)
+            for value, label in ticks:
+                pdf.line(x_of(value), y, x_of(value), base_y)
+                with pdf.local_context(font_size=6):
+                    self._label(pdf, x_of(value) - 8, base_y + axis_height / 2, 16, label)
+
+            for i, (name, value) in enumerate(strengths.items()):
+                row_y = y + i * row_h
+                bar_h = row_h * 0.6
+                bar_y = row_y + (row_h - bar_h) / 2
+                with pdf.local_context(fill_color=hex_to_rgb(mbti_preference_color(value))):
+                    pdf.rect(min(center_x, x_of(value)), bar_y, abs(x_of(value) - center_x), bar_h, style='F')
+
+                self._label(pdf, x, row_y + row_h / 2, label_width - 2, name, align='R')
+                letter = scores.mbti_type[i] if len(scores.mbti_type) > i else ''
+                offset = 3 if value >= 0 else -3
+                with pdf.local_context(font_size=10):
+                    self._label(pdf, x_of(value) + offset - 3, row_y + row_h / 2, 6, letter)
+
+            with pdf.local_context(draw_color=AXIS_COLOR, line_width=0.5):
+                pdf.line(center_x, y, center_x, base_y)
+
+        return h
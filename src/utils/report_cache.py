@@ -0,0 +1,360 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict
+from typing import BinaryIO, Callable, Dict, Iterable, Optional, Tuple
+import logging
+
+import numpy as np
+
+from ..core.cohort import CohortAnalytics
+from ..core.models import UserAssessment
+from ..services.firestore_codec import to_plain
+from .streaming import open_detached
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ARTIFACT_SUFFIX = ".bin"
+
+
+def content_hash(assessment: UserAssessment) -> str:
+    """Hash do conteúdo que determina o relatório (scores e insights)"""
+    payload = {
+        'scores': to_plain(assessment.scores),
+        'insights': to_plain(assessment.profile_insights)
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def cohort_fingerprint(cohort: CohortAnalytics) -> str:
+    """Identifica a equipe pelos membros e scores (a análise é derivada deles)"""
+    frame = cohort.frame
+    digest = hashlib.sha256()
+    digest.update("\x1f".join(map(str, frame.user_ids)).encode('utf-8'))
+    digest.update(np.ascontiguousarray(frame.scores).tobytes())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=32)
+def _hash_sources(stamps: Tuple[Tuple[str, int, int], ...]) -> str:
+    digest = hashlib.sha256()
+    for path, _, _ in stamps:
+        digest.update(path.encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def source_version(paths: Iterable[str]) -> str:
+    """Hash do conteúdo dos arquivos (pastas são percorridas) que geram os relatórios
+
+    O conteúdo só é relido quando mtime ou tamanho de algum arquivo muda.
+    """
+    stamps = []
+    for root in paths:
+        files = [root] if os.path.isfile(root) else sorted(
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(root) for name in names
+        )
+        for path in files:
+            stat = os.stat(path)
+            stamps.append((path, stat.st_mtime_ns, stat.st_size))
+    return _hash_sources(tuple(stamps))
+
+
+def report_key(
+    assessment: UserAssessment,
+    report_type: str,
+    format: str,
+    customizations: Optional[Dict] = None,
+    version: str = ""
+) -> str:
+    """Chave do artefato: (assessment_id, hash do conteúdo, tipo, formato, customizações, versão)
+
+    `version` identifica templates e código de renderização (`source_version`),
+    para que alterações neles não sirvam relatórios antigos. A data de geração
+    impressa no relatório ("Gerado em") é a do preenchimento do cache.
+    """
+
+    options = {}
+    for name, value in (customizations or {}).items():
+        options[name] = cohort_fingerprint(value) if isinstance(value, CohortAnalytics) else to_plain(value)
+
+    parts = {
+        'assessment_id': assessment.assessment_id,
+        'content': content_hash(assessment),
+        'report_type': report_type,
+        'format': format,
+        'customizations': options,
+        'version': version
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+@dataclass
+class ReportCacheStats:
+    """Contadores de uso do cache de relatórios"""
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['hit_rate'] = round(self.hit_rate, 4)
+        return data
+
+
+class ReportCache:
+    """Cache em disco de relatórios gerados, com despejo LRU por tamanho total
+
+    Artefatos são arquivos gravados atomicamente (arquivo temporário +
+    rename) sob `directory`; o horário de modificação marca o último uso e
+    orienta o despejo quando o total passa de `max_bytes`. Pedidos
+    simultâneos da mesma chave aguardam uma única renderização.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        # chave -> (tamanho, último uso); carregado do disco no primeiro acesso
+        self._index: Optional[Dict[str, tuple]] = None
+        self._bytes = 0
+        self._stats = ReportCacheStats()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ARTIFACT_SUFFIX)
+
+    def _load_index(self) -> Dict[str, tuple]:
+        """Varre o diretório uma vez por processo (chamar com `_lock` adquirido)"""
+        if self._index is None:
+            self._index = {}
+            self._bytes = 0
+            if os.path.isdir(self.directory):
+                for root, _, files in os.walk(self.directory):
+                    for name in files:
+                        if not name.endswith(ARTIFACT_SUFFIX):
+                            continue
+                        stat = os.stat(os.path.join(root, name))
+                        self._index[name[:-len(ARTIFACT_SUFFIX)]] = (stat.st_size, stat.st_mtime)
+                        self._bytes += stat.st_size
+        return self._index
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Artefato em cache (atualiza o último uso) ou None"""
+        handle = self._open(key)
+        if handle is None:
+            return None
+        with handle:
+            return handle.read()
+
+    def _open(self, key: str) -> Optional[BinaryIO]:
+        """Artefato aberto para leitura (atualiza o último uso) ou None
+
+        O arquivo aberto continua legível mesmo se for despejado em seguida.
+        """
+
+        with self._lock:
+            if key not in self._load_index():
+                return None
+        path = self._path(key)
+        try:
+            handle = open(path, 'rb')
+            os.utime(path)
+        except FileNotFoundError:
+            # Removido por outro processo
+            with self._lock:
+                self._forget(key)
+            return None
+
+        with self._lock:
+            if key in self._index:
+                self._index[key] = (self._index[key][0], time.time())
+        return handle
+
+    def put(self, key: str, data: bytes) -> None:
+        """Grava o artefato e despeja os menos usados se o limite for excedido"""
+
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            index = self._load_index()
+            self._forget(key)
+            index[key] = (len(data), time.time())
+            self._bytes += len(data)
+            self._evict()
+
+    def _write_stream(self, key: str, write: Callable[[BinaryIO], None]) -> BinaryIO:
+        """Grava o artefato direto no arquivo e o retorna aberto para leitura"""
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+                size = f.tell()
+            if size > self.max_bytes:
+                # Grande demais para o cache: servido do arquivo temporário
+                return open_detached(tmp_path)
+            os.replace(tmp_path, path)
+            # Aberto antes de entrar no índice, para que um despejo não o remova antes da leitura
+            handle = open(path, 'rb')
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            index = self._load_index()
+            self._forget(key)
+            index[key] = (size, time.time())
+            self._bytes += size
+            self._evict()
+        return handle
+
+    def _forget(self, key: str) -> None:
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[0]
+
+    def _evict(self) -> None:
+        if self._bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._bytes <= self.max_bytes:
+                break
+            self._forget(key)
+            self._stats.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        """Retorna o artefato em cache ou renderiza uma única vez por chave"""
+
+        data = self.get(key)
+        if data is not None:
+            with self._lock:
+                self._stats.hits += 1
+            return data
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self._stats.misses += 1
+            else:
+                self._stats.coalesced += 1
+
+        if not owner:
+            data = future.result()
+            if data is not None:
+                return data
+            # A renderização concorrente foi em streaming: lê o artefato do disco
+            data = self.get(key)
+            return data if data is not None else render()
+
+        try:
+            data = render()
+            try:
+                self.put(key, data)
+            except OSError as e:
+                logger.warning(f"Falha ao gravar relatório em cache: {e}")
+            future.set_result(data)
+            return data
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def open_or_write(self, key: str, write: Callable[[BinaryIO], None]) -> BinaryIO:
+        """Artefato aberto para leitura; se ausente, `write` o grava em streaming no disco
+
+        Alternativa a `get_or_render` para documentos grandes: o conteúdo não
+        é montado inteiro em memória. Pedidos simultâneos aguardam uma única
+        gravação; quem chama deve fechar o arquivo retornado.
+        """
+
+        handle = self._open(key)
+        if handle is not None:
+            with self._lock:
+                self._stats.hits += 1
+            return handle
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self._stats.misses += 1
+            else:
+                self._stats.coalesced += 1
+
+        if not owner:
+            future.result()
+            handle = self._open(key)
+            # Artefato não armazenado (acima de `max_bytes`): grava uma cópia própria
+            return handle if handle is not None else self._write_stream(key, write)
+
+        try:
+            handle = self._write_stream(key, write)
+            future.set_result(None)
+            return handle
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove todos os artefatos"""
+        with self._lock:
+            for key in list(self._load_index()):
+                self._forget(key)
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> ReportCacheStats:
+        with self._lock:
+            self._stats.entries = len(self._load_index())
+            self._stats.bytes = self._bytes
+            return ReportCacheStats(**asdict(self._stats))
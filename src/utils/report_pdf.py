@@ -0,0 +1,54 @@
+"""Documento FPDF dos relatórios, com fallback para as fontes embutidas"""
+from typing import Dict, Optional
+
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+
+FALLBACK_FAMILY = 'helvetica'
+# Posição após `cell` para os valores legados de `ln` usados pelas seções
+CELL_LN_POSITIONS = {0: (XPos.RIGHT, YPos.TOP), 1: (XPos.LMARGIN, YPos.NEXT), 2: (XPos.LEFT, YPos.NEXT)}
+# Caracteres dos textos dos relatórios que não existem no cp1252 das fontes embutidas
+CORE_FONT_REPLACEMENTS = str.maketrans({'→': '->', '←': '<-', '✓': 'v', '≥': '>=', '≤': '<='})
+
+
+class ReportPDF(FPDF):
+    """Documento A4 dos relatórios PDF
+
+    Com `fonts` (estilo -> arquivo TTF), registra as faces da família
+    `family` usada pelas seções; sem elas, a família é mapeada para a
+    Helvetica embutida e o texto é transliterado para cp1252. `multi_cell`
+    termina na margem esquerda da linha seguinte, como `cell(..., ln=True)`,
+    para que chamadas consecutivas com largura 0 ocupem a linha inteira;
+    `ln` de `cell` é convertido em `new_x`/`new_y` (obsoleto no fpdf2).
+    """
+
+    def __init__(self, family: str, fonts: Optional[Dict[str, str]] = None):
+        self.report_family = family.lower()
+        self.unicode_fonts = bool(fonts)
+        super().__init__('P', 'mm', 'A4')
+        self.set_auto_page_break(auto=True, margin=15)
+
+        if self.unicode_fonts:
+            for style, path in fonts.items():
+                self.add_font(family, style, path)
+        else:
+            self.core_fonts_encoding = 'cp1252'
+        self.set_font(family, '', 12)
+
+    def set_font(self, family: Optional[str] = None, style: str = '', size: float = 0) -> None:
+        if family and not self.unicode_fonts and family.lower() == self.report_family:
+            family = FALLBACK_FAMILY
+        super().set_font(family, style, size)
+
+    def normalize_text(self, text: str) -> str:
+        if not self.is_ttf_font:
+            text = text.translate(CORE_FONT_REPLACEMENTS).encode('cp1252', 'replace').decode('cp1252')
+        return super().normalize_text(text)
+
+    def multi_cell(self, *args, new_x: XPos = XPos.LMARGIN, new_y: YPos = YPos.NEXT, **kwargs):
+        return super().multi_cell(*args, new_x=new_x, new_y=new_y, **kwargs)
+
+    def cell(self, *args, ln: Optional[int] = None, **kwargs):
+        if ln is not None:
+            kwargs['new_x'], kwargs['new_y'] = CELL_LN_POSITIONS[int(ln)]
+        return super().cell(*args, **kwargs)
@@ -1,25 +1,163 @@
+from __future__ import annotations
+
+import functools
 import io
 import json
 import base64
+import os
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, List, Optional, Tuple
 from dataclasses import asdict
-import pandas as pd
-from fpdf import FPDF
-import plotly.graph_objects as go
-import plotly.io as pio
-from jinja2 import Template
+import logging
 import streamlit as st
 
+from ..core.cohort import CohortAnalytics
 from ..core.models import UserAssessment, PersonalityScores, ProfileInsights
+from .config import get_setting
 from ..ui.visualizations import PersonalityVisualizer
+from .chart_renderer import ChartRasterizer, shared_rasterizer
+from .lazy_imports import lazy_module
+from .pdf_charts import PDFChartDrawer
+from .report_cache import ReportCache, report_key, source_version
+from .streaming import encode_chunks, spool_chunks, write_chunks
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+    from fpdf import FPDF
+    from jinja2 import Environment, Template
+
+# Renderização de relatórios carrega suas dependências apenas quando usada
+pd = lazy_module("pandas")
+fpdf = lazy_module("fpdf")
+pio = lazy_module("plotly.io")
+jinja2 = lazy_module("jinja2")
+
+logger = logging.getLogger(__name__)
+
+REPORT_FONT_FAMILY = 'DejaVu'
+# Faces usadas pelas seções do PDF (regular e negrito)
+REPORT_FONT_FILES = {'': 'DejaVuSansCondensed.ttf', 'B': 'DejaVuSansCondensed-Bold.ttf'}
+FONT_DIRS = ['fonts', '/usr/share/fonts/truetype/dejavu', '/usr/share/fonts/dejavu']
+
+
+def report_font_path(filename: str) -> Optional[str]:
+    """Caminho de um arquivo de fonte em REPORT_FONT_DIR, no diretório atual ou no sistema
+
+    REPORT_FONT_DIR vem da variável de ambiente (usada pela linha de
+    comando do lote) ou, sem ela, dos secrets do Streamlit.
+    """
+    font_dir = os.environ.get("REPORT_FONT_DIR") or get_setting("REPORT_FONT_DIR", "")
+    directories = [font_dir, os.getcwd()] + FONT_DIRS
+    for directory in directories:
+        if directory and os.path.isfile(os.path.join(directory, filename)):
+            return os.path.join(directory, filename)
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def report_fonts() -> Optional[Dict[str, str]]:
+    """Arquivos das faces DejaVu por estilo, resolvidos uma vez por processo
+
+    None se alguma face faltar: os PDFs usam então a Helvetica embutida.
+    """
+    fonts = {style: report_font_path(filename) for style, filename in REPORT_FONT_FILES.items()}
+    missing = [REPORT_FONT_FILES[style] for style, path in fonts.items() if path is None]
+    if missing:
+        logger.warning(f"Fontes não encontradas ({', '.join(missing)}); PDFs usarão Helvetica")
+        return None
+    return fonts
+
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+DEFAULT_TEMPLATE = 'default_report.html'
+# Código que determina o conteúdo dos relatórios; entra na versão da chave do cache
+RENDERER_SOURCES = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ('reports.py', 'report_pdf.py', 'pdf_charts.py', 'chart_renderer.py')
+]
+
+
+def create_report_environment(
+    template_dir: str = TEMPLATE_DIR,
+    bytecode_dir: Optional[str] = None,
+    auto_reload: bool = False
+) -> Environment:
+    """Ambiente Jinja2 dos relatórios HTML
+
+    Templates compilados ficam em memória no ambiente; com `bytecode_dir`,
+    o bytecode também é gravado em disco e reaproveitado entre processos e
+    reinícios. Com `auto_reload`, templates alterados são recompilados.
+    """
+    bytecode_cache = None
+    if bytecode_dir:
+        try:
+            os.makedirs(bytecode_dir, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(bytecode_dir)
+        except OSError as e:
+            logger.warning(f"Cache de bytecode de templates indisponível: {e}")
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_dir),
+        bytecode_cache=bytecode_cache,
+        auto_reload=auto_reload
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def report_environment() -> Environment:
+    """Ambiente compartilhado pelo processo (todas as sessões e geradores)
+
+    Recarrega templates alterados quando REPORT_TEMPLATES_AUTO_RELOAD está
+    ativo; por padrão segue o `server.runOnSave` do Streamlit (modo dev).
+    """
+    auto_reload = get_setting("REPORT_TEMPLATES_AUTO_RELOAD", None)
+    if auto_reload is None:
+        auto_reload = st.get_option("server.runOnSave")
+    return create_report_environment(
+        bytecode_dir=get_setting("REPORT_TEMPLATE_CACHE_DIR", ".neuromap/templates"),
+        auto_reload=bool(auto_reload)
+    )
 
 class AdvancedReportGenerator:
     """Gerador avançado de relatórios com múltiplos formatos e personalização"""
     
-    def __init__(self):
+    # Papel natural em equipe e contribuição típica por estilo DISC dominante
+    TEAM_ROLES = {
+        'D': ('Direcionador', 'decisões rápidas e foco em resultados'),
+        'I': ('Comunicador', 'engajamento, persuasão e energia coletiva'),
+        'S': ('Apoiador', 'estabilidade, cooperação e ritmo consistente'),
+        'C': ('Analista', 'precisão, qualidade e análise criteriosa')
+    }
+    
+    COLLABORATION_TIPS = {
+        'D': ['Explique o raciocínio por trás das decisões', 'Reserve espaço para opiniões mais ponderadas'],
+        'I': ['Documente acordos feitos em conversas', 'Acompanhe os detalhes após o entusiasmo inicial'],
+        'S': ['Manifeste discordâncias cedo', 'Negocie prazos antes de assumir novas demandas'],
+        'C': ['Compartilhe análises parciais antes da versão final', 'Aceite margens de erro em decisões urgentes']
+    }
+    
+    def __init__(
+        self,
+        cache: Optional[ReportCache] = None,
+        rasterizer: Optional[ChartRasterizer] = None,
+        environment: Optional[Environment] = None
+    ):
         self.visualizer = PersonalityVisualizer()
-        self.templates = self._load_report_templates()
+        self.pdf_charts = PDFChartDrawer(self.visualizer.color_scheme)
+        self.cache = cache
+        self.rasterizer = rasterizer if rasterizer is not None else shared_rasterizer
+        self._environment = environment
+    
+    @property
+    def environment(self) -> Environment:
+        """Ambiente Jinja2 dos templates HTML (o do processo, salvo se injetado)"""
+        return self._environment if self._environment is not None else report_environment()
+    
+    def _get_template(self, report_type: str) -> Template:
+        """Template do tipo de relatório, ou o padrão se não houver um específico"""
+        try:
+            return self.environment.get_template(f"{report_type}_report.html")
+        except jinja2.TemplateNotFound:
+            return self.environment.get_template(DEFAULT_TEMPLATE)
     
     def generate_comprehensive_report(
         self,
@@ -28,10 +166,37 @@ class AdvancedReportGenerator:
         format: str = "pdf",
         customizations: Dict = None
     ) -> bytes:
-        """Gera relatório abrangente baseado no tipo e formato especificados"""
+        """Gera relatório abrangente baseado no tipo e formato especificados
+        
+        Com cache configurado, relatórios já gerados para o mesmo conteúdo,
+        tipo, formato, customizações e versão de templates e código são
+        servidos do disco; a data "Gerado em" é a da geração original.
+        """
         
         customizations = customizations or {}
         
+        if self.cache is None:
+            return self._render_report(assessment, report_type, format, customizations)
+        
+        key = report_key(assessment, report_type, format, customizations, self._renderer_version(format))
+        return self.cache.get_or_render(
+            key, lambda: self._render_report(assessment, report_type, format, customizations)
+        )
+    
+    def _renderer_version(self, format: str) -> str:
+        """Versão do código de renderização e, para HTML, dos templates do ambiente"""
+        paths = list(RENDERER_SOURCES)
+        if format == "html":
+            paths += getattr(self.environment.loader, 'searchpath', [TEMPLATE_DIR])
+        return source_version(paths)
+    
+    def _render_report(
+        self,
+        assessment: UserAssessment,
+        report_type: str,
+        format: str,
+        customizations: Dict
+    ) -> bytes:
         if format == "pdf":
             return self._generate_pdf_report(assessment, report_type, customizations)
         elif format == "html":
@@ -51,12 +216,12 @@ class AdvancedReportGenerator:
     ) -> bytes:
         """Gera relatório PDF profissional com gráficos integrados"""
         
-        pdf = FPDF('P', 'mm', 'A4')
-        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf = self._new_pdf()
         
-        # Configurações de fonte
-        pdf.add_font('DejaVu', '', 'DejaVuSansCondensed.ttf', uni=True)
-        pdf.set_font('DejaVu', '', 12)
+        # DISC, Big Five e MBTI são desenhados como vetores; os demais gráficos
+        # são rasterizados em paralelo antes da montagem
+        include_charts = customizations.get("include_charts", True)
+        charts = self._render_pdf_charts(assessment.scores, report_type, customizations)
         
         # Página de capa
         self._add_cover_page(pdf, assessment, report_type)
@@ -66,13 +231,17 @@ class AdvancedReportGenerator:
             self._add_executive_summary(pdf, assessment)
         
         # Análise DISC
-        self._add_disc_analysis(pdf, assessment.scores)
+        self._add_disc_analysis(pdf, assessment.scores, include_charts)
         
         # Análise Big Five
-        self._add_big_five_analysis(pdf, assessment.scores)
+        self._add_big_five_analysis(pdf, assessment.scores, include_charts)
         
         # Análise MBTI
-        self._add_mbti_analysis(pdf, assessment.scores)
+        self._add_mbti_analysis(pdf, assessment.scores, include_charts)
+        
+        # Visão integrada (mistura de estilos e confiança dos resultados)
+        if report_type == "complete" and (charts.get('sunburst') or charts.get('confidence')):
+            self._add_integrated_view(pdf, charts.get('sunburst'), charts.get('confidence'))
         
         # Insights e recomendações
         if assessment.profile_insights:
@@ -88,15 +257,21 @@ class AdvancedReportGenerator:
             self._add_action_plan(pdf, assessment)
         
         elif report_type == "team":
-            self._add_team_dynamics(pdf, assessment)
-            self._add_collaboration_tips(pdf, assessment)
+            cohort = customizations.get("cohort")
+            self._add_team_dynamics(pdf, assessment, cohort)
+            self._add_collaboration_tips(pdf, assessment, cohort)
         
         # Apêndices
         if customizations.get("include_methodology", True):
             self._add_methodology_appendix(pdf)
         
         # Converte para bytes
-        return pdf.output(dest='S').encode('latin1')
+        return bytes(pdf.output())
+    
+    def _new_pdf(self) -> FPDF:
+        """Documento A4 com as faces da fonte dos relatórios registradas"""
+        from .report_pdf import ReportPDF
+        return ReportPDF(REPORT_FONT_FAMILY, report_fonts())
     
     def _add_cover_page(self, pdf: FPDF, assessment: UserAssessment, report_type: str) -> None:
         """Adiciona página de capa profissional"""
@@ -149,6 +324,7 @@ class AdvancedReportGenerator:
         pdf.set_font('DejaVu', '', 10)
         pdf.set_text_color(128, 128, 128)
         pdf.cell(0, 5, 'Relatório Confidencial - Uso Pessoal e Profissional', ln=True, align='C')
+        # Com cache, é a data em que o relatório entrou no cache, não a do download
         pdf.cell(0, 5, f'Gerado em {datetime.now().strftime("%d/%m/%Y às %H:%M")}', ln=True, align='C')
     
     def _add_executive_summary(self, pdf: FPDF, assessment: UserAssessment) -> None:
@@ -195,7 +371,39 @@ class AdvancedReportGenerator:
             for i, area in enumerate(assessment.profile_insights.development_areas[:3], 1):
                 pdf.cell(0, 6, f"{i}. {area}", ln=True)
     
-    def _add_disc_analysis(self, pdf: FPDF, scores: PersonalityScores) -> None:
+    def _render_pdf_charts(
+        self,
+        scores: PersonalityScores,
+        report_type: str,
+        customizations: Dict
+    ) -> Dict[str, Optional[bytes]]:
+        """PNGs dos gráficos sem equivalente vetorial, rasterizados concorrentemente
+        
+        Apenas o relatório completo usa gráficos rasterizados (composição do
+        perfil e confiança); os demais são desenhados por `PDFChartDrawer`.
+        """
+        
+        if not customizations.get("include_charts", True) or report_type != "complete":
+            return {}
+        
+        return self.rasterizer.render_many({
+            'sunburst': self.visualizer.create_personality_blend_sunburst(scores),
+            'confidence': self.visualizer.create_confidence_indicators(scores)
+        })
+    
+    def _add_chart(self, pdf: FPDF, chart_image: Optional[bytes], width: float, spacing: float) -> None:
+        """Insere o PNG na posição atual (sem arquivos temporários)"""
+        if chart_image:
+            pdf.image(io.BytesIO(chart_image), x=10, y=None, w=width)
+            pdf.ln(spacing)
+    
+    def _add_vector_chart(self, pdf: FPDF, draw) -> None:
+        """Desenha o gráfico na posição atual e avança o cursor pela altura ocupada"""
+        y = pdf.get_y()
+        height = draw(y)
+        pdf.set_y(y + height + 5)
+    
+    def _add_disc_analysis(self, pdf: FPDF, scores: PersonalityScores, include_chart: bool = True) -> None:
         """Adiciona análise DISC detalhada"""
         
         pdf.add_page()
@@ -203,17 +411,9 @@ class AdvancedReportGenerator:
         pdf.cell(0, 10, 'Análise DISC', ln=True)
         pdf.ln(5)
         
-        # Gráfico DISC (convertido para imagem)
-        disc_chart = self.visualizer.create_disc_radar_chart(scores)
-        chart_image = self._plotly_to_image(disc_chart)
-        
-        if chart_image:
-            # Salva imagem temporariamente e adiciona ao PDF
-            chart_path = f"/tmp/disc_chart_{datetime.now().timestamp()}.png"
-            with open(chart_path, 'wb') as f:
-                f.write(chart_image)
-            pdf.image(chart_path, x=10, y=None, w=100)
-            pdf.ln(80)
+        # Gráfico DISC (vetorial)
+        if include_chart:
+            self._add_vector_chart(pdf, lambda y: self.pdf_charts.disc_radar(pdf, scores, 10, y, 90))
         
         # Interpretação dos scores
         pdf.set_font('DejaVu', 'B', 12)
@@ -234,7 +434,7 @@ class AdvancedReportGenerator:
             pdf.multi_cell(0, 6, f"{name} ({value:.0f}% - {level}): {description}")
             pdf.ln(2)
     
-    def _add_big_five_analysis(self, pdf: FPDF, scores: PersonalityScores) -> None:
+    def _add_big_five_analysis(self, pdf: FPDF, scores: PersonalityScores, include_chart: bool = True) -> None:
         """Adiciona análise Big Five"""
         
         pdf.add_page()
@@ -243,15 +443,8 @@ class AdvancedReportGenerator:
         pdf.ln(5)
         
         # Gráfico Big Five
-        b5_chart = self.visualizer.create_big_five_bars(scores)
-        chart_image = self._plotly_to_image(b5_chart)
-        
-        if chart_image:
-            chart_path = f"/tmp/b5_chart_{datetime.now().timestamp()}.png"
-            with open(chart_path, 'wb') as f:
-                f.write(chart_image)
-            pdf.image(chart_path, x=10, y=None, w=120)
-            pdf.ln(90)
+        if include_chart:
+            self._add_vector_chart(pdf, lambda y: self.pdf_charts.big_five_bars(pdf, scores, 10, y, 120, 80))
         
         # Interpretações detalhadas
         b5_details = {
@@ -282,7 +475,7 @@ class AdvancedReportGenerator:
             pdf.set_font('DejaVu', '', 11)
             pdf.ln(3)
     
-    def _add_mbti_analysis(self, pdf: FPDF, scores: PersonalityScores) -> None:
+    def _add_mbti_analysis(self, pdf: FPDF, scores: PersonalityScores, include_chart: bool = True) -> None:
         """Adiciona análise MBTI"""
         
         pdf.add_page()
@@ -290,6 +483,10 @@ class AdvancedReportGenerator:
         pdf.cell(0, 10, f'Análise MBTI - Tipo {scores.mbti_type}', ln=True)
         pdf.ln(5)
         
+        # Gráfico de preferências
+        if include_chart:
+            self._add_vector_chart(pdf, lambda y: self.pdf_charts.mbti_preferences(pdf, scores, 10, y, 120, 60))
+        
         # Descrição do tipo
         type_description = self._get_mbti_type_description(scores.mbti_type)
         pdf.set_font('DejaVu', '', 11)
@@ -319,32 +516,337 @@ class AdvancedReportGenerator:
             pdf.set_font('DejaVu', '', 11)
             pdf.ln(2)
     
-    def _generate_html_report(
+    def _add_integrated_view(
+        self,
+        pdf: FPDF,
+        sunburst_image: Optional[bytes],
+        confidence_image: Optional[bytes]
+    ) -> None:
+        """Adiciona a composição do perfil e os indicadores de confiança"""
+        
+        pdf.add_page()
+        pdf.set_font('DejaVu', 'B', 16)
+        pdf.cell(0, 10, 'Visão Integrada do Perfil', ln=True)
+        pdf.ln(5)
+        
+        self._add_chart(pdf, sunburst_image, width=110, spacing=85)
+        self._add_chart(pdf, confidence_image, width=120, spacing=90)
+    
+    def _add_bullet_list(self, pdf: FPDF, title: str, items: List[str]) -> None:
+        """Subtítulo seguido de itens com marcador; não escreve nada sem itens"""
+
+        if not items:
+            return
+        pdf.set_font('DejaVu', 'B', 12)
+        pdf.cell(0, 8, title, ln=True)
+        pdf.set_font('DejaVu', '', 11)
+        for item in items:
+            pdf.multi_cell(0, 6, f"• {item}")
+        pdf.ln(4)
+
+    def _add_insights_section(self, pdf: FPDF, insights: ProfileInsights) -> None:
+        """Adiciona insights do perfil e recomendações de carreira"""
+
+        pdf.add_page()
+        pdf.set_font('DejaVu', 'B', 16)
+        pdf.cell(0, 10, 'Insights e Recomendações', ln=True)
+        pdf.ln(5)
+
+        if insights.summary:
+            pdf.set_font('DejaVu', '', 11)
+            pdf.multi_cell(0, 6, insights.summary)
+            pdf.ln(4)
+
+        for title, text in [('Estilo de Comunicação:', insights.communication_style),
+                            ('Estilo de Liderança:', insights.leadership_style)]:
+            if text:
+                pdf.set_font('DejaVu', 'B', 12)
+                pdf.cell(0, 8, title, ln=True)
+                pdf.set_font('DejaVu', '', 11)
+                pdf.multi_cell(0, 6, text)
+                pdf.ln(4)
+
+        self._add_bullet_list(pdf, 'Sugestões de Carreira:', insights.career_suggestions)
+
+    def _add_detailed_analysis(self, pdf: FPDF, assessment: UserAssessment) -> None:
+        """Adiciona a tabela de pontuações e os pontos fortes e de desenvolvimento completos"""
+
+        pdf.add_page()
+        pdf.set_font('DejaVu', 'B', 16)
+        pdf.cell(0, 10, 'Análise Detalhada', ln=True)
+        pdf.ln(5)
+
+        pdf.set_font('DejaVu', 'B', 11)
+        for header, width in [('Dimensão', 70), ('Pontuação', 40), ('Nível', 70)]:
+            pdf.cell(width, 8, header, border=1)
+        pdf.ln()
+
+        rows = [
+            (f"DISC {k.replace('DISC_', '')}", v, self._get_score_level(v))
+            for k, v in assessment.scores.disc.items()
+        ] + [
+            (f"Big Five {k.replace('B5_', '')}", v, self._get_percentile_interpretation(v))
+            for k, v in assessment.scores.big_five.items()
+        ]
+        pdf.set_font('DejaVu', '', 10)
+        for dimension, score, level in rows:
+            pdf.cell(70, 7, dimension, border=1)
+            pdf.cell(40, 7, f"{score:.1f}", border=1)
+            pdf.cell(70, 7, level, border=1)
+            pdf.ln()
+        pdf.ln(6)
+
+        insights = assessment.profile_insights
+        if insights:
+            self._add_bullet_list(pdf, 'Pontos Fortes:', insights.strengths)
+            self._add_bullet_list(pdf, 'Áreas de Desenvolvimento:', insights.development_areas)
+
+    def _add_development_plan(self, pdf: FPDF, assessment: UserAssessment) -> None:
+        """Adiciona o plano de desenvolvimento a partir das recomendações de crescimento"""
+
+        pdf.add_page()
+        pdf.set_font('DejaVu', 'B', 16)
+        pdf.cell(0, 10, 'Plano de Desenvolvimento', ln=True)
+        pdf.ln(5)
+
+        insights = assessment.profile_insights
+        recommendations = insights.growth_recommendations if insights else []
+        if not recommendations:
+            pdf.set_font('DejaVu', '', 11)
+            pdf.multi_cell(0, 6, 'Converse com um profissional de desenvolvimento para definir metas a partir deste perfil.')
+            return
+
+        for i, recommendation in enumerate(recommendations, 1):
+            pdf.set_font('DejaVu', 'B', 12)
+            pdf.cell(0, 8, f'Meta {i}', ln=True)
+            pdf.set_font('DejaVu', '', 11)
+            pdf.multi_cell(0, 6, recommendation)
+            pdf.ln(3)
+
+    def _add_coaching_insights(self, pdf: FPDF, assessment: UserAssessment) -> None:
+        """Adiciona sinais de estresse e notas de compatibilidade para sessões de coaching"""
+
+        pdf.add_page()
+        pdf.set_font('DejaVu', 'B', 16)
+        pdf.cell(0, 10, 'Insights para Coaching', ln=True)
+        pdf.ln(5)
+
+        dominant_disc, strength = assessment.scores.get_dominant_disc()
+        pdf.set_font('DejaVu', '', 11)
+        pdf.multi_cell(0, 6, (
+            f"Com predominância {dominant_disc} ({strength:.0f}%) e tipo {assessment.scores.mbti_type}, "
+            f"as conversas tendem a render mais quando orientadas para "
+            f"{self._get_style_orientation(dominant_disc, assessment.scores.mbti_type)}."
+        ))
+        pdf.ln(4)
+
+        insights = assessment.profile_insights
+        if insights:
+            self._add_bullet_list(pdf, 'Sinais de Estresse:', insights.stress_indicators)
+            self._add_bullet_list(pdf, 'Notas de Compatibilidade:', [
+                f"{other}: {note}" for other, note in insights.compatibility_notes.items()
+            ])
+
+    def _add_action_plan(self, pdf: FPDF, assessment: UserAssessment) -> None:
+        """Adiciona o plano de ação: áreas de desenvolvimento pareadas com recomendações"""
+
+        pdf.ln(5)
+        pdf.set_font('DejaVu', 'B', 14)
+        pdf.cell(0, 10, 'Plano de Ação', ln=True)
+
+        insights = assessment.profile_insights
+        if not insights:
+            return
+
+        for i, area in enumerate(insights.development_areas, 1):
+            pdf.set_font('DejaVu', 'B', 12)
+            pdf.multi_cell(0, 8, f"{i}. {area}")
+            if i <= len(insights.growth_recommendations):
+                pdf.set_font('DejaVu', '', 11)
+                pdf.multi_cell(0, 6, f"Ação sugerida: {insights.growth_recommendations[i - 1]}")
+            pdf.ln(2)
+
+    def _add_methodology_appendix(self, pdf: FPDF) -> None:
+        """Adiciona o apêndice sobre os instrumentos e limites da avaliação"""
+
+        pdf.add_page()
+        pdf.set_font('DejaVu', 'B', 16)
+        pdf.cell(0, 10, 'Apêndice: Metodologia', ln=True)
+        pdf.ln(5)
+
+        pdf.set_font('DejaVu', '', 11)
+        for paragraph in [
+            "DISC: estilos comportamentais (Dominância, Influência, Estabilidade e Conformidade), "
+            "expressos como a participação percentual de cada estilo no perfil.",
+            "Big Five: os cinco grandes fatores (Abertura, Conscienciosidade, Extroversão, Amabilidade "
+            "e Neuroticismo), em escala de 0 a 100.",
+            "MBTI: preferências em quatro eixos (E/I, S/N, T/F, J/P) que compõem o tipo de quatro letras.",
+            "Os resultados descrevem tendências e não devem ser usados isoladamente em decisões de "
+            "seleção ou avaliação de desempenho."
+        ]:
+            pdf.multi_cell(0, 6, paragraph)
+            pdf.ln(2)
+
+    def _add_team_dynamics(
         self,
+        pdf: FPDF,
         assessment: UserAssessment,
-        report_type: str,
-        customizations: Dict
-    ) -> bytes:
-        """Gera relatório HTML interativo"""
+        cohort: Optional[CohortAnalytics] = None
+    ) -> None:
+        """Adiciona dinâmica de equipe: papel individual e, com equipe, composição do grupo"""
+        
+        pdf.add_page()
+        pdf.set_font('DejaVu', 'B', 16)
+        pdf.cell(0, 10, 'Dinâmica de Equipe', ln=True)
+        pdf.ln(5)
+        
+        dominant_disc, strength = assessment.scores.get_dominant_disc()
+        if dominant_disc in self.TEAM_ROLES:
+            role, contribution = self.TEAM_ROLES[dominant_disc]
+            pdf.set_font('DejaVu', 'B', 12)
+            pdf.cell(0, 8, f'Seu Papel Natural: {role}', ln=True)
+            pdf.set_font('DejaVu', '', 11)
+            pdf.multi_cell(0, 6, f"Com predominância {dominant_disc} ({strength:.0f}%), você tende a contribuir com {contribution}.")
+            pdf.ln(5)
+        
+        if cohort is None or len(cohort) < 2:
+            return
+        
+        team = self._team_summary(cohort)
+        
+        pdf.set_font('DejaVu', 'B', 12)
+        pdf.cell(0, 8, f"Composição da Equipe ({team['size']} membros):", ln=True)
+        pdf.set_font('DejaVu', '', 11)
+        for code, share in team['disc']['dominant_share'].items():
+            pdf.cell(0, 6, f"{self.TEAM_ROLES[code][0]} ({code}): {share:.0f}% da equipe", ln=True)
+        pdf.ln(3)
+        
+        preferences = team['mbti']['preference_share']
+        pdf.multi_cell(0, 6, (
+            f"Preferências MBTI: {preferences.get('E', 0):.0f}% extrovertidos, "
+            f"{preferences.get('N', 0):.0f}% intuitivos, {preferences.get('T', 0):.0f}% orientados "
+            f"à lógica e {preferences.get('J', 0):.0f}% estruturados."
+        ))
+        pdf.multi_cell(0, 6, f"Coesão de perfis: {team['cohesion']:+.2f} ({self._interpret_cohesion(team['cohesion'])})")
+        pdf.ln(3)
+        
+        # Posição do avaliado em relação à média da equipe
+        stats = team['dimension_stats']
+        pdf.set_font('DejaVu', 'B', 12)
+        pdf.cell(0, 8, 'Você vs Média da Equipe:', ln=True)
+        pdf.set_font('DejaVu', '', 11)
+        for key, value in assessment.scores.disc.items():
+            if key in stats:
+                pdf.cell(0, 6, f"{key.replace('DISC_', '')}: {value:.0f}% (equipe: {stats[key]['mean']:.0f}%)", ln=True)
+    
+    def _add_collaboration_tips(
+        self,
+        pdf: FPDF,
+        assessment: UserAssessment,
+        cohort: Optional[CohortAnalytics] = None
+    ) -> None:
+        """Adiciona dicas de colaboração, incluindo estilos pouco representados na equipe"""
+        
+        pdf.ln(5)
+        pdf.set_font('DejaVu', 'B', 14)
+        pdf.cell(0, 10, 'Dicas de Colaboração', ln=True)
+        pdf.set_font('DejaVu', '', 11)
         
-        template_name = f"{report_type}_report.html"
-        template = self.templates.get(template_name, self.templates['default_report.html'])
+        dominant_disc, _ = assessment.scores.get_dominant_disc()
+        for tip in self.COLLABORATION_TIPS.get(dominant_disc, []):
+            pdf.multi_cell(0, 6, f"• {tip}")
+        
+        if cohort is None or len(cohort) < 2:
+            return
+        
+        shares = self._team_summary(cohort)['disc']['dominant_share']
+        underrepresented = [code for code, share in shares.items() if share < 10]
+        if underrepresented:
+            pdf.ln(3)
+            pdf.set_font('DejaVu', 'B', 12)
+            pdf.cell(0, 8, 'Estilos Pouco Representados:', ln=True)
+            pdf.set_font('DejaVu', '', 11)
+            for code in underrepresented:
+                role, contribution = self.TEAM_ROLES[code]
+                pdf.multi_cell(0, 6, f"• {role} ({code}): a equipe pode precisar compensar {contribution}.")
+    
+    def _team_summary(self, cohort: CohortAnalytics) -> Dict:
+        """Resumo do grupo, calculado uma vez por instância de análise"""
+        if getattr(cohort, '_report_summary', None) is None:
+            cohort._report_summary = cohort.summary()
+        return cohort._report_summary
+    
+    def _interpret_cohesion(self, cohesion: float) -> str:
+        if cohesion >= 0.2:
+            return "perfis semelhantes, risco de pontos cegos"
+        elif cohesion <= -0.05:
+            return "perfis bastante diversos, atenção à comunicação"
+        else:
+            return "diversidade equilibrada"
+    
+    def stream_html_report(
+        self,
+        assessment: UserAssessment,
+        report_type: str = "executive",
+        customizations: Dict = None
+    ) -> Iterator[bytes]:
+        """Relatório HTML em blocos UTF-8, renderizados sob demanda (`Template.generate`)
+        
+        O documento nunca existe inteiro em memória: seções por membro de um
+        relatório de equipe são produzidas à medida que os blocos são consumidos.
+        """
+        
+        customizations = customizations or {}
+        cohort = customizations.get('cohort')
         
         # Prepara dados para o template
         context = {
             'assessment': assessment,
             'scores': assessment.scores,
             'insights': assessment.profile_insights,
+            # Com cache, é a data em que o relatório entrou no cache, não a do download
             'generated_at': datetime.now(),
             'report_type': report_type,
             'customizations': customizations,
-            'charts': self._generate_html_charts(assessment.scores)
+            'charts': self._generate_html_charts(assessment.scores),
+            'team': self._team_summary(cohort) if cohort else None,
+            'team_members': cohort.iter_members() if cohort else ()
         }
         
-        # Renderiza template
-        html_content = template.render(context)
+        return encode_chunks(self._get_template(report_type).generate(context))
+    
+    def open_html_report(
+        self,
+        assessment: UserAssessment,
+        report_type: str = "executive",
+        customizations: Dict = None
+    ) -> BinaryIO:
+        """Relatório HTML gravado em disco em streaming e aberto para leitura
+        
+        Com cache configurado, o documento é gravado direto no cache (mesma
+        chave de `generate_comprehensive_report`). O arquivo retornado é aceito
+        por `st.download_button`; quem chama deve fechá-lo.
+        """
+        
+        customizations = customizations or {}
         
-        return html_content.encode('utf-8')
+        def chunks() -> Iterator[bytes]:
+            return self.stream_html_report(assessment, report_type, customizations)
+        
+        if self.cache is None:
+            return spool_chunks(chunks())
+        
+        key = report_key(assessment, report_type, "html", customizations, self._renderer_version("html"))
+        return self.cache.open_or_write(key, lambda output: write_chunks(chunks(), output))
+    
+    def _generate_html_report(
+        self,
+        assessment: UserAssessment,
+        report_type: str,
+        customizations: Dict
+    ) -> bytes:
+        """Gera relatório HTML interativo"""
+        return b"".join(self.stream_html_report(assessment, report_type, customizations))
     
     def _generate_excel_report(
         self,
@@ -389,10 +891,11 @@ class AdvancedReportGenerator:
             
             # Aba: Insights (se disponível)
             if assessment.profile_insights:
+                # Cópias: o preenchimento abaixo não pode alterar os insights da avaliação
                 insights_data = {
-                    'Pontos Fortes': assessment.profile_insights.strengths,
-                    'Áreas de Desenvolvimento': assessment.profile_insights.development_areas,
-                    'Sugestões de Carreira': assessment.profile_insights.career_suggestions
+                    'Pontos Fortes': list(assessment.profile_insights.strengths),
+                    'Áreas de Desenvolvimento': list(assessment.profile_insights.development_areas),
+                    'Sugestões de Carreira': list(assessment.profile_insights.career_suggestions)
                 }
                 
                 max_len = max(len(v) for v in insights_data.values())
@@ -409,94 +912,8 @@ class AdvancedReportGenerator:
         return buffer.read()
     
     def _plotly_to_image(self, fig: go.Figure) -> Optional[bytes]:
-        """Converte gráfico Plotly para imagem PNG"""
-        
-        try:
-            img_bytes = pio.to_image(fig, format='png', width=800, height=600)
-            return img_bytes
-        except Exception as e:
-            st.warning(f"Erro ao converter gráfico: {e}")
-            return None
-    
-    def _load_report_templates(self) -> Dict[str, Template]:
-        """Carrega templates HTML para relatórios"""
-        
-        # Template básico HTML
-        default_template = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Relatório NeuroMap</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 20px; }
-                .header { background: #0b0f17; color: #8ab4f8; padding: 20px; text-align: center; }
-                .section { margin: 20px 0; padding: 15px; border-left: 4px solid #8ab4f8; }
-                .metric { display: inline-block; margin: 10px; padding: 10px; background: #f0f0f0; }
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>🧠 Relatório NeuroMap</h1>
-                <p>Gerado em {{ generated_at.strftime('%d/%m/%Y às %H:%M') }}</p>
-            </div>
-            
-            <div class="section">
-                <h2>Resumo do Perfil</h2>
-                <div class="metric">
-                    <strong>Tipo MBTI:</strong> {{ scores.mbti_type }}
-                </div>
-                <div class="metric">
-                    <strong>Estilo DISC Dominante:</strong> {{ scores.get_dominant_disc()[0] }}
-                </div>
-            </div>
-            
-            {% if insights %}
-            <div class="section">
-                <h2>Principais Insights</h2>
-                <h3>Pontos Fortes:</h3>
-                <ul>
-                {% for strength in insights.strengths %}
-                    <li>{{ strength }}</li>
-                {% endfor %}
-                </ul>
-                
-                <h3>Áreas de Desenvolvimento:</h3>
-                <ul>
-                {% for area in insights.development_areas %}
-                    <li>{{ area }}</li>
-                {% endfor %}
-                </ul>
-            </div>
-            {% endif %}
-            
-            <div class="section">
-                <h2>Scores Detalhados</h2>
-                
-                <h3>DISC:</h3>
-                {% for key, value in scores.disc.items() %}
-                <div class="metric">
-                    <strong>{{ key.replace('DISC_', '') }}:</strong> {{ value|round(1) }}%
-                </div>
-                {% endfor %}
-                
-                <h3>Big Five:</h3>
-                {% for key, value in scores.big_five.items() %}
-                <div class="metric">
-                    <strong>{{ key.replace('B5_', '') }}:</strong> {{ value|round(1) }}%
-                </div>
-                {% endfor %}
-            </div>
-        </body>
-        </html>
-        """
-        
-        return {
-            'default_report.html': Template(default_template),
-            'executive_report.html': Template(default_template),
-            'complete_report.html': Template(default_template),
-            'coaching_report.html': Template(default_template),
-            'team_report.html': Template(default_template)
-        }
+        """Converte gráfico Plotly para imagem PNG (pool de rasterização com cache)"""
+        return self.rasterizer.render(fig)
     
     def _get_style_orientation(self, dominant_disc: str, mbti_type: str) -> str:
         """Retorna orientação do estilo baseado em DISC + MBTI"""
@@ -628,12 +1045,18 @@ class AdvancedReportGenerator:
         
         return charts
 
+# Relatórios gerados, compartilhados por todas as sessões do processo
+shared_report_cache = ReportCache(
+    get_setting("REPORT_CACHE_DIR", ".neuromap/reports"),
+    max_bytes=int(get_setting("REPORT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+)
+
 # Interface Streamlit para geração de relatórios
 class ReportInterface:
     """Interface Streamlit para geração e customização de relatórios"""
     
     def __init__(self):
-        self.report_generator = AdvancedReportGenerator()
+        self.report_generator = AdvancedReportGenerator(cache=shared_report_cache)
     
     def render_report_generator(self, assessment: UserAssessment) -> None:
         """Renderiza interface de geração de relatórios"""
@@ -694,14 +1117,24 @@ class ReportInterface:
             "language": language
         }
         
+        # Relatórios de equipe usam a análise carregada no dashboard
+        if report_type == "team" and st.session_state.get('team_cohort') is not None:
+            customizations["cohort"] = st.session_state.team_cohort
+        
         # Botão de geração
         if st.button("🚀 Gerar Relatório", type="primary", use_container_width=True):
             
             with st.spinner(f"Gerando relatório {format_type.upper()}..."):
                 try:
-                    report_data = self.report_generator.generate_comprehensive_report(
-                        assessment, report_type, format_type, customizations
-                    )
+                    if format_type == "html":
+                        # HTML em streaming: o documento vai para o disco em blocos
+                        report_data = self.report_generator.open_html_report(
+                            assessment, report_type, customizations
+                        )
+                    else:
+                        report_data = self.report_generator.generate_comprehensive_report(
+                            assessment, report_type, format_type, customizations
+                        )
                     
                     # Determina MIME type
                     mime_types = {
@@ -715,13 +1148,17 @@ class ReportInterface:
                     filename = f"neuromap_relatorio_{report_type}_{timestamp}.{format_type if format_type != 'excel' else 'xlsx'}"
                     
                     # Botão de download
-                    st.download_button(
-                        label=f"⬇️ Baixar Relatório {format_type.upper()}",
-                        data=report_data,
-                        file_name=filename,
-                        mime=mime_types[format_type],
-                        use_container_width=True
-                    )
+                    try:
+                        st.download_button(
+                            label=f"⬇️ Baixar Relatório {format_type.upper()}",
+                            data=report_data,
+                            file_name=filename,
+                            mime=mime_types[format_type],
+                            use_container_width=True
+                        )
+                    finally:
+                        if format_type == "html":
+                            report_data.close()
                     
                     st.success("✅ Relatório gerado com sucesso!")
                     
@@ -0,0 +1,56 @@
+"""Saída de documentos em partes, sem montar o conteúdo inteiro em memória"""
+import os
+import tempfile
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+STREAM_CHUNK_CHARS = 64 * 1024
+
+
+def encode_chunks(parts: Iterable[str], chunk_chars: int = STREAM_CHUNK_CHARS) -> Iterator[bytes]:
+    """Agrupa partes de texto (ex.: `Template.generate`) em blocos UTF-8 de ~64K caracteres"""
+    buffer: List[str] = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_chars:
+            yield "".join(buffer).encode('utf-8')
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode('utf-8')
+
+
+def write_chunks(chunks: Iterable[bytes], output: BinaryIO) -> int:
+    """Grava os blocos à medida que são produzidos; retorna o total de bytes"""
+    written = 0
+    for chunk in chunks:
+        output.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def open_detached(path: str) -> BinaryIO:
+    """Abre o arquivo para leitura e o remove do diretório (o conteúdo vive até o fechamento)"""
+    handle = open(path, 'rb')
+    try:
+        os.remove(path)
+    except OSError:
+        # Windows não remove arquivos abertos; fica para a limpeza do diretório temporário
+        pass
+    return handle
+
+
+def spool_chunks(chunks: Iterable[bytes], directory: Optional[str] = None) -> BinaryIO:
+    """Grava os blocos num arquivo temporário e o retorna aberto para leitura
+
+    O resultado é um `io.BufferedReader`, aceito diretamente por `st.download_button`.
+    """
+    fd, path = tempfile.mkstemp(suffix=".part", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write_chunks(chunks, f)
+    except BaseException:
+        os.remove(path)
+        raise
+    return open_detached(path)
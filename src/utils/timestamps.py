@@ -0,0 +1,28 @@
+"""Conversão de datas para tempo Unix; datas sem fuso são tratadas como UTC"""
+from datetime import date, datetime, time, timezone
+from typing import Union
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _as_datetime(value: Union[datetime, date]) -> datetime:
+    if isinstance(value, datetime):
+        timestamp = value
+    elif isinstance(value, date):
+        timestamp = datetime.combine(value, time.min)
+    else:
+        raise TypeError(f"Data inválida: {value!r}")
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+def epoch_seconds(value: Union[datetime, date]) -> float:
+    """Segundos desde a época; `date` conta a partir da meia-noite"""
+    return (_as_datetime(value) - EPOCH).total_seconds()
+
+
+def epoch_microseconds(value: Union[datetime, date]) -> int:
+    """Microssegundos desde a época, em aritmética inteira (sem arredondamento de float)"""
+    delta = _as_datetime(value) - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
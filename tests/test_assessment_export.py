@@ -0,0 +1,146 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+from src.core.item_bank import DIMENSIONS
+from src.core.models import PersonalityScores, UserAssessment
+from src.services.assessment_export import AssessmentExporter, firestore_source, main
+from src.services.firestore_codec import schema_for
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+ds = pytest.importorskip("pyarrow.dataset")
+
+
+def make_assessment(i, month=1, answers=None, completion=12):
+    rng = np.random.default_rng(i)
+    values = dict(zip(DIMENSIONS, rng.uniform(0, 100, len(DIMENSIONS)).round(2).tolist()))
+    return UserAssessment(
+        user_id=f"u{i % 5}",
+        assessment_id=f"a{i}",
+        answers=answers if answers is not None else {j: int(rng.integers(1, 6)) for j in range(1, 49)},
+        scores=PersonalityScores(
+            disc={name: values[name] for name in DIMENSIONS[:4]},
+            big_five={name: values[name] for name in DIMENSIONS[4:9]},
+            mbti_preferences={name: values[name] for name in DIMENSIONS[9:]},
+            mbti_type="ENFP"
+        ),
+        profile_insights=None,
+        timestamp=datetime(2024, month, 1) + timedelta(hours=i),
+        completion_time_minutes=completion,
+        reliability_score=0.75
+    )
+
+
+class TestAssessmentExporter:
+    """Testes para a exportação colunar particionada"""
+
+    def test_parquet_round_trip(self, tmp_path, sample_assessment):
+        result = AssessmentExporter(str(tmp_path)).export([sample_assessment])
+        table = pq.read_table(result.files[0])
+        row = table.to_pylist()[0]
+
+        assert result.rows_written == 1
+        assert table.schema.field("answers").type == pa.list_(pa.int8(), 48)
+        assert table.schema.field("DISC_D").type == pa.float32()
+        assert row['user_id'] == sample_assessment.user_id
+        assert row['timestamp'] == sample_assessment.timestamp.replace(tzinfo=timezone.utc)
+        assert row['DISC_D'] == pytest.approx(sample_assessment.scores.disc['DISC_D'])
+        assert row['completion_time_minutes'] == sample_assessment.completion_time_minutes
+
+        answers = row['answers']
+        for item_id, response in sample_assessment.answers.items():
+            assert answers[item_id - 1] == response
+        assert answers[len(sample_assessment.answers):] == [0] * (48 - len(sample_assessment.answers))
+
+    def test_partitions_by_month(self, tmp_path):
+        assessments = [make_assessment(i, month=1 + i % 3) for i in range(30)]
+        result = AssessmentExporter(str(tmp_path), batch_rows=4).export(assessments)
+
+        table = ds.dataset(str(tmp_path), format="parquet", partitioning="hive").to_table()
+
+        assert result.rows_written == 30
+        assert result.partitions == 3
+        assert sorted(os.listdir(tmp_path)) == ["period=2024-01", "period=2024-02", "period=2024-03"]
+        assert table.num_rows == 30
+        assert sorted(table.column("assessment_id").to_pylist()) == sorted(f"a{i}" for i in range(30))
+
+    def test_bounded_open_partitions_rotate_parts(self, tmp_path):
+        assessments = [make_assessment(i, month=1 + i % 3) for i in range(12)]
+        result = AssessmentExporter(str(tmp_path), batch_rows=100, max_open_writers=1).export(assessments)
+
+        assert result.rows_written == 12
+        assert len(result.files) == 12
+        assert os.path.exists(tmp_path / "period=2024-01" / "part-00003.parquet")
+        assert ds.dataset(str(tmp_path), format="parquet").to_table().num_rows == 12
+
+    def test_nulls_and_dropped_answers(self, tmp_path):
+        assessment = make_assessment(1, answers={1: 5, 48: 1, 60: 3}, completion=None)
+        assessment.scores.big_five = {}
+
+        result = AssessmentExporter(str(tmp_path)).export([assessment])
+        row = pq.read_table(result.files[0]).to_pylist()[0]
+
+        assert result.dropped_answers == 1
+        assert row['answers'][0] == 5 and row['answers'][47] == 1
+        assert row['completion_time_minutes'] is None
+        assert row['B5_O'] is None
+
+    def test_arrow_format(self, tmp_path):
+        assessments = [make_assessment(i) for i in range(5)]
+        result = AssessmentExporter(str(tmp_path), file_format="arrow").export(assessments)
+
+        with pa.memory_map(result.files[0]) as source:
+            table = pa.ipc.open_file(source).read_all()
+
+        assert result.files[0].endswith(".arrow")
+        assert table.num_rows == 5
+        block = table.column("answers").combine_chunks().flatten().to_numpy().reshape(5, 48)
+        assert block.dtype == np.int8
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            AssessmentExporter(str(tmp_path), file_format="csv")
+
+
+class TestExportSources:
+    """Testes para as fontes de avaliações e a CLI"""
+
+    def test_firestore_source_pages(self, sample_assessment):
+        schema = schema_for(UserAssessment)
+        docs = []
+        for i in range(5):
+            doc = Mock()
+            data = schema.to_plain(sample_assessment)
+            data['assessment_id'] = f"a{i}"
+            doc.to_dict.return_value = data
+            docs.append(doc)
+
+        query = Mock()
+        query.stream.return_value = iter(docs[:2])
+        query.start_after.side_effect = lambda last: Mock(stream=Mock(
+            return_value=iter(docs[docs.index(last) + 1:docs.index(last) + 3])
+        ))
+        db = Mock()
+        db.collection_group.return_value.order_by.return_value.limit.return_value = query
+
+        assessments = list(firestore_source(db, page_size=2))
+
+        assert [assessment.assessment_id for assessment in assessments] == [f"a{i}" for i in range(5)]
+        assert assessments[0].answers == sample_assessment.answers
+
+    def test_cli_with_jsonl_source(self, tmp_path, sample_assessment, capsys):
+        data = schema_for(UserAssessment).to_plain(sample_assessment)
+        data['timestamp'] = sample_assessment.timestamp.isoformat()
+        source = tmp_path / "dump.jsonl"
+        source.write_text(json.dumps(data) + "\n")
+
+        output = tmp_path / "out"
+        assert main(["--output", str(output), "--source", "jsonl", "--input", str(source)]) == 0
+
+        summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+        assert summary['rows_written'] == 1
+        assert ds.dataset(str(output), format="parquet").to_table().num_rows == 1
@@ -0,0 +1,83 @@
+import time
+import pytest
+from unittest.mock import Mock
+from src.services.cache import LRUTTLCache
+from src.services.database import FirestoreManager, SyncFirestoreFacade
+from src.services.async_runner import AsyncRunner
+
+
+def _slow_query(delay: float):
+    """Query mock cujo stream bloqueia como uma chamada de rede"""
+    query = Mock()
+
+    def stream():
+        time.sleep(delay)
+        return iter([])
+
+    query.stream.side_effect = stream
+    return query
+
+
+def _slow_call(delay: float, result):
+    """Chamada mock que bloqueia antes de retornar"""
+
+    def call(*args, **kwargs):
+        time.sleep(delay)
+        return result
+
+    return call
+
+
+@pytest.fixture
+def slow_manager():
+    """FirestoreManager com cliente bloqueante lento e cache isolado"""
+    manager = FirestoreManager(cache=LRUTTLCache())
+    db = Mock()
+    db.collection.return_value.document.return_value.collection.return_value\
+        .order_by.return_value.limit.return_value = _slow_query(0.3)
+    # Resumo do usuário e shards de benchmarks também são leituras bloqueantes
+    db.collection.return_value.document.return_value.collection.return_value\
+        .document.return_value.get.side_effect = _slow_call(0.3, Mock(exists=True, **{'to_dict.return_value': {}}))
+    db.get_all.side_effect = _slow_call(0.3, [])
+    manager.db = db
+    yield manager
+    manager.close()
+
+
+class TestSyncFirestoreFacade:
+    """Testes para a camada assíncrona e a fachada síncrona"""
+
+    def test_dashboard_fetches_run_concurrently(self, slow_manager):
+        """As três buscas do dashboard devem rodar em paralelo, não em série"""
+        runner = AsyncRunner()
+        facade = SyncFirestoreFacade(slow_manager, runner=runner)
+
+        start = time.perf_counter()
+        data = facade.load_dashboard_data("user_1")
+        elapsed = time.perf_counter() - start
+        runner.shutdown()
+
+        assert data['assessments'] == []
+        assert data['latest_assessment'] is None
+        # Serial seriam 3 × 0.3s (avaliações, analytics e benchmarks)
+        assert elapsed < 0.75
+
+    def test_blocking_calls_leave_event_loop_free(self, slow_manager):
+        """Enquanto o Firestore bloqueia, o event loop continua processando outras tarefas"""
+        import asyncio
+
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.ensure_future(ticker())
+            await slow_manager.get_user_assessments("user_1")
+            task.cancel()
+            return ticks
+
+        assert asyncio.run(scenario()) > 5
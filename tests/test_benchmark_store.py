@@ -0,0 +1,130 @@
+import asyncio
+from dataclasses import replace
+from datetime import datetime
+from unittest.mock import Mock
+import numpy as np
+import pytest
+from src.core.models import UserAssessment
+from src.services.benchmark_store import (
+    BENCHMARK_SHARDS, DimensionHistogram, PopulationBenchmarks, increment_fields, periods_between
+)
+from src.services.cache import LRUTTLCache
+from src.services.database import FirestoreManager
+from src.services.firestore_codec import schema_for
+
+
+def _random_scores(base, rng):
+    disc = dict(zip(['DISC_D', 'DISC_I', 'DISC_S', 'DISC_C'], rng.dirichlet(np.ones(4)) * 100))
+    big_five = {key: float(rng.uniform(0, 100)) for key in base.big_five}
+    return replace(base, disc=disc, big_five=big_five, mbti_type=str(rng.choice(["INTJ", "ENFP", "ISTJ"])))
+
+
+def _apply_deltas(document, deltas):
+    """Simula os incrementos atômicos do Firestore sobre o documento"""
+    for path, delta in deltas.items():
+        *parents, leaf = path.split('.')
+        node = document
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = node.get(leaf, 0) + delta
+
+
+class TestPopulationBenchmarks:
+    """Testes para o agregado populacional materializado"""
+
+    def test_histogram_matches_exact_statistics(self):
+        """Quantis do histograma ficam a menos de um bin dos exatos"""
+        values = np.random.default_rng(1).normal(50, 15, 5000).clip(0, 100)
+        histogram = DimensionHistogram()
+        for value in values:
+            histogram.add(value)
+
+        for q in (25, 50, 75):
+            assert histogram.quantile(q / 100) == pytest.approx(np.percentile(values, q), abs=1.0)
+        assert histogram.mean == pytest.approx(values.mean())
+        assert histogram.std == pytest.approx(values.std())
+
+    def test_merge_equals_single_pass(self, sample_scores):
+        rng = np.random.default_rng(2)
+        scores = [_random_scores(sample_scores, rng) for _ in range(200)]
+
+        whole = PopulationBenchmarks()
+        shards = [PopulationBenchmarks() for _ in range(3)]
+        for i, item in enumerate(scores):
+            whole.add(item)
+            shards[i % 3].add(item)
+
+        merged = PopulationBenchmarks.merged(shard.to_document() for shard in shards)
+        assert merged.sample_size == 200
+        assert merged.mbti_counts == whole.mbti_counts
+        for code, histogram in whole.disc.items():
+            assert merged.disc[code].bins == histogram.bins
+            assert merged.disc[code].summary() == pytest.approx(histogram.summary())
+
+    def test_increments_reproduce_document(self, sample_scores):
+        """Aplicar os deltas de cada save produz o mesmo documento da materialização"""
+        rng = np.random.default_rng(3)
+        population = PopulationBenchmarks()
+        document = {}
+        for _ in range(50):
+            item = _random_scores(sample_scores, rng)
+            population.add(item)
+            _apply_deltas(document, increment_fields(item))
+
+        restored = PopulationBenchmarks.from_document(document)
+        assert restored.to_benchmarks()['mbti_distribution'] == population.to_benchmarks()['mbti_distribution']
+        assert restored.disc['D'].bins == population.disc['D'].bins
+        assert restored.sample_size == 50
+
+    def test_periods_between(self):
+        assert periods_between(datetime(2024, 11, 20), datetime(2025, 2, 1)) == [
+            "2024-11", "2024-12", "2025-01", "2025-02"
+        ]
+
+    def test_manager_reads_and_merges_shards(self, sample_scores):
+        """Dashboard lê apenas os shards materializados, com sample_size real"""
+        population = PopulationBenchmarks()
+        population.add(sample_scores)
+        snapshot = Mock(exists=True)
+        snapshot.to_dict.return_value = population.to_document()
+
+        manager = FirestoreManager(cache=LRUTTLCache())
+        manager.db = Mock()
+        manager.db.get_all.return_value = [snapshot, snapshot, Mock(exists=False)]
+
+        benchmarks = asyncio.run(manager.get_population_benchmarks())
+        manager.close()
+
+        assert benchmarks['sample_size'] == 2
+        assert benchmarks['disc_percentiles']['D']['mean'] == pytest.approx(sample_scores.disc['DISC_D'])
+        assert len(manager.db.get_all.call_args.args[0]) == BENCHMARK_SHARDS
+        manager.db.collection_group.assert_not_called()
+
+    def test_materialize_aggregates_collection_group_in_pages(self, sample_assessment):
+        """Materialização percorre o collection group com `start_after` em vez de um stream único"""
+        schema = schema_for(UserAssessment)
+        pages = []
+        for page in range(3):
+            docs = []
+            for i in range(1000 if page < 2 else 5):
+                doc = Mock()
+                doc.to_dict.return_value = dict(schema.to_plain(sample_assessment), user_id=f"u{page}-{i}")
+                docs.append(doc)
+            pages.append(docs)
+
+        query = Mock()
+        query.stream.side_effect = lambda: iter(pages[0])
+        query.start_after.side_effect = lambda last: Mock(stream=Mock(
+            return_value=iter(pages[1] if last is pages[0][-1] else pages[2])
+        ))
+        manager = FirestoreManager(cache=LRUTTLCache())
+        manager.db = Mock()
+        manager.db.collection_group.return_value.order_by.return_value.limit.return_value = query
+
+        populations = manager._aggregate_benchmarks()
+        latest = asyncio.run(manager._latest_assessments())
+        manager.close()
+
+        assert populations['global'].sample_size == 2005
+        assert query.start_after.call_count == 4
+        assert len(latest) == 2005
@@ -0,0 +1,141 @@
+import json
+import os
+import zipfile
+from dataclasses import replace
+from functools import partial
+
+import pytest
+from src.services.write_queue import encode_assessment
+from src.utils.bulk_reports import BulkReportPipeline, default_generator, jsonl_assessments, main
+from src.utils.reports import REPORT_FONT_FILES, AdvancedReportGenerator, report_fonts
+
+
+# Geradores precisam ser importáveis pelos processos do pool
+class FakeGenerator(AdvancedReportGenerator):
+    def _render_report(self, assessment, report_type, format, customizations):
+        if assessment.assessment_id.startswith("bad"):
+            raise RuntimeError("template quebrado")
+        if assessment.assessment_id.startswith("crash"):
+            os._exit(1)
+        return f"%PDF {report_type} {assessment.assessment_id}".encode()
+
+
+@pytest.fixture
+def assessments(sample_assessment):
+    return [replace(sample_assessment, assessment_id=f"a{i}") for i in range(6)]
+
+
+def pipeline(path, **kwargs):
+    return BulkReportPipeline(str(path), max_workers=2, max_in_flight=3, generator_factory=FakeGenerator, **kwargs)
+
+
+class TestBulkReportPipeline:
+    """Testes para a geração de relatórios em lote"""
+
+    def test_reports_are_written_to_zip(self, tmp_path, assessments):
+        output = tmp_path / "lote.zip"
+        progress = []
+
+        result = pipeline(output).run(
+            [a.assessment_id for a in assessments], iter(assessments), progress=lambda r: progress.append(r.completed)
+        )
+
+        assert result.succeeded == 6 and result.failed == 0
+        assert result.reports_per_second > 0
+        assert progress == list(range(1, 7))
+        with zipfile.ZipFile(output) as archive:
+            assert archive.read("a3.pdf") == b"%PDF executive a3"
+            manifest = json.loads(archive.read("manifest.json"))
+        assert manifest['succeeded'] == 6 and manifest['failures'] == {}
+        assert not os.path.exists(str(output) + ".partial")
+
+    def test_failures_do_not_abort_batch(self, tmp_path, assessments, sample_assessment):
+        output = tmp_path / "lote.zip"
+        source = assessments + [replace(sample_assessment, assessment_id="bad1")]
+
+        result = pipeline(output).run(["a0", "bad1", "a5", "missing"], iter(source))
+
+        assert result.succeeded == 2
+        assert set(result.failures) == {"bad1", "missing"}
+        assert "template quebrado" in result.failures["bad1"]
+        with zipfile.ZipFile(output) as archive:
+            assert sorted(archive.namelist()) == ["a0.pdf", "a5.pdf", "manifest.json"]
+            assert json.loads(archive.read("manifest.json"))['failures']["missing"] == "Avaliação não encontrada"
+
+    def test_worker_crash_recreates_pool(self, tmp_path, assessments, sample_assessment):
+        source = assessments + [replace(sample_assessment, assessment_id="crash1")]
+
+        result = pipeline(tmp_path / "lote.zip").run([a.assessment_id for a in source], iter(source))
+
+        assert result.succeeded == 6
+        assert list(result.failures) == ["crash1"]
+
+    @pytest.mark.parametrize("report_type", ["executive", "complete", "coaching", "team"])
+    def test_real_pdfs_with_default_generator(self, tmp_path, assessments, report_type):
+        output = tmp_path / "lote.zip"
+        batch = BulkReportPipeline(
+            str(output), report_type=report_type, customizations={"include_charts": False},
+            max_workers=1, generator_factory=default_generator
+        )
+
+        result = batch.run(["a0", "a1"], iter(assessments))
+
+        assert result.failures == {}
+        with zipfile.ZipFile(output) as archive:
+            for name in ["a0.pdf", "a1.pdf"]:
+                data = archive.read(name)
+                assert data.startswith(b"%PDF-") and data.rstrip().endswith(b"%%EOF")
+
+    def test_unsupported_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            BulkReportPipeline(str(tmp_path / "lote.zip"), format="excel")
+
+
+class TestBulkReportCLI:
+    """Testes para a linha de comando do lote"""
+
+    def test_jsonl_source(self, tmp_path, assessments, monkeypatch):
+        dump = tmp_path / "dump.jsonl"
+        dump.write_text("\n".join(json.dumps(encode_assessment(a)) for a in assessments), encoding='utf-8')
+        ids = tmp_path / "ids.txt"
+        ids.write_text("a1\na2\n", encoding='utf-8')
+        output = tmp_path / "lote.zip"
+        monkeypatch.setattr(
+            "src.utils.bulk_reports.BulkReportPipeline", partial(BulkReportPipeline, generator_factory=FakeGenerator)
+        )
+
+        exit_code = main([
+            "--ids", str(ids), "--output", str(output), "--source", "jsonl",
+            "--input", str(dump), "--workers", "1"
+        ])
+
+        assert exit_code == 0
+        assert next(jsonl_assessments(str(dump))).profile_insights is not None
+        with zipfile.ZipFile(output) as archive:
+            assert sorted(archive.namelist()) == ["a1.pdf", "a2.pdf", "manifest.json"]
+
+    def test_font_dir_option(self, tmp_path, assessments, monkeypatch):
+        fonts = tmp_path / "fonts"
+        fonts.mkdir()
+        for filename in REPORT_FONT_FILES.values():
+            (fonts / filename).write_bytes(b"")
+        dump = tmp_path / "dump.jsonl"
+        dump.write_text(json.dumps(encode_assessment(assessments[0])), encoding='utf-8')
+        ids = tmp_path / "ids.txt"
+        ids.write_text("a0\n", encoding='utf-8')
+        monkeypatch.delenv("REPORT_FONT_DIR", raising=False)
+        monkeypatch.setattr(
+            "src.utils.bulk_reports.BulkReportPipeline", partial(BulkReportPipeline, generator_factory=FakeGenerator)
+        )
+
+        try:
+            main([
+                "--ids", str(ids), "--output", str(tmp_path / "lote.zip"), "--source", "jsonl",
+                "--input", str(dump), "--workers", "1", "--font-dir", str(fonts)
+            ])
+            assert os.environ["REPORT_FONT_DIR"] == str(fonts)
+            assert report_fonts() == {
+                style: str(fonts / filename) for style, filename in REPORT_FONT_FILES.items()
+            }
+        finally:
+            report_fonts.cache_clear()
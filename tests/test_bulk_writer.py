@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from src.services.bulk_writer import BulkCommitError, BulkWriter, RestBatchCommitter
+from src.services.cache import LRUTTLCache
+from src.services.database import FirestoreManager
+
+
+async def _no_sleep(seconds: float) -> None:
+    return None
+
+
+def _writes(n: int):
+    return ((f"users/u{i % 7}/assessments/a{i}", {"value": i}) for i in range(n))
+
+
+class RecordingCommitter:
+    """Committer falso que registra lotes e a concorrência máxima observada"""
+
+    def __init__(self, failures: int = 0, delay: float = 0.0, error: Exception = None):
+        self.chunks = []
+        self.failures = failures
+        self.delay = delay
+        self.error = error or RuntimeError("unavailable")
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, writes):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            failing = self.failures > 0
+            if failing:
+                self.failures -= 1
+        try:
+            time.sleep(self.delay)
+            if failing:
+                raise self.error
+            self.chunks.append(list(writes))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class TestBulkWriter:
+    """Testes para o envio em lote de documentos"""
+
+    def test_chunks_respect_batch_limit(self):
+        """Escritas devem ser divididas em lotes de no máximo 500"""
+        committer = RecordingCommitter()
+        writer = BulkWriter(committer, sleep=_no_sleep)
+
+        result = asyncio.run(writer.write(_writes(1203)))
+        writer.close()
+
+        assert sorted(len(chunk) for chunk in committer.chunks) == [203, 500, 500]
+        assert result.documents_written == 1203
+        assert result.chunks_committed == 3
+        assert result.ok
+
+    def test_concurrency_is_bounded(self):
+        """Nunca mais que `max_concurrency` lotes em voo"""
+        committer = RecordingCommitter(delay=0.05)
+        writer = BulkWriter(committer, batch_size=10, max_concurrency=3, sleep=_no_sleep)
+
+        asyncio.run(writer.write(_writes(200)))
+        writer.close()
+
+        assert len(committer.chunks) == 20
+        assert 1 < committer.max_active <= 3
+
+    def test_transient_failure_is_retried(self):
+        """Lote que falha temporariamente é repetido"""
+        committer = RecordingCommitter(failures=2)
+        writer = BulkWriter(committer, batch_size=50, max_concurrency=1, sleep=_no_sleep)
+
+        result = asyncio.run(writer.write(_writes(50)))
+        writer.close()
+
+        assert result.ok
+        assert result.retries == 2
+
+    def test_exhausted_chunk_is_reported_without_aborting(self):
+        """Lote que esgota as tentativas é registrado e os demais seguem"""
+        committer = RecordingCommitter(failures=3)
+        writer = BulkWriter(committer, batch_size=10, max_concurrency=1, max_retries=2, sleep=_no_sleep)
+
+        result = asyncio.run(writer.write(_writes(30)))
+        writer.close()
+
+        assert result.chunks_failed == 1
+        assert result.documents_written == 20
+        assert result.failed_paths == [f"users/u{i % 7}/assessments/a{i}" for i in range(10)]
+
+    def test_non_retryable_error_stops_immediately(self):
+        committer = RecordingCommitter(failures=1, error=BulkCommitError("forbidden", status=403, retryable=False))
+        writer = BulkWriter(committer, batch_size=10, sleep=_no_sleep)
+
+        result = asyncio.run(writer.write(_writes(10)))
+        writer.close()
+
+        assert result.retries == 0
+        assert result.documents_failed == 10
+
+    def test_progress_reported_per_chunk(self):
+        reports = []
+        writer = BulkWriter(RecordingCommitter(), batch_size=100, sleep=_no_sleep)
+
+        asyncio.run(writer.write(_writes(350), progress=reports.append))
+        writer.close()
+
+        assert len(reports) == 4
+        assert reports[-1].documents_written == 350
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(ValueError):
+            BulkWriter(RecordingCommitter(), batch_size=501)
+
+    def test_rest_commit_body(self):
+        """Corpo do `documents:commit` deve usar nomes completos e valores tipados"""
+        client = Mock()
+        client.post.return_value = Mock(status_code=200)
+        committer = RestBatchCommitter("proj", id_token="token", client=client)
+
+        committer([("users/u1/assessments/a1", {"score": 1.5})])
+
+        body = client.post.call_args.kwargs['json']
+        assert body == {"writes": [{"update": {
+            "name": "projects/proj/databases/(default)/documents/users/u1/assessments/a1",
+            "fields": {"score": {"doubleValue": 1.5}}
+        }}]}
+
+    def test_manager_bulk_save(self, sample_assessment):
+        """FirestoreManager grava avaliações via WriteBatch e invalida o cache"""
+        cache = LRUTTLCache()
+        cache.set('user_assessments', 'k', [], owner=sample_assessment.user_id)
+        manager = FirestoreManager(cache=cache)
+        manager.db = Mock()
+
+        result = asyncio.run(manager.bulk_save_assessments([sample_assessment] * 3, batch_size=2))
+        manager.close()
+
+        assert result.documents_written == 3
+        assert manager.db.batch.return_value.commit.call_count == 2
+        manager.db.document.assert_called_with("users/test_user_123/assessments/assess_20241115_001")
+        assert len(cache) == 0
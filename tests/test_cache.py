@@ -0,0 +1,87 @@
+import pytest
+from src.services.cache import LRUTTLCache
+
+
+class FakeClock:
+    """Relógio controlável para testar expiração"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUTTLCache:
+    """Testes para o cache LRU com TTL por namespace"""
+
+    def test_ttl_per_namespace(self):
+        """Cada namespace expira conforme seu próprio TTL"""
+        clock = FakeClock()
+        cache = LRUTTLCache(default_ttl=10, namespace_ttls={'analytics': 100}, clock=clock)
+
+        cache.set('assessments', 'k', [1, 2, 3])
+        cache.set('analytics', 'k', {'total': 3})
+        clock.now += 50
+
+        assert cache.get('assessments', 'k') is None
+        assert cache.get('analytics', 'k') == {'total': 3}
+        assert cache.stats().expirations == 1
+
+    def test_ttl_longer_than_one_day(self):
+        """TTLs acima de 24h não podem "dar a volta" como timedelta.seconds"""
+        clock = FakeClock()
+        cache = LRUTTLCache(default_ttl=300, clock=clock)
+
+        cache.set('ns', 'k', 'valor')
+        clock.now += 86400 + 10
+
+        assert cache.get('ns', 'k') is None
+
+    def test_lru_eviction_by_entries(self):
+        """Entrada menos recentemente usada é removida ao exceder o limite"""
+        cache = LRUTTLCache(max_entries=2)
+
+        cache.set('ns', 'a', 1)
+        cache.set('ns', 'b', 2)
+        cache.get('ns', 'a')
+        cache.set('ns', 'c', 3)
+
+        assert cache.get('ns', 'b') is None
+        assert cache.get('ns', 'a') == 1
+        assert cache.stats().evictions == 1
+
+    def test_eviction_by_bytes(self):
+        """Limite de bytes deve ser respeitado"""
+        cache = LRUTTLCache(max_bytes=250, sizeof=lambda value: 100)
+
+        for key in 'abc':
+            cache.set('ns', key, key)
+
+        stats = cache.stats()
+        assert stats.entries == 2
+        assert stats.bytes == 200
+
+    def test_invalidate_owner(self):
+        """Invalidação por usuário remove apenas as entradas daquele usuário"""
+        cache = LRUTTLCache()
+
+        cache.set('assessments', 'user_1:10', [1], owner='user_1')
+        cache.set('analytics', 'user_1', {}, owner='user_1')
+        cache.set('assessments', 'user_11:10', [2], owner='user_11')
+
+        assert cache.invalidate_owner('user_1') == 2
+        assert cache.get('assessments', 'user_11:10') == [2]
+        assert cache.invalidate_owner('user_1') == 0
+
+    def test_hit_miss_counters(self):
+        """Contadores de hit/miss devem refletir os acessos"""
+        cache = LRUTTLCache()
+
+        cache.set('ns', 'k', 'v')
+        cache.get('ns', 'k')
+        cache.get('ns', 'ausente')
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses) == (1, 1)
+        assert stats.hit_rate == pytest.approx(0.5)
@@ -0,0 +1,101 @@
+import time
+
+import plotly.graph_objects as go
+import pytest
+from src.utils.chart_renderer import ChartRasterizer
+from src.utils.reports import AdvancedReportGenerator
+
+
+# Funções de renderização precisam ser importáveis pelos processos do pool
+def fake_render(spec, width, height):
+    return f"{width}x{height}:{len(spec)}".encode()
+
+
+def slow_render(spec, width, height):
+    time.sleep(0.3)
+    return fake_render(spec, width, height)
+
+
+def failing_render(spec, width, height):
+    raise RuntimeError("kaleido indisponível")
+
+
+def figure(values):
+    return go.Figure(go.Bar(y=values))
+
+
+@pytest.fixture
+def rasterizer():
+    rasterizer = ChartRasterizer(max_workers=4, render=fake_render)
+    yield rasterizer
+    rasterizer.close()
+
+
+class TestChartRasterizer:
+    """Testes para o pool de rasterização de gráficos"""
+
+    def test_renders_by_name(self, rasterizer):
+        charts = rasterizer.render_many({'a': figure([1, 2]), 'b': figure([3, 4, 5]), 'none': None}, width=400)
+
+        assert charts['a'].startswith(b"400x600:")
+        assert charts['a'] != charts['b']
+        assert charts['none'] is None
+
+    def test_cached_by_spec_hash(self, rasterizer):
+        first = rasterizer.render(figure([1, 2]))
+        rasterizer._render = failing_render
+
+        assert rasterizer.render(figure([1, 2])) == first
+        assert rasterizer.render(figure([1, 2]), width=300) is None
+        assert rasterizer.cache_stats()['hits'] == 1
+
+    def test_identical_specs_render_once(self, rasterizer):
+        charts = rasterizer.render_many({'a': figure([1]), 'b': figure([1])})
+
+        assert charts['a'] == charts['b']
+        assert rasterizer.cache_stats()['entries'] == 1
+
+    def test_charts_render_concurrently(self):
+        rasterizer = ChartRasterizer(max_workers=4, render=slow_render)
+        rasterizer.render(figure([0]))
+
+        start = time.perf_counter()
+        charts = rasterizer.render_many({str(i): figure([i, i + 1]) for i in range(1, 5)})
+        elapsed = time.perf_counter() - start
+        rasterizer.close()
+
+        assert all(charts.values())
+        assert elapsed < 0.9
+
+    def test_failure_returns_none(self):
+        rasterizer = ChartRasterizer(max_workers=1, render=failing_render)
+
+        assert rasterizer.render(figure([1])) is None
+        rasterizer.close()
+
+
+class TestReportCharts:
+    """Gráficos do PDF renderizados em lote"""
+
+    def test_complete_report_renders_all_charts_at_once(self, sample_scores):
+        rasterizer = ChartRasterizer(render=fake_render)
+        calls = []
+        render_many = rasterizer.render_many
+        rasterizer.render_many = lambda figures, *args: calls.append(set(figures)) or render_many(figures, *args)
+        generator = AdvancedReportGenerator(rasterizer=rasterizer)
+
+        charts = generator._render_pdf_charts(sample_scores, "complete", {})
+        rasterizer.close()
+
+        assert calls == [{'sunburst', 'confidence'}]
+        assert charts['sunburst'] and charts['confidence']
+
+    def test_other_reports_need_no_raster_charts(self, sample_scores):
+        generator = AdvancedReportGenerator(rasterizer=ChartRasterizer(render=failing_render))
+
+        assert generator._render_pdf_charts(sample_scores, "executive", {}) == {}
+
+    def test_charts_disabled(self, sample_scores):
+        generator = AdvancedReportGenerator(rasterizer=ChartRasterizer(render=failing_render))
+
+        assert generator._render_pdf_charts(sample_scores, "executive", {"include_charts": False}) == {}
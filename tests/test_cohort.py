@@ -0,0 +1,210 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from src.core.cohort import MBTI_TYPES, MAX_SIMILARITY_MEMBERS, CohortAnalytics, CohortFrame
+from src.core.item_bank import DIMENSIONS
+from src.core.models import PersonalityScores, UserAssessment
+from src.core.percentiles import PercentileIndex
+
+
+def make_assessment(user_id, values, mbti_type="INTJ", minutes=0):
+    scores = dict(zip(DIMENSIONS, values))
+    return UserAssessment(
+        user_id=user_id,
+        assessment_id=f"{user_id}-{minutes}",
+        answers={},
+        scores=PersonalityScores(
+            disc={name: scores[name] for name in DIMENSIONS[:4]},
+            big_five={name: scores[name] for name in DIMENSIONS[4:9]},
+            mbti_preferences={name: scores[name] for name in DIMENSIONS[9:]},
+            mbti_type=mbti_type
+        ),
+        profile_insights=None,
+        timestamp=datetime(2024, 1, 1) + timedelta(minutes=minutes),
+        reliability_score=0.8
+    )
+
+
+@pytest.fixture
+def team():
+    rng = np.random.default_rng(3)
+    return [
+        make_assessment(f"u{i}", rng.uniform(0, 100, len(DIMENSIONS)), MBTI_TYPES[i % 16], minutes=i)
+        for i in range(40)
+    ]
+
+
+class TestCohortFrame:
+    """Testes para o frame colunar de avaliações"""
+
+    def test_columns_follow_dimension_order(self, sample_assessment):
+        frame = CohortFrame.from_assessments([sample_assessment])
+        scores = sample_assessment.scores
+
+        assert frame.scores.shape == (1, len(DIMENSIONS))
+        for column, name in enumerate(DIMENSIONS):
+            values = {**scores.disc, **scores.big_five, **scores.mbti_preferences}
+            if name in values:
+                assert frame.scores[0, column] == pytest.approx(values[name])
+            else:
+                assert np.isnan(frame.scores[0, column])
+        assert MBTI_TYPES[frame.mbti_codes[0]] == scores.mbti_type
+
+    def test_keeps_latest_assessment_per_user(self):
+        old = make_assessment("u1", np.full(len(DIMENSIONS), 10.0), "ESTJ", minutes=0)
+        new = make_assessment("u1", np.full(len(DIMENSIONS), 90.0), "INFP", minutes=5)
+
+        frame = CohortFrame.from_assessments([new, old])
+
+        assert len(frame) == 1
+        assert frame.scores[0, 0] == pytest.approx(90.0)
+        assert MBTI_TYPES[frame.mbti_codes[0]] == "INFP"
+        assert len(CohortFrame.from_assessments([new, old], latest_only=False)) == 2
+
+    def test_unknown_mbti_type(self):
+        frame = CohortFrame.from_assessments([make_assessment("u1", np.full(len(DIMENSIONS), 50.0), "")])
+        assert frame.mbti_codes[0] == -1
+
+
+class TestCohortAnalytics:
+    """Testes para distribuições, similaridade e lacunas do grupo"""
+
+    def test_disc_distribution_counts_dominant_styles(self, team):
+        analytics = CohortAnalytics(CohortFrame.from_assessments(team))
+        distribution = analytics.disc_distribution()
+
+        expected = {code: 0 for code in "DISC"}
+        for assessment in team:
+            expected[assessment.scores.get_dominant_disc()[0]] += 1
+
+        assert distribution['dominant_counts'] == expected
+        assert sum(distribution['dominant_share'].values()) == pytest.approx(100.0)
+
+    def test_mbti_distribution(self, team):
+        distribution = CohortAnalytics(CohortFrame.from_assessments(team)).mbti_distribution()
+
+        assert sum(distribution['type_counts'].values()) == len(team)
+        assert distribution['type_counts']['ESTJ'] == 3
+        for first, second in ("EI", "SN", "TF", "JP"):
+            shares = distribution['preference_share']
+            assert shares[first] + shares[second] == pytest.approx(100.0)
+
+    def test_similarity_matrix_properties(self, team):
+        analytics = CohortAnalytics(CohortFrame.from_assessments(team))
+        similarity = analytics.similarity_matrix()
+
+        assert similarity.shape == (len(team), len(team))
+        np.testing.assert_allclose(similarity, similarity.T, atol=1e-6)
+        np.testing.assert_allclose(np.diag(similarity), 1.0, atol=1e-5)
+        assert analytics.similarity_matrix([0, 3]).shape == (2, 2)
+
+    def test_similar_members_match_full_matrix(self, team):
+        analytics = CohortAnalytics(CohortFrame.from_assessments(team))
+        similarity = analytics.similarity_matrix()
+        np.fill_diagonal(similarity, -np.inf)
+
+        indices, scores = analytics.similar_members(k=3)
+
+        assert indices.shape == scores.shape == (len(team), 3)
+        np.testing.assert_allclose(scores, -np.sort(-similarity, axis=1)[:, :3], atol=1e-5)
+        np.testing.assert_allclose(scores, np.take_along_axis(similarity, indices, axis=1), atol=1e-5)
+
+    def test_cohesion_matches_pairwise_mean(self, team):
+        analytics = CohortAnalytics(CohortFrame.from_assessments(team))
+        similarity = analytics.similarity_matrix().astype(np.float64)
+        n = len(team)
+        expected = (similarity.sum() - np.trace(similarity)) / (n * (n - 1))
+
+        assert analytics.cohesion() == pytest.approx(expected, abs=1e-5)
+
+    def test_member_fit_flags_outlier(self):
+        base = np.array([70, 20, 20, 60, 50, 80, 40, 40, 30, 40, 60, 50, 50, 70, 30, 60, 40], dtype=float)
+        rng = np.random.default_rng(1)
+        members = [make_assessment(f"u{i}", base + rng.normal(0, 3, len(base)), minutes=i) for i in range(20)]
+        members.append(make_assessment("outlier", 100 - base, minutes=99))
+
+        analytics = CohortAnalytics(CohortFrame.from_assessments(members))
+        fit = analytics.member_fit()
+
+        assert analytics.frame.user_ids[np.argmin(fit)] == "outlier"
+        assert analytics.summary()['atypical_members'][0]['user_id'] == "outlier"
+
+    def test_population_gaps(self, team):
+        analytics = CohortAnalytics(CohortFrame.from_assessments(team))
+        benchmarks = {'disc_percentiles': {'D': {'mean': 40.0, 'std': 10.0}}}
+        rng = np.random.default_rng(5)
+        index = PercentileIndex.from_samples({'DISC_D': rng.uniform(0, 100, 5000)})
+
+        gaps = analytics.population_gaps(benchmarks, index)
+        team_mean = np.mean([assessment.scores.disc['DISC_D'] for assessment in team])
+
+        assert gaps['DISC_D']['gap'] == pytest.approx(team_mean - 40.0, rel=1e-4)
+        assert gaps['DISC_D']['effect_size'] == pytest.approx((team_mean - 40.0) / 10.0, rel=1e-4)
+        assert 0 <= gaps['DISC_D']['median_percentile'] <= 100
+        assert 'population_mean' not in gaps['DISC_I']
+        assert 'MBTI_E' not in gaps
+
+    def test_small_cohorts(self, sample_assessment):
+        analytics = CohortAnalytics(CohortFrame.from_assessments([sample_assessment]))
+
+        assert analytics.cohesion() == 0.0
+        assert analytics.summary()['size'] == 1
+
+        empty = CohortAnalytics(CohortFrame.from_assessments([]))
+        assert empty.summary()['disc']['members'] == 0
+
+    def test_iter_members(self, team):
+        analytics = CohortAnalytics(CohortFrame.from_assessments(team))
+        members = list(analytics.iter_members())
+        fit = analytics.member_fit()
+
+        assert [member['user_id'] for member in members] == [f"u{i}" for i in range(40)]
+        assert members[3]['mbti_type'] == MBTI_TYPES[3]
+        assert members[0]['dominant_disc'] == max(members[0]['disc'], key=members[0]['disc'].get)
+        assert members[7]['fit'] == pytest.approx(fit[7])
+
+    def test_large_cohort_under_one_second(self):
+        n = 10_000
+        rng = np.random.default_rng(0)
+        frame = CohortFrame(
+            [f"u{i}" for i in range(n)],
+            rng.uniform(0, 100, (n, len(DIMENSIONS))),
+            rng.integers(0, 16, n),
+            np.arange(n, dtype=float),
+            np.full(n, 0.8)
+        )
+
+        start = time.perf_counter()
+        summary = CohortAnalytics(frame).summary({'disc_percentiles': {'D': {'mean': 50.0, 'std': 10.0}}})
+        elapsed = time.perf_counter() - start
+
+        assert summary['size'] == n
+        assert elapsed < 1.0
+        with pytest.raises(ValueError):
+            CohortAnalytics(frame).similarity_matrix()
+        assert n > MAX_SIMILARITY_MEMBERS
+
+    def test_large_cohort_pairwise_in_blocks(self):
+        n = 10_000
+        rng = np.random.default_rng(1)
+        frame = CohortFrame(
+            [f"u{i}" for i in range(n)],
+            rng.uniform(0, 100, (n, len(DIMENSIONS))),
+            rng.integers(0, 16, n),
+            np.arange(n, dtype=float),
+            np.full(n, 0.8)
+        )
+        analytics = CohortAnalytics(frame)
+
+        indices, scores = analytics.similar_members(k=5)
+        engine = analytics.similarity_engine()
+        rows, block = next(engine.iter_blocks([10, 20]))
+
+        assert indices.shape == (n, 5)
+        assert not np.any(indices == np.arange(n)[:, None])
+        assert np.all(np.diff(scores, axis=1) <= 0)
+        assert block.shape == (2, n)
+        assert block[0, indices[10, 0]] == pytest.approx(scores[10, 0], abs=1e-5)
+        assert block[1].max() == pytest.approx(1.0, abs=1e-5)
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from src.core.compatibility import (
+    CompatibilityEngine, scores_to_matrix, scores_to_vector, style_compatibility
+)
+from src.core.item_bank import DIMENSIONS, DIMENSION_INDEX
+from src.core.scoring import InsightGenerator
+
+
+@pytest.fixture
+def profiles():
+    rng = np.random.default_rng(11)
+    return rng.uniform(0, 100, (300, len(DIMENSIONS))).astype(np.float32)
+
+
+class TestProfileVectors:
+    """Testes para a representação vetorial dos perfis"""
+
+    def test_vector_follows_dimension_order(self, sample_scores):
+        vector = scores_to_vector(sample_scores)
+
+        assert vector.shape == (len(DIMENSIONS),)
+        assert vector[DIMENSION_INDEX['DISC_D']] == 75.0
+        assert vector[DIMENSION_INDEX['B5_N']] == 25.0
+        assert vector[DIMENSION_INDEX['MBTI_P']] == 15.0
+
+    def test_matrix_rows(self, sample_scores):
+        matrix = scores_to_matrix([sample_scores, sample_scores])
+
+        assert matrix.shape == (2, len(DIMENSIONS))
+        np.testing.assert_allclose(matrix[0], scores_to_vector(sample_scores))
+
+
+class TestCompatibilityEngine:
+    """Testes para as matrizes de similaridade/complementaridade"""
+
+    @pytest.mark.parametrize("metric", ["similarity", "complementarity"])
+    def test_blocked_matrix_matches_dense(self, profiles, metric):
+        blocked = CompatibilityEngine(profiles, metric=metric, block_size=64).matrix()
+        dense = CompatibilityEngine(profiles, metric=metric, block_size=10_000).matrix()
+
+        assert blocked.shape == (len(profiles), len(profiles))
+        np.testing.assert_allclose(blocked, dense, atol=1e-6)
+        np.testing.assert_allclose(blocked, blocked.T, atol=1e-5)
+        assert np.all(np.abs(blocked) <= 1 + 1e-5)
+
+    def test_similarity_is_centered_cosine(self, profiles):
+        matrix = CompatibilityEngine(profiles).matrix()
+        centered = profiles - 50
+        expected = centered @ centered.T / np.outer(
+            np.linalg.norm(centered, axis=1), np.linalg.norm(centered, axis=1)
+        )
+
+        np.testing.assert_allclose(matrix, expected, atol=1e-5)
+        np.testing.assert_allclose(np.diag(matrix), 1.0, atol=1e-5)
+
+    def test_top_k_matches_full_matrix(self, profiles):
+        engine = CompatibilityEngine(profiles, metric="complementarity", block_size=50)
+        indices, scores = engine.top_k(k=4)
+
+        full = engine.matrix()
+        np.fill_diagonal(full, -np.inf)
+        expected = np.sort(full, axis=1)[:, ::-1][:, :4]
+
+        assert indices.shape == (len(profiles), 4)
+        np.testing.assert_allclose(scores, expected, atol=1e-6)
+        assert not np.any(indices == np.arange(len(profiles))[:, None])
+        assert np.all(np.diff(scores, axis=1) <= 0)
+
+    def test_top_k_for_external_profile(self, profiles, sample_scores):
+        ids = [f"u{i}" for i in range(len(profiles))]
+        engine = CompatibilityEngine(profiles, ids, metric="complementarity")
+
+        matches = engine.top_k_for(sample_scores, k=3, exclude=["u0"])
+        against = engine.scores_against(sample_scores)
+
+        assert [item_id for item_id, _ in matches] == [ids[i] for i in np.argsort(-against)[:3] if ids[i] != "u0"][:3]
+        assert matches[0][1] == pytest.approx(float(np.max(against[1:])), abs=1e-6)
+
+    def test_missing_dimensions_are_neutral(self):
+        profiles = np.full((2, len(DIMENSIONS)), np.nan, dtype=np.float32)
+        profiles[:, DIMENSION_INDEX['DISC_D']] = [90.0, 90.0]
+
+        assert CompatibilityEngine(profiles).score(0, 1) == pytest.approx(1.0)
+
+    def test_unknown_metric(self, profiles):
+        with pytest.raises(ValueError):
+            CompatibilityEngine(profiles, metric="distance")
+
+
+class TestCompatibilityNotes:
+    """Testes para as notas de compatibilidade dos insights"""
+
+    def test_style_compatibility(self, sample_scores):
+        result = style_compatibility(sample_scores)
+
+        assert set(result) == {"D", "I", "S", "C"}
+        # Perfil com D alto se parece mais com o estilo D e complementa mais o estilo S
+        assert max(result, key=lambda code: result[code]['similarity']) == "D"
+        assert result["S"]['complementarity'] > result["D"]['complementarity']
+
+    def test_insights_include_compatibility_notes(self, sample_scores):
+        insights = InsightGenerator().generate_comprehensive_insights(sample_scores)
+
+        assert len(insights.compatibility_notes) == 4
+        assert "Estabilidade (S)" in insights.compatibility_notes
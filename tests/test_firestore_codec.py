@@ -0,0 +1,84 @@
+import json
+import math
+import numpy as np
+import pytest
+from datetime import datetime, timezone
+from src.core.models import PersonalityScores, UserAssessment
+from src.services.firestore_codec import (
+    decode_document, decode_value, encode_document, encode_value, parse_timestamp, schema_for
+)
+
+
+class TestFirestoreCodec:
+    """Testes para o codec de valores REST do Firestore"""
+
+    def test_scalar_encoding(self):
+        """Escalares devem usar o tipo REST correspondente"""
+        assert encode_value(True) == {"booleanValue": True}
+        assert encode_value(7) == {"integerValue": "7"}
+        assert encode_value(0.5) == {"doubleValue": 0.5}
+        assert encode_value("x") == {"stringValue": "x"}
+        assert encode_value(None) == {"nullValue": None}
+        assert encode_value(np.float64(1.5)) == {"doubleValue": 1.5}
+        assert encode_value(np.int64(3)) == {"integerValue": "3"}
+
+    def test_round_trip_nested_results(self):
+        """Resultado completo do app deve sobreviver a encode/decode sem perdas"""
+        results = {
+            "disc": {"D": 40.5, "I": 25.0, "S": 20.0, "C": 14.5},
+            "disc_raw": {"D": 3.2, "I": -1.0, "S": 0.0, "C": 2},
+            "mbti_type": "ENTJ",
+            "reliability": 85,
+            "tags": ["a", "b"],
+            "timestamp": datetime(2024, 11, 15, 10, 30, tzinfo=timezone.utc)
+        }
+
+        encoded = encode_value(results)
+        # Corpo deve ser JSON válido para a API REST
+        decoded = decode_value(json.loads(json.dumps(encoded)))
+
+        assert decoded == results
+
+    def test_non_finite_doubles_are_valid_json(self):
+        """NaN/Infinity são enviados na forma textual aceita pela API"""
+        encoded = encode_value([math.nan, math.inf])
+        json.dumps(encoded, allow_nan=False)
+
+        decoded = decode_value(encoded)
+        assert math.isnan(decoded[0]) and decoded[1] == math.inf
+
+    def test_timestamp_with_nanoseconds(self):
+        """Timestamps do Firestore têm nanossegundos"""
+        parsed = parse_timestamp("2024-11-15T10:30:00.123456789Z")
+        assert parsed == datetime(2024, 11, 15, 10, 30, 0, 123456, tzinfo=timezone.utc)
+
+    def test_dataclass_document_round_trip(self, sample_assessment):
+        """Schema tipado restaura chaves int, datetime e dataclasses aninhadas"""
+        document = encode_document(sample_assessment)
+        restored = decode_document(json.loads(json.dumps(document)), UserAssessment)
+
+        assert restored.answers == sample_assessment.answers
+        assert isinstance(restored.scores, PersonalityScores)
+        assert restored.scores == sample_assessment.scores
+        assert restored.timestamp == sample_assessment.timestamp.replace(tzinfo=timezone.utc)
+        assert restored.profile_insights['summary'] == sample_assessment.profile_insights.summary
+
+    def test_plain_round_trip_for_sdk(self, sample_assessment):
+        """to_plain gera estruturas aceitas pelo SDK (chaves string, sem modelos)"""
+        schema = schema_for(UserAssessment)
+        plain = schema.to_plain(sample_assessment)
+
+        assert set(plain['answers']) == {"1", "2", "3", "4", "5"}
+        assert isinstance(plain['profile_insights'], dict)
+
+        restored = schema.from_plain(plain)
+        assert restored.answers == sample_assessment.answers
+        assert restored.scores == sample_assessment.scores
+
+    def test_schema_is_cached(self):
+        """Schema é resolvido uma única vez por tipo"""
+        assert schema_for(PersonalityScores) is schema_for(PersonalityScores)
+
+    def test_unsupported_type(self):
+        with pytest.raises(TypeError):
+            encode_value(object())
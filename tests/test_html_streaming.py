@@ -0,0 +1,98 @@
+import io
+import os
+from dataclasses import replace
+
+import numpy as np
+from src.core.cohort import MBTI_TYPES, CohortAnalytics, CohortFrame
+from src.utils.report_cache import ReportCache
+from src.utils.reports import AdvancedReportGenerator
+from src.utils.streaming import encode_chunks, spool_chunks
+
+
+def team_cohort(sample_assessment, size):
+    rng = np.random.default_rng(5)
+    members = []
+    for i in range(size):
+        disc = dict(zip(sample_assessment.scores.disc, rng.uniform(0, 100, 4)))
+        scores = replace(sample_assessment.scores, disc=disc, mbti_type=MBTI_TYPES[i % 16])
+        members.append(replace(sample_assessment, user_id=f"membro{i:03d}", scores=scores))
+    return CohortAnalytics(CohortFrame.from_assessments(members))
+
+
+class TestStreamingHelpers:
+    """Testes para a saída em blocos"""
+
+    def test_encode_chunks_groups_parts(self):
+        chunks = list(encode_chunks(["ação"] * 10, chunk_chars=12))
+
+        assert b"".join(chunks).decode('utf-8') == "ação" * 10
+        assert len(chunks) == 4
+
+    def test_spool_chunks_returns_detached_reader(self):
+        handle = spool_chunks(iter([b"abc", b"def"]))
+
+        with handle:
+            assert isinstance(handle, io.BufferedReader)
+            assert handle.read() == b"abcdef"
+            assert not os.path.exists(handle.name)
+
+
+class TestHTMLStreaming:
+    """Testes para a renderização do relatório HTML em blocos"""
+
+    def test_team_report_streams_member_sections(self, sample_assessment):
+        generator = AdvancedReportGenerator()
+        customizations = {"cohort": team_cohort(sample_assessment, 1000)}
+
+        chunks = list(generator.stream_html_report(sample_assessment, "team", customizations))
+        html = b"".join(chunks).decode('utf-8')
+
+        assert len(chunks) > 1
+        assert "membro000" in html and "membro999" in html
+        assert html.rstrip().endswith("</html>")
+
+    def test_open_html_report_without_cache(self, sample_assessment):
+        generator = AdvancedReportGenerator()
+
+        with generator.open_html_report(sample_assessment, "executive") as handle:
+            assert sample_assessment.scores.mbti_type.encode() in handle.read()
+
+    def test_open_html_report_writes_into_cache(self, tmp_path, sample_assessment):
+        cache = ReportCache(str(tmp_path))
+        generator = AdvancedReportGenerator(cache=cache)
+
+        with generator.open_html_report(sample_assessment, "executive") as handle:
+            streamed = handle.read()
+        with generator.open_html_report(sample_assessment, "executive") as handle:
+            assert handle.read() == streamed
+
+        # Mesma chave do caminho em memória
+        assert generator.generate_comprehensive_report(sample_assessment, "executive", "html") == streamed
+        stats = cache.stats()
+        assert stats.misses == 1 and stats.hits == 2 and stats.entries == 1
+
+
+class TestReportCacheStreaming:
+    """Testes para artefatos gravados em streaming no cache"""
+
+    def test_oversized_artifact_is_served_but_not_stored(self, tmp_path):
+        cache = ReportCache(str(tmp_path), max_bytes=10)
+
+        with cache.open_or_write("ab12", lambda output: output.write(b"z" * 20)) as handle:
+            assert handle.read() == b"z" * 20
+        assert cache.stats().entries == 0
+        assert os.listdir(tmp_path / "ab") == []
+
+    def test_write_error_propagates_and_is_not_cached(self, tmp_path):
+        cache = ReportCache(str(tmp_path))
+
+        def fail(output):
+            output.write(b"parcial")
+            raise RuntimeError("falhou")
+
+        try:
+            cache.open_or_write("ab12", fail)
+        except RuntimeError:
+            pass
+        assert cache.get("ab12") is None
+        assert os.listdir(tmp_path / "ab") == []
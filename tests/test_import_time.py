@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Orçamento do cold start de `import app`, ajustável por ambiente (CI mais lento)
+IMPORT_BUDGET_SECONDS = float(os.environ.get('NEUROMAP_IMPORT_BUDGET', '3.0'))
+
+# Dependências que só devem carregar quando relatório/gráfico/pontuação são usados
+HEAVY_MODULES = ['pandas', 'scipy', 'fpdf', 'jinja2', 'reportlab']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def _import_in_subprocess(module: str, cwd: str) -> dict:
+    """Importa o módulo num interpretador limpo e retorna tempo e módulos carregados"""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module)],
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture
+def secrets_dir(tmp_path):
+    """Diretório de trabalho com secrets mínimos para o app inicializar"""
+    streamlit_dir = tmp_path / '.streamlit'
+    streamlit_dir.mkdir()
+    (streamlit_dir / 'secrets.toml').write_text(
+        'FIREBASE_API_KEY = "test"\nFIREBASE_PROJECT_ID = "test"\n'
+    )
+    return str(tmp_path)
+
+
+class TestImportTime:
+    """Benchmarks de tempo de import para o cold start do Streamlit"""
+
+    def test_app_import_within_budget(self, secrets_dir):
+        """`import app` deve caber no orçamento de cold start"""
+        probe = _import_in_subprocess('app', secrets_dir)
+
+        assert probe['elapsed'] < IMPORT_BUDGET_SECONDS, (
+            f"import app levou {probe['elapsed']:.2f}s (orçamento {IMPORT_BUDGET_SECONDS:.2f}s)"
+        )
+
+    @pytest.mark.parametrize('module', [
+        'app', 'src.core.scoring', 'src.ui.components', 'src.utils.reports'
+    ])
+    def test_heavy_dependencies_are_lazy(self, module, secrets_dir):
+        """Dependências pesadas não devem ser carregadas no import"""
+        probe = _import_in_subprocess(module, secrets_dir)
+
+        loaded = [name for name in HEAVY_MODULES if name in probe['modules']]
+        assert loaded == []
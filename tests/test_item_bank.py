@@ -0,0 +1,75 @@
+import pytest
+from src.core.item_bank import CompiledItemBank, DIMENSIONS, DIMENSION_INDEX
+from src.core.models import AssessmentItem
+from src.core.scoring import ITEM_BANK_CACHE_SIZE, AdvancedScoringEngine
+
+
+class TestCompiledItemBank:
+    """Testes para o banco de itens compilado"""
+
+    def test_compiled_arrays(self, sample_items):
+        """Testa índices, máscaras e mapa id→linha"""
+        bank = CompiledItemBank(sample_items)
+
+        assert len(bank) == 3
+        assert bank.row_of == {1: 0, 2: 1, 3: 2}
+        assert not bank.reverse_mask.any()
+        assert bank.weights.shape == (3, len(DIMENSIONS))
+        assert bank.weights[0, DIMENSION_INDEX["DISC_D"]] == 0.8
+        assert bank.weights[2, DIMENSION_INDEX["MBTI_J"]] == 0.6
+        assert bank.confidence_dimensions == ["DISC_D", "MBTI_J", "B5_O", "MBTI_N", "B5_C"]
+
+    def test_raw_scores_match_item_loop(self):
+        """Scores brutos devem igualar a soma item a item com reverse scoring e confiabilidade"""
+        items = [
+            AssessmentItem(id=1, text="A", category="DISC", weights={"DISC_D": 0.8, "MBTI_J": 0.4}),
+            AssessmentItem(id=30, text="B", category="B5", reverse_scored=True, weights={"B5_N": -0.5}),
+        ]
+        engine = AdvancedScoringEngine()
+        bank = engine.compile_item_bank(items)
+        answers = {1: 4, 30: 2}
+
+        raw = bank.raw_scores(bank.answers_to_vector(answers))[0]
+
+        expected_d = 4 * 0.8 * engine._get_item_reliability(1)
+        expected_n = (6 - 2) * -0.5 * engine._get_item_reliability(30)
+        assert raw[DIMENSION_INDEX["DISC_D"]] == pytest.approx(expected_d)
+        assert raw[DIMENSION_INDEX["B5_N"]] == pytest.approx(expected_n)
+        assert raw[DIMENSION_INDEX["MBTI_P"]] == 0
+
+    def test_engine_reuses_compiled_bank(self, sample_items):
+        """Compilação deve ser reaproveitada entre instâncias do engine"""
+        first = AdvancedScoringEngine().compile_item_bank(sample_items)
+        second = AdvancedScoringEngine().compile_item_bank(list(sample_items))
+
+        assert first is second
+
+    def test_reliability_is_part_of_cache_key(self, sample_items):
+        """Engines com outra confiabilidade não reaproveitam o banco compilado"""
+
+        class FlatReliabilityEngine(AdvancedScoringEngine):
+            def _get_item_reliability(self, item_id):
+                return 1.0
+
+        default = AdvancedScoringEngine().compile_item_bank(sample_items)
+        flat = FlatReliabilityEngine().compile_item_bank(sample_items)
+
+        assert flat is not default
+        assert (flat.reliability == 1.0).all()
+
+    def test_cache_is_bounded(self, sample_items):
+        """Bancos menos usados recentemente são descartados"""
+        engine = AdvancedScoringEngine()
+        first = engine.compile_item_bank(sample_items)
+
+        for i in range(ITEM_BANK_CACHE_SIZE):
+            engine.compile_item_bank([AssessmentItem(id=100 + i, text="A", category="DISC", weights={"DISC_D": 1.0})])
+
+        assert engine.compile_item_bank(sample_items) is not first
+
+    def test_unknown_dimension_raises(self):
+        """Dimensão com prefixo conhecido e código inválido deve gerar erro"""
+        items = [AssessmentItem(id=1, text="A", category="DISC", weights={"DISC_X": 1.0})]
+
+        with pytest.raises(ValueError):
+            CompiledItemBank(items)
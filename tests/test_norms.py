@@ -0,0 +1,55 @@
+import pytest
+import numpy as np
+from src.core.norms import NormativeNormalizer, NormTable, normal_cdf
+from src.core.scoring import AdvancedScoringEngine
+
+
+class TestNormativeNormalizer:
+    """Testes para a normalização vetorizada por tabelas normativas"""
+
+    def test_normal_cdf_matches_scipy(self):
+        """CDF vetorizada deve coincidir com scipy dentro da precisão dos percentis"""
+        stats = pytest.importorskip("scipy.stats")
+        z = np.linspace(-6, 6, 1001)
+
+        assert np.allclose(normal_cdf(z), stats.norm.cdf(z), atol=1e-7)
+
+    def test_percentiles_per_segment(self):
+        """Cada linha deve usar a tabela do seu segmento"""
+        codes = ["O", "C", "E", "A", "N"]
+        normalizer = NormativeNormalizer.default()
+        normalizer.register(NormTable(
+            segment="tech",
+            means={c: 60.0 for c in codes},
+            stds={c: 10.0 for c in codes}
+        ))
+
+        raw = np.full((2, 5), 60.0)
+        percentiles = normalizer.percentiles(raw, ["global", "tech"])
+
+        assert percentiles[0] == pytest.approx(np.full(5, 74.75), abs=0.01)
+        assert percentiles[1] == pytest.approx(np.full(5, 50.0))
+
+    def test_unknown_segment_raises(self):
+        """Segmento não registrado deve gerar erro"""
+        with pytest.raises(KeyError):
+            NormativeNormalizer.default().percentiles(np.zeros((1, 5)), "inexistente")
+
+    def test_incomplete_table_raises(self):
+        """Tabela sem todos os traços deve ser rejeitada"""
+        with pytest.raises(ValueError):
+            NormTable(segment="x", means={"O": 50.0}, stds={"O": 15.0})
+
+    def test_engine_uses_segment_tables(self, sample_items):
+        """Engine deve aplicar o segmento informado na normalização Big Five"""
+        codes = ["O", "C", "E", "A", "N"]
+        normalizer = NormativeNormalizer.default()
+        normalizer.register(NormTable(segment="baixo", means={c: 0.0 for c in codes}, stds={c: 1.0 for c in codes}))
+        engine = AdvancedScoringEngine(normalizer=normalizer)
+        answers = {1: 5, 2: 4, 3: 3}
+
+        default_scores = engine.calculate_scores_with_confidence(answers, sample_items)
+        segment_scores = engine.calculate_scores_with_confidence(answers, sample_items, segment="baixo")
+
+        assert segment_scores.big_five["B5_O"] > default_scores.big_five["B5_O"]
+        assert default_scores.disc == segment_scores.disc
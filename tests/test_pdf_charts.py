@@ -0,0 +1,71 @@
+import fpdf
+import pytest
+from src.core.models import PersonalityScores
+from src.ui.visualizations import PersonalityVisualizer, mbti_preference_strengths
+from src.utils.pdf_charts import PDFChartDrawer, hex_to_rgb
+
+
+@pytest.fixture
+def drawer():
+    return PDFChartDrawer(PersonalityVisualizer().color_scheme)
+
+
+@pytest.fixture
+def pdf():
+    document = fpdf.FPDF('P', 'mm', 'A4')
+    document.set_compression(False)
+    document.add_page()
+    document.set_font('helvetica', '', 12)
+    return document
+
+
+class TestPDFChartDrawer:
+    """Testes para os gráficos vetoriais do PDF"""
+
+    def test_hex_to_rgb(self):
+        assert hex_to_rgb('#4ecdc4') == (78, 205, 196)
+
+    def test_disc_radar(self, drawer, pdf, sample_scores):
+        height = drawer.disc_radar(pdf, sample_scores, 10, 20, 90)
+        content = bytes(pdf.output())
+
+        assert height == 96
+        assert content.startswith(b'%PDF')
+        assert b'Domin' in content and b'75%' in content
+        # Polígonos preenchidos e traço tracejado da média
+        assert b' f\n' in content and b'] 0 d' in content
+        assert b'/Subtype /Image' not in content
+
+    def test_big_five_bars(self, drawer, pdf, sample_scores):
+        assert drawer.big_five_bars(pdf, sample_scores, 10, 20, 120, 80) == 80
+        content = bytes(pdf.output())
+
+        assert b'85% ' in content and b're f' in content.replace(b'\n', b' ')
+
+    def test_mbti_preferences(self, drawer, pdf, sample_scores):
+        assert drawer.mbti_preferences(pdf, sample_scores, 10, 20, 120, 60) == 60
+        assert b'Moderada' in bytes(pdf.output())
+
+    def test_document_state_is_preserved(self, drawer, pdf, sample_scores):
+        pdf.set_text_color(0, 0, 0)
+        drawer.disc_radar(pdf, sample_scores, 10, 20, 90)
+        drawer.big_five_bars(pdf, sample_scores, 10, 120, 120, 80)
+
+        assert pdf.font_size_pt == 12
+        assert pdf.text_color == fpdf.drawing.DeviceGray(0)
+        assert pdf.line_width == pytest.approx(0.567 / pdf.k, rel=0.01)
+
+    def test_missing_scores_are_tolerated(self, drawer, pdf):
+        empty = PersonalityScores(disc={}, big_five={}, mbti_preferences={}, mbti_type='')
+
+        drawer.disc_radar(pdf, empty, 10, 20, 90)
+        drawer.big_five_bars(pdf, empty, 10, 120, 120, 80)
+        drawer.mbti_preferences(pdf, empty, 10, 210, 120, 60)
+
+        assert bytes(pdf.output()).startswith(b'%PDF')
+
+    def test_mbti_strengths_are_clamped(self, sample_scores):
+        strengths = mbti_preference_strengths(sample_scores)
+
+        assert strengths['E vs I'] == -100
+        assert all(-100 <= value <= 100 for value in strengths.values())
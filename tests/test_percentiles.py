@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from src.core.percentiles import PercentileIndex
+from src.core.sketches import QuantileSketch
+from src.services.benchmark_store import PopulationBenchmarks
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(7)
+    return {
+        'DISC_D': rng.normal(50, 12, 4000).clip(0, 100),
+        'DISC_I': rng.uniform(0, 100, 4000),
+        'B5_O': rng.beta(2, 5, 4000) * 100
+    }
+
+
+class TestPercentileIndex:
+    """Testes para o índice de percentis populacionais"""
+
+    def test_percentile_matches_empirical_cdf(self, samples):
+        index = PercentileIndex.from_samples(samples)
+
+        for name, values in samples.items():
+            for score in np.percentile(values, [5, 30, 50, 80, 95]):
+                expected = (values <= score).mean() * 100
+                assert index.percentile_of(name, score) == pytest.approx(expected, abs=0.5)
+
+    def test_vectorized_matches_scalar(self, samples):
+        index = PercentileIndex.from_samples(samples)
+        scores = {'DISC_D': 61.0, 'DISC_I': 12.5, 'B5_O': 40.0, 'MBTI_E': 50.0}
+
+        result = index.percentiles_of(scores)
+
+        assert set(result) == {'DISC_D', 'DISC_I', 'B5_O'}
+        for name, value in result.items():
+            assert value == pytest.approx(index.percentile_of(name, scores[name]))
+
+    def test_out_of_range_scores_clamp(self, samples):
+        index = PercentileIndex.from_samples(samples)
+        assert index.percentile_of('DISC_I', -10) == 0.0
+        assert index.percentile_of('DISC_I', 500) == 100.0
+
+    def test_ties_use_middle_level(self):
+        index = PercentileIndex.from_samples({'DISC_D': [10, 20, 20, 20, 30]})
+        low, high = index.percentile_of('DISC_D', 19.99), index.percentile_of('DISC_D', 20.01)
+        assert low < index.percentile_of('DISC_D', 20) < high
+
+    def test_from_sketches_and_population(self, samples, sample_scores):
+        sketches = {name: QuantileSketch() for name in samples}
+        for name, values in samples.items():
+            sketches[name].update_many(values)
+        from_sketch = PercentileIndex.from_sketches(sketches)
+        assert from_sketch.percentile_of('DISC_D', 50) == pytest.approx((samples['DISC_D'] <= 50).mean() * 100, abs=1)
+
+        population = PopulationBenchmarks()
+        population.add(sample_scores)
+        from_population = PercentileIndex.from_population(population)
+        assert 'DISC_D' in from_population and 'B5_O' in from_population
+        assert from_population.sample_size == 1
+
+    def test_scores_percentiles(self, sample_scores):
+        index = PercentileIndex.from_scores([sample_scores] * 10)
+        assert set(index.scores_percentiles(sample_scores)) >= set(sample_scores.disc)
+
+    def test_dict_round_trip(self, samples):
+        index = PercentileIndex.from_samples(samples)
+        restored = PercentileIndex.from_dict(index.to_dict())
+        assert restored.percentile_of('B5_O', 33.0) == pytest.approx(index.percentile_of('B5_O', 33.0), abs=0.1)
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+from src.core.cohort import MBTI_TYPES
+from src.core.compatibility import scores_to_vector
+from src.core.item_bank import DIMENSIONS
+from src.services import profile_index as profile_index_module
+from src.services.cache import LRUTTLCache
+from src.services.database import FirestoreManager
+from src.services.profile_index import JOURNAL_FILE, SNAPSHOT_FILE, ProfileIndex
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def population():
+    rng = np.random.default_rng(21)
+    n = 2000
+    return {
+        'user_ids': [f"u{i}" for i in range(n)],
+        'vectors': rng.uniform(0, 100, (n, len(DIMENSIONS))).astype(np.float32),
+        'mbti_types': [MBTI_TYPES[i % 16] for i in range(n)],
+        'timestamps': [START + timedelta(hours=i) for i in range(n)]
+    }
+
+
+@pytest.fixture
+def index(population):
+    index = ProfileIndex()
+    index.bulk_load(**population)
+    return index
+
+
+def brute_force(population, query, rows=None):
+    vectors = population['vectors'] if rows is None else population['vectors'][rows]
+    distances = np.linalg.norm(vectors - query, axis=1)
+    order = np.argsort(distances)
+    ids = np.array(population['user_ids'])[rows] if rows is not None else np.array(population['user_ids'])
+    return list(ids[order]), distances[order]
+
+
+class TestProfileIndexSearch:
+    """Testes para a busca exata de vizinhos"""
+
+    def test_matches_brute_force(self, index, population):
+        query = population['vectors'][7] + 3
+
+        matches = index.query(query, k=20)
+        expected_ids, expected_distances = brute_force(population, query)
+
+        assert [match.user_id for match in matches] == expected_ids[:20]
+        np.testing.assert_allclose([match.distance for match in matches], expected_distances[:20], rtol=1e-3)
+
+    def test_blocked_search_matches_single_block(self, index, population, monkeypatch):
+        query = population['vectors'][3]
+        expected = [match.user_id for match in index.query(query, k=15)]
+
+        monkeypatch.setattr(profile_index_module, 'SEARCH_BLOCK_ROWS', 128)
+
+        assert [match.user_id for match in index.query(query, k=15)] == expected
+
+    def test_filters(self, index, population):
+        query = population['vectors'][0]
+        matches = index.query(
+            query, k=10, mbti_types=["INTJ", "ENFP"],
+            date_range=(START + timedelta(days=10), START + timedelta(days=40)),
+            exclude=["u300"]
+        )
+
+        rows = [
+            i for i, (mbti_type, timestamp) in enumerate(zip(population['mbti_types'], population['timestamps']))
+            if mbti_type in ("INTJ", "ENFP") and START + timedelta(days=10) <= timestamp <= START + timedelta(days=40)
+            and i != 300
+        ]
+        expected_ids, _ = brute_force(population, query, np.array(rows))
+
+        assert [match.user_id for match in matches] == expected_ids[:10]
+        assert all(match.mbti_type in ("INTJ", "ENFP") for match in matches)
+
+    def test_query_batch_and_scores(self, index, population, sample_scores):
+        queries = [sample_scores, population['vectors'][5]]
+        results = index.query_batch(queries, k=5)
+
+        assert [match.user_id for match in results[0]] == brute_force(population, scores_to_vector(sample_scores))[0][:5]
+        assert results[1][0].user_id == "u5"
+        assert results[1][0].distance == pytest.approx(0.0, abs=1e-2)
+
+    def test_k_larger_than_candidates(self, index, population):
+        matches = index.query(population['vectors'][0], k=50, mbti_types=["INTJ"],
+                              date_range=(START, START + timedelta(hours=40)))
+        assert {match.user_id for match in matches} == {"u12", "u28"}
+
+    def test_million_profiles_query_in_milliseconds(self):
+        n = 1_000_000
+        rng = np.random.default_rng(0)
+        index = ProfileIndex(initial_capacity=n)
+        index._set_arrays(
+            [f"u{i}" for i in range(n)],
+            rng.uniform(0, 100, (n, len(DIMENSIONS))).astype(np.float32),
+            rng.integers(0, 16, n).astype(np.int8),
+            np.arange(n, dtype=np.float64),
+            np.ones(n, dtype=bool)
+        )
+        query = rng.uniform(0, 100, len(DIMENSIONS))
+        index.query(query, k=20)
+
+        start = time.perf_counter()
+        matches = index.query(query, k=20)
+        elapsed = time.perf_counter() - start
+
+        assert len(matches) == 20
+        assert elapsed < 0.25
+
+
+class TestProfileIndexUpdates:
+    """Testes para atualização incremental e persistência"""
+
+    def test_upsert_replaces_and_ignores_older(self, sample_scores):
+        index = ProfileIndex()
+        index.upsert("u1", sample_scores, START + timedelta(days=2))
+
+        older = scores_to_vector(sample_scores)
+        sample_scores.disc['DISC_D'] = 10.0
+        index.upsert("u1", sample_scores, START)
+
+        assert len(index) == 1
+        assert index.query(older, k=1)[0].distance == pytest.approx(0.0, abs=1e-2)
+
+        index.upsert("u1", sample_scores, START + timedelta(days=3))
+        assert len(index) == 1
+        assert index.query(older, k=1)[0].distance == pytest.approx(65.0, abs=1e-2)
+
+    def test_capacity_grows(self, sample_scores):
+        index = ProfileIndex(initial_capacity=2)
+        for i in range(10):
+            index.upsert(f"u{i}", sample_scores, START)
+
+        assert len(index) == 10
+        assert "u9" in index
+
+    def test_remove(self, index, population):
+        assert index.remove("u7")
+        assert "u7" not in index
+        assert index.query(population['vectors'][7], k=1)[0].user_id != "u7"
+        assert not index.remove("u7")
+
+    def test_journal_replay_and_compaction(self, tmp_path, sample_scores):
+        directory = str(tmp_path / "index")
+        index = ProfileIndex(directory=directory, compact_every=3)
+        index.upsert("u1", sample_scores, START)
+        index.upsert("u2", sample_scores, START + timedelta(days=1))
+
+        assert os.path.exists(os.path.join(directory, JOURNAL_FILE))
+        assert not os.path.exists(os.path.join(directory, SNAPSHOT_FILE))
+        assert len(ProfileIndex(directory=directory)) == 2
+
+        index.remove("u1")
+        assert os.path.exists(os.path.join(directory, SNAPSHOT_FILE))
+        assert not os.path.exists(os.path.join(directory, JOURNAL_FILE))
+
+        index.upsert("u3", sample_scores, START)
+        reopened = ProfileIndex(directory=directory)
+        assert len(reopened) == 2
+        assert "u1" not in reopened and "u3" in reopened
+        assert reopened.query(sample_scores, k=1)[0].mbti_type == sample_scores.mbti_type
+
+    def test_truncated_journal_line_is_skipped(self, tmp_path, sample_scores):
+        directory = str(tmp_path / "index")
+        ProfileIndex(directory=directory).upsert("u1", sample_scores, START)
+        with open(os.path.join(directory, JOURNAL_FILE), 'a') as f:
+            f.write('{"op": "upsert", "user_id": "u2", "vec')
+
+        assert len(ProfileIndex(directory=directory)) == 1
+
+
+class TestManagerProfileIndex:
+    """Integração do índice com o FirestoreManager"""
+
+    def test_bulk_save_indexes_latest_profile(self, sample_assessment):
+        index = ProfileIndex()
+        manager = FirestoreManager(cache=LRUTTLCache(), profile_index=index)
+        manager.db = Mock()
+
+        asyncio.run(manager.bulk_save_assessments([sample_assessment]))
+        matches = asyncio.run(manager.find_similar_profiles(sample_assessment.scores, k=1))
+        manager.close()
+
+        assert matches[0].user_id == sample_assessment.user_id
+        assert matches[0].distance == pytest.approx(0.0, abs=1e-2)
+
+    def test_failed_write_is_not_indexed(self, sample_assessment):
+        index = ProfileIndex()
+        manager = FirestoreManager(cache=LRUTTLCache(), profile_index=index)
+        manager.db = Mock()
+        manager.db.batch.return_value.commit.side_effect = ValueError("invalid")
+
+        asyncio.run(manager.bulk_save_assessments([sample_assessment], max_retries=0))
+        manager.close()
+
+        assert len(index) == 0
@@ -0,0 +1,142 @@
+import os
+import shutil
+import threading
+import time
+from dataclasses import replace
+
+import pytest
+from src.utils.report_cache import ReportCache, report_key, source_version
+from src.utils.reports import TEMPLATE_DIR, AdvancedReportGenerator, create_report_environment
+
+
+class TestReportKey:
+    """Testes para a chave de conteúdo dos relatórios"""
+
+    def test_stable_for_same_content(self, sample_assessment):
+        key = report_key(sample_assessment, "executive", "pdf", {"language": "Português"})
+
+        assert key == report_key(replace(sample_assessment), "executive", "pdf", {"language": "Português"})
+
+    def test_changes_with_inputs(self, sample_assessment):
+        base = report_key(sample_assessment, "executive", "pdf", {"include_charts": True})
+        changed_scores = replace(
+            sample_assessment,
+            scores=replace(sample_assessment.scores, disc={**sample_assessment.scores.disc, 'DISC_D': 1.0})
+        )
+
+        assert base != report_key(sample_assessment, "complete", "pdf", {"include_charts": True})
+        assert base != report_key(sample_assessment, "executive", "html", {"include_charts": True})
+        assert base != report_key(sample_assessment, "executive", "pdf", {"include_charts": False})
+        assert base != report_key(changed_scores, "executive", "pdf", {"include_charts": True})
+        assert base != report_key(sample_assessment, "executive", "pdf", {"include_charts": True}, "v2")
+
+    def test_source_version_tracks_template_changes(self, tmp_path):
+        templates = tmp_path / "templates"
+        shutil.copytree(TEMPLATE_DIR, templates)
+        generator = AdvancedReportGenerator(environment=create_report_environment(template_dir=str(templates)))
+        before = generator._renderer_version("html")
+
+        assert generator._renderer_version("html") == before
+        assert source_version([str(templates)]) == source_version([str(templates)])
+
+        path = templates / "default_report.html"
+        path.write_text(path.read_text(encoding='utf-8') + "<!-- v2 -->", encoding='utf-8')
+
+        assert generator._renderer_version("html") != before
+        assert generator._renderer_version("pdf") == AdvancedReportGenerator()._renderer_version("pdf")
+
+
+class TestReportCache:
+    """Testes para o cache de artefatos em disco"""
+
+    def test_render_once_then_hit(self, tmp_path):
+        cache = ReportCache(str(tmp_path))
+        calls = []
+
+        def render():
+            calls.append(1)
+            return b"relatorio"
+
+        assert cache.get_or_render("ab12", render) == b"relatorio"
+        assert cache.get_or_render("ab12", render) == b"relatorio"
+        assert len(calls) == 1
+        assert cache.stats().hits == 1 and cache.stats().misses == 1
+
+        # Outro processo (nova instância) encontra o artefato no disco
+        assert ReportCache(str(tmp_path)).get("ab12") == b"relatorio"
+
+    def test_size_based_lru_eviction(self, tmp_path):
+        cache = ReportCache(str(tmp_path), max_bytes=250)
+        for key in ("aa01", "bb02"):
+            cache.put(key, b"x" * 100)
+        time.sleep(0.01)
+        cache.get("aa01")
+        cache.put("cc03", b"y" * 100)
+
+        stats = cache.stats()
+        assert cache.get("bb02") is None
+        assert cache.get("aa01") is not None and cache.get("cc03") is not None
+        assert stats.evictions == 1 and stats.bytes == 200
+        assert not os.path.exists(tmp_path / "bb" / "bb02.bin")
+
+    def test_oversized_artifact_is_not_stored(self, tmp_path):
+        cache = ReportCache(str(tmp_path), max_bytes=10)
+
+        assert cache.get_or_render("ab12", lambda: b"z" * 20) == b"z" * 20
+        assert cache.stats().entries == 0
+
+    def test_concurrent_requests_are_coalesced(self, tmp_path):
+        cache = ReportCache(str(tmp_path))
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def render():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return b"pdf"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_render("ab12", render)))
+                   for _ in range(4)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == [b"pdf"] * 4
+        assert len(calls) == 1
+        assert cache.stats().coalesced == 3
+
+    def test_render_error_propagates_and_is_not_cached(self, tmp_path):
+        cache = ReportCache(str(tmp_path))
+
+        def fail():
+            raise RuntimeError("falhou")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_render("ab12", fail)
+        assert cache.get_or_render("ab12", lambda: b"ok") == b"ok"
+
+
+class TestGeneratorCache:
+    """Integração do cache com o gerador de relatórios"""
+
+    def test_generator_serves_repeated_requests_from_cache(self, tmp_path, sample_assessment, monkeypatch):
+        generator = AdvancedReportGenerator(cache=ReportCache(str(tmp_path)))
+        calls = []
+        monkeypatch.setattr(
+            generator, '_render_report', lambda *args: calls.append(args) or b"<html></html>"
+        )
+
+        first = generator.generate_comprehensive_report(sample_assessment, "executive", "html")
+        second = generator.generate_comprehensive_report(sample_assessment, "executive", "html")
+        generator.generate_comprehensive_report(sample_assessment, "coaching", "html")
+
+        assert first == second == b"<html></html>"
+        assert len(calls) == 2
@@ -0,0 +1,59 @@
+import os
+import shutil
+
+import pytest
+from src.utils.reports import (
+    TEMPLATE_DIR, AdvancedReportGenerator, create_report_environment, report_environment
+)
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    directory = tmp_path / "templates"
+    shutil.copytree(TEMPLATE_DIR, directory)
+    return directory
+
+
+class TestReportEnvironment:
+    """Testes para o ambiente Jinja2 compartilhado dos relatórios"""
+
+    def test_environment_is_shared_by_generators(self):
+        first, second = AdvancedReportGenerator(), AdvancedReportGenerator()
+
+        assert first.environment is second.environment is report_environment()
+        assert first._get_template("executive") is second._get_template("executive")
+
+    def test_unknown_report_type_uses_default_template(self):
+        generator = AdvancedReportGenerator(environment=create_report_environment())
+
+        assert generator._get_template("inexistente").name == "default_report.html"
+
+    def test_bytecode_is_cached_on_disk(self, tmp_path):
+        cache_dir = tmp_path / "bytecode"
+        create_report_environment(bytecode_dir=str(cache_dir)).get_template("default_report.html")
+
+        assert len(os.listdir(cache_dir)) == 1
+
+        # Um novo processo (novo ambiente) carrega o bytecode em vez de compilar
+        environment = create_report_environment(bytecode_dir=str(cache_dir))
+        environment.compile = None
+        assert environment.get_template("default_report.html")
+
+    def test_auto_reload_picks_up_changes(self, template_dir, sample_assessment):
+        environment = create_report_environment(template_dir=str(template_dir), auto_reload=True)
+        generator = AdvancedReportGenerator(environment=environment)
+        assert b"Relat" in generator._generate_html_report(sample_assessment, "executive", {})
+
+        path = template_dir / "default_report.html"
+        path.write_text("<html>{{ scores.mbti_type }} alterado</html>", encoding='utf-8')
+        os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 5))
+
+        assert generator._generate_html_report(sample_assessment, "executive", {}) == b"<html>INTJ alterado</html>"
+
+    def test_without_auto_reload_templates_stay_compiled(self, template_dir, sample_assessment):
+        generator = AdvancedReportGenerator(environment=create_report_environment(template_dir=str(template_dir)))
+        before = generator._generate_html_report(sample_assessment, "team", {})
+
+        (template_dir / "default_report.html").write_text("<html>alterado</html>", encoding='utf-8')
+
+        assert generator._generate_html_report(sample_assessment, "team", {}) == before
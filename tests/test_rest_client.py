@@ -0,0 +1,78 @@
+import pytest
+import requests
+from unittest.mock import Mock
+from src.services.rest_client import FirebaseRestClient
+
+
+def _response(status: int, headers: dict = None) -> Mock:
+    response = Mock()
+    response.status_code = status
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture
+def client():
+    """Cliente sem espera real entre tentativas"""
+    sleeps = []
+    rest_client = FirebaseRestClient(max_retries=3, sleep=sleeps.append)
+    rest_client.sleeps = sleeps
+    return rest_client
+
+
+class TestFirebaseRestClient:
+    """Testes para o cliente REST com pool e retry"""
+
+    def test_retries_transient_errors(self, client):
+        """429/5xx devem ser repetidos até obter sucesso"""
+        client.session.request = Mock(side_effect=[_response(503), _response(429), _response(200)])
+
+        response = client.patch("https://firestore.googleapis.com/v1/doc", endpoint="firestore.save")
+
+        assert response.status_code == 200
+        assert client.session.request.call_count == 3
+        assert len(client.sleeps) == 2
+        metrics = client.metrics()["firestore.save"]
+        assert metrics['requests'] == 3
+        assert metrics['retries'] == 2
+        assert metrics['errors'] == 2
+
+    def test_gives_up_after_max_retries(self, client):
+        """Após esgotar as tentativas, retorna a última resposta"""
+        client.session.request = Mock(return_value=_response(500))
+
+        response = client.get("https://firestore.googleapis.com/v1/doc")
+
+        assert response.status_code == 500
+        assert client.session.request.call_count == 4
+
+    def test_client_errors_not_retried(self, client):
+        """Erros 4xx (exceto 429) não devem ser repetidos"""
+        client.session.request = Mock(return_value=_response(400))
+
+        assert client.post("https://identitytoolkit.googleapis.com/v1/accounts:signUp").status_code == 400
+        assert client.session.request.call_count == 1
+
+    def test_post_not_retried_on_ambiguous_failure(self, client):
+        """POST não é repetido em 500 nem em erro de conexão (pode ter sido processado)"""
+        client.session.request = Mock(return_value=_response(500))
+        assert client.post("https://identitytoolkit.googleapis.com/v1/accounts:signUp").status_code == 500
+
+        client.session.request = Mock(side_effect=requests.exceptions.ConnectionError())
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.post("https://identitytoolkit.googleapis.com/v1/accounts:signUp")
+        assert client.session.request.call_count == 1
+
+    def test_retry_after_header_respected(self, client):
+        """Header Retry-After define a espera (limitada ao backoff máximo)"""
+        client.session.request = Mock(side_effect=[_response(429, {"Retry-After": "2"}), _response(200)])
+
+        client.get("https://firestore.googleapis.com/v1/doc")
+
+        assert client.sleeps == [2.0]
+
+    def test_backoff_is_jittered_and_capped(self, client):
+        """Backoff deve ficar entre 0 e o limite exponencial"""
+        for attempt in range(10):
+            delay = client._backoff(attempt)
+            assert 0 <= delay <= min(client.backoff_max, client.backoff_base * 2 ** attempt)
@@ -0,0 +1,85 @@
+import pytest
+import numpy as np
+from src.core.scoring import AdvancedScoringEngine
+from src.core.models import AssessmentItem
+
+
+@pytest.fixture
+def mixed_items():
+    """Banco de itens com reverse scoring e as três escalas"""
+    return [
+        AssessmentItem(id=1, text="Item 1", category="DISC", weights={"DISC_D": 0.8, "MBTI_J": 0.4}),
+        AssessmentItem(id=2, text="Item 2", category="B5", weights={"B5_O": 0.9, "MBTI_N": 0.7}),
+        AssessmentItem(id=3, text="Item 3", category="B5", reverse_scored=True, weights={"B5_C": 0.85, "MBTI_P": 0.6}),
+        AssessmentItem(id=4, text="Item 4", category="DISC", weights={"DISC_I": 1.0, "B5_E": 0.5, "MBTI_E": 0.8}),
+        AssessmentItem(id=5, text="Item 5", category="DISC", reverse_scored=True, weights={"DISC_S": 0.7, "B5_A": 0.6}),
+        AssessmentItem(id=6, text="Item 6", category="DISC", weights={"DISC_C": 0.9, "B5_N": -0.4, "MBTI_T": 0.5}),
+        AssessmentItem(id=40, text="Item 40", category="MBTI", weights={"MBTI_I": 0.6, "MBTI_S": 0.5, "MBTI_F": 0.3}),
+    ]
+
+
+class TestScoreBatch:
+    """Testes para a pontuação vetorizada em lote"""
+
+    def _assert_same_scores(self, batch, single):
+        assert batch.mbti_type == single.mbti_type
+        assert batch.disc == pytest.approx(single.disc)
+        assert batch.big_five == pytest.approx(single.big_five)
+        assert batch.mbti_preferences == pytest.approx(single.mbti_preferences)
+        assert batch.confidence_scores == pytest.approx(single.confidence_scores)
+
+    def test_matches_single_scoring(self, mixed_items):
+        """Cada linha do lote deve igualar calculate_scores_with_confidence"""
+        engine = AdvancedScoringEngine()
+        rng = np.random.default_rng(42)
+
+        answers_list = [
+            {item.id: int(rng.integers(1, 6)) for item in mixed_items}
+            for _ in range(50)
+        ]
+        # Respondentes com itens faltantes
+        answers_list.append({1: 5, 3: 2})
+        answers_list.append({})
+
+        matrix = engine.answers_to_matrix(answers_list, mixed_items)
+        batch = engine.score_batch(matrix, mixed_items)
+
+        assert len(batch) == len(answers_list)
+        for answers, batch_scores in zip(answers_list, batch):
+            single = engine.calculate_scores_with_confidence(answers, mixed_items)
+            self._assert_same_scores(batch_scores, single)
+
+    def test_mbti_tie_is_exact_in_both_paths(self):
+        """Empate E/I (0.1 + 0.2 contra 0.3) resulta em E, sozinho ou em lote"""
+        engine = AdvancedScoringEngine()
+        items = [
+            AssessmentItem(id=100, text="Item 100", category="MBTI", weights={"MBTI_E": 0.1}),
+            AssessmentItem(id=101, text="Item 101", category="MBTI", weights={"MBTI_E": 0.2}),
+            AssessmentItem(id=102, text="Item 102", category="MBTI", weights={"MBTI_I": 0.3}),
+        ]
+        answers = {100: 5, 101: 5, 102: 5}
+
+        single = engine.calculate_scores_with_confidence(answers, items)
+        batch = engine.score_batch(engine.answers_to_matrix([answers] * 64, items), items)
+
+        assert single.mbti_preferences["MBTI_E"] == single.mbti_preferences["MBTI_I"]
+        assert single.mbti_type[0] == "E"
+        for scores in batch:
+            assert scores.mbti_preferences == single.mbti_preferences
+            assert scores.mbti_type == single.mbti_type
+
+    def test_nan_means_unanswered(self, sample_items):
+        """NaN na matriz deve ser tratado como item não respondido"""
+        engine = AdvancedScoringEngine()
+
+        batch = engine.score_batch(np.array([[5, np.nan, 3]]), sample_items)
+        single = engine.calculate_scores_with_confidence({1: 5, 3: 3}, sample_items)
+
+        self._assert_same_scores(batch[0], single)
+
+    def test_column_mismatch_raises(self, sample_items):
+        """Matriz com número errado de colunas deve gerar erro"""
+        engine = AdvancedScoringEngine()
+
+        with pytest.raises(ValueError):
+            engine.score_batch(np.ones((2, 5)), sample_items)
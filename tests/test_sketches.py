@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+from src.core.sketches import MomentSketch, QuantileSketch, TDigest
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(42).normal(50, 15, 20000)
+
+
+class TestMomentSketch:
+    """Testes para momentos de Welford"""
+
+    def test_matches_numpy(self, values):
+        sketch = MomentSketch()
+        for value in values:
+            sketch.update(value)
+
+        assert sketch.mean == pytest.approx(values.mean())
+        assert sketch.std == pytest.approx(values.std())
+        assert (sketch.min, sketch.max) == (values.min(), values.max())
+
+    def test_merge_matches_single_pass(self, values):
+        left, right, whole = MomentSketch(), MomentSketch(), MomentSketch()
+        for i, value in enumerate(values[:1000]):
+            (left if i < 300 else right).update(value)
+            whole.update(value)
+
+        left.merge(right)
+        assert left.count == whole.count
+        assert left.mean == pytest.approx(whole.mean)
+        assert left.variance == pytest.approx(whole.variance)
+
+
+class TestTDigest:
+    """Testes para o t-digest"""
+
+    def test_quantiles_close_to_exact(self, values):
+        digest = TDigest(compression=100)
+        digest.update_many(values)
+
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            assert digest.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.5)
+        # Tamanho limitado pela compressão, não pelo número de valores
+        assert len(digest) < 200
+
+    def test_cdf_inverts_quantile(self, values):
+        digest = TDigest()
+        digest.update_many(values)
+
+        for q in (0.1, 0.5, 0.9):
+            assert digest.cdf(digest.quantile(q)) == pytest.approx(q, abs=0.01)
+
+    def test_merge_of_shards(self, values):
+        shards = [TDigest() for _ in range(4)]
+        for i, value in enumerate(values):
+            shards[i % 4].update(value)
+
+        merged = TDigest()
+        for shard in shards:
+            merged.merge(shard)
+
+        assert merged.count == len(values)
+        assert merged.quantile(0.5) == pytest.approx(np.median(values), abs=0.5)
+
+    def test_merge_matches_single_stream(self, values):
+        """Shards mesclados respondem como um único digest alimentado com tudo"""
+        single, left, right = TDigest(), TDigest(), TDigest()
+        single.update_many(values)
+        left.update_many(values[:7000])
+        right.update_many(values[7000:])
+
+        left.merge(right)
+
+        assert left.count == single.count
+        assert (left.min, left.max) == (single.min, single.max)
+        for q in (0.05, 0.25, 0.5, 0.75, 0.95):
+            assert left.quantile(q) == pytest.approx(single.quantile(q), abs=0.5)
+
+    def test_empty_and_single(self):
+        digest = TDigest()
+        assert np.isnan(digest.quantile(0.5))
+        digest.update(7.0)
+        assert digest.quantile(0.5) == 7.0
+
+
+class TestQuantileSketch:
+    """Testes para o sketch combinado e sua serialização"""
+
+    def test_summary(self, values):
+        sketch = QuantileSketch()
+        sketch.update_many(values)
+        summary = sketch.summary()
+
+        assert summary['p50'] == pytest.approx(np.percentile(values, 50), abs=0.5)
+        assert summary['std'] == pytest.approx(values.std())
+        assert sketch.percentile_rank(np.percentile(values, 75)) == pytest.approx(75, abs=1)
+
+    def test_dict_round_trip(self, values):
+        sketch = QuantileSketch()
+        sketch.update_many(values[:5000])
+        restored = QuantileSketch.from_dict(sketch.to_dict())
+
+        assert restored.count == sketch.count
+        assert restored.quantile(0.9) == pytest.approx(sketch.quantile(0.9), abs=0.01)
+
+    def test_bytes_round_trip(self, values):
+        sketch = QuantileSketch()
+        sketch.update_many(values[:5000])
+        restored = QuantileSketch.from_bytes(sketch.to_bytes())
+
+        assert restored.count == sketch.count
+        assert restored.moments == sketch.moments
+        for q in (0.1, 0.5, 0.9):
+            assert restored.quantile(q) == pytest.approx(sketch.quantile(q), abs=0.01)
+
+    def test_bytes_are_compact_and_mergeable(self, values):
+        """Sketches serializados por período podem ser combinados depois"""
+        march, april = QuantileSketch(), QuantileSketch()
+        march.update_many(values[:10000])
+        april.update_many(values[10000:])
+
+        payload = march.to_bytes()
+        assert len(payload) < 2000
+
+        combined = QuantileSketch.merged([QuantileSketch.from_bytes(payload), QuantileSketch.from_bytes(april.to_bytes())])
+        assert combined.count == len(values)
+        assert combined.quantile(0.25) == pytest.approx(np.percentile(values, 25), abs=0.5)
+        assert combined.moments.mean == pytest.approx(values.mean())
+
+    def test_nan_ignored(self):
+        sketch = QuantileSketch()
+        sketch.update_many([1.0, float('nan'), 3.0])
+        assert sketch.count == 2
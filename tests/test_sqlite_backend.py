@@ -0,0 +1,167 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from src.core.item_bank import DIMENSIONS
+from src.core.models import PersonalityScores, UserAssessment
+from src.services import database
+from src.services.benchmark_store import PopulationBenchmarks
+from src.services.cache import LRUTTLCache
+from src.services.profile_index import ProfileIndex
+from src.services.sqlite_backend import SQLiteStorage
+from src.services.user_stats import UserStatsSummary
+
+START = datetime(2024, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def make_assessment(i, user_id="u1", timestamp=None, reliability=0.8, minutes=12):
+    rng = np.random.default_rng(i)
+    values = dict(zip(DIMENSIONS, rng.uniform(0, 100, len(DIMENSIONS)).round(2).tolist()))
+    return UserAssessment(
+        user_id=user_id,
+        assessment_id=f"a{i}",
+        answers={1: 4, 2: 2},
+        scores=PersonalityScores(
+            disc={name: values[name] for name in DIMENSIONS[:4]},
+            big_five={name: values[name] for name in DIMENSIONS[4:9]},
+            mbti_preferences={name: values[name] for name in DIMENSIONS[9:]},
+            mbti_type=["INTJ", "ENFP", "ISTJ"][i % 3]
+        ),
+        profile_insights=None,
+        timestamp=timestamp or START + timedelta(hours=i),
+        completion_time_minutes=minutes,
+        reliability_score=reliability
+    )
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "neuromap.db"), cache=LRUTTLCache())
+    yield storage
+    storage.close()
+
+
+class TestSQLiteAssessments:
+    """Testes para leitura e escrita de avaliações no backend local"""
+
+    def test_round_trip(self, storage, sample_assessment):
+        asyncio.run(storage.save_assessment(sample_assessment.user_id, sample_assessment))
+        loaded = asyncio.run(storage.get_latest_assessment(sample_assessment.user_id))
+
+        assert loaded.assessment_id == sample_assessment.assessment_id
+        assert loaded.answers == sample_assessment.answers
+        assert loaded.scores == sample_assessment.scores
+        assert loaded.timestamp == sample_assessment.timestamp.replace(tzinfo=timezone.utc)
+        assert loaded.profile_insights == sample_assessment.profile_insights
+
+    def test_order_limit_and_cache_invalidation(self, storage):
+        for i in (2, 0, 1):
+            asyncio.run(storage.save_assessment("u1", make_assessment(i)))
+
+        assert [a.assessment_id for a in asyncio.run(storage.get_user_assessments("u1", limit=2))] == ["a2", "a1"]
+
+        asyncio.run(storage.save_assessment("u1", make_assessment(3)))
+        assert asyncio.run(storage.get_user_assessments("u1", limit=2))[0].assessment_id == "a3"
+        assert asyncio.run(storage.get_user_assessments("u2")) == []
+
+    def test_bulk_save_and_profile_index(self, tmp_path):
+        index = ProfileIndex()
+        storage = SQLiteStorage(str(tmp_path / "bulk.db"), cache=LRUTTLCache(), profile_index=index)
+        assessments = [make_assessment(i, user_id=f"u{i % 4}") for i in range(25)]
+
+        progress = []
+        result = asyncio.run(storage.bulk_save_assessments(assessments, batch_size=10, progress=progress.append))
+
+        assert result.ok and result.documents_written == 25
+        assert [p.chunks_committed for p in progress] == [1, 2, 3]
+        assert len(index) == 4
+
+        index.bulk_load([], np.empty((0, len(DIMENSIONS)), dtype=np.float32), [], [])
+        assert asyncio.run(storage.rebuild_profile_index()) == 4
+        match = asyncio.run(storage.find_similar_profiles(assessments[-1].scores, k=1))[0]
+        storage.close()
+
+        assert match.user_id == assessments[-1].user_id
+
+
+class TestSQLiteAggregates:
+    """Agregações SQL devem coincidir com os resumos incrementais"""
+
+    def test_analytics_matches_incremental_summary(self, storage):
+        days = [0, 1, 1, 2, 5, 6, 9]
+        assessments = [
+            make_assessment(i, timestamp=START + timedelta(days=day, hours=i), reliability=0.5 + i / 20,
+                            minutes=0 if i == 3 else 10 + i)
+            for i, day in enumerate(days)
+        ]
+        summary = UserStatsSummary()
+        for assessment in assessments:
+            summary = summary.apply(assessment)
+        for assessment in reversed(assessments):
+            asyncio.run(storage.save_assessment("u1", assessment))
+
+        stats = storage._query_stats("u1")
+        today = date(2024, 3, 11)
+
+        assert stats.to_analytics(today=today) == summary.to_analytics(today=today)
+        assert (stats.assessment_streak, stats.longest_streak) == (1, 3)
+        assert asyncio.run(storage.get_assessment_analytics("u1"))['total_assessments'] == 7
+        assert asyncio.run(storage.get_assessment_analytics("u2")) == {}
+
+    def test_population_matches_python_aggregate(self, storage):
+        assessments = [make_assessment(i, user_id=f"u{i}", timestamp=START + timedelta(days=i)) for i in range(40)]
+        assessments[0].scores.disc['DISC_D'] = 100.0
+        asyncio.run(storage.bulk_save_assessments(assessments))
+
+        expected = PopulationBenchmarks()
+        for assessment in assessments:
+            expected.add(assessment.scores)
+        population = asyncio.run(storage._get_population())
+
+        assert population.sample_size == 40
+        assert population.mbti_counts == expected.mbti_counts
+        for scale in ("disc", "big_five"):
+            for code, histogram in getattr(expected, scale).items():
+                actual = getattr(population, scale)[code]
+                assert actual.bins == histogram.bins
+                assert actual.total == pytest.approx(histogram.total)
+                assert actual.total_sq == pytest.approx(histogram.total_sq)
+
+        benchmarks = asyncio.run(storage.get_population_benchmarks())
+        expected_benchmarks = expected.to_benchmarks()
+        assert benchmarks['sample_size'] == expected_benchmarks['sample_size']
+        for code, stats in expected_benchmarks['disc_percentiles'].items():
+            assert benchmarks['disc_percentiles'][code] == pytest.approx(stats)
+
+    def test_population_date_range(self, storage):
+        asyncio.run(storage.bulk_save_assessments(
+            [make_assessment(i, user_id=f"u{i}", timestamp=START + timedelta(days=i)) for i in range(10)]
+        ))
+
+        population = asyncio.run(storage._get_population(
+            {'date_range': (date(2024, 3, 3), date(2024, 3, 5))}
+        ))
+
+        assert population.sample_size == 3
+        assert sum(population.disc['D'].bins.values()) == 3
+        assert asyncio.run(storage.get_percentile_index()) is not None
+
+
+class TestStorageBackendFactory:
+    """Seleção do backend por configuração"""
+
+    def test_sqlite_backend_from_config(self, tmp_path, monkeypatch):
+        settings = {"STORAGE_BACKEND": "sqlite", "SQLITE_PATH": str(tmp_path / "app.db")}
+        monkeypatch.setattr(database, "get_setting", lambda name, default=None: settings.get(name, default))
+
+        backend = database.create_storage_backend()
+        backend.close()
+
+        assert isinstance(backend, SQLiteStorage)
+        assert backend.available
+        assert (tmp_path / "app.db").exists()
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            database.create_storage_backend("duckdb")
@@ -0,0 +1,28 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from src.utils.timestamps import epoch_microseconds, epoch_seconds
+
+
+class TestTimestamps:
+    """Testes para a conversão de datas em tempo Unix"""
+
+    def test_naive_is_utc(self):
+        naive = datetime(2024, 11, 15, 10, 30)
+
+        assert epoch_seconds(naive) == naive.replace(tzinfo=timezone.utc).timestamp()
+
+    def test_aware_keeps_offset(self):
+        brasilia = datetime(2024, 11, 15, 7, 30, tzinfo=timezone(timedelta(hours=-3)))
+
+        assert epoch_seconds(brasilia) == epoch_seconds(datetime(2024, 11, 15, 10, 30))
+
+    def test_date_is_midnight(self):
+        assert epoch_seconds(date(1970, 1, 2)) == 86400
+
+    def test_microseconds_are_exact(self):
+        assert epoch_microseconds(datetime(2024, 11, 15, 10, 30, 0, 123457)) == 1731666600123457
+
+    def test_invalid_value(self):
+        with pytest.raises(TypeError):
+            epoch_seconds("2024-11-15")
@@ -0,0 +1,99 @@
+import asyncio
+from dataclasses import replace
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import Mock
+import pytest
+from src.services.cache import LRUTTLCache
+from src.services.database import FirestoreManager, USER_STATS_SCHEMA
+from src.services.user_stats import RECENT_HISTORY, UserStatsSummary
+
+
+def _assessment_at(base, timestamp, d=50.0, mbti="INTJ", reliability=0.8, minutes=10):
+    scores = replace(base.scores, disc={**base.scores.disc, 'DISC_D': d}, mbti_type=mbti)
+    return replace(
+        base, timestamp=timestamp, scores=scores,
+        reliability_score=reliability, completion_time_minutes=minutes
+    )
+
+
+class TestUserStatsSummary:
+    """Testes para o resumo incremental de estatísticas"""
+
+    def test_running_totals(self, sample_assessment):
+        start = datetime(2024, 11, 1, 9, 0)
+        summary = UserStatsSummary()
+        for i, (d, minutes) in enumerate([(40.0, 10), (50.0, 20), (70.0, 30)]):
+            summary = summary.apply(_assessment_at(sample_assessment, start + timedelta(days=3 * i), d=d, minutes=minutes))
+
+        analytics = summary.to_analytics(today=date(2024, 11, 7))
+
+        assert analytics['total_assessments'] == 3
+        assert analytics['completion_time_avg'] == pytest.approx(20.0)
+        assert analytics['assessment_frequency'] == "Semanal"
+        assert analytics['disc_evolution']['DISC_D'] == {'change': 30.0, 'direction': 'increase'}
+        assert analytics['first_assessment'] == start.replace(tzinfo=timezone.utc)
+        assert analytics['last_assessment'] == (start + timedelta(days=6)).replace(tzinfo=timezone.utc)
+
+    def test_apply_does_not_mutate(self, sample_assessment):
+        summary = UserStatsSummary()
+        summary.apply(sample_assessment)
+        assert summary.total_assessments == 0
+        assert summary.recent_disc == []
+
+    def test_streak_counts_consecutive_days(self, sample_assessment):
+        """Sequência cresce em dias consecutivos, ignora repetição no mesmo dia e reinicia após lacuna"""
+        summary = UserStatsSummary()
+        for day in [1, 2, 2, 3]:
+            summary = summary.apply(_assessment_at(sample_assessment, datetime(2024, 11, day, 12)))
+        assert summary.assessment_streak == 3
+
+        summary = summary.apply(_assessment_at(sample_assessment, datetime(2024, 11, 6, 12)))
+        assert summary.assessment_streak == 1
+        assert summary.longest_streak == 3
+
+    def test_streak_expires_when_inactive(self, sample_assessment):
+        summary = UserStatsSummary().apply(_assessment_at(sample_assessment, datetime(2024, 11, 1, 12)))
+        assert summary.current_streak(today=date(2024, 11, 2)) == 1
+        assert summary.current_streak(today=date(2024, 11, 3)) == 0
+
+    def test_recent_history_is_bounded(self, sample_assessment):
+        summary = UserStatsSummary()
+        start = datetime(2024, 1, 1)
+        for i in range(RECENT_HISTORY + 5):
+            summary = summary.apply(_assessment_at(sample_assessment, start + timedelta(days=i), d=float(i)))
+
+        assert len(summary.recent_disc) == RECENT_HISTORY
+        assert summary.recent_disc[0]['DISC_D'] == RECENT_HISTORY + 4
+
+    def test_out_of_order_only_updates_totals(self, sample_assessment):
+        summary = UserStatsSummary().apply(_assessment_at(sample_assessment, datetime(2024, 11, 10), mbti="ENTP"))
+        summary = summary.apply(_assessment_at(sample_assessment, datetime(2024, 11, 1), mbti="ISFJ"))
+
+        assert summary.total_assessments == 2
+        assert summary.last_mbti_type == "ENTP"
+        assert summary.first_assessment == datetime(2024, 11, 1, tzinfo=timezone.utc)
+
+    def test_persistence_round_trip(self, sample_assessment):
+        summary = UserStatsSummary().apply(sample_assessment)
+        assert USER_STATS_SCHEMA.from_plain(USER_STATS_SCHEMA.to_plain(summary)) == summary
+
+
+class TestAnalyticsFromSummary:
+    """Analytics deve ser uma leitura de documento único"""
+
+    def test_analytics_reads_summary_document(self, sample_assessment):
+        manager = FirestoreManager(cache=LRUTTLCache())
+        db = Mock()
+        snapshot = Mock(exists=True)
+        snapshot.to_dict.return_value = USER_STATS_SCHEMA.to_plain(UserStatsSummary().apply(sample_assessment))
+        stats_ref = db.collection.return_value.document.return_value.collection.return_value.document.return_value
+        stats_ref.get.return_value = snapshot
+        manager.db = db
+
+        analytics = asyncio.run(manager.get_assessment_analytics("test_user_123"))
+        manager.close()
+
+        assert analytics['total_assessments'] == 1
+        assert analytics['mbti_type_history'] == [sample_assessment.scores.mbti_type]
+        # Nenhuma query sobre o histórico de avaliações
+        db.collection.return_value.document.return_value.collection.return_value.order_by.assert_not_called()
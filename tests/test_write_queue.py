@@ -0,0 +1,280 @@
+import asyncio
+import time
+from dataclasses import replace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from src.services.cache import LRUTTLCache
+from src.services.benchmark_store import GLOBAL_PERIOD
+from src.services.database import FirestoreManager, assessment_revision
+from src.services.sqlite_backend import SQLiteStorage
+from src.services.write_queue import (
+    PermanentWriteError, WriteBehindQueue, assessment_key, backend_sender, decode_assessment,
+    encode_assessment, enqueue_assessment, pending_payload
+)
+
+
+class Recorder:
+    """Destino falso: registra envios e falha nas primeiras `failures` chamadas"""
+
+    def __init__(self, failures=0, error=RuntimeError("indisponível")):
+        self.sent = []
+        self.failures = failures
+        self.error = error
+
+    def __call__(self, key, payload):
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        self.sent.append((key, payload))
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return str(tmp_path / "queue" / "journal.db")
+
+
+class TestWriteBehindQueue:
+    """Testes para a fila durável de escritas"""
+
+    def test_enqueue_returns_before_send_and_flush_delivers(self, journal):
+        send = Recorder()
+        queue = WriteBehindQueue(journal, send)
+        queue.start = Mock()
+
+        queue.enqueue("users/u1", {"score": 1}, owner="u1")
+
+        assert send.sent == []
+        assert [write.payload for write in queue.pending("u1")] == [{"score": 1}]
+        assert queue.flush()
+        assert send.sent == [("users/u1", {"score": 1})]
+        assert queue.stats()['pending'] == 0
+        queue.close()
+
+    def test_same_key_keeps_latest_payload(self, journal):
+        send = Recorder()
+        queue = WriteBehindQueue(journal, send)
+        queue.start = Mock()
+
+        queue.enqueue("users/u1", {"version": 1})
+        queue.enqueue("users/u1", {"version": 2})
+        queue.flush()
+        queue.close()
+
+        assert send.sent == [("users/u1", {"version": 2})]
+
+    def test_retry_with_backoff(self, journal):
+        send = Recorder(failures=1)
+        queue = WriteBehindQueue(journal, send)
+        queue.start = Mock()
+        queue.enqueue("users/u1", {"score": 1})
+
+        assert queue.flush_once() == 0
+        write = queue.pending()[0]
+        assert write.attempts == 1 and "indisponível" in write.last_error
+        # Backoff: ainda não está vencida
+        assert queue.flush_once() == 0
+
+        queue._journal().execute("UPDATE pending_writes SET next_attempt_at = 0")
+        assert queue.flush_once() == 1
+        queue.close()
+
+        assert send.sent == [("users/u1", {"score": 1})]
+
+    def test_permanent_error_is_retained(self, journal):
+        send = Recorder(failures=1, error=PermanentWriteError("HTTP 403"))
+        queue = WriteBehindQueue(journal, send, max_attempts=5)
+        queue.start = Mock()
+        queue.enqueue("users/u1", {"score": 1})
+
+        queue.flush_once()
+
+        assert queue.stats()['exhausted'] == 1
+        assert queue.flush()
+        assert send.sent == []
+        queue.close()
+
+    def test_exhausted_writes_are_failed_not_pending(self, journal):
+        queue = WriteBehindQueue(journal, Recorder(failures=1, error=PermanentWriteError("HTTP 403")))
+        queue.start = Mock()
+        queue.enqueue("users/u1", {"score": 1}, owner="u1")
+        queue.enqueue("users/u2", {"score": 2}, owner="u2")
+        queue._journal().execute("UPDATE pending_writes SET next_attempt_at = 1e12 WHERE owner = 'u2'")
+
+        queue.flush_once()
+
+        assert [write.owner for write in queue.pending()] == ["u2"]
+        assert [write.owner for write in queue.failed()] == ["u1"]
+        assert queue.failed("u1")[0].last_error == "HTTP 403"
+        assert len(queue.pending(include_exhausted=True)) == 2
+        queue.close()
+
+    def test_permanent_failure_does_not_shadow_destination(self, journal):
+        """Leitura antes do destino usa só escritas vivas; a rejeitada cede ao Firestore"""
+        queue = WriteBehindQueue(journal, Recorder(failures=1, error=PermanentWriteError("HTTP 400")))
+        queue.start = Mock()
+        queue.enqueue("users/u1", {"score": 1}, owner="u1")
+        assert pending_payload(queue, "users/u1", owner="u1") == {"score": 1}
+
+        queue.flush_once()
+
+        assert pending_payload(queue, "users/u1", owner="u1") is None
+        queue.enqueue("users/u1", {"score": 2}, owner="u1")
+        assert pending_payload(queue, "users/u1", owner="u1") == {"score": 2}
+        queue.close()
+
+    def test_pending_survives_restart(self, journal):
+        queue = WriteBehindQueue(journal, Recorder(failures=1))
+        queue.start = Mock()
+        queue.enqueue("users/u1", {"score": 1})
+        queue.flush_once()
+        queue.close()
+
+        send = Recorder()
+        reopened = WriteBehindQueue(journal, send)
+        reopened._journal().execute("UPDATE pending_writes SET next_attempt_at = 0")
+        reopened.flush()
+        reopened.close()
+
+        assert send.sent == [("users/u1", {"score": 1})]
+
+    def test_resume_flushes_pending_after_restart(self, journal):
+        queue = WriteBehindQueue(journal, Recorder())
+        queue.start = Mock()
+        queue.enqueue("users/u1", {"score": 1})
+        queue.close()
+
+        send = Recorder()
+        reopened = WriteBehindQueue(journal, send, flush_interval=0.05)
+        assert reopened.resume() == 1
+
+        deadline = time.monotonic() + 5
+        while reopened.stats()['pending'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        reopened.close()
+
+        assert send.sent == [("users/u1", {"score": 1})]
+
+    def test_resume_without_pending_does_not_start(self, journal):
+        queue = WriteBehindQueue(journal, Recorder())
+
+        assert queue.resume() == 0
+        assert queue._worker is None
+        queue.close()
+
+    def test_requeue_during_send_is_not_acknowledged(self, journal):
+        queue = WriteBehindQueue(journal, lambda key, payload: None)
+        queue.start = Mock()
+
+        def send(key, payload):
+            if payload["version"] == 1:
+                queue.enqueue(key, {"version": 2})
+
+        queue.send = send
+        queue.enqueue("users/u1", {"version": 1})
+        queue.flush_once()
+
+        assert [write.payload for write in queue.pending()] == [{"version": 2}]
+        queue.close()
+
+    def test_background_worker_flushes(self, journal):
+        send = Recorder()
+        queue = WriteBehindQueue(journal, send, flush_interval=0.05)
+        queue.enqueue("users/u1", {"score": 1})
+
+        deadline = time.monotonic() + 5
+        while queue.stats()['pending'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        queue.close()
+
+        assert send.sent == [("users/u1", {"score": 1})]
+
+
+class TestAssessmentWrites:
+    """Avaliações enfileiradas e enviadas ao backend"""
+
+    def test_payload_round_trip(self, sample_assessment):
+        decoded = decode_assessment(encode_assessment(sample_assessment))
+
+        assert decoded.answers == sample_assessment.answers
+        assert decoded.scores == sample_assessment.scores
+        assert decoded.timestamp == sample_assessment.timestamp
+        assert decoded.profile_insights == sample_assessment.profile_insights
+
+    def test_replay_into_sqlite_backend(self, tmp_path, sample_assessment):
+        storage = SQLiteStorage(str(tmp_path / "neuromap.db"), cache=LRUTTLCache())
+        queue = WriteBehindQueue(str(tmp_path / "journal.db"), backend_sender(storage))
+        queue.start = Mock()
+
+        key = enqueue_assessment(queue, sample_assessment.user_id, sample_assessment)
+        queue.flush()
+        enqueue_assessment(queue, sample_assessment.user_id, sample_assessment)
+        queue.flush()
+        assessments = asyncio.run(storage.get_user_assessments(sample_assessment.user_id))
+        queue.close()
+        storage.close()
+
+        assert key == assessment_key(sample_assessment.user_id, sample_assessment)
+        assert [a.assessment_id for a in assessments] == [sample_assessment.assessment_id]
+
+    @pytest.fixture
+    def firestore_manager(self, sample_assessment):
+        """FirestoreManager sobre um cliente falso; `stored` é o documento já existente"""
+        manager = FirestoreManager(cache=LRUTTLCache())
+        manager.db = Mock()
+        manager.rebuild_user_stats = AsyncMock()
+        doc_ref = manager.db.collection.return_value.document.return_value.collection.return_value.document.return_value
+        doc_ref.id = sample_assessment.assessment_id
+        manager.stored = doc_ref.get.return_value
+        yield manager
+        manager.close()
+
+    def save(self, manager, assessment):
+        with patch('src.services.database.firestore.transactional', lambda func: func):
+            return asyncio.run(manager.save_assessment(assessment.user_id, assessment))
+
+    def written(self, manager):
+        return [call.args[1] for call in manager.db.transaction.return_value.set.call_args_list]
+
+    def test_firestore_replay_rewrites_document_only(self, firestore_manager, sample_assessment):
+        firestore_manager.stored.exists = True
+        firestore_manager.stored.to_dict.return_value = firestore_manager._assessment_document(
+            sample_assessment.user_id, sample_assessment
+        )
+
+        result = self.save(firestore_manager, sample_assessment)
+
+        assert result == sample_assessment.assessment_id
+        written = self.written(firestore_manager)
+        assert len(written) == 1 and written[0]['revision'] == assessment_revision(sample_assessment)
+        firestore_manager.rebuild_user_stats.assert_not_called()
+
+    def test_firestore_changed_resave_updates_aggregates(self, firestore_manager, sample_assessment):
+        firestore_manager.stored.exists = True
+        firestore_manager.stored.to_dict.return_value = firestore_manager._assessment_document(
+            sample_assessment.user_id, sample_assessment
+        )
+        rescored = replace(sample_assessment, scores=replace(
+            sample_assessment.scores, disc=dict(sample_assessment.scores.disc, DISC_D=10.0)
+        ))
+
+        self.save(firestore_manager, rescored)
+
+        written = self.written(firestore_manager)
+        assert written[0]['revision'] == assessment_revision(rescored) != assessment_revision(sample_assessment)
+        assert len(written) > 1
+        firestore_manager.rebuild_user_stats.assert_awaited_once_with(sample_assessment.user_id)
+
+        deltas = firestore_manager._benchmark_deltas(rescored, sample_assessment)[GLOBAL_PERIOD]
+        assert 'sample_size' not in deltas
+        assert deltas['disc.D.sum'] == pytest.approx(10.0 - sample_assessment.scores.disc['DISC_D'])
+
+    def test_firestore_new_document_counts_once(self, firestore_manager, sample_assessment):
+        firestore_manager.stored.exists = False
+
+        self.save(firestore_manager, sample_assessment)
+
+        written = self.written(firestore_manager)
+        assert written[0]['revision'] == assessment_revision(sample_assessment)
+        assert written[1]['total_assessments'] == 1
+        firestore_manager.rebuild_user_stats.assert_not_called()